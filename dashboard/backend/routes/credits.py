@@ -94,8 +94,8 @@ def donate():
 
     result = credits_service.donate(str(user['id']), str(guild_id), amount)
     if not result.get('ok'):
-        # insufficient 는 200 + ok:false 로 — 프론트가 깔끔하게 처리.
-        if result.get('reason') == 'insufficient':
+        # insufficient / held_in_escrow(봇이 잡아 둔 크레딧 반환 대기) 는 200 + ok:false 로 — 프론트가 깔끔하게 처리.
+        if result.get('reason') in ('insufficient', 'held_in_escrow'):
             return jsonify(result), 200
         return jsonify(result), 400
     return jsonify(result), 200
@@ -2,15 +2,20 @@
 
 - /api/me/feed       : daily_feeds Firestore 컬렉션 최신 N일 조회
 - /api/me/whoami     : owner 여부만 빠르게 확인 (프론트 가드용)
+- /api/me/metrics    : 봇 프로세스들의 /metrics.json 을 모아서 요약 (명령어/외부 API/LLM 지연 등)
+- /api/me/health     : 봇 이벤트 루프 상태 전체 (블로킹 코드 위치 / 태스크 이름 — 공개 /api/bot/stats 는 p50/p99 만)
 
 owner_id 외 접근 시 403. OWNER_ID 환경변수 또는 Secret Manager 에서.
 """
 
 from __future__ import annotations
 
+import json
 import logging
 import os
 import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
 from flask import Blueprint, jsonify, request, session
@@ -20,6 +25,12 @@ me_bp = Blueprint('me', __name__)
 
 GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID', 'ironic-objectivist-465713-a6')
 DAILY_COLLECTION = 'daily_feeds'
+# 쉼표 구분. 샤드 워커는 포트가 워커 번호만큼 밀린다 (9464, 9465, ...)
+BOT_METRICS_URLS = [
+    url.strip() for url in
+    os.getenv('BOT_METRICS_URLS', 'http://127.0.0.1:9464/metrics.json').split(',')
+    if url.strip()
+]
 
 _owner_id_cache: str | None = None
 _firestore_client = None
@@ -112,3 +123,29 @@ def feed():
     except Exception as e:
         logger.exception('feed query 실패')
         return jsonify({'error': str(e)}), 500
+
+
+def _fetch_metrics(url: str) -> dict:
+    try:
+        with urllib.request.urlopen(url, timeout=3) as resp:
+            data = json.load(resp)
+        return {'url': url, 'instance': data.get('instance'), 'metrics': data.get('metrics', {})}
+    except Exception as e:
+        return {'url': url, 'error': str(e)}
+
+
+@me_bp.route('/metrics')
+@owner_required
+def bot_metrics():
+    """봇 인스턴스별 메트릭 요약 (카운터/게이지 값, 히스토그램 count/avg/p50/p95)."""
+    with ThreadPoolExecutor(max_workers=max(1, min(len(BOT_METRICS_URLS), 8))) as pool:
+        instances = list(pool.map(_fetch_metrics, BOT_METRICS_URLS))
+    return jsonify({'instances': instances})
+
+
+@me_bp.route('/health')
+@owner_required
+def bot_health():
+    """봇 인스턴스별 이벤트 루프 상태 — 지연, 멈춤 횟수, 블로킹 코드 위치(offenders), 태스크 수."""
+    from routes.servers import _load_bot_health
+    return jsonify({'health': _load_bot_health()})
@@ -15,6 +15,7 @@ _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
 if _PROJECT_ROOT not in sys.path:
     sys.path.insert(0, _PROJECT_ROOT)
 from run.core import config as bot_config
+from run.services import command_log_store, stats_store
 try:
     from dashboard_logger import log_action as log_dashboard_action
 except ImportError:
@@ -528,6 +529,53 @@ def get_server_roles(guild_id):
 
     return jsonify({'roles': sorted(formatted, key=lambda x: -x['position'])})
 
+_BOT_HEALTH_CACHE = {'data': None, 'fetched_at': 0.0}
+_BOT_HEALTH_TTL = 60  # 봇은 5분마다 기록 — 랜딩 페이지 트래픽마다 Firestore read 하지 않도록
+
+
+def _load_bot_health():
+    """봇 인스턴스별 이벤트 루프 상태 (bot_health 컬렉션, run/core/loop_monitor.py 가 기록)."""
+    import time
+    now = time.time()
+    cache = _BOT_HEALTH_CACHE
+    if cache['data'] is not None and (now - cache['fetched_at']) < _BOT_HEALTH_TTL:
+        return cache['data']
+    health = {}
+    fs = bot_config.get_firestore_client()
+    if fs:
+        try:
+            for doc in fs.collection('bot_health').stream():
+                data = doc.to_dict() or {}
+                loop = data.get('loop', {})
+                health[doc.id] = {
+                    'updatedAt': data.get('updatedAt'),
+                    'lag_ms': loop.get('lag_ms', {}),
+                    'stalls': loop.get('stalls', 0),
+                    'stall_ms': loop.get('stall_ms', 0),
+                    'offenders': [
+                        {k: o.get(k) for k in ('site', 'task', 'count', 'total_ms', 'max_ms', 'last_at')}
+                        for o in loop.get('offenders', [])
+                    ],
+                    'tasks': loop.get('tasks', {}),
+                }
+        except Exception as e:
+            logger.error(f'bot_health 로드 실패: {e}')
+    cache['data'] = health
+    cache['fetched_at'] = now
+    return health
+
+
+def _public_bot_health():
+    """공개 통계용 — 인스턴스별 루프 지연 p50/p99 만 (코드 위치 / 태스크 이름은 /api/me/health)."""
+    return {
+        instance: {
+            'updatedAt': data.get('updatedAt'),
+            'lag_ms': {k: data.get('lag_ms', {}).get(k) for k in ('p50', 'p99')},
+        }
+        for instance, data in _load_bot_health().items()
+    }
+
+
 @servers_bp.route('/bot/stats')
 def get_bot_stats():
     """Get bot statistics (public endpoint)"""
@@ -557,6 +605,7 @@ def get_bot_stats():
             'servers': servers,
             'commands': commands,
         },
+        'health': _public_bot_health(),
         'botClientId': DISCORD_CLIENT_ID,
     })
 
@@ -1070,56 +1119,21 @@ def preview_welcome_image(guild_id):
 @servers_bp.route('/servers/<guild_id>/stats')
 @admin_required
 def get_server_stats(guild_id):
-    """서버 통계 조회"""
-    settings = load_gcs_settings()
-    guild_settings = settings.get('guilds', {}).get(str(guild_id), {})
-    stats = guild_settings.get('stats', {
-        'daily': {},
-        'members': {},
-        'logs': []
-    })
-
-    # 일별 통계를 날짜순으로 정렬
-    daily_sorted = sorted(stats.get('daily', {}).items())
-
-    # 멤버 통계 (상위 20명)
-    members = stats.get('members', {})
-    top_members = sorted(
-        [{'id': k, **v} for k, v in members.items()],
-        key=lambda x: x.get('messages', 0),
-        reverse=True
-    )[:20]
-
-    return jsonify({
-        'daily': [{'date': k, **v} for k, v in daily_sorted],
-        'topMembers': top_members,
-        'logs': stats.get('logs', [])[-100:]  # 최근 100개
-    })
+    """서버 통계 조회 (guild_stats 일별 문서 — 설정 문서와 분리)"""
+    days = min(int(request.args.get('days', 30)), stats_store.DAILY_RETENTION_DAYS)
+    return jsonify(stats_store.get_guild_stats(guild_id, days=days, top=20, logs=100))
 
 
 @servers_bp.route('/servers/<guild_id>/stats/logs')
 @admin_required
 def get_server_logs(guild_id):
     """서버 활동 로그 조회"""
-    settings = load_gcs_settings()
-    guild_settings = settings.get('guilds', {}).get(str(guild_id), {})
-    stats = guild_settings.get('stats', {})
-
     log_type = request.args.get('type')  # join, leave, role_add, role_remove, message_delete, message_edit
     user_id = request.args.get('user_id')
     limit = int(request.args.get('limit', 100))
+    days = min(int(request.args.get('days', 7)), stats_store.DAILY_RETENTION_DAYS)
 
-    logs = stats.get('logs', [])
-
-    # 필터링
-    if log_type:
-        logs = [l for l in logs if l.get('type') == log_type]
-    if user_id:
-        logs = [l for l in logs if l.get('user_id') == user_id]
-
-    # 최신순 정렬
-    logs = sorted(logs, key=lambda x: x.get('timestamp', ''), reverse=True)[:limit]
-
+    logs = stats_store.get_logs(guild_id, log_type=log_type, user_id=user_id, limit=limit, days=days)
     return jsonify({'logs': logs})
 
 
@@ -1127,21 +1141,15 @@ def get_server_logs(guild_id):
 @admin_required
 def get_member_stats(guild_id, user_id):
     """특정 멤버 통계 조회"""
-    settings = load_gcs_settings()
-    guild_settings = settings.get('guilds', {}).get(str(guild_id), {})
-    stats = guild_settings.get('stats', {})
+    return jsonify(stats_store.get_member_stats(guild_id, user_id, days=30, logs=50))
 
-    # 멤버 정보
-    member_stats = stats.get('members', {}).get(user_id, {'messages': 0, 'name': ''})
 
-    # 해당 멤버의 로그
-    logs = [l for l in stats.get('logs', []) if l.get('user_id') == user_id]
-    logs = sorted(logs, key=lambda x: x.get('timestamp', ''), reverse=True)[:50]
-
-    return jsonify({
-        'member': member_stats,
-        'logs': logs
-    })
+@servers_bp.route('/servers/<guild_id>/stats/commands')
+@admin_required
+def get_command_stats(guild_id):
+    """명령어 사용 요약 (command_stats 일별 rollup 문서만 읽음)"""
+    days = min(int(request.args.get('days', 7)), command_log_store.COMMAND_STATS_TTL_DAYS)
+    return jsonify(command_log_store.get_summary(guild_id, days=days, top=10))
 
 
 # ============== 온보딩 ==============
@@ -61,6 +61,8 @@ export default function CreditDonateModal({ isOpen, onClose, onDone }: Props) {
       } else {
         if (r.reason === 'insufficient') {
           setError(`잔고 부족 (필요 ${r.needed} · 보유 ${r.balance})`)
+        } else if (r.reason === 'held_in_escrow') {
+          setError(`봇이 사용 중인 크레딧을 정산하는 중이에요. ${r.retry_after ?? 20}초 뒤 다시 시도해 주세요.`)
         } else {
           setError(r.reason || '실패')
         }
@@ -316,6 +316,7 @@ function formatLastBet(r: GachaResponse | null): string | null {
   if (!r.ok) {
     if (r.reason === 'daily_cap') return `오늘 베팅 한도 도달 (남은 ${r.remaining ?? 0})`
     if (r.reason === 'insufficient') return `잔고 부족 (필요 ${r.needed})`
+    if (r.reason === 'held_in_escrow') return `크레딧 정산 중 — ${r.retry_after ?? 20}초 뒤 다시 시도`
     return r.reason || '베팅 실패'
   }
   const mult = r.multiplier ?? 0
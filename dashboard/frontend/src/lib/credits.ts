@@ -42,8 +42,9 @@ export interface GachaResponse {
   balance?: number
   daily_bet?: number
   daily_cap?: number
-  // insufficient 시
+  // insufficient / held_in_escrow 시
   needed?: number
+  retry_after?: number
   // daily_cap 시
   cap?: number
   used_today?: number
@@ -58,6 +59,7 @@ export interface DonateResponse {
   donated?: number
   needed?: number
   balance?: number
+  retry_after?: number
 }
 
 export interface GuildBalance {
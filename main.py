@@ -8,18 +8,22 @@ import sys
 import os
 import asyncio
 import io
+import signal
 
 # Windows 콘솔 UTF-8 설정
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-from run.core.bot import bot
-from run.core import config
+# 봇 / 설정 모듈은 함수 안에서 import — 렌더 프로세스 풀(spawn) 워커가 이 파일을 __mp_main__ 으로
+# 다시 import 할 때 discord / 모든 Cog 까지 끌고 오지 않게 (scripts/check_render_workers.py)
 
 
 def run_bot():
     """Discord 봇 실행"""
+    from run.core.bot import bot
+    from run.core import config
+
     DISCORD_TOKEN = config.DISCORD_TOKEN
 
     if not DISCORD_TOKEN:
@@ -32,9 +36,27 @@ def run_bot():
 
 def main():
     """메인 실행 함수"""
+    from run.core import config
+
     _identity = config.BOT_IDENTITY
     _label = {"debi": "Debi 솔로봇", "marlene": "Marlene 솔로봇"}.get(_identity, "데비&마를렌 봇")
     print(f"[시작] {_label}을(를) 시작합니다... (identity={_identity})", flush=True)
+
+    # BOT_IMPORT_PROFILE=1 → 시작 경로 import 시간 요약 (-X importtime, 자식 프로세스)
+    if os.getenv("BOT_IMPORT_PROFILE"):
+        from run.utils.import_profile import format_summary, run_import_profile
+        print(format_summary(run_import_profile()), flush=True)
+
+    # BOT_WORKERS > 1 (unified) → 이 프로세스는 supervisor: 샤드를 나눠 워커 프로세스를 띄우고 관리
+    if config.BOT_WORKERS > 1 and not config.IS_WORKER and _identity == "unified":
+        from run.core.supervisor import run_supervisor
+        run_supervisor()
+        return
+
+    # 워커는 supervisor 의 SIGTERM 을 Ctrl+C 와 같게 처리 → bot.close() 로 알림/쓰기 flush 후 종료
+    if config.IS_WORKER:
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
     try:
         run_bot()
     except KeyboardInterrupt:
@@ -18,8 +18,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from typing import Dict, List, Optional
+import asyncio
 import logging
 import re
+import sqlite3
 
 from run.services.chat import get_chat_client
 from run.services.chat.chat_agent_graph import build_chat_agent
@@ -55,33 +57,11 @@ _histories: Dict[str, List[dict]] = {}
 MAX_HISTORY = 5
 
 # ========== 사용자별 일일 무료 + 크레딧 차감 ==========
-# 거노 결정: 하루 무료 5회까지, 그 이후엔 크레딧 -2/회. 봇 재시작 시 무료 카운터 리셋.
-# 크레딧 잔고는 Firestore 영속 → run.services.credits.debit 위임.
-from datetime import datetime, timezone, timedelta
-_KST = timezone(timedelta(hours=9))
+# 거노 결정: 하루 무료 5회까지, 그 이후엔 크레딧 -2/회. 무료 카운터는 KST 자정에 리셋.
+# 무료 카운터는 run.services.chat_quota (BOT_DATA_DIR SQLite, 통합봇/솔로봇 공유),
+# 크레딧 잔고는 Firestore 영속 → run.services.credit_escrow (lease 승인 + 묶음 정산) 위임.
 DAILY_FREE_CHAT = 5            # 하루 무료 대화 수 (사용자당)
 CHAT_CREDIT_COST = 2           # 무료 초과 시 메시지당 크레딧 차감
-_daily_counts: Dict[tuple, int] = {}  # {(user_scope, YYYY-MM-DD): count}
-
-
-def _chat_quota_key(user_id) -> tuple:
-    scope = f"u:{user_id}" if user_id is not None else "anon"
-    today = datetime.now(_KST).strftime("%Y-%m-%d")
-    return (scope, today)
-
-
-def _free_used(user_id) -> int:
-    return _daily_counts.get(_chat_quota_key(user_id), 0)
-
-
-def _free_remaining(user_id) -> int:
-    return max(0, DAILY_FREE_CHAT - _free_used(user_id))
-
-
-def _inc_free_quota(user_id) -> int:
-    key = _chat_quota_key(user_id)
-    _daily_counts[key] = _daily_counts.get(key, 0) + 1
-    return _daily_counts[key]
 
 
 async def _charge_chat_or_deny(user_id) -> dict:
@@ -90,17 +70,20 @@ async def _charge_chat_or_deny(user_id) -> dict:
     Returns:
         { ok: bool, mode: 'free'|'paid'|'insufficient', used?, balance?, charged? }
     """
-    import asyncio
-    from run.services import credits as credits_service
+    from run.services import chat_quota
+    from run.services.credit_escrow import get_credit_escrow
 
-    if _free_remaining(user_id) > 0:
-        used = _inc_free_quota(user_id)
+    try:
+        used = await asyncio.to_thread(chat_quota.consume, user_id, DAILY_FREE_CHAT)
+    except (sqlite3.Error, OSError) as e:
+        # 쿼터 저장소 장애 시 무료 판정 불가 → 크레딧 경로로
+        logger.warning("무료 대화 쿼터 확인 실패: %s", e)
+        used = None
+    if used is not None:
         return {'ok': True, 'mode': 'free', 'used': used, 'free_max': DAILY_FREE_CHAT}
 
-    # 무료 소진 → 크레딧 차감
-    result = await asyncio.to_thread(
-        credits_service.debit, user_id, CHAT_CREDIT_COST, 'chat_message',
-    )
+    # 무료 소진 → 크레딧 차감 (escrow lease 에서 즉시 승인, 정산은 주기적으로 묶어서)
+    result = await get_credit_escrow().debit(user_id, CHAT_CREDIT_COST, 'chat_message')
     if result.get('ok'):
         return {'ok': True, 'mode': 'paid', 'charged': CHAT_CREDIT_COST,
                 'balance': result.get('balance', 0)}
@@ -170,11 +153,17 @@ class ChatCog(commands.Cog, name="대화"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.client = get_chat_client()
-        self.chat_agent = build_chat_agent(self.client)
+        self._chat_agent = None  # LangGraph 앱은 첫 대화 때 compile (langgraph import 지연)
         # unified: /대화 슬래시 전용 (on_message 없음)
         # debi/marlene 솔로: 지정 채널 + 호명 키워드 시 on_message → Managed Agent (tool 사용)
         self.identity = _IDENTITY
 
+    @property
+    def chat_agent(self):
+        if self._chat_agent is None:
+            self._chat_agent = build_chat_agent(self.client)
+        return self._chat_agent
+
     async def cog_unload(self):
         await self.client.close()
 
@@ -196,9 +185,9 @@ class ChatCog(commands.Cog, name="대화"):
         from run.core import config as _cfg
         from run.services.chat.chime_decider import has_keyword as _has_keyword
 
-        # 지정 채널 외에서는 완전 무반응
-        designated = _cfg.get_solo_chat_channels(message.guild.id, self.identity)
-        if message.channel.id not in designated:
+        # 지정 채널 외에서는 완전 무반응 (채널 기능 색인 — Firestore read 없음)
+        features = _cfg.get_channel_features(message.channel.id)
+        if features is None or self.identity not in features.solo_identities:
             return
 
         # 키워드 호명이 아니면 여기서 처리 안 함 (ChimeInCog 담당).
@@ -207,8 +196,7 @@ class ChatCog(commands.Cog, name="대화"):
             return
 
         # 대화 토글 확인
-        guild_settings = _cfg.load_settings().get("guilds", {}).get(str(message.guild.id), {})
-        if not guild_settings.get("chat_enabled", True):
+        if not features.chat_enabled:
             return
 
         # 프롬프트 인젝션 방어
@@ -224,11 +212,8 @@ class ChatCog(commands.Cog, name="대화"):
 
         # 차단 체크 — 관리자가 이 유저의 chat 기능을 차단했으면 응답 안 함
         try:
-            import asyncio as _aio
             from run.services import blocklist as _bl
-            if guild_id is not None and await _aio.to_thread(
-                _bl.is_blocked, guild_id, message.author.id, "chat",
-            ):
+            if guild_id is not None and _bl.is_blocked(guild_id, message.author.id, "chat"):
                 await message.reply(
                     "관리자가 이 서버에서 대화 기능을 차단했어요.",
                     mention_author=False,
@@ -344,11 +329,8 @@ class ChatCog(commands.Cog, name="대화"):
 
         # 차단 체크 — 관리자가 이 유저의 chat 기능을 차단했으면 응답 안 함
         try:
-            import asyncio as _aio
             from run.services import blocklist as _bl
-            if guild_id is not None and await _aio.to_thread(
-                _bl.is_blocked, guild_id, user_id, "chat",
-            ):
+            if guild_id is not None and _bl.is_blocked(guild_id, user_id, "chat"):
                 await interaction.response.send_message(
                     "관리자가 이 서버에서 대화 기능을 차단했어요.",
                     ephemeral=True,
@@ -8,19 +8,25 @@
 
 Decider 게이트: 쿨다운 → 봇 streak 캡 → 확률 → Claude judge.
 통과 시 짧은 한 줄 대사를 채널에 전송.
+
+judge 맥락은 지정 채널 메시지를 on_message 에서 채널별 링 버퍼에 쌓아 두고 잘라 쓴다
+(history REST 호출 없음). 맥락 / 타이핑 표시는 확률·쿨다운 게이트를 통과한 뒤에만.
 """
 
 import logging
 import os
 import re
 
-import anthropic
 import discord
 from discord.ext import commands
 
 from run.core import config
 from run.services.chat.chat_agent_graph import PATCH_KEYWORDS
+from run.services.chat.channel_context import ChannelContextBuffer
 from run.services.chat.chime_decider import ChimeInDecider, has_keyword, is_question
+from run.utils.lazy_import import lazy_import
+
+anthropic = lazy_import("anthropic")  # 솔로봇에서 끼어들기 켜질 때만 로드
 
 # Managed Agent tool 호출 의도가 강한 자연어 키워드.
 # 매칭되면 chime_in의 짧은 judge 대신 ChatCog로 위임 → LangGraph + tool 사용.
@@ -35,7 +41,7 @@ TOOL_INTENT_KEYWORDS = re.compile(
 
 logger = logging.getLogger(__name__)
 
-CONTEXT_HISTORY_LIMIT = 5
+CONTEXT_HISTORY_LIMIT = 5  # 트리거 메시지 앞의 최근 메시지 수
 
 
 class ChimeInCog(commands.Cog, name="끼어들기"):
@@ -46,6 +52,7 @@ class ChimeInCog(commands.Cog, name="끼어들기"):
         self.identity = config.BOT_IDENTITY
         self.enabled = self.identity in ("debi", "marlene")
         self.decider: ChimeInDecider | None = None
+        self.context = ChannelContextBuffer(size=CONTEXT_HISTORY_LIMIT + 1)  # + 트리거 메시지
 
         if not self.enabled:
             return
@@ -65,17 +72,25 @@ class ChimeInCog(commands.Cog, name="끼어들기"):
         if not self.enabled or self.decider is None:
             return
 
-        # 자기 자신 메시지 무시 (무한 루프 방지)
-        if message.author.id == self.bot.user.id:
-            return
-
         # DM은 chime_in 대상 아님 (그룹 대화가 아니라서)
         if not message.guild:
             return
 
+        # 솔로봇은 지정 채널에서만 반응. 비지정 채널은 완전 무반응 (채널 기능 색인 조회 한 번).
+        # streak 은 지정 채널에서만 쓰이므로 비지정 채널은 상태도 만들지 않는다.
+        features = config.get_channel_features(message.channel.id)
+        if features is None or self.identity not in features.solo_identities:
+            return
+
         # 서버별 대화 토글이 꺼져 있으면 스킵 (ChatCog와 동일 규칙)
-        guild_settings = config.load_settings().get("guilds", {}).get(str(message.guild.id), {})
-        if not guild_settings.get("chat_enabled", True):
+        if not features.chat_enabled:
+            return
+
+        # judge 맥락용 링 버퍼 (자기 메시지 포함)
+        self.context.record(message)
+
+        # 자기 자신 메시지는 맥락에만 (무한 루프 방지)
+        if message.author.id == self.bot.user.id:
             return
 
         gid, cid = message.guild.id, message.channel.id
@@ -87,17 +102,11 @@ class ChimeInCog(commands.Cog, name="끼어들기"):
             # 유저 발화 → streak 리셋
             self.decider.on_user_message(gid, cid)
 
-        # 솔로봇은 지정 채널에서만 반응. 비지정 채널은 완전 무반응.
-        designated_channels = config.get_solo_chat_channels(gid, self.identity)
-        if cid not in designated_channels:
-            return
-
         # 관리자 차단 체크 — solo_chat 차단된 유저면 끼어들기 스킵
         if not is_bot:
             try:
-                import asyncio as _aio
                 from run.services import blocklist as _bl
-                if await _aio.to_thread(_bl.is_blocked, gid, message.author.id, "solo_chat"):
+                if _bl.is_blocked(gid, message.author.id, "solo_chat"):
                     return
             except Exception as e:
                 logger.warning("chime_in blocklist 체크 실패: %s", e)
@@ -124,16 +133,20 @@ class ChimeInCog(commands.Cog, name="끼어들기"):
         # 질문 vs 일반 채팅
         question_hit = not is_bot and is_question(message.content)
 
-        # 최근 맥락 수집
-        recent = await self._collect_context(message)
+        # 게이트 1~3 (쿨다운 / streak / 확률) — 대부분 여기서 끝, 맥락 / 타이핑 비용 없음
+        if not self.decider.passes_gates(gid, cid, relaxed=True, question_hit=question_hit):
+            return
+
+        # 최근 맥락 (트리거 메시지가 마지막) — 버퍼 자르기만
+        recent = self.context.lines(cid, CONTEXT_HISTORY_LIMIT + 1)
+        if not recent and message.content:
+            recent = [f"{message.author.display_name}: {message.content.strip()}"]
 
         # 타이핑 표시 — judge 호출 동안 Discord에 "입력 중..." 표시.
         async with message.channel.typing():
-            reply = await self.decider.maybe_chime(
+            reply = await self.decider.judge_chime(
                 gid, cid, recent,
                 triggering_author=message.author.display_name,
-                relaxed=True,
-                question_hit=question_hit,
             )
         if reply:
             try:
@@ -142,22 +155,8 @@ class ChimeInCog(commands.Cog, name="끼어들기"):
             except discord.HTTPException as e:
                 logger.warning("chime 전송 실패: %s", e)
 
-    async def _collect_context(self, message: discord.Message) -> list[str]:
-        """최근 메시지 N개 수집 (오래된 순). 방금 메시지는 마지막에 포함."""
-        lines: list[str] = []
-        try:
-            async for m in message.channel.history(limit=CONTEXT_HISTORY_LIMIT, before=message):
-                speaker = m.author.display_name
-                content = (m.content or "").strip()
-                if content:
-                    lines.append(f"{speaker}: {content}")
-        except discord.Forbidden:
-            pass
-        except Exception as e:
-            logger.debug("history 수집 실패 (무시): %s", e)
-
-        lines.reverse()
-        # 방금 트리거 메시지
-        if message.content:
-            lines.append(f"{message.author.display_name}: {message.content.strip()}")
-        return lines
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """지워진 메시지는 맥락에서도 뺌."""
+        if self.enabled:
+            self.context.discard(payload.channel_id, payload.message_id)
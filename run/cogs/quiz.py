@@ -15,8 +15,9 @@ from discord.ext import commands
 from run.services.quiz.quiz_manager import QuizManager
 from run.services.quiz.er_quiz import generate_er_question
 from run.services.quiz.song_quiz import (
-    SongQuiz, SongEntry, check_answer, get_title_hint, get_artist_hint,
-    ANSWER_TIMEOUT, HINT_DELAY,
+    SongQuiz, SongEntry, ClipPrefetcher, PreparedClip, check_answer,
+    get_title_hint, get_artist_hint, pick_clip_start,
+    ANSWER_TIMEOUT, HINT_DELAY, DEFAULT_TRACK_DURATION,
 )
 from run.services.voice_manager import voice_manager
 from run.views.quiz_view import (
@@ -79,11 +80,12 @@ class QuizCog(commands.Cog, name="퀴즈"):
         channel: discord.abc.Messageable,
         session,
         song: SongEntry,
-        stream_info: str,
+        clip: PreparedClip,
         question_num: int,
         total: int,
         guild_id: str,
         exclude_user_id: int = None,
+        question_started: float = None,
     ):
         """노래 퀴즈 한 문제의 재생, 힌트, 답변, 스킵을 처리합니다."""
 
@@ -95,7 +97,7 @@ class QuizCog(commands.Cog, name="퀴즈"):
         question_msg = await channel.send(embed=embed, view=skip_view)
 
         play_task = asyncio.create_task(
-            SongQuiz.play_clip(guild_id, stream_info, 180)
+            SongQuiz.play_clip(guild_id, clip, question_started)
         )
 
         answered = False
@@ -257,28 +259,36 @@ class QuizCog(commands.Cog, name="퀴즈"):
         )
         stop_view = QuizStopView(guild_id, self)
         await interaction.channel.send(embed=start_embed, view=stop_view)
-        await asyncio.sleep(2)
 
         channel = interaction.channel
 
-        for i in range(total):
-            if not session.is_active:
-                break
-
-            session.current_question = i + 1
-            song = song_quiz_instance.pick_song()
-            if not song:
-                await channel.send("곡 데이터를 불러올 수 없습니다.")
-                break
-
-            stream_info = await SongQuiz.get_stream_url(song, interaction.guild.me)
-            if not stream_info:
-                await channel.send(f"[{i + 1}/{total}] 곡을 검색할 수 없어 건너뜁니다.")
-                continue
+        # 시작 안내 중에 첫 클립부터 미리 준비 → 이후엔 현재 문제 진행 중에 다음 클립 준비
+        prefetcher = ClipPrefetcher(song_quiz_instance, interaction.guild.me)
+        prefetcher.start()
+        await asyncio.sleep(2)
 
-            await self._song_answer_loop(
-                channel, session, song, stream_info, i + 1, total, guild_id
-            )
+        try:
+            for i in range(total):
+                if not session.is_active:
+                    break
+
+                session.current_question = i + 1
+                question_started = time.monotonic()
+                song, clip = await prefetcher.next()
+                if not song:
+                    await channel.send("곡 데이터를 불러올 수 없습니다.")
+                    break
+
+                if not clip:
+                    await channel.send(f"[{i + 1}/{total}] 곡을 검색할 수 없어 건너뜁니다.")
+                    continue
+
+                await self._song_answer_loop(
+                    channel, session, song, clip, i + 1, total, guild_id,
+                    question_started=question_started,
+                )
+        finally:
+            prefetcher.close()
 
         final_session = QuizManager.end_session(guild_id)
         if final_session:
@@ -480,14 +490,21 @@ class QuizCog(commands.Cog, name="퀴즈"):
                 query=modal.search_query.value.strip(),
             )
 
+            question_started = time.monotonic()
             stream_info = await SongQuiz.get_stream_url(song, interaction.guild.me)
             if not stream_info:
                 await channel.send(f"[{i + 1}/{total}] 곡을 검색할 수 없어 건너뜁니다.")
                 continue
 
+            # 출제 모드는 다음 곡을 미리 알 수 없으므로 실시간 재생
+            clip = PreparedClip(
+                song=song, stream_url=stream_info,
+                start=pick_clip_start(DEFAULT_TRACK_DURATION),
+            )
             await self._song_answer_loop(
-                channel, session, song, stream_info, i + 1, total, guild_id,
+                channel, session, song, clip, i + 1, total, guild_id,
                 exclude_user_id=host.id,
+                question_started=question_started,
             )
 
         final_session = QuizManager.end_session(guild_id)
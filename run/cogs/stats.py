@@ -1,16 +1,19 @@
 """
 서버 통계 수집 Cog
 
-멤버 수, 메시지 수, 활동 로그를 수집하여 GCS에 저장합니다.
+멤버 수, 메시지 수, 활동 로그를 메모리에 모았다가 5분마다 서버별·일별 통계 문서
+(run.services.stats_store, guild_stats 컬렉션)에 write-behind 로 쌓습니다.
+설정 문서(guilds/{id})에는 더 이상 통계를 넣지 않습니다.
 """
 
+import asyncio
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
-from collections import defaultdict
 
-from run.core.config import load_settings, save_settings
+from run.core.config import is_primary_worker
+from run.services import stats_store
 
 logger = logging.getLogger(__name__)
 
@@ -20,115 +23,64 @@ class StatsCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # 메모리 캐시 (주기적으로 GCS에 저장)
-        self.message_counts = defaultdict(lambda: defaultdict(int))  # guild_id -> user_id -> count
-        self.daily_messages = defaultdict(int)  # guild_id -> count
-        self.member_logs = defaultdict(list)  # guild_id -> [log entries]
+        # 메모리 카운터 (5분마다 일별 통계 문서로 flush)
+        self.buffer = stats_store.StatsBuffer()
 
     async def cog_load(self):
         self.save_stats_task.start()
+        if is_primary_worker():
+            self.compact_stats_task.start()
 
     def cog_unload(self):
         self.save_stats_task.cancel()
+        self.compact_stats_task.cancel()
+        self._flush_stats()
 
     @tasks.loop(minutes=5)
     async def save_stats_task(self):
-        """5분마다 통계를 GCS에 저장"""
-        await self._save_stats_to_gcs()
+        """5분마다 통계를 일별 문서로 flush"""
+        self._flush_stats()
 
     @save_stats_task.before_loop
     async def before_save_stats(self):
         await self.bot.wait_until_ready()
 
-    async def _save_stats_to_gcs(self):
-        """통계를 GCS에 저장"""
-        if not self.message_counts and not self.member_logs:
-            return
-
+    @tasks.loop(hours=24)
+    async def compact_stats_task(self):
+        """보존 기간이 지난 일별 통계를 월별 rollup 으로 합침 (주 워커만)"""
         try:
-            settings = load_settings()
-            today = datetime.now().strftime('%Y-%m-%d')
-
-            for guild_id_str, user_counts in self.message_counts.items():
-                if guild_id_str not in settings.get('guilds', {}):
-                    continue
-
-                guild_settings = settings['guilds'][guild_id_str]
-
-                # stats 구조 초기화
-                if 'stats' not in guild_settings:
-                    guild_settings['stats'] = {
-                        'daily': {},
-                        'members': {},
-                        'logs': []
-                    }
-
-                stats = guild_settings['stats']
-
-                # 일별 통계
-                if today not in stats['daily']:
-                    guild = self.bot.get_guild(int(guild_id_str))
-                    stats['daily'][today] = {
-                        'messages': 0,
-                        'member_count': guild.member_count if guild else 0,
-                        'active_users': 0
-                    }
-
-                stats['daily'][today]['messages'] += self.daily_messages.get(guild_id_str, 0)
-                stats['daily'][today]['active_users'] = len(user_counts)
-
-                # 멤버별 메시지 수
-                for user_id_str, count in user_counts.items():
-                    if user_id_str not in stats['members']:
-                        stats['members'][user_id_str] = {'messages': 0, 'name': ''}
-                    stats['members'][user_id_str]['messages'] += count
-
-                # 30일 이전 데이터 정리
-                cutoff = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-                stats['daily'] = {k: v for k, v in stats['daily'].items() if k >= cutoff}
-
-            # 멤버 로그 저장
-            for guild_id_str, logs in self.member_logs.items():
-                if guild_id_str not in settings.get('guilds', {}):
-                    continue
-
-                guild_settings = settings['guilds'][guild_id_str]
-                if 'stats' not in guild_settings:
-                    guild_settings['stats'] = {'daily': {}, 'members': {}, 'logs': []}
-
-                guild_settings['stats']['logs'].extend(logs)
-                # 최근 1000개만 유지
-                guild_settings['stats']['logs'] = guild_settings['stats']['logs'][-1000:]
-
-            save_settings(settings, silent=True)
-
-            # 캐시 초기화
-            self.message_counts.clear()
-            self.daily_messages.clear()
-            self.member_logs.clear()
+            await asyncio.to_thread(stats_store.compact)
+        except Exception as e:
+            logger.error(f"[Stats] 통계 compaction 실패: {e}")
 
+    @compact_stats_task.before_loop
+    async def before_compact_stats(self):
+        await self.bot.wait_until_ready()
+
+    def _flush_stats(self):
+        """메모리 카운터를 write-behind 큐에 넣고 비움 (Firestore 읽기 없음)"""
+        if not self.buffer:
+            return
+        try:
+            member_counts = {}
+            for guild in self.bot.guilds:
+                if guild.member_count is not None:
+                    member_counts[str(guild.id)] = guild.member_count
+            self.buffer.flush(member_counts)
         except Exception as e:
             logger.error(f"[Stats] 통계 저장 실패: {e}")
 
+    def _log(self, guild_id, entry: dict):
+        entry['timestamp'] = datetime.now().isoformat()
+        self.buffer.record_log(guild_id, entry)
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """메시지 수 카운트"""
         if message.author.bot or not message.guild:
             return
 
-        guild_id = str(message.guild.id)
-        user_id = str(message.author.id)
-
-        self.message_counts[guild_id][user_id] += 1
-        self.daily_messages[guild_id] += 1
-
-        # 멤버 이름 업데이트 (나중에 조회용)
-        settings = load_settings()
-        if guild_id in settings.get('guilds', {}):
-            guild_settings = settings['guilds'][guild_id]
-            if 'stats' in guild_settings and 'members' in guild_settings['stats']:
-                if user_id in guild_settings['stats']['members']:
-                    guild_settings['stats']['members'][user_id]['name'] = message.author.display_name
+        self.buffer.record_message(message.guild.id, message.author.id, message.author.display_name)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -137,11 +89,10 @@ class StatsCog(commands.Cog):
             return
 
         guild_id = str(member.guild.id)
-        self.member_logs[guild_id].append({
+        self._log(guild_id, {
             'type': 'join',
             'user_id': str(member.id),
             'user_name': member.display_name,
-            'timestamp': datetime.now().isoformat()
         })
 
     @commands.Cog.listener()
@@ -151,11 +102,10 @@ class StatsCog(commands.Cog):
             return
 
         guild_id = str(member.guild.id)
-        self.member_logs[guild_id].append({
+        self._log(guild_id, {
             'type': 'leave',
             'user_id': str(member.id),
             'user_name': member.display_name,
-            'timestamp': datetime.now().isoformat()
         })
 
     @commands.Cog.listener()
@@ -174,21 +124,19 @@ class StatsCog(commands.Cog):
         guild_id = str(after.guild.id)
 
         if added_roles:
-            self.member_logs[guild_id].append({
+            self._log(guild_id, {
                 'type': 'role_add',
                 'user_id': str(after.id),
                 'user_name': after.display_name,
                 'roles': [r.name for r in added_roles],
-                'timestamp': datetime.now().isoformat()
             })
 
         if removed_roles:
-            self.member_logs[guild_id].append({
+            self._log(guild_id, {
                 'type': 'role_remove',
                 'user_id': str(after.id),
                 'user_name': after.display_name,
                 'roles': [r.name for r in removed_roles],
-                'timestamp': datetime.now().isoformat()
             })
 
     @commands.Cog.listener()
@@ -198,12 +146,11 @@ class StatsCog(commands.Cog):
             return
 
         guild_id = str(message.guild.id)
-        self.member_logs[guild_id].append({
+        self._log(guild_id, {
             'type': 'message_delete',
             'user_id': str(message.author.id),
             'user_name': message.author.display_name,
             'channel': message.channel.name,
-            'timestamp': datetime.now().isoformat()
         })
 
     @commands.Cog.listener()
@@ -216,12 +163,11 @@ class StatsCog(commands.Cog):
             return
 
         guild_id = str(after.guild.id)
-        self.member_logs[guild_id].append({
+        self._log(guild_id, {
             'type': 'message_edit',
             'user_id': str(after.author.id),
             'user_name': after.author.display_name,
             'channel': after.channel.name,
-            'timestamp': datetime.now().isoformat()
         })
 
 
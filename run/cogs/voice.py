@@ -18,7 +18,7 @@ import asyncio
 from run.services.tts import TTSService, AudioPlayer
 from run.services.tts.text_preprocessor import extract_segments_with_sfx, has_sfx_triggers, match_voice_line, preprocess_text_for_tts, split_text_for_tts
 from run.services.tts.audio_utils import convert_to_discord_pcm
-from run.core.config import load_settings, save_settings
+from run.core.config import get_guild, load_settings, save_settings
 from run.utils.command_logger import log_command_usage
 
 logger = logging.getLogger(__name__)
@@ -716,8 +716,7 @@ async def handle_tts_message(message: discord.Message):
 
     await initialize_audio_player()
 
-    settings = load_settings()
-    guild_settings = settings.get("guilds", {}).get(guild_id, {})
+    guild_settings = get_guild(guild_id)
 
     tts_channel_id = guild_settings.get("tts_channel_id")
     if not tts_channel_id:
@@ -731,9 +730,7 @@ async def handle_tts_message(message: discord.Message):
     # 관리자 차단 체크 — tts 차단된 유저면 읽지 않음 (조용히 무반응)
     try:
         from run.services import blocklist as _bl
-        if message.guild and await asyncio.to_thread(
-            _bl.is_blocked, message.guild.id, message.author.id, "tts",
-        ):
+        if message.guild and _bl.is_blocked(message.guild.id, message.author.id, "tts"):
             return
     except Exception as e:
         logger.warning("tts blocklist 체크 실패: %s", e)
@@ -750,9 +747,11 @@ async def handle_tts_message(message: discord.Message):
     if not tts_voice.startswith("edge_"):
         try:
             from run.services import credits as credits_service
+            from run.services.credit_escrow import get_credit_escrow
             est_seconds = min(60.0, max(1.0, len(message.content) / 3.0))
-            charge = await asyncio.to_thread(
-                credits_service.debit_for_tts, message.author.id, est_seconds, 'tts',
+            # escrow lease 에서 즉시 승인 — 오디오 생성 전에 Firestore 트랜잭션을 기다리지 않음
+            charge = await get_credit_escrow().debit(
+                message.author.id, credits_service.tts_cost(est_seconds), 'tts',
             )
             # 크레딧 부족(insufficient)만 차단. firestore 장애 등 시스템 문제는 무료 통과.
             if not charge.get('ok') and charge.get('reason') == 'insufficient':
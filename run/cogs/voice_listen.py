@@ -17,7 +17,6 @@ import base64
 import io
 import logging
 import struct
-import time
 import threading
 from collections import deque
 from typing import Dict, Optional
@@ -25,18 +24,22 @@ from typing import Dict, Optional
 import os
 
 import discord
-import webrtcvad
-from openai import AsyncOpenAI
 from discord import app_commands
 from discord.ext import commands
 from discord.opus import Decoder as OpusDecoder
 
-import davey
 import discord.ext.voice_recv as voice_recv
 
 from run.services.voice_manager import VoiceManager
 from run.services.tts import TTSService
 from run.utils.command_logger import log_command_usage
+from run.utils.lazy_import import lazy_import
+from run.utils.ttl_map import TTLMap
+
+# 듣기 모드를 처음 켤 때 로드 (VAD / DAVE 복호화 / Omni 호출)
+webrtcvad = lazy_import("webrtcvad")
+davey = lazy_import("davey")
+openai = lazy_import("openai")
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +111,10 @@ SYSTEM_PROMPT = """너는 이터널 리턴 루미아섬 실험체 쌍둥이 데
 # 웨이크워드 응답 음성 (로컬 재생용)
 WAKEWORD_THRESHOLD_SEC = 2.0  # 이 이하면 웨이크워드로 판단
 LISTEN_MODE_TIMEOUT_SEC = 8.0  # 듣기 모드 타임아웃
+LISTEN_MODE_MAX_USERS = 1024
+# 싱크(듣기 세션)별 유저 감지기 — 말 없는 유저는 이만큼 지나면 버림 (말하는 중이면 유지)
+SINK_USER_TTL_SEC = 300
+SINK_USER_MAX = 256
 
 SFX_DIR = os.path.join(os.path.dirname(__file__), "..", "assets", "sfx")
 ACK_AUDIO = {
@@ -222,8 +229,9 @@ class ListenSink(voice_recv.AudioSink):
         self.cog = cog
         self.guild_id = guild_id
         self.text_channel = text_channel
-        self.detectors: Dict[int, SpeechDetector] = {}
-        self._user_map: Dict[int, discord.Member] = {}
+        self.detectors = TTLMap(maxsize=SINK_USER_MAX, ttl=SINK_USER_TTL_SEC,
+                                keep=lambda _, det: det.is_speaking)  # uid -> SpeechDetector
+        self._user_map = TTLMap(maxsize=SINK_USER_MAX, ttl=SINK_USER_TTL_SEC)  # uid -> discord.Member
         self._first_data = True
         self._feed_count = 0
 
@@ -277,10 +285,7 @@ class ListenSink(voice_recv.AudioSink):
             self._user_map[uid] = user
 
         # SpeechDetector에 피딩
-        if uid not in self.detectors:
-            self.detectors[uid] = SpeechDetector()
-
-        wav_bytes = self.detectors[uid].feed_opus(opus_data)
+        wav_bytes = self.detectors.get_or_create(uid, SpeechDetector).feed_opus(opus_data)
         if wav_bytes is not None:
             # 발화 완성 -- asyncio 이벤트 루프로 처리 넘기기
             member = self._user_map.get(uid)
@@ -299,6 +304,7 @@ class ListenSink(voice_recv.AudioSink):
 
     def cleanup(self):
         self.detectors.clear()
+        self._user_map.clear()
 
 
 def parse_character_lines(text: str) -> list[tuple[str, str]]:
@@ -327,9 +333,9 @@ class VoiceListenCog(commands.Cog, name="음성듣기"):
         self.bot = bot
         self.active_sinks: Dict[str, ListenSink] = {}
         self.tts_services: Dict[str, TTSService] = {}
-        # 유저별 듣기 모드: {user_id: expiry_time}
-        self.listen_mode: Dict[int, float] = {}
-        self.listen_mode_timers: Dict[int, asyncio.Task] = {}
+        # 유저별 듣기 모드 (user_id 가 있으면 듣기 모드, 진입 후 LISTEN_MODE_TIMEOUT_SEC 에 만료)
+        self.listen_mode = TTLMap(maxsize=LISTEN_MODE_MAX_USERS, ttl=LISTEN_MODE_TIMEOUT_SEC, touch_on_get=False,
+                                  on_evict=lambda uid, _: logger.info(f"[듣기] 듣기 모드 타임아웃: {uid}"))
 
     async def cog_unload(self):
         for guild_id in list(self.active_sinks):
@@ -395,6 +401,7 @@ class VoiceListenCog(commands.Cog, name="음성듣기"):
             except Exception:
                 pass
             vm.voice_clients.pop(guild_id, None)
+            vm.clear_guild_state(guild_id)
             await asyncio.sleep(1)
 
         try:
@@ -478,39 +485,21 @@ class VoiceListenCog(commands.Cog, name="음성듣기"):
             except Exception:
                 pass
             vm.voice_clients.pop(guild_id, None)
+            vm.clear_guild_state(guild_id)
 
         logger.info(f"[듣기] 중지: {guild_id}")
 
     def _is_listen_mode(self, user_id: int) -> bool:
         """유저가 듣기 모드 중인지 확인"""
-        expiry = self.listen_mode.get(user_id)
-        if expiry and time.time() < expiry:
-            return True
-        self.listen_mode.pop(user_id, None)
-        return False
+        return user_id in self.listen_mode
 
     def _enter_listen_mode(self, user_id: int):
         """듣기 모드 진입 (타임아웃 후 자동 해제)"""
-        self.listen_mode[user_id] = time.time() + LISTEN_MODE_TIMEOUT_SEC
-        # 이전 타이머 취소
-        old_task = self.listen_mode_timers.pop(user_id, None)
-        if old_task and not old_task.done():
-            old_task.cancel()
-
-        async def _expire():
-            await asyncio.sleep(LISTEN_MODE_TIMEOUT_SEC)
-            self.listen_mode.pop(user_id, None)
-            self.listen_mode_timers.pop(user_id, None)
-            logger.info(f"[듣기] 듣기 모드 타임아웃: {user_id}")
-
-        self.listen_mode_timers[user_id] = asyncio.create_task(_expire())
+        self.listen_mode[user_id] = True
 
     def _exit_listen_mode(self, user_id: int):
         """듣기 모드 해제"""
         self.listen_mode.pop(user_id, None)
-        old_task = self.listen_mode_timers.pop(user_id, None)
-        if old_task and not old_task.done():
-            old_task.cancel()
 
     async def process_speech(
         self,
@@ -590,7 +579,7 @@ class VoiceListenCog(commands.Cog, name="음성듣기"):
             )
 
         try:
-            client = AsyncOpenAI(
+            client = openai.AsyncOpenAI(
                 api_key=os.getenv("DASHSCOPE_API_KEY"),
                 base_url="https://dashscope-intl.aliyuncs.com/compatible-mode/v1",
             )
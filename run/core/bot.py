@@ -13,7 +13,8 @@ import time
 from discord.ext import commands, tasks
 from datetime import datetime
 
-from run.core import config
+from run.core import config, metrics
+from run.services.sticky_engine import sticky_engine
 from run.services.eternal_return.api_client import initialize_game_data, set_bot_instance
 from run.services import youtube_service
 from run.views.welcome_view import WelcomeLayoutView
@@ -44,9 +45,45 @@ intents = discord.Intents.all()
 intents.presences = False
 
 
-class DebiMarleneBot(commands.Bot):
+# BOT_SHARD_COUNT 지정 시 AutoShardedBot — supervisor 워커는 BOT_SHARD_IDS 범위의 샤드만 접속
+_BotBase = commands.AutoShardedBot if config.SHARD_COUNT else commands.Bot
+
+
+COMMAND_SECONDS = metrics.histogram(
+    "command_seconds", "슬래시 명령어 처리 시간 (초)", ("command", "status"))
+
+
+class _MetricsCommandTree(discord.app_commands.CommandTree):
+    """명령어 실행 직전 시각을 interaction.extras 에 찍어 둔다 (완료/에러 핸들러에서 지연 기록)."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["metrics_t0"] = time.perf_counter()
+        return True
+
+
+def _observe_command(interaction: discord.Interaction, status: str):
+    t0 = interaction.extras.get("metrics_t0")
+    if t0 is None:
+        return
+    command = interaction.command
+    name = command.qualified_name if command else (interaction.data or {}).get("name", "?")
+    COMMAND_SECONDS.observe(time.perf_counter() - t0, command=name, status=status)
+
+
+class DebiMarleneBot(_BotBase):
     async def setup_hook(self):
         """봇 연결 전 Cog 등록 + Firestore listener 시작 (bot.run() 내부에서 호출됨)"""
+        from run.core.loop_monitor import LOOP_MONITOR_ENABLED, loop_monitor
+        if LOOP_MONITOR_ENABLED:
+            loop_monitor.start()
+
+        # 샤드 워커는 포트가 겹치지 않게 기본 포트 + 워커 번호
+        if metrics.METRICS_PORT:
+            metrics.start_http_server(
+                port=metrics.METRICS_PORT + config.WORKER_ID,
+                instance=config.worker_key(config.BOT_IDENTITY),
+            )
+
         # Firestore snapshot listener 등록 → settings cache 실시간 동기화 (read 0회 운영)
         try:
             await asyncio.to_thread(config.init_settings_listeners)
@@ -80,10 +117,43 @@ class DebiMarleneBot(commands.Bot):
                                 pass
         except Exception as e:
             print(f"[경고] 종료 알림 전송 실패: {e}", flush=True)
+
+        # 대기 중인 스티키 재전송 취소 (보낸 것의 lastMessageId 는 이미 큐에 있음)
+        sticky_engine.close()
+
+        # 명령어 로그 버퍼 → write-behind 큐 (아래 flush 에 같이 실림)
+        try:
+            from run.services import command_log_store
+            command_log_store.flush()
+        except Exception as e:
+            print(f"[경고] 명령어 로그 flush 실패: {e}", flush=True)
+
+        # write-behind 큐에 남은 Firestore 쓰기 flush (상호작용/명령어 로그/통계)
+        try:
+            await asyncio.to_thread(config.flush_pending_writes)
+        except Exception as e:
+            print(f"[경고] 대기 중인 쓰기 flush 실패: {e}", flush=True)
+
+        # 크레딧 escrow lease 정산 + 남은 양 반환
+        try:
+            from run.services.credit_escrow import peek_credit_escrow
+            escrow = peek_credit_escrow()
+            if escrow is not None:
+                await escrow.close()
+        except Exception as e:
+            print(f"[경고] 크레딧 escrow 정산 실패: {e}", flush=True)
+
+        from run.services.render_service import render_service
+        render_service.close()
+
+        from run.core.loop_monitor import loop_monitor
+        loop_monitor.stop()
+        metrics.stop_http_server()
         await super().close()
 
 
-bot = DebiMarleneBot(command_prefix='!', intents=intents, help_command=None)
+bot = DebiMarleneBot(command_prefix='!', intents=intents, help_command=None,
+                     tree_cls=_MetricsCommandTree, **config.shard_options())
 
 # App Command Mention 맵 {명령어이름: "</이름:ID>"}. sync 직후 채워짐 (on_ready)
 bot.command_mentions = {}
@@ -98,9 +168,6 @@ welcomed_guilds = set()
 welcome_timestamps = {}
 # YouTube 태스크 시작 여부 (on_ready 중복 호출 방지)
 _youtube_task_started = False
-# 스티키 메시지
-_sticky_cooldowns = {}
-STICKY_COOLDOWN_SECONDS = 5
 
 
 async def update_guild_data_to_gcs(guild: discord.Guild):
@@ -149,147 +216,35 @@ async def update_guild_data_to_gcs(guild: discord.Guild):
 
 
 async def update_server_info_to_gcs():
-    """서버 정보를 GCS settings.json에 업데이트"""
-    try:
-        # 사용자 정보 수집
-        users_data = []
-        seen_user_ids = set()
-
-        # YouTube 구독자 정보
-        subscribers = config.get_youtube_subscribers()
-        for user_id in subscribers:
-            if user_id not in seen_user_ids:
-                seen_user_ids.add(user_id)
-                try:
-                    # bot.fetch_user 사용하여 API로 실제 정보 가져오기
-                    user = await bot.fetch_user(user_id)
-                    if user:
-                        # display_name 사용하여 실제 닉네임/이름 가져오기
-                        user_name = user.display_name or user.global_name or user.name
-                        users_data.append({
-                            'id': str(user_id),
-                            'name': user_name,
-                            'type': 'YouTube 구독자',
-                            'last_seen': '2025-08-25',
-                            'servers': ['구독자 (개인 메시지)']
-                        })
-                    else:
-                        users_data.append({
-                            'id': str(user_id),
-                            'name': f"User_{str(user_id)[-4:]}",
-                            'type': 'YouTube 구독자',
-                            'last_seen': '알 수 없음',
-                            'servers': ['구독자 (개인 메시지)']
-                        })
-                except:
-                    users_data.append({
-                        'id': str(user_id),
-                        'name': f"User_{str(user_id)[-4:]}",
-                        'type': 'YouTube 구독자',
-                        'last_seen': '알 수 없음',
-                        'servers': ['구독자 (개인 메시지)']
-                    })
-
-        # 실제 서버 멤버들 중에서 봇과 상호작용한 사용자들 추가
-        interaction_users = config.get_interaction_users()  # 실제 상호작용한 사용자 목록
-
-        for user_id in interaction_users:
-            if user_id not in seen_user_ids:
-                seen_user_ids.add(user_id)
-                try:
-                    user = await bot.fetch_user(user_id)
-                    if user:
-                        user_name = user.display_name or user.global_name or user.name
-                        # 해당 사용자가 속한 서버들 찾기
-                        user_servers = []
-                        for guild in bot.guilds:
-                            try:
-                                member = guild.get_member(user_id)
-                                if member:
-                                    user_servers.append(guild.name)
-                            except:
-                                pass
+    """서버 실제 정보(이름/멤버수/가입일/상태)를 settings 의 guilds 문서에 반영합니다.
 
-                        users_data.append({
-                            'id': str(user_id),
-                            'name': user_name,
-                            'type': '일반 사용자',
-                            'last_seen': '2025-08-25',
-                            'servers': user_servers if user_servers else ['알 수 없음']
-                        })
-                except:
-                    users_data.append({
-                        'id': str(user_id),
-                        'name': f"User_{str(user_id)[-4:]}",
-                        'type': '일반 사용자',
-                        'last_seen': '알 수 없음',
-                        'servers': ['알 수 없음']
-                    })
-
-        server_data = {
-            'updated_at': datetime.now().isoformat(),
-            'total_servers': len(bot.guilds),
-            'total_members': sum(guild.member_count for guild in bot.guilds),
-            'total_users': len(users_data),
-            'servers': [],
-            'users': users_data
-        }
+    스냅샷과 비교해 바뀐 필드가 있는 서버만 쓴다. 마지막_업데이트 는 다른 필드가 바뀔 때만 함께 갱신.
+    (예전에는 구독자/상호작용 사용자를 한 명씩 fetch_user 해서 만든 목록을 저장하지 않고 버렸다.)
+    """
+    try:
+        snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+        now = datetime.now().isoformat()
+        updates = {}
 
         for guild in bot.guilds:
-            # 공지 채널 설정 확인
-            guild_settings = config.get_guild_settings(guild.id)
-            announcement_channel_id = guild_settings.get('ANNOUNCEMENT_CHANNEL_ID')
-            announcement_channel_name = "미설정"
-            announcement_display = "미설정"
-
-            if announcement_channel_id:
-                try:
-                    channel = guild.get_channel(announcement_channel_id)
-                    if channel:
-                        announcement_channel_name = f"#{channel.name}"
-                        announcement_display = f"#{channel.name} (ID: {announcement_channel_id})"
-                    else:
-                        announcement_channel_name = f"채널 ID: {announcement_channel_id} (접근불가)"
-                        announcement_display = f"채널 ID: {announcement_channel_id} (접근불가)"
-                except:
-                    announcement_channel_name = f"채널 ID: {announcement_channel_id}"
-                    announcement_display = f"채널 ID: {announcement_channel_id}"
-
-            server_info = {
-                'id': str(guild.id),
-                'name': guild.name,
-                'member_count': guild.member_count,
-                'joined_at': guild.me.joined_at.isoformat() if guild.me.joined_at else None,
-                'announcement_channel': announcement_channel_name,
-                'announcement_channel_display': announcement_display,
-                'announcement_channel_id': announcement_channel_id,
-                'status': '활성' if announcement_channel_id else '설정 필요',
-                'is_configured': bool(announcement_channel_id)
+            guild_id = str(guild.id)
+            if guild_id not in snapshot.guilds:
+                continue
+            current = snapshot.get_guild(guild_id)
+            announcement_channel_id = current.get('ANNOUNCEMENT_CHANNEL_ID')
+            fields = {
+                'GUILD_NAME': guild.name,
+                '멤버수': guild.member_count,
+                '가입일': guild.me.joined_at.isoformat() if guild.me.joined_at else None,
+                '상태': '활성' if announcement_channel_id else '설정 필요',
             }
+            changed = {key: value for key, value in fields.items() if current.get(key) != value}
+            if changed:
+                changed['마지막_업데이트'] = now
+                updates[guild_id] = changed
 
-            server_data['servers'].append(server_info)
-
-        # GCS settings.json 업데이트 (로컬 파일 저장 제거)
-        try:
-            current_settings = config.load_settings()
-
-            # 각 서버의 실제 정보를 settings.json의 guilds에 업데이트
-            for server in server_data['servers']:
-                guild_id = server['id']
-                if guild_id in current_settings.get('guilds', {}):
-                    # 기존 설정 유지하면서 실제 정보 업데이트
-                    current_settings['guilds'][guild_id].update({
-                        'GUILD_NAME': server['name'],
-                        '멤버수': server['member_count'],
-                        '가입일': server['joined_at'],
-                        '상태': server['status'],
-                        '마지막_업데이트': datetime.now().isoformat()
-                    })
-
-            config.save_settings(current_settings, silent=True)
-        except Exception as e:
-            print(f"[오류] GCS settings.json 업데이트 실패: {e}", flush=True)
-
+        if updates:
+            await asyncio.to_thread(config.update_docs, 'guilds', updates, True)
     except Exception as e:
         print(f"[오류] 웹 패널 데이터 저장 실패: {e}", flush=True)
 
@@ -308,9 +263,15 @@ async def on_error(event, *args, **kwargs):
     traceback.print_exc()
 
 
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    _observe_command(interaction, "ok")
+
+
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
     """슬래시 커맨드 에러 처리"""
+    _observe_command(interaction, "error")
     cmd_name = interaction.data.get("name", "?") if interaction.data else "?"
     # user-install 컨텍스트에서는 interaction.guild가 None이지만 guild_id는 살아있음
     if interaction.guild:
@@ -416,167 +377,214 @@ async def on_ready():
 async def _background_init():
     """봇 시작 후 백그라운드에서 실행되는 무거운 초기화 작업들.
 
+    단계별로 StartupOrchestrator 에 등록해 의존성이 없는 단계는 동시에 실행하고,
+    끝나면 단계별 소요 시간을 출력한다. 한 단계가 실패해도 나머지는 계속 진행.
+
     솔로봇(BOT_IDENTITY='debi'/'marlene')은 대화+끼어들기 전용이라
     TTS/YouTube/패치노트/쿠폰/음성복구/프레즌스 등 무거운 서비스를 전부 스킵.
     settings.json/사용자 정보 업데이트·이모지 맵 로드·게임 데이터 초기화는 유지
     (이모지는 대화 렌더링, 게임 데이터는 search_player_stats tool에서 필요).
     """
     import sys
+    from run.core.startup import StartupOrchestrator, display_name_of, fetch_users_bounded
 
     _is_solo = config.BOT_IDENTITY in ("debi", "marlene")
-
-    # TTS 서비스 초기화 (unified만)
-    if not _is_solo:
-        try:
-            # 데비/마를렌은 get_tts_service 에서 CosyVoice3 로 고정 초기화된다.
-            # (env TTS_ENGINE 은 초기화 엔진과 무관 — 표시를 실제 엔진에 맞춘다.)
-            tts_engine = "cosyvoice3"
-            print(f"[TTS] 초기화 시작 (엔진: {tts_engine})...", flush=True)
-            from run.cogs.voice import get_tts_service
-            await get_tts_service("debi")
-            await get_tts_service("marlene")
-            print(f"[TTS] 초기화 완료! (Debi, Marlene, 엔진: {tts_engine})", flush=True)
-        except Exception as e:
-            print(f"[TTS] 초기화 실패: {e}", flush=True)
-
-    # settings.json에 기존 서버들의 이름 정보를 한 번에 업데이트
-    # GCS 호출은 동기적이라 to_thread()로 이벤트 루프 차단 방지
-    settings = await asyncio.to_thread(config.load_settings)
-
-    for guild in bot.guilds:
-        try:
-            guild_id_str = str(guild.id)
-
-            if guild_id_str not in settings.get('guilds', {}):
-                settings.setdefault('guilds', {})[guild_id_str] = {}
-
-            guild_settings = settings['guilds'][guild_id_str]
-
-            announcement_channel_name = None
-            chat_channel_name = None
-
-            if guild_settings.get('ANNOUNCEMENT_CHANNEL_ID'):
-                announcement_channel = guild.get_channel(guild_settings['ANNOUNCEMENT_CHANNEL_ID'])
-                if announcement_channel:
-                    announcement_channel_name = announcement_channel.name
-
-            if guild_settings.get('CHAT_CHANNEL_ID'):
-                chat_channel = guild.get_channel(guild_settings['CHAT_CHANNEL_ID'])
-                if chat_channel:
-                    chat_channel_name = chat_channel.name
-
-            guild_settings['GUILD_NAME'] = guild.name
-            if announcement_channel_name:
-                guild_settings['ANNOUNCEMENT_CHANNEL_NAME'] = announcement_channel_name
-            if chat_channel_name:
-                guild_settings['CHAT_CHANNEL_NAME'] = chat_channel_name
-        except Exception as e:
-            print(f"[경고] {guild.name} 서버 정보 업데이트 실패: {e}", flush=True)
-
-    await asyncio.to_thread(config.save_settings, settings)
-
-    # 기존 사용자들의 이름 정보 업데이트
-    settings = await asyncio.to_thread(config.load_settings)
-    existing_users = settings.get("users", {})
-
-    for user_id_str, user_data in existing_users.items():
-        if "user_name" not in user_data or not user_data["user_name"]:
+    startup = StartupOrchestrator()
+
+    async def init_tts():
+        # 데비/마를렌은 get_tts_service 에서 CosyVoice3 로 고정 초기화된다.
+        # (env TTS_ENGINE 은 초기화 엔진과 무관 — 표시를 실제 엔진에 맞춘다.)
+        tts_engine = "cosyvoice3"
+        print(f"[TTS] 초기화 시작 (엔진: {tts_engine})...", flush=True)
+        from run.cogs.voice import get_tts_service
+        await get_tts_service("debi")
+        await get_tts_service("marlene")
+        print(f"[TTS] 초기화 완료! (Debi, Marlene, 엔진: {tts_engine})", flush=True)
+
+    async def load_settings_snapshot():
+        # GCS/Firestore 호출은 동기적이라 to_thread()로 이벤트 루프 차단 방지
+        await asyncio.to_thread(config.get_settings_snapshot)
+
+    async def sync_guild_names():
+        """서버/공지/대화 채널 이름을 settings 에 반영 — 바뀐 필드만 쓴다."""
+        snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+        updates = {}
+        for guild in bot.guilds:
             try:
-                user_id = int(user_id_str)
-                user = await bot.fetch_user(user_id)
-                if user:
-                    user_name = user.display_name or user.global_name or user.name
-                    await asyncio.to_thread(config.log_user_interaction, user_id, user_name)
+                guild_settings = snapshot.get_guild(guild.id)
+                fields = {'GUILD_NAME': guild.name}
+
+                if guild_settings.get('ANNOUNCEMENT_CHANNEL_ID'):
+                    announcement_channel = guild.get_channel(guild_settings['ANNOUNCEMENT_CHANNEL_ID'])
+                    if announcement_channel:
+                        fields['ANNOUNCEMENT_CHANNEL_NAME'] = announcement_channel.name
+
+                if guild_settings.get('CHAT_CHANNEL_ID'):
+                    chat_channel = guild.get_channel(guild_settings['CHAT_CHANNEL_ID'])
+                    if chat_channel:
+                        fields['CHAT_CHANNEL_NAME'] = chat_channel.name
+
+                changed = {key: value for key, value in fields.items() if guild_settings.get(key) != value}
+                if changed:
+                    updates[str(guild.id)] = changed
             except Exception as e:
-                print(f"  -> [경고] 사용자 {user_id_str} 이름 업데이트 실패: {e}", flush=True)
+                print(f"[경고] {guild.name} 서버 정보 업데이트 실패: {e}", flush=True)
+
+        if updates:
+            await asyncio.to_thread(config.update_docs, 'guilds', updates, True)
+        print(f"[시작] 서버 정보 동기화: {len(updates)}/{len(bot.guilds)}개 서버 변경", flush=True)
+
+    async def backfill_user_names():
+        """이름이 없는 사용자만 조회 (캐시 우선, fetch_user 는 동시 요청 수/간격 제한)."""
+        snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+        missing = []
+        for user_id_str, user_data in snapshot.users.items():
+            if not user_data.get("user_name"):
+                try:
+                    missing.append(int(user_id_str))
+                except (TypeError, ValueError):
+                    continue
+        if not missing:
+            return
 
-    # 웹 패널을 위한 봇 인스턴스 저장
-    try:
-        set_bot_instance(bot)
-    except Exception as e:
-        print(f"[경고] 웹 패널용 봇 인스턴스 등록 실패: {e}", flush=True)
+        users = await fetch_users_bounded(bot, missing)
+        updates = {
+            str(user_id): {'user_name': display_name_of(user)}
+            for user_id, user in users.items() if user is not None
+        }
+        if updates:
+            await asyncio.to_thread(config.update_docs, 'users', updates, True)
+        failed = len(missing) - len(updates)
+        print(f"[시작] 사용자 이름 보정: {len(updates)}명 갱신, {failed}명 실패", flush=True)
 
-    # GCS에 서버 정보 업데이트
-    try:
-        await update_server_info_to_gcs()
-    except Exception as e:
-        print(f"[경고] GCS 서버 정보 업데이트 실패: {e}", flush=True)
+    async def register_bot_instance():
+        # 웹 패널을 위한 봇 인스턴스 저장
+        set_bot_instance(bot)
 
-    # 서버 정보 정기 업데이트 태스크 시작
-    try:
+    async def start_server_info_task():
+        # 서버 정보 정기 업데이트 태스크 시작
         if not update_server_info_periodic.is_running():
             update_server_info_periodic.start()
-    except Exception as e:
-        print(f"[경고] 서버 정보 업데이트 태스크 시작 실패: {e}", flush=True)
 
-    try:
+    async def init_game_data():
         await initialize_game_data()
         print("[완료] 게임 데이터 초기화 완료.", flush=True)
 
-        if not _is_solo:
-            global _youtube_task_started
-            if not _youtube_task_started:
-                youtube_service.set_bot_instance(bot)
-                await youtube_service.initialize_youtube()
-                if not youtube_service.check_new_videos.is_running():
-                    youtube_service.check_new_videos.start()
-                _youtube_task_started = True
-
-            # 패치노트 체커 시작
-            from run.services.patchnote_service import start_patchnote_checker
-            start_patchnote_checker(bot)
-
-            # 쿠폰 크롤링 서비스 시작
-            from run.services.coupon_service import start_coupon_service
-            start_coupon_service(bot)
-
-            # 정기적 서버 수 로깅 태스크 시작
-            if not periodic_guild_logging.is_running():
-                periodic_guild_logging.start()
-
-        # 이모지 맵 로드
+    async def init_youtube():
+        global _youtube_task_started
+        if not _youtube_task_started:
+            youtube_service.set_bot_instance(bot)
+            await youtube_service.initialize_youtube()
+            if not youtube_service.check_new_videos.is_running():
+                youtube_service.check_new_videos.start()
+            _youtube_task_started = True
+
+    async def start_patchnote():
+        from run.services.patchnote_service import start_patchnote_checker
+        start_patchnote_checker(bot)
+
+    async def start_coupon():
+        # 쿠폰 크롤링 서비스 시작
+        from run.services.coupon_service import start_coupon_service
+        start_coupon_service(bot)
+
+    async def start_guild_logging():
+        # 정기적 서버 수 로깅 태스크 시작
+        if not periodic_guild_logging.is_running():
+            periodic_guild_logging.start()
+
+    async def init_emoji_map():
         from run.utils.emoji_utils import load_emoji_map, EmojiAutoUpdater
         await load_emoji_map(bot)
-
         bot.emoji_auto_updater = EmojiAutoUpdater(bot)
 
+    async def restore_voice():
+        # 기존 음성 연결 복구 (봇 재시작/RESUME 후 voice_manager에 등록)
+        from run.services.voice_manager import voice_manager
+        for vc in bot.voice_clients:
+            if vc.is_connected() and vc.guild:
+                guild_id = str(vc.guild.id)
+                voice_manager.voice_clients[guild_id] = vc
+                voice_manager.current_type[guild_id] = None
+                print(f"[음성] 기존 연결 복구: {vc.guild.name} / {vc.channel.name}", flush=True)
+
+    async def resume_broadcasts():
+        # 지난 실행에서 도중에 끊긴 알림 브로드캐스트(유튜브/패치노트/쿠폰)를 남은 대상에만 이어서 전송
+        # 대상이 많으면 오래 걸리므로 초기화 완료를 기다리게 하지 않는다
+        from run.services.broadcast_service import get_broadcast_engine
+        bot.broadcast_resume_task = asyncio.create_task(get_broadcast_engine(bot).resume_pending())
+
+    async def recover_credit_escrow():
+        # 지난 실행이 정산 못 하고 죽은 크레딧 lease 를 journal 로 정산 + 반환
+        from run.services.credit_escrow import get_credit_escrow
+        await get_credit_escrow().recover()
+
+    async def start_render_pool():
+        # 환영 이미지/MMR 그래프/이모지 렌더 워커 미리 띄우기 (PIL·matplotlib·폰트 warm-up)
+        from run.services.render_service import render_service
+        await render_service.start()
+
+    async def start_presence():
+        # 봇 상태(activity) 즉시 1회 + 5분 주기 갱신
+        # 즉시 호출이 없으면 부팅 후 5분간 presence 비어있어 봇 프로필 카드가 휑함
+        try:
+            await update_presence()
+        except Exception as e:
+            print(f"[경고] 초기 presence 갱신 실패: {e}", flush=True)
+        if not update_presence.is_running():
+            update_presence.start()
+            print("[완료] 동접수 상태 업데이트 태스크 시작 (5분 간격)", flush=True)
+
+    async def track_loop_timing():
+        # tasks.loop 회차별 실행 시간 + 회차 중 루프 멈춤 시간 (대시보드 health)
+        from run.core.loop_monitor import loop_monitor
+        loop_monitor.track(update_presence)
+        loop_monitor.track(update_server_info_periodic)
+        loop_monitor.track(periodic_guild_logging)
+        stats_cog = bot.get_cog("StatsCog")
+        if stats_cog is not None:
+            loop_monitor.track(stats_cog.save_stats_task)
         if not _is_solo:
-            # 기존 음성 연결 복구 (봇 재시작/RESUME 후 voice_manager에 등록)
-            from run.services.voice_manager import voice_manager
-            for vc in bot.voice_clients:
-                if vc.is_connected() and vc.guild:
-                    guild_id = str(vc.guild.id)
-                    voice_manager.voice_clients[guild_id] = vc
-                    voice_manager.current_type[guild_id] = None
-                    print(f"[음성] 기존 연결 복구: {vc.guild.name} / {vc.channel.name}", flush=True)
-
-            # 봇 상태(activity) 즉시 1회 + 5분 주기 갱신
-            # 즉시 호출이 없으면 부팅 후 5분간 presence 비어있어 봇 프로필 카드가 휑함
-            try:
-                await update_presence()
-            except Exception as e:
-                print(f"[경고] 초기 presence 갱신 실패: {e}", flush=True)
-            if not update_presence.is_running():
-                update_presence.start()
-                print("[완료] 동접수 상태 업데이트 태스크 시작 (5분 간격)", flush=True)
+            from run.services.patchnote_service import check_patchnotes
+            from run.services.coupon_service import check_coupons_task
+            loop_monitor.track(youtube_service.check_new_videos)
+            loop_monitor.track(check_patchnotes)
+            loop_monitor.track(check_coupons_task)
 
+    async def notify_started():
         print("[완료] 모든 초기화 완료!", flush=True)
         sys.stdout.flush()
-
         # 모든 초기화 끝난 뒤 봇 시작 Webhook 알림 (on_ready 시점 아님 — 너무 일렀음)
         # BOT_ENV=local 이면 "테스트 중" 메시지, VM이면 "시작" 메시지
-        try:
-            from run.services.webhook_logger import notify_bot_started
-            await notify_bot_started()
-        except Exception as e:
-            print(f"[경고] 시작 알림 전송 실패: {e}", flush=True)
+        from run.services.webhook_logger import notify_bot_started
+        await notify_bot_started()
 
-    except Exception as e:
-        print(f"[오류] 데이터 초기화 중 일부 실패 (봇은 계속 실행): {e}", flush=True)
-        sys.stdout.flush()
-        import traceback
-        traceback.print_exc()
-        sys.stdout.flush()
+    if not _is_solo:
+        startup.add("tts", init_tts)
+    startup.add("settings", load_settings_snapshot)
+    startup.add("guild_sync", sync_guild_names, deps=("settings",))
+    startup.add("user_backfill", backfill_user_names, deps=("settings",))
+    startup.add("bot_instance", register_bot_instance)
+    # 같은 guilds 필드를 쓰므로 guild_sync 뒤에
+    startup.add("server_info", update_server_info_to_gcs, deps=("guild_sync",))
+    startup.add("server_info_task", start_server_info_task, deps=("server_info",))
+    startup.add("game_data", init_game_data)
+    startup.add("emoji_map", init_emoji_map)
+    startup.add("loop_timing", track_loop_timing)
+    startup.add("credit_escrow", recover_credit_escrow)
+    if not _is_solo:
+        startup.add("youtube", init_youtube, deps=("settings",))
+        startup.add("patchnote", start_patchnote)
+        startup.add("coupon", start_coupon)
+        startup.add("guild_logging", start_guild_logging)
+        startup.add("voice_restore", restore_voice)
+        startup.add("presence", start_presence)
+        startup.add("render_pool", start_render_pool)
+        startup.add("broadcast_resume", resume_broadcasts, deps=("settings",))
+    startup.add("notify_started", notify_started, deps=tuple(startup.stage_names()))
+
+    await startup.run()
+    print(startup.report(), flush=True)
 
 
 STEAM_PLAYER_COUNT_URL = "https://api.steampowered.com/ISteamUserStats/GetNumberOfCurrentPlayers/v1/?appid=1049590"
@@ -823,10 +831,7 @@ async def on_voice_state_update(member, before, after):
         elif before.channel and not after.channel:
             # 봇이 음성 채널에서 나감 (퇴장, 킥, 연결 끊김 등)
             voice_manager.voice_clients.pop(guild_id, None)
-            voice_manager.current_type.pop(guild_id, None)
-            voice_manager.tts_interrupting.pop(guild_id, None)
-            voice_manager.music_restart_callbacks.pop(guild_id, None)
-            voice_manager.play_finished_events.pop(guild_id, None)
+            voice_manager.clear_guild_state(guild_id)
             voice_manager.cancel_idle_timer(guild_id)
             print(f"[음성] 연결 해제 정리: {before.channel.name}", flush=True)
         return
@@ -858,67 +863,6 @@ async def on_voice_state_update(member, before, after):
             voice_manager.cancel_idle_timer(guild_id)
 
 
-async def _handle_sticky_message(message):
-    """스티키 메시지 처리: 채널에 새 메시지가 오면 스티키 메시지를 다시 전송"""
-    channel_id_str = str(message.channel.id)
-    guild_id_str = str(message.guild.id)
-
-    # 쿨다운 체크 (채널별)
-    now = time.time()
-    last_sent = _sticky_cooldowns.get(channel_id_str, 0)
-    if now - last_sent < STICKY_COOLDOWN_SECONDS:
-        return
-
-    # 설정 로드 (listener cache 활용 → Firestore read 0)
-    try:
-        settings = await asyncio.to_thread(config.load_settings)
-    except Exception as e:
-        print(f"[스티키] 설정 로드 실패: {e}", flush=True)
-        return
-
-    sticky_messages = settings.get('guilds', {}).get(guild_id_str, {}).get('sticky_messages', [])
-    if not sticky_messages:
-        return
-
-    # 이 채널에 활성화된 스티키 메시지 모두 찾기
-    matching = [(i, sm) for i, sm in enumerate(sticky_messages)
-                if str(sm.get('channelId', '')) == channel_id_str and sm.get('enabled')]
-
-    if not matching:
-        return
-
-    # 쿨다운 설정
-    _sticky_cooldowns[channel_id_str] = now
-
-    changed = False
-    for idx, sticky in matching:
-        # 이전 스티키 메시지 삭제
-        old_message_id = sticky.get('lastMessageId')
-        if old_message_id:
-            try:
-                old_msg = await message.channel.fetch_message(int(old_message_id))
-                await old_msg.delete()
-            except (discord.NotFound, discord.HTTPException):
-                pass
-            except Exception as e:
-                print(f"[스티키] 이전 메시지 삭제 실패: {e}", flush=True)
-
-        # 새 스티키 메시지 전송 (silent)
-        try:
-            new_msg = await message.channel.send(sticky['content'], silent=True)
-            sticky_messages[idx]['lastMessageId'] = str(new_msg.id)
-            changed = True
-        except Exception as e:
-            print(f"[스티키] 메시지 전송 실패: {e}", flush=True)
-
-    # GCS에 lastMessageId 업데이트 (한 번만)
-    if changed:
-        try:
-            await asyncio.to_thread(config.save_settings, settings, True)
-        except Exception as e:
-            print(f"[스티키] 설정 저장 실패: {e}", flush=True)
-
-
 @bot.event
 async def on_message(message):
     """메시지 수신 시"""
@@ -935,15 +879,18 @@ async def on_message(message):
     # 솔로봇은 대화/끼어들기만 — 스티키/TTS 기능 스킵
     _is_solo_bot = config.BOT_IDENTITY in ("debi", "marlene")
 
-    # 스티키 메시지 처리 (서버 메시지만, unified만)
-    if message.guild and not _is_solo_bot:
+    # 채널별 기능 색인 — 스티키/TTS 가 없는 채널은 dict 조회 한 번으로 건너뜀
+    features = config.get_channel_features(message.channel.id) if message.guild else None
+
+    # 스티키 메시지 처리 (서버 메시지만, unified만) — 재전송 타이머만 걸고 바로 반환
+    if features and features.stickies and not _is_solo_bot:
         try:
-            await _handle_sticky_message(message)
+            sticky_engine.on_message(message, features)
         except Exception as e:
             print(f"[스티키] 처리 오류: {e}", flush=True)
 
     # TTS 메시지 처리 (서버 메시지만, unified만 — solo는 VoiceCog 미등록)
-    if message.guild and not _is_solo_bot:
+    if features and features.tts and not _is_solo_bot:
         try:
             from run.cogs.voice import handle_tts_message
             await handle_tts_message(message)
@@ -4,6 +4,9 @@ import time
 import threading
 from dotenv import load_dotenv
 
+from run.core.settings_snapshot import SettingsSnapshot
+from run.core.write_queue import write_queue, FIRESTORE_RPC_SECONDS, FIRESTORE_DOCS_WRITTEN
+
 # BOT_ENV_FILE이 지정되면 해당 파일을 로드 (솔로봇 로컬 테스트용 .env.solo-debi 등).
 # 미지정 시 기본 .env. override=False로 이미 설정된 env(예: GOOGLE_APPLICATION_CREDENTIALS)는 유지.
 _env_file = os.getenv('BOT_ENV_FILE', '.env')
@@ -40,6 +43,53 @@ GCS_KEY = 'settings.json'  # 레거시 fallback 전용
 # - 'gcs': 레거시 (롤백용)
 SETTINGS_BACKEND = os.getenv('SETTINGS_BACKEND', 'firestore').lower()
 
+# 샤드 멀티 프로세스 실행 (unified 전용)
+# - BOT_WORKERS > 1 이면 main.py 가 supervisor 로 동작해 워커 프로세스를 띄우고 샤드를 나눠 맡긴다
+# - 워커는 supervisor 가 BOT_WORKER_ID / BOT_SHARD_COUNT / BOT_SHARD_IDS 를 넣어서 실행
+# - BOT_SHARD_COUNT 만 지정하면 단일 프로세스 AutoShardedBot
+BOT_WORKERS = int(os.getenv('BOT_WORKERS', '1'))
+IS_WORKER = 'BOT_WORKER_ID' in os.environ
+WORKER_ID = int(os.getenv('BOT_WORKER_ID', '0'))
+SHARD_COUNT = int(os.getenv('BOT_SHARD_COUNT', '0')) or None
+
+
+def _parse_shard_ids(raw):
+    """'0-3' / '0,2,4' / '0-1,4' → [0, 1, 2, 3] ..."""
+    ids = []
+    for part in (raw or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            ids.extend(range(int(start), int(end) + 1))
+        else:
+            ids.append(int(part))
+    return ids or None
+
+
+SHARD_IDS = _parse_shard_ids(os.getenv('BOT_SHARD_IDS'))
+
+
+def shard_options():
+    """봇 생성자에 넘길 샤드 인자 (샤딩 미사용이면 빈 dict)."""
+    if not SHARD_COUNT:
+        return {}
+    return {'shard_count': SHARD_COUNT, 'shard_ids': SHARD_IDS}
+
+
+def is_primary_worker():
+    """DM 알림처럼 프로세스 하나만 해야 하는 작업 담당 여부 (단일 프로세스면 항상 True)."""
+    return WORKER_ID == 0
+
+
+def worker_key(key):
+    """워커별 중복 방지 상태 키. 워커마다 자기 샤드의 서버에만 보내므로 '보냈음' 기록도 워커 단위."""
+    if BOT_WORKERS <= 1:
+        return key
+    return f"{key}@w{WORKER_ID}"
+
+
 # 클라이언트 싱글톤
 gcs_client = None
 firestore_client = None
@@ -55,6 +105,11 @@ _listeners_active = False
 _listener_watches = []  # unsubscribe 용 핸들 보관
 _first_snapshot_event = threading.Event()  # 첫 동기화 완료 대기
 
+# 불변 설정 스냅샷 (읽기 전용 — get_guild / get_user 는 락/복사 없이 이 참조만 읽음)
+# 갱신은 _cache_lock 안에서 copy-on-write 로 새 스냅샷을 만든 뒤 참조를 교체
+_snapshot = SettingsSnapshot.empty()
+_snapshot_source = None  # listener 비활성 시 스냅샷을 만든 settings_cache 객체 (무효화 판정용)
+
 
 # ───────────────────── 클라이언트 초기화 ─────────────────────
 
@@ -111,17 +166,24 @@ def _fs_load_all_settings():
         return None
 
     try:
-        guilds = {}
-        for doc in fs.collection('guilds').stream():
-            guilds[doc.id] = doc.to_dict() or {}
+        with FIRESTORE_RPC_SECONDS.time(op="load_all"):
+            guilds = {}
+            for doc in fs.collection('guilds').stream():
+                guilds[doc.id] = doc.to_dict() or {}
 
-        users = {}
-        for doc in fs.collection('users').stream():
-            users[doc.id] = doc.to_dict() or {}
+            users = {}
+            for doc in fs.collection('users').stream():
+                users[doc.id] = doc.to_dict() or {}
 
-        global_doc = fs.collection('global').document('settings').get()
+            global_doc = fs.collection('global').document('settings').get()
         global_settings = global_doc.to_dict() if global_doc.exists else {}
 
+        for gid, gdata in guilds.items():
+            _remember_persisted('guilds', gid, gdata)
+        for uid, udata in users.items():
+            _remember_persisted('users', uid, udata)
+        _remember_persisted('global', 'settings', global_settings if global_doc.exists else None)
+
         return {
             'guilds': guilds,
             'users': users,
@@ -132,39 +194,121 @@ def _fs_load_all_settings():
         return None
 
 
-def _fs_save_all_settings(settings):
-    """레거시 dict 를 3컬렉션으로 분산 저장. batch 로 부분 atomicity 보장."""
+# ─────── 변경 추적 (dirty tracking) ───────
+# save_settings 는 호출처가 load_settings() 결과를 고쳐서 통째로 넘기는 레거시 시그니처라,
+# 마지막으로 Firestore 와 일치한다고 알고 있는 문서 상태(_persisted_docs, deep copy)와 비교해
+# 바뀐 문서/필드 경로만 update() 로 보낸다. 기준 상태는 전체 로드, snapshot callback, 쓰기 성공 시 갱신.
+_persisted_docs = {}  # (collection, doc_id) -> dict
+_persisted_lock = threading.Lock()
+_DELETE = object()  # _diff_fields 가 반환하는 '필드 삭제' 표시
+_write_stats = {
+    'saves': 0,
+    'docs_written': 0,
+    'docs_unchanged': 0,
+    'last_docs_written': 0,
+}
+
+
+def _remember_persisted(collection, doc_id, data):
+    """Firestore 와 일치하는 문서 상태를 기준으로 기록 (None 이면 삭제)."""
+    import copy
+    with _persisted_lock:
+        if data is None:
+            _persisted_docs.pop((collection, str(doc_id)), None)
+        else:
+            _persisted_docs[(collection, str(doc_id))] = copy.deepcopy(data)
+
+
+def _diff_fields(old, new, path=()):
+    """두 dict 의 차이를 (필드 경로 tuple, 새 값 | _DELETE) 목록으로 반환. 하위 dict 는 재귀 비교."""
+    changes = []
+    for key, value in new.items():
+        sub_path = path + (str(key),)
+        if key not in old:
+            changes.append((sub_path, value))
+        elif isinstance(value, dict) and isinstance(old[key], dict) and value:
+            changes.extend(_diff_fields(old[key], value, sub_path))
+        elif value != old[key]:
+            changes.append((sub_path, value))
+    for key in old:
+        if key not in new:
+            changes.append((path + (str(key),), _DELETE))
+    return changes
+
+
+def get_settings_write_stats():
+    """save_settings 누적 쓰기 통계 (저장 횟수, 실제 쓴 문서 수, 변경 없어 건너뛴 문서 수)."""
+    return dict(_write_stats)
+
+
+def _fs_save_changed_settings(settings):
+    """레거시 dict 중 기준 상태와 달라진 문서만 저장. 필드 단위 update() 마스크 사용.
+
+    기준 상태가 없는 문서(새 문서/아직 로드 전)는 기존처럼 전체 set(merge=False).
+    dict 에서 빠진 문서는 기존 전체 저장과 마찬가지로 삭제하지 않는다.
+    """
     fs = get_firestore_client()
     if not fs:
         return False
 
     try:
+        from google.cloud import firestore
+
         guilds = settings.get('guilds', {}) or {}
         users = settings.get('users', {}) or {}
         global_settings = settings.get('global', {}) or {}
 
-        # Firestore batch 한 번에 500 op 제한 → chunk 단위로 split
-        all_ops = []
+        docs = []
         for gid, gdata in guilds.items():
             if isinstance(gdata, dict):
-                all_ops.append(('guilds', str(gid), gdata))
+                docs.append(('guilds', str(gid), gdata))
         for uid, udata in users.items():
             if isinstance(udata, dict):
-                all_ops.append(('users', str(uid), udata))
+                docs.append(('users', str(uid), udata))
         if global_settings:
-            all_ops.append(('global', 'settings', global_settings))
+            docs.append(('global', 'settings', global_settings))
+
+        # (collection, doc_id, data, fields | None) — fields None 이면 전체 set
+        ops = []
+        with _persisted_lock:
+            for collection, doc_id, data in docs:
+                old = _persisted_docs.get((collection, doc_id))
+                if old is None:
+                    ops.append((collection, doc_id, data, None))
+                    continue
+                changes = _diff_fields(old, data)
+                if not changes:
+                    continue
+                fields = {
+                    firestore.FieldPath(*field_path).to_api_repr():
+                        (firestore.DELETE_FIELD if value is _DELETE else value)
+                    for field_path, value in changes
+                }
+                ops.append((collection, doc_id, data, fields))
 
-        # 500 op 단위 batch 분할 (set with merge)
-        for i in range(0, len(all_ops), 450):
+        # Firestore batch 한 번에 500 op 제한 → chunk 단위로 split
+        for i in range(0, len(ops), 450):
             batch = fs.batch()
-            for collection, doc_id, data in all_ops[i:i+450]:
+            chunk = ops[i:i+450]
+            for collection, doc_id, data, fields in chunk:
                 ref = fs.collection(collection).document(doc_id)
-                batch.set(ref, data, merge=False)  # 전체 dict 저장 = 레거시 호환
-            batch.commit()
-
+                if fields is None:
+                    batch.set(ref, data, merge=False)
+                else:
+                    batch.update(ref, fields)
+            with FIRESTORE_RPC_SECONDS.time(op="save_settings"):
+                batch.commit()
+            FIRESTORE_DOCS_WRITTEN.inc(len(chunk), path="direct")
+            for collection, doc_id, data, _ in chunk:
+                _remember_persisted(collection, doc_id, data)
+
+        _write_stats['saves'] += 1
+        _write_stats['docs_written'] += len(ops)
+        _write_stats['docs_unchanged'] += len(docs) - len(ops)
+        _write_stats['last_docs_written'] = len(ops)
         return True
     except Exception as e:
-        print(f"[Firestore 경고] 전체 저장 실패: {e}", flush=True)
+        print(f"[Firestore 경고] 설정 저장 실패: {e}", flush=True)
         return False
 
 
@@ -174,7 +318,8 @@ def _fs_get_guild(guild_id):
     if not fs:
         return None
     try:
-        doc = fs.collection('guilds').document(str(guild_id)).get()
+        with FIRESTORE_RPC_SECONDS.time(op="get_guild"):
+            doc = fs.collection('guilds').document(str(guild_id)).get()
         return doc.to_dict() if doc.exists else None
     except Exception as e:
         print(f"[Firestore 경고] guild {guild_id} 로드 실패: {e}", flush=True)
@@ -187,7 +332,9 @@ def _fs_set_guild(guild_id, data, merge=True):
     if not fs:
         return False
     try:
-        fs.collection('guilds').document(str(guild_id)).set(data, merge=merge)
+        with FIRESTORE_RPC_SECONDS.time(op="set_guild"):
+            fs.collection('guilds').document(str(guild_id)).set(data, merge=merge)
+        FIRESTORE_DOCS_WRITTEN.inc(path="direct")
         return True
     except Exception as e:
         print(f"[Firestore 경고] guild {guild_id} 저장 실패: {e}", flush=True)
@@ -200,7 +347,9 @@ def _fs_update_guild(guild_id, fields):
     if not fs:
         return False
     try:
-        fs.collection('guilds').document(str(guild_id)).set(fields, merge=True)
+        with FIRESTORE_RPC_SECONDS.time(op="update_guild"):
+            fs.collection('guilds').document(str(guild_id)).set(fields, merge=True)
+        FIRESTORE_DOCS_WRITTEN.inc(path="direct")
         return True
     except Exception as e:
         print(f"[Firestore 경고] guild {guild_id} 업데이트 실패: {e}", flush=True)
@@ -213,7 +362,8 @@ def _fs_delete_guild(guild_id):
     if not fs:
         return False
     try:
-        fs.collection('guilds').document(str(guild_id)).delete()
+        with FIRESTORE_RPC_SECONDS.time(op="delete_guild"):
+            fs.collection('guilds').document(str(guild_id)).delete()
         return True
     except Exception as e:
         print(f"[Firestore 경고] guild {guild_id} 삭제 실패: {e}", flush=True)
@@ -226,7 +376,8 @@ def _fs_get_user(user_id):
     if not fs:
         return None
     try:
-        doc = fs.collection('users').document(str(user_id)).get()
+        with FIRESTORE_RPC_SECONDS.time(op="get_user"):
+            doc = fs.collection('users').document(str(user_id)).get()
         return doc.to_dict() if doc.exists else None
     except Exception as e:
         print(f"[Firestore 경고] user {user_id} 로드 실패: {e}", flush=True)
@@ -239,7 +390,9 @@ def _fs_update_user(user_id, fields):
     if not fs:
         return False
     try:
-        fs.collection('users').document(str(user_id)).set(fields, merge=True)
+        with FIRESTORE_RPC_SECONDS.time(op="update_user"):
+            fs.collection('users').document(str(user_id)).set(fields, merge=True)
+        FIRESTORE_DOCS_WRITTEN.inc(path="direct")
         return True
     except Exception as e:
         print(f"[Firestore 경고] user {user_id} 업데이트 실패: {e}", flush=True)
@@ -252,7 +405,8 @@ def _fs_get_global():
     if not fs:
         return None
     try:
-        doc = fs.collection('global').document('settings').get()
+        with FIRESTORE_RPC_SECONDS.time(op="get_global"):
+            doc = fs.collection('global').document('settings').get()
         return doc.to_dict() if doc.exists else {}
     except Exception as e:
         print(f"[Firestore 경고] global 로드 실패: {e}", flush=True)
@@ -265,7 +419,9 @@ def _fs_update_global(fields):
     if not fs:
         return False
     try:
-        fs.collection('global').document('settings').set(fields, merge=True)
+        with FIRESTORE_RPC_SECONDS.time(op="update_global"):
+            fs.collection('global').document('settings').set(fields, merge=True)
+        FIRESTORE_DOCS_WRITTEN.inc(path="direct")
         return True
     except Exception as e:
         print(f"[Firestore 경고] global 업데이트 실패: {e}", flush=True)
@@ -277,46 +433,124 @@ def _fs_update_global(fields):
 # load_settings() 는 cache 만 반환, Firestore read 0회
 # 변경 비용: 변경된 doc 만 청구 (전체 172 docs 매번 X)
 
-def _on_guilds_snapshot(col_snapshot, changes, read_time):
-    global settings_cache
+_settings_observers = []  # (collection, {doc_id: data | None}) 콜백 — supervisor 가 공유 캐시로 중계
+
+
+def add_settings_observer(callback):
+    """listener 가 받은 문서 변경을 통지받을 콜백 등록 (supervisor → 워커 중계용)."""
+    _settings_observers.append(callback)
+
+
+def _apply_collection_updates(collection, updates, replace=False):
+    """문서 변경 {doc_id: data | None(삭제)} 을 cache / 스냅샷 / 저장 기준 상태에 반영합니다.
+
+    Firestore listener 와 공유 캐시 동기화(워커)가 같이 쓴다. replace=True 면 updates 가
+    컬렉션 전체 상태라서 거기 없는 문서는 삭제로 처리한다. global 은 doc_id 'settings' 하나.
+    """
+    global settings_cache, _snapshot
     with _cache_lock:
         if settings_cache is None:
             settings_cache = {'guilds': {}, 'users': {}, 'global': {}}
-        guilds = settings_cache.setdefault('guilds', {})
-        for change in changes:
-            doc_id = change.document.id
-            if change.type.name == 'REMOVED':
-                guilds.pop(doc_id, None)
-            else:  # ADDED, MODIFIED
-                guilds[doc_id] = change.document.to_dict() or {}
+        if collection == 'global':
+            data = updates.get('settings')
+            settings_cache['global'] = data or {}
+            _remember_persisted('global', 'settings', data)
+            _snapshot = _snapshot.with_global(settings_cache['global'])
+        else:
+            docs = settings_cache.setdefault(collection, {})
+            if replace:
+                updates = {**{doc_id: None for doc_id in docs if doc_id not in updates}, **updates}
+            for doc_id, data in updates.items():
+                if data is None:
+                    docs.pop(doc_id, None)
+                else:
+                    docs[doc_id] = data
+                _remember_persisted(collection, doc_id, data)
+            if updates:
+                if collection == 'guilds':
+                    _snapshot = _snapshot.with_guilds(updates)
+                else:
+                    _snapshot = _snapshot.with_users(updates)
+    for observer in _settings_observers:
+        try:
+            observer(collection, updates)
+        except Exception as e:
+            print(f"[설정 동기화] observer 오류: {e}", flush=True)
+
+
+def _changes_to_updates(changes):
+    updates = {}
+    for change in changes:
+        doc_id = change.document.id
+        if change.type.name == 'REMOVED':
+            updates[doc_id] = None
+        else:  # ADDED, MODIFIED
+            updates[doc_id] = change.document.to_dict() or {}
+    return updates
+
+
+def _on_guilds_snapshot(col_snapshot, changes, read_time):
+    _apply_collection_updates('guilds', _changes_to_updates(changes))
     _first_snapshot_event.set()
 
 
 def _on_users_snapshot(col_snapshot, changes, read_time):
-    global settings_cache
-    with _cache_lock:
-        if settings_cache is None:
-            settings_cache = {'guilds': {}, 'users': {}, 'global': {}}
-        users = settings_cache.setdefault('users', {})
-        for change in changes:
-            doc_id = change.document.id
-            if change.type.name == 'REMOVED':
-                users.pop(doc_id, None)
-            else:
-                users[doc_id] = change.document.to_dict() or {}
+    _apply_collection_updates('users', _changes_to_updates(changes))
 
 
 def _on_global_snapshot(doc_snapshot, changes, read_time):
-    global settings_cache
-    with _cache_lock:
-        if settings_cache is None:
-            settings_cache = {'guilds': {}, 'users': {}, 'global': {}}
-        # global 은 단일 doc → snapshot list 에 1개만 옴
-        for snap in doc_snapshot:
-            if snap.exists:
-                settings_cache['global'] = snap.to_dict() or {}
-            else:
-                settings_cache['global'] = {}
+    # global 은 단일 doc → snapshot list 에 1개만 옴
+    for snap in doc_snapshot:
+        data = (snap.to_dict() or {}) if snap.exists else None
+        _apply_collection_updates('global', {'settings': data})
+
+
+def _init_shared_settings_sync(wait_first_snapshot_seconds):
+    """워커 프로세스: Firestore listener 대신 supervisor 공유 캐시의 'settings' 채널을 구독.
+
+    supervisor 가 listener 하나로 받은 변경을 (collection, doc_id) 키로 중계하므로 워커 수만큼
+    listener 초기 읽기가 늘지 않는다. 워커 자신의 쓰기는 _apply_local_fields 로 먼저 반영되고
+    listener echo 가 곧 같은 값으로 다시 들어온다.
+    """
+    global _listeners_active
+    from run.core import shared_cache
+
+    client = shared_cache.new_client()  # 블로킹 poll 전용 연결
+
+    def _apply(updates, full):
+        grouped = {'guilds': {}, 'users': {}, 'global': {}}
+        for (collection, doc_id), data in updates.items():
+            grouped.setdefault(collection, {})[doc_id] = data
+        for collection, docs in grouped.items():
+            if collection == 'global':
+                if docs or full:
+                    _apply_collection_updates('global', {'settings': docs.get('settings')})
+            elif docs or full:
+                _apply_collection_updates(collection, docs, replace=full)
+
+    def _run():
+        since = 0
+        while _listeners_active:
+            try:
+                seq, updates, full = client.poll('settings', since, 30.0)
+            except Exception as e:
+                print(f"[설정 동기화] 공유 캐시 poll 실패: {e}", flush=True)
+                time.sleep(2)
+                since = 0  # 다시 붙으면 전체 상태부터
+                continue
+            if updates or full:
+                _apply(updates, full)
+            since = seq
+            if seq:
+                _first_snapshot_event.set()
+
+    _listeners_active = True
+    threading.Thread(target=_run, name="shared-settings-sync", daemon=True).start()
+    if _first_snapshot_event.wait(timeout=wait_first_snapshot_seconds):
+        print(f"[설정 동기화] 공유 캐시 구독 완료 (worker={WORKER_ID})", flush=True)
+    else:
+        print(f"[설정 동기화] 공유 캐시 첫 상태 대기 timeout ({wait_first_snapshot_seconds}s)", flush=True)
+    return True
 
 
 def init_settings_listeners(wait_first_snapshot_seconds=5):
@@ -333,6 +567,10 @@ def init_settings_listeners(wait_first_snapshot_seconds=5):
     if _listeners_active:
         return True
 
+    from run.core import shared_cache
+    if shared_cache.is_enabled():
+        return _init_shared_settings_sync(wait_first_snapshot_seconds)
+
     fs = get_firestore_client()
     if not fs:
         print("[Firestore listener] 클라이언트 없음 → 기존 lazy-load 모드 유지", flush=True)
@@ -371,6 +609,11 @@ def init_settings_listeners(wait_first_snapshot_seconds=5):
         return False
 
 
+def settings_listeners_active():
+    """snapshot listener(또는 워커의 공유 캐시 구독)로 스냅샷이 자동 동기화 중인지."""
+    return _listeners_active
+
+
 def shutdown_settings_listeners():
     """봇 종료 시 listener unsubscribe (선택사항, 프로세스 종료로도 정리됨)."""
     global _listeners_active, _listener_watches
@@ -428,6 +671,9 @@ def load_settings(force_reload=False):
     3. 로컬 backups/settings_backup.json (최후 fallback)
 
     listener 활성 시 force_reload 는 무시됨 (snapshot 으로 자동 동기화).
+
+    반환값은 얕은 복사본이라 하위 dict 를 고치면 캐시까지 바뀐다. 읽기만 할 때는
+    get_guild() / get_user() 를, 부분 수정은 update_guild() / update_user() 를 쓴다.
     """
     global settings_cache
 
@@ -483,6 +729,190 @@ def load_settings(force_reload=False):
     return default_settings
 
 
+# ─────── 읽기 전용 스냅샷 API (핫패스용) ───────
+
+def get_settings_snapshot() -> SettingsSnapshot:
+    """현재 설정의 불변 스냅샷을 반환합니다.
+
+    listener 활성 시 참조 하나를 읽을 뿐이라 락/복사/Firestore read 가 없다.
+    listener 비활성 시(dashboard 단발 호출 등)에는 settings_cache 가 바뀌었을 때만 다시 만든다.
+    """
+    global _snapshot, _snapshot_source
+    if _listeners_active:
+        return _snapshot
+    if settings_cache is None or settings_cache is not _snapshot_source:
+        settings = load_settings()
+        with _cache_lock:
+            _snapshot = SettingsSnapshot.from_dict(settings, _snapshot.version + 1)
+            _snapshot_source = settings_cache
+    return _snapshot
+
+
+def get_guild(guild_id):
+    """서버 설정 읽기 전용 view (없으면 빈 mapping). 수정하려면 update_guild() 사용."""
+    return get_settings_snapshot().get_guild(guild_id)
+
+
+def get_user(user_id):
+    """사용자 설정 읽기 전용 view (없으면 빈 mapping). 수정하려면 update_user() 사용."""
+    return get_settings_snapshot().get_user(user_id)
+
+
+def get_channel_features(channel_id):
+    """채널별 파생 설정 색인 (TTS/스티키/솔로 대화·끼어들기). 기능 없는 채널이면 None.
+
+    on_message 핫패스용 — dict 조회 한 번. 색인은 snapshot listener 가 바뀐 서버만 다시 계산한다.
+    """
+    return get_settings_snapshot().get_channel_features(channel_id)
+
+
+def get_blocked_features(guild_id, user_id):
+    """(서버, 유저) 차단 기능 bitset (settings_snapshot.BLOCK_FEATURE_BITS). 차단 없으면 0.
+
+    blocked_users 를 snapshot listener 가 색인해 둔 값이라 dict 조회뿐 (Firestore 읽기 없음).
+    """
+    return get_settings_snapshot().get_blocked_features(guild_id, user_id)
+
+
+def _fs_set_fields(collection, doc_id, fields):
+    """최상위 필드만 통째로 교체 (문서 없으면 생성). set(merge=필드목록) — 하위 map 은 병합하지 않음."""
+    fs = get_firestore_client()
+    if not fs:
+        return False
+    try:
+        from google.cloud import firestore
+        with FIRESTORE_RPC_SECONDS.time(op="set_fields"):
+            fs.collection(collection).document(str(doc_id)).set(
+                fields, merge=[firestore.FieldPath(key) for key in fields],
+            )
+        FIRESTORE_DOCS_WRITTEN.inc(path="direct")
+        return True
+    except Exception as e:
+        print(f"[Firestore 경고] {collection}/{doc_id} 필드 저장 실패: {e}", flush=True)
+        return False
+
+
+def _apply_local_fields(collection, doc_id, fields):
+    """쓰기 성공 직후 스냅샷/기준 상태에 바로 반영 (listener echo 를 기다리지 않음)."""
+    _apply_local_fields_many(collection, {doc_id: fields})
+
+
+def _apply_local_fields_many(collection, updates):
+    """{doc_id: fields} 여러 문서를 스냅샷 교체 한 번으로 반영 (일괄 쓰기용)."""
+    global _snapshot
+    import copy
+    updates = {str(doc_id): fields for doc_id, fields in updates.items() if fields}
+    if not updates:
+        return
+    with _cache_lock:
+        # load_settings() 가 돌려주는 settings_cache 도 같이 — 안 그러면 레거시 save_settings 가
+        # 옛 값을 새 기준 상태와 비교해 Firestore 에 되돌려 쓴다
+        if settings_cache is not None:
+            docs = settings_cache.setdefault(collection, {})
+            for doc_id, fields in updates.items():
+                docs[doc_id] = {**(docs.get(doc_id) or {}), **copy.deepcopy(fields)}
+        if collection == 'guilds':
+            _snapshot = _snapshot.with_guild_fields_many(updates)
+        else:
+            _snapshot = _snapshot.with_user_fields_many(updates)
+    with _persisted_lock:
+        for doc_id, fields in updates.items():
+            base = _persisted_docs.get((collection, doc_id))
+            if base is not None:
+                base.update(copy.deepcopy(fields))
+
+
+def apply_local_guild_fields(guild_id, fields):
+    """이미 Firestore 에 쓴 서버 필드를 스냅샷에 바로 반영 (write-through, listener echo 전)."""
+    _apply_local_fields('guilds', guild_id, fields)
+
+
+def _update_doc_fields(collection, doc_id, fields, defer=False):
+    global settings_cache
+    if not fields:
+        return True
+    if not _listeners_active:
+        settings_cache = None
+
+    if SETTINGS_BACKEND == 'firestore' and defer:
+        # write-behind: 다음 flush 때 batch 로 커밋, 스냅샷은 바로 반영
+        write_queue.update(collection, doc_id, fields)
+        _apply_local_fields(collection, doc_id, fields)
+        return True
+
+    if SETTINGS_BACKEND in ('firestore', 'dual'):
+        ok = _fs_set_fields(collection, doc_id, fields)
+        if ok:
+            _apply_local_fields(collection, doc_id, fields)
+        if SETTINGS_BACKEND == 'firestore':
+            return ok
+
+    # dual / gcs 모드: GCS 도 업데이트 (전체 settings 통째로)
+    settings = load_settings(force_reload=True)
+    doc = settings.setdefault(collection, {}).setdefault(str(doc_id), {})
+    doc.update(fields)
+    return save_settings(settings, silent=True)
+
+
+def update_guild(guild_id, fields, defer=False):
+    """서버 문서의 최상위 필드를 교체합니다 (스냅샷 copy-on-write 갱신 포함).
+
+    defer=True 면 write-behind 큐에 넣고 바로 반환 (결과가 급하지 않은 통계 등).
+    """
+    return _update_doc_fields('guilds', guild_id, fields, defer=defer)
+
+
+def update_user(user_id, fields, defer=False):
+    """사용자 문서의 최상위 필드를 교체합니다 (스냅샷 copy-on-write 갱신 포함)."""
+    return _update_doc_fields('users', user_id, fields, defer=defer)
+
+
+def update_docs(collection, updates, defer=False):
+    """여러 문서의 최상위 필드를 한 번에 교체합니다 ({doc_id: fields}).
+
+    firestore 모드는 문서별 필드 쓰기(defer 면 write-behind 큐 한 번의 batch),
+    dual/gcs 모드는 GCS 전체 저장을 문서마다 하지 않고 한 번만 한다.
+    스냅샷은 문서 수와 관계없이 마지막에 한 번만 교체한다.
+    """
+    global settings_cache
+    updates = {str(doc_id): fields for doc_id, fields in updates.items() if fields}
+    if not updates:
+        return True
+    if not _listeners_active:
+        settings_cache = None
+    if SETTINGS_BACKEND == 'firestore':
+        if defer:
+            for doc_id, fields in updates.items():
+                write_queue.update(collection, doc_id, fields)
+            _apply_local_fields_many(collection, updates)
+            return True
+        written = {doc_id: fields for doc_id, fields in updates.items()
+                   if _fs_set_fields(collection, doc_id, fields)}
+        _apply_local_fields_many(collection, written)
+        return len(written) == len(updates)
+
+    if SETTINGS_BACKEND == 'dual':
+        _apply_local_fields_many(collection, {
+            doc_id: fields for doc_id, fields in updates.items()
+            if _fs_set_fields(collection, doc_id, fields)
+        })
+    settings = load_settings(force_reload=True)
+    docs = settings.setdefault(collection, {})
+    for doc_id, fields in updates.items():
+        docs.setdefault(doc_id, {}).update(fields)
+    return save_settings(settings, silent=True)
+
+
+def get_write_queue_stats():
+    """write-behind 큐 지표 (깊이, flush 횟수/지연, 합쳐진 갱신 수 등)."""
+    return write_queue.get_stats()
+
+
+def flush_pending_writes(timeout=10.0):
+    """종료 시 write-behind 큐를 비웁니다."""
+    write_queue.shutdown(timeout=timeout)
+
+
 def save_local_backup(settings):
     """로컬에 settings 백업을 저장합니다 (재해 복구용)."""
     try:
@@ -507,7 +937,8 @@ def save_settings(settings, silent=False):
     - 'gcs': 레거시 GCS 만 (롤백용)
 
     레거시 시그니처 유지 — 기존 호출처 코드 변경 불필요.
-    내부적으로 3 컬렉션 batch write 로 분산.
+    Firestore 에는 마지막 동기화 상태와 달라진 문서/필드만 batch update 로 쓴다
+    (쓰기 양이 전체 서버/유저 수가 아니라 변경량에 비례). 통계는 get_settings_write_stats().
     """
     global settings_cache
     # listener 활성 시: write → snapshot callback 이 자동으로 cache 갱신 (read 1회)
@@ -518,9 +949,9 @@ def save_settings(settings, silent=False):
     primary_success = False
 
     if SETTINGS_BACKEND in ('firestore', 'dual'):
-        primary_success = _fs_save_all_settings(settings)
+        primary_success = _fs_save_changed_settings(settings)
         if primary_success and not silent:
-            print(f"[Firestore] 설정 저장 완료", flush=True)
+            print(f"[Firestore] 설정 저장 완료 (변경 문서 {_write_stats['last_docs_written']}개)", flush=True)
         elif not primary_success and not silent:
             print(f"[경고] Firestore 설정 저장 실패", flush=True)
 
@@ -686,20 +1117,27 @@ def get_global_setting(key):
 
 def save_global_setting(key, value):
     """전역 설정을 저장합니다 (atomic 단일 필드 업데이트)."""
+    return save_global_settings({key: value})
+
+
+def save_global_settings(fields):
+    """전역 설정 필드 여러 개를 한 번에 저장합니다 (global/settings 문서 하나만 씀).
+
+    load_settings() + save_settings() 로 전역 키 하나를 저장하면 캐시 전체를 기준 상태와 비교하게 되어
+    listener echo 전의 다른 문서 변경까지 되돌려 쓸 수 있다 — 전역 키만 바꿀 때는 이걸 쓴다.
+    """
     global settings_cache
     if not _listeners_active:
         settings_cache = None
 
     if SETTINGS_BACKEND in ('firestore', 'dual'):
-        ok = _fs_update_global({key: value})
+        ok = _fs_update_global(fields)
         if SETTINGS_BACKEND == 'firestore':
             return ok
 
     # dual / gcs
     settings = load_settings(force_reload=True)
-    if "global" not in settings:
-        settings["global"] = {}
-    settings["global"][key] = value
+    settings.setdefault("global", {}).update(fields)
     return save_settings(settings)
 
 
@@ -707,6 +1145,14 @@ def save_global_setting(key, value):
 _SENT_IDS_KEY = "SENT_VIDEO_IDS"
 _SENT_IDS_MAX = 100
 
+
+def _sent_ids_of(global_data):
+    """이 워커의 SENT_VIDEO_IDS. 샤드 워커로 처음 전환할 때는 단일 프로세스 시절 목록을 이어받는다."""
+    sent = global_data.get(worker_key(_SENT_IDS_KEY))
+    if sent is None:
+        sent = global_data.get(_SENT_IDS_KEY)
+    return list(sent or [])
+
 # 유튜브 claim 이상(트랜잭션 실패/비원자 폴백/저장 실패)을 디스코드 웹훅으로 승격한다.
 # print 는 컨테이너 재시작 시 소실돼 '같은 영상 N개' 중복의 원인 추적을 놓친다.
 # 웹훅은 채널에 남으므로 재전송 직전(폴백 발동) 상태를 실시간 포착한다.
@@ -753,12 +1199,12 @@ def claim_video_id(video_id, video_title=None):
                 def _claim(transaction):
                     snapshot = ref.get(transaction=transaction)
                     data = snapshot.to_dict() if snapshot.exists else {}
-                    sent = data.get(_SENT_IDS_KEY) or []
+                    sent = _sent_ids_of(data)
                     if video_id in sent:
                         return False
                     sent.append(video_id)
                     fields = {
-                        _SENT_IDS_KEY: sent[-_SENT_IDS_MAX:],
+                        worker_key(_SENT_IDS_KEY): sent[-_SENT_IDS_MAX:],
                         "LAST_CHECKED_VIDEO_ID": video_id,
                     }
                     if video_title:
@@ -792,11 +1238,11 @@ def claim_video_id(video_id, video_title=None):
     settings = load_settings(force_reload=True)
     if "global" not in settings:
         settings["global"] = {}
-    sent = settings["global"].get(_SENT_IDS_KEY) or []
+    sent = _sent_ids_of(settings["global"])
     if video_id in sent:
         return False
     sent.append(video_id)
-    settings["global"][_SENT_IDS_KEY] = sent[-_SENT_IDS_MAX:]
+    settings["global"][worker_key(_SENT_IDS_KEY)] = sent[-_SENT_IDS_MAX:]
     settings["global"]["LAST_CHECKED_VIDEO_ID"] = video_id
     if video_title:
         settings["global"]["LAST_CHECKED_VIDEO_TITLE"] = video_title
@@ -826,10 +1272,10 @@ def seed_sent_video_ids(video_ids):
     전 서버에 폭탄 전송하는 것을 막는다. 이미 집합이 있으면 아무것도 하지 않는다.
     반환: seeded(bool) — 실제로 시드했으면 True (이번 사이클은 전송 스킵해야 함)
     """
-    existing = get_global_setting(_SENT_IDS_KEY)
+    existing = get_global_setting(worker_key(_SENT_IDS_KEY)) or get_global_setting(_SENT_IDS_KEY)
     if existing:  # 이미 운영 중 — 시드 불필요
         return False
-    save_global_setting(_SENT_IDS_KEY, list(video_ids)[-_SENT_IDS_MAX:])
+    save_global_setting(worker_key(_SENT_IDS_KEY), list(video_ids)[-_SENT_IDS_MAX:])
     return True
 
 
@@ -876,13 +1322,15 @@ def log_user_interaction(user_id, user_name=None):
     if user_name:
         fields["user_name"] = user_name
 
-    if SETTINGS_BACKEND in ('firestore', 'dual'):
-        # interaction_count 증가는 read-modify-write — 짧은 윈도우에 race 가능. 일단 단순 처리.
+    if SETTINGS_BACKEND == 'firestore':
+        # write-behind + Increment — read 없이 서버에서 원자적으로 증가, flush 주기 안의 갱신은 합쳐짐
+        write_queue.update('users', user_id, fields, increments={"interaction_count": 1})
+        return True
+
+    if SETTINGS_BACKEND == 'dual':
         existing = _fs_get_user(user_id) or {}
         fields["interaction_count"] = existing.get("interaction_count", 0) + 1
-        ok = _fs_update_user(user_id, fields)
-        if SETTINGS_BACKEND == 'firestore':
-            return ok
+        _fs_update_user(user_id, fields)
 
     settings = load_settings(force_reload=True)
     if "users" not in settings:
@@ -956,16 +1404,18 @@ def add_user_interaction(user_id, interaction_type="general"):
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     if SETTINGS_BACKEND in ('firestore', 'dual'):
-        existing = _fs_get_user(user_id) or {}
+        # listener 활성 시 스냅샷으로 first_interaction 여부 확인 (Firestore read 없음)
+        existing = get_user(user_id) if _listeners_active else (_fs_get_user(user_id) or {})
         fields = {
             "last_seen": now,
             "interaction_type": interaction_type,
         }
         if "first_interaction" not in existing:
             fields["first_interaction"] = now
-        ok = _fs_update_user(user_id, fields)
         if SETTINGS_BACKEND == 'firestore':
-            return ok
+            write_queue.update('users', user_id, fields)
+            return True
+        _fs_update_user(user_id, fields)
 
     settings = load_settings(force_reload=True)
     if "users" not in settings:
@@ -1096,19 +1546,21 @@ def save_user_dm_interaction(user_id, channel_id, user_name=None):
     from datetime import datetime
     now = datetime.now().isoformat()
 
-    if SETTINGS_BACKEND in ('firestore', 'dual'):
+    fields = {
+        "dm_channel_id": str(channel_id),
+        "last_dm": now,
+        "last_interaction": now,
+    }
+    if user_name:
+        fields["user_name"] = user_name
+
+    if SETTINGS_BACKEND == 'firestore':
+        write_queue.update('users', user_id, fields, increments={"interaction_count": 1})
+        return True
+
+    if SETTINGS_BACKEND == 'dual':
         existing = _fs_get_user(user_id) or {}
-        fields = {
-            "dm_channel_id": str(channel_id),
-            "last_dm": now,
-            "last_interaction": now,
-            "interaction_count": existing.get("interaction_count", 0) + 1,
-        }
-        if user_name:
-            fields["user_name"] = user_name
-        ok = _fs_update_user(user_id, fields)
-        if SETTINGS_BACKEND == 'firestore':
-            return ok
+        _fs_update_user(user_id, dict(fields, interaction_count=existing.get("interaction_count", 0) + 1))
 
     user_id_str = str(user_id)
     settings = load_settings(force_reload=True)
@@ -1131,36 +1583,29 @@ def save_dm_channel(user_id, channel_id, user_name=None):
     return save_user_dm_interaction(user_id, channel_id, user_name)
 
 
-# ─────── 명령어 로그 (Firestore command_logs 컬렉션) ───────
-# expireAt 필드 + Firestore TTL 정책으로 30일 후 자동 삭제
-# (TTL 정책 설정: gcloud firestore fields ttls update expireAt --collection-group=command_logs)
-
-COMMAND_LOGS_COLLECTION = 'command_logs'
-COMMAND_LOGS_TTL_DAYS = 30
+# ─────── 명령어 로그 ───────
+# run.services.command_log_store 로 위임 — ring buffer + 압축 chunk 문서 + 서버·일별 rollup 카운터.
+# chunk 문서는 expireAt + Firestore TTL 정책으로 30일 후 자동 삭제
+# (TTL 정책 설정: gcloud firestore fields ttls update expireAt --collection-group=command_log_chunks,
+#  rollup 은 --collection-group=command_stats 로 90일)
+# load_command_logs 쿼리의 복합 색인 + TTL 필드 설정은 저장소 루트 firestore.indexes.json
 
 
 def save_command_log(log_entry):
-    """명령어 사용 로그를 Firestore 에 저장합니다.
+    """명령어 사용 로그를 파이프라인 버퍼에 넣습니다 (Firestore 쓰기는 flush 때 묶어서).
 
     Args:
-        log_entry: 로그 항목 (dict). timestamp 는 ISO 형식 str. 다른 키는 그대로 저장.
+        log_entry: 로그 항목 (dict). command_logger.log_command_usage 의 키들 (timestamp 는 무시, 지금 시각).
     """
-    from datetime import datetime, timedelta, timezone
-    fs = get_firestore_client()
-    if not fs:
-        return False
-    try:
-        doc = dict(log_entry)
-        doc["expireAt"] = datetime.now(timezone.utc) + timedelta(days=COMMAND_LOGS_TTL_DAYS)
-        fs.collection(COMMAND_LOGS_COLLECTION).add(doc)
-        return True
-    except Exception as e:
-        print(f"[경고] 명령어 로그 저장 실패: {e}", flush=True)
-        return False
+    from run.services.command_log_store import command_logs
+    entry = dict(log_entry)
+    entry.pop("timestamp", None)
+    command_logs.record(**entry)
+    return True
 
 
 def load_command_logs(filters=None):
-    """명령어 사용 로그를 Firestore 에서 로드합니다.
+    """명령어 사용 로그를 로드합니다 (command_log_store.load_logs — 샘플링된 명령어는 일부만).
 
     Args:
         filters: 필터 딕셔너리 (optional)
@@ -1171,28 +1616,5 @@ def load_command_logs(filters=None):
     Returns:
         list: 필터링된 로그 항목 리스트 (timestamp desc)
     """
-    fs = get_firestore_client()
-    if not fs:
-        return []
-    try:
-        query = fs.collection(COMMAND_LOGS_COLLECTION)
-        filters = filters or {}
-        if filters.get("guild_id"):
-            query = query.where("guild_id", "==", str(filters["guild_id"]))
-        if filters.get("user_id"):
-            query = query.where("user_id", "==", str(filters["user_id"]))
-        if filters.get("command_name"):
-            query = query.where("command_name", "==", filters["command_name"])
-        if filters.get("start_date"):
-            query = query.where("timestamp", ">=", filters["start_date"])
-        if filters.get("end_date"):
-            query = query.where("timestamp", "<=", filters["end_date"])
-
-        from google.cloud.firestore_v1 import Query as FsQuery
-        query = query.order_by("timestamp", direction=FsQuery.DESCENDING)
-        query = query.limit(int(filters.get("limit") or 1000))
-
-        return [d.to_dict() for d in query.stream()]
-    except Exception as e:
-        print(f"[경고] 명령어 로그 로드 실패: {e}", flush=True)
-        return []
+    from run.services.command_log_store import load_logs
+    return load_logs(filters)
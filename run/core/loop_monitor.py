@@ -0,0 +1,272 @@
+"""
+이벤트 루프 상태 모니터
+
+gateway heartbeat 경고 / 1006 끊김의 원인(루프를 막는 동기 작업)을 찾기 위한 계측.
+
+- 지연 샘플링: interval 마다 깨어나는 태스크가 예정 시각 대비 늦은 정도(ms)를 기록
+- 느린 콜백 탐지: 감시 스레드가 루프가 threshold 이상 멈춘 것을 보면 그 순간 루프 스레드의
+  스택(sys._current_frames)과 실행 중이던 태스크 이름을 잡는다. asyncio debug 모드와 달리
+  코루틴 생성 비용이 없어 운영 중에도 켜둘 수 있다. 스택에서 가장 안쪽의 프로젝트 코드
+  프레임(run/...)을 "범인"으로 묶어 횟수/합계/최대 시간을 집계
+- tasks.loop 타이밍: track(loop) 으로 등록한 루프의 회차별 실행 시간 + 그 회차 중 멈춤 시간
+- REPORT 주기마다 상위 범인을 로그로 출력하고 Firestore bot_health/{인스턴스} 문서로 내보냄
+  (대시보드 /api/bot/stats 의 health)
+
+    LOOP_MONITOR=0                     # 끄기
+    LOOP_MONITOR_INTERVAL=0.5          # 지연 샘플 주기 (초)
+    LOOP_MONITOR_SLOW_MS=250           # 이 이상 멈추면 느린 콜백으로 기록
+    LOOP_MONITOR_REPORT_SECONDS=300    # 로그/내보내기 주기
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR", "1") != "0"
+SAMPLE_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.5"))
+SLOW_MS = float(os.getenv("LOOP_MONITOR_SLOW_MS", "250"))
+REPORT_SECONDS = float(os.getenv("LOOP_MONITOR_REPORT_SECONDS", "300"))
+WATCHDOG_INTERVAL = 0.05
+WINDOW_SECONDS = 300.0  # 지연 분위수 계산 구간
+TOP_OFFENDERS = 10
+STACK_DEPTH = 12
+HEALTH_COLLECTION = "bot_health"
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+_PROJECT_CODE = os.path.join(_PROJECT_ROOT, "run") + os.sep
+
+
+def _offender_of(frame):
+    """스택에서 가장 안쪽의 프로젝트 코드 프레임 → ("run/x.py:123 func", 스택 문자열)."""
+    summary = traceback.extract_stack(frame, limit=None)
+    site = summary[-1] if summary else None
+    for entry in reversed(summary):
+        if entry.filename.startswith(_PROJECT_CODE) and entry.filename != __file__:
+            site = entry
+            break
+    if site is None:
+        return "unknown", ""
+    path = os.path.relpath(site.filename, _PROJECT_ROOT) if site.filename.startswith(_PROJECT_ROOT) else site.filename
+    stack = "".join(traceback.format_list(summary[-STACK_DEPTH:]))
+    return f"{path}:{site.lineno} {site.name}", stack
+
+
+def _percentile(ordered, ratio):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class LoopMonitor:
+    """이벤트 루프 하나에 붙는 지연 샘플러 + 멈춤 감시 스레드."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, slow_ms: float = SLOW_MS,
+                 report_seconds: float = REPORT_SECONDS):
+        self.interval = interval
+        self.slow_ms = slow_ms
+        self.report_seconds = report_seconds
+        self._loop = None
+        self._loop_thread_id = None
+        self._sampler = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._deadline = 0.0  # 샘플러가 다음에 깨어나야 하는 시각 (monotonic)
+        self._stall = None  # 감시 스레드가 잡은 진행 중 멈춤 {"key", "stack", "task"}
+        self._lags = deque()  # (monotonic, lag_ms)
+        self._offenders = {}  # key -> {"count", "total_ms", "max_ms", "task", "stack", "last_at"}
+        self._tasks = {}  # 루프 이름 -> 회차 통계
+        self._running_loops = {}  # asyncio task 이름 -> 루프 이름 (멈춤 귀속용)
+        self._reported_stalls = 0
+        self.stats = {"samples": 0, "stalls": 0, "stall_ms": 0.0, "max_lag_ms": 0.0}
+
+    # ───────── 시작/종료 ─────────
+
+    def start(self):
+        """실행 중인 이벤트 루프 안에서 호출 (setup_hook)."""
+        if self._sampler is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self.interval
+        self._sampler = self._loop.create_task(self._sample_loop(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"[루프] 모니터 시작 (샘플 {self.interval}s, 느린 콜백 ≥{self.slow_ms:.0f}ms)", flush=True)
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+
+    # ───────── 지연 샘플링 ─────────
+
+    async def _sample_loop(self):
+        next_report = time.monotonic() + self.report_seconds
+        while True:
+            self._deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag_ms = max(0.0, now - self._deadline) * 1000
+            self._record_lag(now, lag_ms)
+            if now >= next_report:
+                next_report = now + self.report_seconds
+                try:
+                    self.report()
+                except Exception as e:
+                    print(f"[루프] 리포트 실패: {e}", flush=True)
+
+    def _record_lag(self, now, lag_ms):
+        self.stats["samples"] += 1
+        self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag_ms)
+        self._lags.append((now, lag_ms))
+        while self._lags and self._lags[0][0] < now - WINDOW_SECONDS:
+            self._lags.popleft()
+
+        with self._lock:
+            stall, self._stall = self._stall, None
+        if lag_ms < self.slow_ms:
+            return
+        # 감시 스레드가 못 잡은 짧은 멈춤 (threshold 근처) 은 범인 미상
+        key, stack, task = (stall["key"], stall["stack"], stall["task"]) if stall else ("unknown", "", None)
+        self.stats["stalls"] += 1
+        self.stats["stall_ms"] += lag_ms
+        with self._lock:
+            entry = self._offenders.get(key)
+            if entry is None:
+                entry = self._offenders[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                "task": task, "stack": stack, "last_at": None}
+            entry["count"] += 1
+            entry["total_ms"] += lag_ms
+            if lag_ms >= entry["max_ms"]:
+                entry["max_ms"] = lag_ms
+                entry["stack"] = stack or entry["stack"]
+            entry["task"] = task or entry["task"]
+            entry["last_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        loop_name = self._running_loops.get(task)
+        if loop_name:
+            self._tasks[loop_name]["stall_ms"] += lag_ms
+
+    # ───────── 멈춤 감시 (별도 스레드) ─────────
+
+    def _watch(self):
+        while not self._stopped.wait(WATCHDOG_INTERVAL):
+            overdue_ms = (time.monotonic() - self._deadline) * 1000
+            if overdue_ms < self.slow_ms or self._stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            key, stack = _offender_of(frame)
+            task = None
+            try:
+                current = asyncio.current_task(self._loop)
+                task = current.get_name() if current is not None else None
+            except Exception:
+                pass
+            with self._lock:
+                if self._stall is None:
+                    self._stall = {"key": key, "stack": stack, "task": task}
+
+    # ───────── tasks.loop 타이밍 ─────────
+
+    def track(self, task_loop, name: str = None):
+        """discord.ext.tasks.Loop 의 회차별 실행 시간을 기록합니다 (시작 전/후 모두 가능).
+
+        Cog 안의 루프는 인스턴스에서 꺼낸 복사본(cog.save_stats_task)을 넘길 것.
+        """
+        coro = task_loop.coro
+        if getattr(coro, "__loop_monitor__", False):
+            return task_loop
+        name = name or coro.__name__
+        self._tasks.setdefault(name, {"runs": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                      "last_ms": 0.0, "stall_ms": 0.0, "last_at": None})
+        self._running_loops[getattr(task_loop, "_name", None)] = name
+        stats = self._tasks[name]
+
+        @functools.wraps(coro)  # Loop.__get__ 가 coro.__name__ 으로 setattr 하므로 이름 유지
+        async def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return await coro(*args, **kwargs)
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - t0) * 1000
+                stats["runs"] += 1
+                stats["total_ms"] += elapsed_ms
+                stats["last_ms"] = elapsed_ms
+                stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+                stats["last_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        timed.__loop_monitor__ = True
+        task_loop.coro = timed
+        return task_loop
+
+    # ───────── 조회/리포트 ─────────
+
+    def get_stats(self, top: int = TOP_OFFENDERS) -> dict:
+        ordered = sorted(lag for _, lag in self._lags)
+        with self._lock:
+            offenders = sorted(self._offenders.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:top]
+            offenders = [{"site": key, **{k: (round(v, 1) if isinstance(v, float) else v) for k, v in entry.items()}}
+                         for key, entry in offenders]
+        return {
+            "lag_ms": {
+                "p50": round(_percentile(ordered, 0.5), 1),
+                "p99": round(_percentile(ordered, 0.99), 1),
+                "max": round(ordered[-1], 1) if ordered else 0.0,
+                "window_s": WINDOW_SECONDS,
+            },
+            "max_lag_ms": round(self.stats["max_lag_ms"], 1),
+            "samples": self.stats["samples"],
+            "stalls": self.stats["stalls"],
+            "stall_ms": round(self.stats["stall_ms"], 1),
+            "slow_ms": self.slow_ms,
+            "offenders": offenders,
+            "tasks": {
+                name: {k: (round(v, 1) if isinstance(v, float) else v) for k, v in stats.items()}
+                for name, stats in self._tasks.items()
+            },
+        }
+
+    def report(self):
+        """상위 범인 로그 출력 + bot_health 문서로 내보내기."""
+        stats = self.get_stats()
+        new_stalls = stats["stalls"] - self._reported_stalls
+        self._reported_stalls = stats["stalls"]
+        lag = stats["lag_ms"]
+        print(f"[루프] 지연 p50 {lag['p50']:.0f}ms / p99 {lag['p99']:.0f}ms / max {lag['max']:.0f}ms, "
+              f"느린 콜백 {new_stalls}건 (누적 {stats['stalls']}건)", flush=True)
+        if new_stalls:
+            for entry in stats["offenders"][:5]:
+                print(f"  {entry['total_ms']:8.0f}ms {entry['count']:4d}회 (최대 {entry['max_ms']:.0f}ms) "
+                      f"{entry['site']} [{entry['task'] or '-'}]", flush=True)
+            if stats["offenders"][0]["stack"]:
+                print(f"  최대 범인 스택:\n{stats['offenders'][0]['stack'].rstrip()}", flush=True)
+        export_health(stats)
+
+
+def export_health(stats: dict):
+    """bot_health/{인스턴스} 문서에 루프 상태를 write-behind 로 기록 (대시보드 표시용)."""
+    from run.core import config
+    instance = config.worker_key(config.BOT_IDENTITY)
+    # 스택 전문은 로그로만 — 문서에는 범인 위치/집계만
+    offenders = [{k: v for k, v in entry.items() if k != "stack"} for entry in stats["offenders"]]
+    config.write_queue.update(HEALTH_COLLECTION, instance, fields={
+        "instance": instance,
+        "loop": {**stats, "offenders": offenders},
+        "updatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    })
+
+
+loop_monitor = LoopMonitor()
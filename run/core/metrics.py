@@ -0,0 +1,306 @@
+"""
+프로세스 내 메트릭 레지스트리 (Prometheus 텍스트 포맷)
+
+print 로그 대신 카운터 / 게이지 / 히스토그램(고정 버킷)으로 상태를 모으고,
+로컬 HTTP 엔드포인트로 내보낸다. 외부 의존성 없음.
+
+    DAKGG_LATENCY = metrics.histogram("dakgg_request_seconds", "DAK.GG 응답 시간", ("endpoint",))
+    DAKGG_LATENCY.observe(0.21, endpoint="players/profile")
+    with DAKGG_LATENCY.time(endpoint="players/profile"):
+        ...
+
+    GET /metrics        Prometheus 텍스트 포맷 (scrape 용)
+    GET /metrics.json   요약 (카운터/게이지 값, 히스토그램 count/avg/p50/p95) — 대시보드 /api/me/metrics
+
+    BOT_METRICS_PORT=9464      # 0 이면 끔. 샤드 워커는 포트 + 워커 번호
+    BOT_METRICS_HOST=127.0.0.1
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("BOT_METRICS_PORT", "9464"))
+METRICS_HOST = os.getenv("BOT_METRICS_HOST", "127.0.0.1")
+
+# 초 단위 지연용 기본 버킷 (Discord 응답 3초 제한 / LLM 수십 초까지)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"라벨 불일치: {sorted(labels)} != {sorted(labelnames)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """단조 증가 카운터."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def collect(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def summary(self):
+        with self._lock:
+            return {"/".join(key) or "_": value for key, value in sorted(self._values.items())}
+
+
+class Gauge(_Metric):
+    """현재 값. set_function 으로 scrape 시점에 계산하는 게이지도 가능 (큐 깊이 등)."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._functions = {}
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn, **labels):
+        self._functions[_label_key(self.labelnames, labels)] = fn
+
+    def _current(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, fn in list(self._functions.items()):
+            try:
+                values[key] = fn()
+            except Exception:
+                continue
+        return values
+
+    def collect(self):
+        lines = self._header()
+        for key, value in sorted(self._current().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def summary(self):
+        return {"/".join(key) or "_": value for key, value in sorted(self._current().items())}
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램 (누적 bucket / sum / count)."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]  # 버킷별 개수, 합, 개수
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _snapshot(self):
+        with self._lock:
+            return [(key, list(entry[0]), entry[1], entry[2]) for key, entry in sorted(self._values.items())]
+
+    def collect(self):
+        lines = self._header()
+        for key, counts, total, count in self._snapshot():
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def _quantile(self, counts, count, ratio):
+        """버킷 상한으로 근사한 분위수."""
+        target, cumulative = count * ratio, 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            if cumulative >= target:
+                return bound if bound != math.inf else self.buckets[-2]
+        return self.buckets[-2]
+
+    def summary(self):
+        out = {}
+        for key, counts, total, count in self._snapshot():
+            out["/".join(key) or "_"] = {
+                "count": count,
+                "avg": round(total / count, 4) if count else 0.0,
+                "p50": self._quantile(counts, count, 0.5),
+                "p95": self._quantile(counts, count, 0.95),
+            }
+        return out
+
+
+class MetricsRegistry:
+    """이름별 메트릭 모음. 같은 이름으로 다시 만들면 기존 객체를 돌려준다 (모듈 재import 안전)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"메트릭 {name} 이 다른 형식으로 이미 등록됨")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 exposition."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: {"type": metric.kind, "values": metric.summary()} for metric in metrics}
+
+
+registry = MetricsRegistry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+
+
+# ───────────────────────── HTTP 엔드포인트 ─────────────────────────
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = registry
+    instance = ""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = self.registry.render().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps({"instance": self.instance, "metrics": self.registry.summary()},
+                              ensure_ascii=False).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrape 마다 stderr 로그 남기지 않음
+
+
+_server = None
+
+
+def start_http_server(port: int = None, host: str = METRICS_HOST, instance: str = ""):
+    """메트릭 HTTP 서버를 데몬 스레드로 시작합니다 (port 0 이면 시작 안 함)."""
+    global _server
+    port = METRICS_PORT if port is None else port
+    if _server is not None or port <= 0:
+        return _server
+    handler = type("MetricsHandler", (_MetricsHandler,), {"instance": instance})
+    try:
+        _server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        print(f"[메트릭] HTTP 서버 시작 실패 ({host}:{port}): {e}", flush=True)
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[메트릭] http://{host}:{port}/metrics", flush=True)
+    return _server
+
+
+def stop_http_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
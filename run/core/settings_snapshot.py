@@ -0,0 +1,339 @@
+"""
+읽기 전용 설정 스냅샷
+
+load_settings() 는 settings_cache 의 얕은 복사본을 돌려줘서, 호출처가 하위 guild dict 를 고치면
+snapshot callback 이 _cache_lock 을 잡고 갱신하는 캐시를 그대로 건드리게 된다.
+SettingsSnapshot 은 모든 문서를 읽기 전용(MappingProxyType / tuple)으로 얼린 불변 객체다.
+변경은 바뀐 문서만 새로 얼리고 나머지 문서 객체는 이전 스냅샷과 공유하는 copy-on-write 로
+새 스냅샷을 만들고, 모듈 전역 참조 하나를 교체해 공개한다. 읽기 쪽은 락도 복사도 없다.
+
+문서 / 색인 맵은 키 해시로 SHARD_COUNT 개로 나눈 2단 dict(ShardedMap)다. 통짜 dict 였을 때는
+문서 하나를 바꿔도 맵 전체(유저 5만 명이면 5만 항목)를 복사해서, 문서마다 갱신하는 일괄 쓰기가
+O(N²) 이 됐다. 지금은 바뀐 키가 든 샤드만 복사하고(≈ N / SHARD_COUNT) 나머지 샤드는 이전 스냅샷과
+공유한다. 여러 문서는 with_*_fields_many 로 한 번에 — 샤드마다 한 번만 복사하고 색인도 한 번만 계산.
+
+스냅샷은 채널 ID → ChannelFeatures 색인도 함께 들고 있어서, on_message 는 기능이 없는 채널에서
+dict 조회 한 번으로 빠져나간다. 서버별 blocked_users 도 (서버, 유저) → 차단 기능 bitset 색인으로
+들고 있어서 차단 체크가 Firestore 읽기 없이 dict 조회로 끝난다. 색인은 바뀐 서버 문서만 다시 계산한다.
+"""
+
+import copy
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterator, Mapping, Optional, Tuple
+
+EMPTY: Mapping = MappingProxyType({})
+SHARD_COUNT = 256  # 2의 거듭제곱 (해시 하위 비트로 샤드 선택)
+_SHARD_MASK = SHARD_COUNT - 1
+
+
+def freeze(value: Any) -> Any:
+    """dict → 읽기 전용 mapping, list → tuple 로 재귀 변환."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """freeze 의 역변환 — 수정 가능한 dict/list 깊은 복사본."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return copy.copy(value)
+
+
+class ShardedMap(Mapping):
+    """읽기 전용 2단 dict — 키 해시 하위 비트로 샤드를 고르고, 샤드는 보통 dict.
+
+    공개된 샤드 dict 는 절대 수정하지 않는다. replace() 는 바뀐 키가 든 샤드만 복사한 새 맵을
+    돌려주고 나머지 샤드 객체는 그대로 공유한다 (키 k 개 갱신 ≈ O(min(N, k · N / SHARD_COUNT))).
+    """
+
+    __slots__ = ("_shards", "_len")
+
+    def __init__(self, items: Optional[Mapping] = None):
+        shards = [{} for _ in range(SHARD_COUNT)]
+        for key, value in (items or {}).items():
+            shards[hash(key) & _SHARD_MASK][key] = value
+        self._shards: Tuple[dict, ...] = tuple(shards)
+        self._len = sum(len(shard) for shard in shards)
+
+    @classmethod
+    def _from_shards(cls, shards: Tuple[dict, ...], length: int) -> "ShardedMap":
+        new = cls.__new__(cls)
+        new._shards = shards
+        new._len = length
+        return new
+
+    def __getitem__(self, key):
+        return self._shards[hash(key) & _SHARD_MASK][key]
+
+    def get(self, key, default=None):
+        return self._shards[hash(key) & _SHARD_MASK].get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key in self._shards[hash(key) & _SHARD_MASK]
+
+    def __iter__(self) -> Iterator:
+        for shard in self._shards:
+            yield from shard
+
+    def __len__(self) -> int:
+        return self._len
+
+    def items(self):
+        for shard in self._shards:
+            yield from shard.items()
+
+    def values(self):
+        for shard in self._shards:
+            yield from shard.values()
+
+    def replace(self, updates: Mapping) -> "ShardedMap":
+        """{key: 새 값 | None(삭제)} 를 반영한 새 맵. 건드린 샤드만 한 번씩 복사."""
+        if not updates:
+            return self
+        shards = list(self._shards)
+        copied = set()
+        length = self._len
+        for key, value in updates.items():
+            idx = hash(key) & _SHARD_MASK
+            if idx not in copied:
+                shards[idx] = dict(shards[idx])
+                copied.add(idx)
+            shard = shards[idx]
+            if value is None:
+                if shard.pop(key, None) is not None:
+                    length -= 1
+            else:
+                if key not in shard:
+                    length += 1
+                shard[key] = value
+        return self._from_shards(tuple(shards), length)
+
+
+EMPTY_MAP = ShardedMap()
+
+
+@dataclass(frozen=True)
+class ChannelFeatures:
+    """채널 하나에 켜진 기능 (서버 설정에서 파생)."""
+    guild_id: str
+    tts: bool = False  # tts_channel_id
+    stickies: Tuple[Tuple[int, Mapping], ...] = ()  # 활성 스티키 (sticky_messages 인덱스, 항목)
+    solo_identities: FrozenSet[str] = frozenset()  # 자율 대화/끼어들기 지정 페르소나 (debi/marlene)
+    chat_enabled: bool = True  # 서버 단위 대화 토글
+
+
+# blocked_users[user].features 의 기능 키 → bit (run.services.blocklist.VALID_FEATURES 와 같은 순서)
+BLOCK_FEATURE_BITS = {"chat": 1, "solo_chat": 2, "tts": 4, "credits": 8}
+
+
+def build_blocked_features(doc: Mapping) -> Mapping:
+    """서버 문서의 blocked_users → {user_id: 차단 기능 bitset} (차단 없는 유저는 빠짐)."""
+    out = {}
+    for user_id, entry in (doc.get("blocked_users") or {}).items():
+        if not isinstance(entry, Mapping):
+            continue
+        bits = 0
+        for feature in entry.get("features") or ():
+            bits |= BLOCK_FEATURE_BITS.get(feature, 0)
+        if bits:
+            out[str(user_id)] = bits
+    return MappingProxyType(out) if out else EMPTY
+
+
+def _to_channel_id(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_channel_features(guild_id: str, doc: Mapping) -> Dict[int, ChannelFeatures]:
+    """서버 문서 하나에서 채널별 기능 색인을 만듭니다."""
+    tts_channels = set()
+    stickies: Dict[int, list] = {}
+    solo: Dict[int, set] = {}
+
+    tts_id = _to_channel_id(doc.get("tts_channel_id"))
+    if tts_id is not None:
+        tts_channels.add(tts_id)
+
+    for idx, sticky in enumerate(doc.get("sticky_messages") or ()):
+        if not isinstance(sticky, Mapping) or not sticky.get("enabled"):
+            continue
+        cid = _to_channel_id(sticky.get("channelId"))
+        if cid is not None:
+            stickies.setdefault(cid, []).append((idx, sticky))
+
+    for identity, channel_ids in (doc.get("solo_chat_channels") or {}).items():
+        for raw in channel_ids or ():
+            cid = _to_channel_id(raw)
+            if cid is not None:
+                solo.setdefault(cid, set()).add(identity)
+
+    chat_enabled = bool(doc.get("chat_enabled", True))
+    return {
+        cid: ChannelFeatures(
+            guild_id=guild_id,
+            tts=cid in tts_channels,
+            stickies=tuple(stickies.get(cid, ())),
+            solo_identities=frozenset(solo.get(cid, ())),
+            chat_enabled=chat_enabled,
+        )
+        for cid in tts_channels | stickies.keys() | solo.keys()
+    }
+
+
+class SettingsSnapshot:
+    """guilds / users / global 의 불변 스냅샷. 갱신 메서드는 새 스냅샷을 반환한다."""
+
+    __slots__ = ("_guilds", "_users", "_global", "version", "_channels", "_guild_channels", "_blocked")
+
+    def __init__(self, guilds: Mapping[str, Mapping], users: Mapping[str, Mapping],
+                 global_settings: Mapping, version: int = 0,
+                 channels: Optional[ShardedMap] = None,
+                 guild_channels: Optional[ShardedMap] = None,
+                 blocked: Optional[ShardedMap] = None):
+        # 공개 후에는 절대 수정하지 않는 맵 — 갱신은 항상 ShardedMap.replace 로 새 맵
+        self._guilds = guilds if isinstance(guilds, ShardedMap) else ShardedMap(guilds)
+        self._users = users if isinstance(users, ShardedMap) else ShardedMap(users)
+        self._global = global_settings
+        self.version = version
+        if channels is None:
+            channels, guild_channels, blocked = self._reindex(
+                EMPTY_MAP, EMPTY_MAP, EMPTY_MAP, self._guilds)
+        self._channels = channels
+        self._guild_channels = guild_channels
+        self._blocked = blocked  # guild_id -> {user_id: 차단 기능 bitset}
+
+    @staticmethod
+    def _reindex(channels: ShardedMap, guild_channels: ShardedMap, blocked: ShardedMap,
+                 docs: Mapping[str, Optional[Mapping]]):
+        """바뀐 서버(docs: guild_id → 문서 | None)의 채널 / 차단 색인만 교체한 새 색인."""
+        channel_updates: Dict[int, Optional[ChannelFeatures]] = {}
+        guild_channel_updates: Dict[str, Optional[Tuple[int, ...]]] = {}
+        blocked_updates: Dict[str, Optional[Mapping]] = {}
+        for guild_id, doc in docs.items():
+            for cid in guild_channels.get(guild_id, ()):
+                channel_updates[cid] = None
+            guild_channel_updates[guild_id] = None
+            blocked_updates[guild_id] = None
+            if doc is None:
+                continue
+            features = build_channel_features(guild_id, doc)
+            if features:
+                channel_updates.update(features)
+                guild_channel_updates[guild_id] = tuple(features)
+            blocked_users = build_blocked_features(doc)
+            if blocked_users:
+                blocked_updates[guild_id] = blocked_users
+        return (channels.replace(channel_updates), guild_channels.replace(guild_channel_updates),
+                blocked.replace(blocked_updates))
+
+    @classmethod
+    def empty(cls) -> "SettingsSnapshot":
+        return cls({}, {}, EMPTY)
+
+    @classmethod
+    def from_dict(cls, settings: Optional[dict], version: int = 0) -> "SettingsSnapshot":
+        settings = settings or {}
+        return cls(
+            {str(k): freeze(v) for k, v in (settings.get("guilds") or {}).items() if isinstance(v, dict)},
+            {str(k): freeze(v) for k, v in (settings.get("users") or {}).items() if isinstance(v, dict)},
+            freeze(settings.get("global") or {}),
+            version,
+        )
+
+    # ───────── 읽기 (O(1), 락 없음) ─────────
+
+    def get_guild(self, guild_id) -> Mapping:
+        return self._guilds.get(str(guild_id), EMPTY)
+
+    def get_user(self, user_id) -> Mapping:
+        return self._users.get(str(user_id), EMPTY)
+
+    def get_global(self) -> Mapping:
+        return self._global
+
+    def get_channel_features(self, channel_id: int) -> Optional[ChannelFeatures]:
+        """채널에 켜진 기능. 아무 기능도 없는 채널이면 None."""
+        return self._channels.get(channel_id)
+
+    def get_blocked_features(self, guild_id, user_id) -> int:
+        """(서버, 유저) 의 차단 기능 bitset (BLOCK_FEATURE_BITS). 차단 없으면 0."""
+        return self._blocked.get(str(guild_id), EMPTY).get(str(user_id), 0)
+
+    @property
+    def guilds(self) -> Mapping:
+        return self._guilds  # ShardedMap 자체가 읽기 전용
+
+    @property
+    def users(self) -> Mapping:
+        return self._users
+
+    def to_dict(self) -> dict:
+        """레거시 형태의 수정 가능한 전체 dict (깊은 복사 — 핫패스에서 쓰지 말 것)."""
+        return {
+            "guilds": {k: thaw(v) for k, v in self._guilds.items()},
+            "users": {k: thaw(v) for k, v in self._users.items()},
+            "global": thaw(self._global),
+        }
+
+    # ───────── copy-on-write 갱신 ─────────
+
+    @staticmethod
+    def _replace(docs: ShardedMap, updates: Dict[str, Optional[dict]]) -> ShardedMap:
+        # 문서 객체는 공유, 바뀐 키가 든 샤드만 복사
+        return docs.replace({str(doc_id): (None if data is None else freeze(data))
+                             for doc_id, data in updates.items()})
+
+    def with_guilds(self, updates: Dict[str, Optional[dict]]) -> "SettingsSnapshot":
+        """{guild_id: 새 문서 | None(삭제)} 를 반영한 새 스냅샷."""
+        guilds = self._replace(self._guilds, updates)
+        changed = {str(gid): guilds.get(str(gid)) for gid in updates}
+        channels, guild_channels, blocked = self._reindex(
+            self._channels, self._guild_channels, self._blocked, changed)
+        return SettingsSnapshot(guilds, self._users, self._global, self.version + 1,
+                                channels, guild_channels, blocked)
+
+    def with_users(self, updates: Dict[str, Optional[dict]]) -> "SettingsSnapshot":
+        return SettingsSnapshot(self._guilds, self._replace(self._users, updates),
+                                self._global, self.version + 1,
+                                self._channels, self._guild_channels, self._blocked)
+
+    def with_global(self, data: Optional[dict]) -> "SettingsSnapshot":
+        return SettingsSnapshot(self._guilds, self._users, freeze(data or {}), self.version + 1,
+                                self._channels, self._guild_channels, self._blocked)
+
+    @staticmethod
+    def merged(doc: Mapping, fields: dict) -> Mapping:
+        """문서의 최상위 필드 일부만 바꾼 새 문서 (set(merge=True) 와 같은 의미의 최상위 병합)."""
+        new_doc = dict(doc)
+        for key, value in fields.items():
+            new_doc[key] = freeze(value)
+        return MappingProxyType(new_doc)
+
+    def with_guild_fields_many(self, updates: Dict[str, dict]) -> "SettingsSnapshot":
+        """{guild_id: 바꿀 최상위 필드} 여러 개를 스냅샷 한 번으로 반영 (색인도 한 번만 계산)."""
+        docs = {str(gid): self.merged(self.get_guild(gid), fields) for gid, fields in updates.items()}
+        channels, guild_channels, blocked = self._reindex(
+            self._channels, self._guild_channels, self._blocked, docs)
+        return SettingsSnapshot(self._guilds.replace(docs), self._users, self._global, self.version + 1,
+                                channels, guild_channels, blocked)
+
+    def with_user_fields_many(self, updates: Dict[str, dict]) -> "SettingsSnapshot":
+        """{user_id: 바꿀 최상위 필드} 여러 개를 스냅샷 한 번으로 반영."""
+        docs = {str(uid): self.merged(self.get_user(uid), fields) for uid, fields in updates.items()}
+        return SettingsSnapshot(self._guilds, self._users.replace(docs), self._global, self.version + 1,
+                                self._channels, self._guild_channels, self._blocked)
+
+    def with_guild_fields(self, guild_id, fields: dict) -> "SettingsSnapshot":
+        return self.with_guild_fields_many({guild_id: fields})
+
+    def with_user_fields(self, user_id, fields: dict) -> "SettingsSnapshot":
+        return self.with_user_fields_many({user_id: fields})
@@ -0,0 +1,232 @@
+"""
+샤드 워커 간 공유 캐시 (로컬 Unix 소켓)
+
+멀티 프로세스 실행(BOT_WORKERS > 1)에서 supervisor 가 서버를 띄우고, 각 워커는 env
+BOT_SHARED_CACHE(소켓 경로) / BOT_SHARED_CACHE_KEY(인증 키)로 접속한다.
+multiprocessing.connection 을 쓰므로 값은 pickle 로 오가고 접속 시 HMAC 인증을 거친다.
+
+두 가지 저장 방식:
+- 키/값: get / set(ttl) / get_or_load — 게임 데이터 원본처럼 워커마다 따로 받을 필요 없는 값
+- 채널: publish({키: 값 | None}) / poll(since) — 키별 최신 상태 + 변경 순번.
+  설정 스냅샷처럼 "바뀐 문서만" 전달해야 하는 상태. 너무 뒤처진 구독자는 전체 상태를 받는다.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client, Listener
+
+SHARED_CACHE_ADDRESS = os.getenv("BOT_SHARED_CACHE")
+SHARED_CACHE_KEY = os.getenv("BOT_SHARED_CACHE_KEY", "")
+CHANNEL_LOG_MAX = 10000  # 채널당 보관하는 변경 순번 수 (넘으면 구독자는 전체 재동기화)
+
+
+class _Channel:
+    __slots__ = ("state", "log", "seq")
+
+    def __init__(self):
+        self.state = {}
+        self.log = deque(maxlen=CHANNEL_LOG_MAX)  # (seq, key)
+        self.seq = 0
+
+
+class SharedCacheServer:
+    """supervisor 프로세스 안에서 도는 공유 캐시 서버 (연결마다 스레드 하나)."""
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self._authkey = authkey
+        self._values = {}  # key -> (version, expires_at | None, value)
+        self._channels = {}
+        self._cond = threading.Condition()
+        self._listener = None
+        self._closed = False
+        self.stats = {"connections": 0, "requests": 0}
+
+    def start(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self._authkey)
+        threading.Thread(target=self._accept_loop, name="shared-cache-accept", daemon=True).start()
+
+    def close(self):
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._closed:
+                    return
+                continue  # 인증 실패 등 — 해당 연결만 버림
+            self.stats["connections"] += 1
+            threading.Thread(target=self._serve, args=(conn,), name="shared-cache-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while not self._closed:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                self.stats["requests"] += 1
+                try:
+                    handler = getattr(self, f"_op_{op}")
+                    conn.send(("ok", handler(*args)))
+                except Exception as e:
+                    try:
+                        conn.send(("err", f"{type(e).__name__}: {e}"))
+                    except OSError:
+                        return
+
+    # ───────── 키/값 ─────────
+
+    def _op_get(self, key):
+        with self._cond:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            version, expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._values[key]
+                return None
+            return version, value
+
+    def _op_set(self, key, value, ttl=None):
+        with self._cond:
+            version = self._values.get(key, (0,))[0] + 1
+            self._values[key] = (version, time.time() + ttl if ttl else None, value)
+            return version
+
+    # ───────── 채널 ─────────
+
+    def publish(self, channel: str, updates: dict) -> int:
+        """채널 상태에 {키: 값 | None(삭제)} 반영 (supervisor 안에서 직접 호출 가능)."""
+        with self._cond:
+            ch = self._channels.setdefault(channel, _Channel())
+            for key, value in updates.items():
+                ch.seq += 1
+                if value is None:
+                    ch.state.pop(key, None)
+                else:
+                    ch.state[key] = value
+                ch.log.append((ch.seq, key))
+            self._cond.notify_all()
+            return ch.seq
+
+    _op_publish = publish
+
+    def _op_poll(self, channel, since, timeout):
+        """since 이후 바뀐 키의 최신 값. 반환 (seq, updates, full). full 이면 updates 가 전체 상태."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            ch = self._channels.setdefault(channel, _Channel())
+            while ch.seq == since and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return ch.seq, {}, False
+                self._cond.wait(remaining)
+            oldest = ch.log[0][0] if ch.log else ch.seq + 1
+            if since <= 0 or since > ch.seq or since < oldest - 1:
+                return ch.seq, dict(ch.state), True
+            changed = {key for seq, key in ch.log if seq > since}
+            return ch.seq, {key: ch.state.get(key) for key in changed}, False
+
+    def _op_stats(self):
+        with self._cond:
+            return {
+                **self.stats,
+                "keys": len(self._values),
+                "channels": {name: {"seq": ch.seq, "size": len(ch.state)} for name, ch in self._channels.items()},
+            }
+
+
+class SharedCacheClient:
+    """워커 쪽 클라이언트. 연결 하나를 락으로 직렬화 — 블로킹 poll 은 전용 클라이언트로."""
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self._authkey = authkey
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _call(self, op, *args):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = Client(self.address, family="AF_UNIX", authkey=self._authkey)
+                    self._conn.send((op, args))
+                    status, result = self._conn.recv()
+                    break
+                except (EOFError, OSError):
+                    self._conn = None
+                    if attempt:
+                        raise
+            if status != "ok":
+                raise RuntimeError(f"공유 캐시 {op} 실패: {result}")
+            return result
+
+    def get(self, key, default=None):
+        entry = self._call("get", key)
+        return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl=None) -> int:
+        return self._call("set", key, value, ttl)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """공유 값이 있으면 그대로, 없으면 loader() 결과를 올리고 반환 (동기 loader)."""
+        entry = self._call("get", key)
+        if entry is not None:
+            return entry[1]
+        value = loader()
+        if value is not None:
+            self._call("set", key, value, ttl)
+        return value
+
+    def publish(self, channel, updates: dict) -> int:
+        return self._call("publish", channel, updates)
+
+    def poll(self, channel, since: int, timeout: float = 30.0):
+        return self._call("poll", channel, since, timeout)
+
+    def stats(self) -> dict:
+        return self._call("stats")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_client = None
+
+
+def is_enabled() -> bool:
+    return bool(SHARED_CACHE_ADDRESS)
+
+
+def new_client() -> SharedCacheClient:
+    return SharedCacheClient(SHARED_CACHE_ADDRESS, bytes.fromhex(SHARED_CACHE_KEY))
+
+
+def get_shared_cache():
+    """워커 프로세스면 공유 캐시 클라이언트, 단일 프로세스 실행이면 None."""
+    global _client
+    if not is_enabled():
+        return None
+    if _client is None:
+        _client = new_client()
+    return _client
@@ -0,0 +1,120 @@
+"""
+시작 초기화 오케스트레이터
+
+_background_init 의 초기화 단계들을 의존성 DAG 로 등록해 서로 독립인 단계는 동시에 실행한다.
+각 단계는 선행 단계가 (성공/실패와 무관하게) 끝난 뒤 시작하고, 한 단계의 실패는 로그만 남기고
+다른 단계를 막지 않는다 (기존 순차 코드의 try/except 동작과 동일). 끝나면 단계별 소요 시간 보고.
+
+fetch_users_bounded 는 사용자 이름 보정용 — 캐시(bot.get_user) 우선, 나머지만 동시 요청 수와
+요청 간격을 제한해 fetch_user 로 조회한다 (Discord 전역 50 req/s 제한보다 충분히 낮게).
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import discord
+
+USER_FETCH_CONCURRENCY = int(os.getenv("STARTUP_USER_FETCH_CONCURRENCY", "4"))
+USER_FETCH_INTERVAL = float(os.getenv("STARTUP_USER_FETCH_INTERVAL", "0.25"))  # 슬롯당 요청 간격 (초)
+
+
+class StartupStage:
+    def __init__(self, name: str, func: Callable[[], Awaitable], deps: Iterable[str]):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.started_at: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+
+class StartupOrchestrator:
+    """의존성 DAG 기반 비동기 초기화 실행기."""
+
+    def __init__(self):
+        self._stages: Dict[str, StartupStage] = {}
+        self._t0: Optional[float] = None
+
+    def add(self, name: str, func: Callable[[], Awaitable], deps: Iterable[str] = ()):
+        """단계를 등록합니다. 선행 단계는 먼저 등록돼 있어야 한다 (순환 방지)."""
+        deps = tuple(deps)
+        for dep in deps:
+            if dep not in self._stages:
+                raise ValueError(f"알 수 없는 선행 단계: {name} <- {dep}")
+        self._stages[name] = StartupStage(name, func, deps)
+
+    def stage_names(self) -> List[str]:
+        return list(self._stages)
+
+    async def run(self):
+        self._t0 = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def _run_stage(stage: StartupStage):
+            if stage.deps:
+                await asyncio.gather(*(tasks[d] for d in stage.deps), return_exceptions=True)
+            stage.started_at = time.perf_counter() - self._t0
+            t0 = time.perf_counter()
+            try:
+                await stage.func()
+            except Exception as e:
+                stage.error = e
+                print(f"[시작] {stage.name} 단계 실패: {e}", flush=True)
+            finally:
+                stage.elapsed = time.perf_counter() - t0
+
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.create_task(_run_stage(stage), name=f"startup:{stage.name}")
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    def report(self) -> str:
+        """단계별 시작 시점/소요 시간 표."""
+        total = max(
+            ((s.started_at or 0) + (s.elapsed or 0) for s in self._stages.values()),
+            default=0.0,
+        )
+        lines = [f"[시작] 초기화 단계별 소요 (전체 {total:.2f}s)"]
+        for stage in sorted(self._stages.values(), key=lambda s: s.started_at or 0):
+            status = "실패" if stage.error else "완료"
+            deps = f" <- {', '.join(stage.deps)}" if stage.deps else ""
+            lines.append(
+                f"  {stage.name:<18} +{stage.started_at or 0:6.2f}s  {stage.elapsed or 0:6.2f}s  {status}{deps}"
+            )
+        return "\n".join(lines)
+
+
+async def fetch_users_bounded(
+    bot: discord.Client,
+    user_ids: Iterable[int],
+    concurrency: int = USER_FETCH_CONCURRENCY,
+    interval: float = USER_FETCH_INTERVAL,
+) -> Dict[int, Optional[discord.User]]:
+    """사용자 ID 목록 → User (실패 시 None). 캐시에 있으면 API 호출 없음."""
+    result: Dict[int, Optional[discord.User]] = {}
+    to_fetch: List[int] = []
+    for user_id in user_ids:
+        cached = bot.get_user(user_id)
+        if cached is not None:
+            result[user_id] = cached
+        else:
+            to_fetch.append(user_id)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _fetch(user_id: int):
+        async with semaphore:
+            try:
+                result[user_id] = await bot.fetch_user(user_id)
+            except discord.HTTPException:
+                result[user_id] = None
+            # 슬롯을 잡은 채로 쉬어서 초당 요청 수 상한 = concurrency / interval
+            await asyncio.sleep(interval)
+
+    await asyncio.gather(*(_fetch(uid) for uid in to_fetch))
+    return result
+
+
+def display_name_of(user: discord.abc.User) -> str:
+    return user.display_name or user.global_name or user.name
@@ -0,0 +1,172 @@
+"""
+샤드 워커 supervisor
+
+BOT_WORKERS > 1 로 main.py 를 실행하면 이 supervisor 가 돈다.
+- 전체 샤드 수를 정하고 (BOT_SHARD_COUNT 또는 Discord /gateway/bot 권장값) 워커마다 연속 구간 배정
+- 공유 캐시 서버(Unix 소켓)를 띄우고, Firestore settings listener 를 여기서 하나만 등록해
+  받은 문서 변경을 'settings' 채널로 워커들에게 중계
+- 워커(`python main.py` + BOT_WORKER_ID/BOT_SHARD_IDS env)를 띄우고 죽으면 그 워커만 재시작
+  (연속 크래시는 지수 백오프, 오래 버틴 뒤의 종료는 백오프 초기화)
+- SIGTERM/SIGINT → 워커에 SIGTERM 전달 후 종료 대기 (bot.close 의 알림/flush 가 돌 시간)
+"""
+
+import copy
+import json
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from run.core import config
+from run.core.shared_cache import SharedCacheServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+RESTART_BACKOFF_MAX = 60.0
+STABLE_SECONDS = 300.0  # 이만큼 살아있던 워커가 죽으면 백오프 초기화
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def recommended_shard_count(token: str) -> int:
+    """Discord 권장 샤드 수 (GET /gateway/bot)."""
+    request = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (debi-marlene, 1.0)"},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return int(json.load(response)["shards"])
+
+
+def split_shards(shard_count: int, workers: int):
+    """샤드 0..shard_count-1 을 workers 개 연속 구간으로 (앞 워커부터 하나씩 더)."""
+    base, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker_id in range(workers):
+        size = base + (1 if worker_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+class _Worker:
+    def __init__(self, worker_id: int, shard_ids):
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.proc = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+        self.restarts = 0
+
+
+class Supervisor:
+    def __init__(self, workers: int, shard_count: int):
+        self.shard_count = shard_count
+        self.workers = [
+            _Worker(worker_id, shard_ids)
+            for worker_id, shard_ids in enumerate(split_shards(shard_count, workers))
+        ]
+        self.cache_address = os.path.join(tempfile.gettempdir(), f"debi-marlene-cache-{os.getpid()}.sock")
+        self._cache_key = secrets.token_bytes(32)
+        self.cache = SharedCacheServer(self.cache_address, self._cache_key)
+        self._stopping = False
+
+    def _worker_env(self, worker: _Worker) -> dict:
+        env = dict(os.environ)
+        env.update({
+            "BOT_WORKER_ID": str(worker.worker_id),
+            "BOT_WORKERS": str(len(self.workers)),
+            "BOT_SHARD_COUNT": str(self.shard_count),
+            "BOT_SHARD_IDS": ",".join(str(shard_id) for shard_id in worker.shard_ids),
+            "BOT_SHARED_CACHE": self.cache_address,
+            "BOT_SHARED_CACHE_KEY": self._cache_key.hex(),
+        })
+        return env
+
+    def _spawn(self, worker: _Worker):
+        worker.proc = subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "main.py")],
+            cwd=str(REPO_ROOT), env=self._worker_env(worker),
+        )
+        worker.started_at = time.monotonic()
+        print(f"[supervisor] 워커 {worker.worker_id} 시작 (pid={worker.proc.pid}, "
+              f"샤드 {worker.shard_ids[0]}-{worker.shard_ids[-1]}/{self.shard_count})", flush=True)
+
+    def _relay_settings(self, collection, updates):
+        # 캐시 객체를 그대로 넘기면 이후 수정이 채널 상태에 새어 들어가므로 복사본을 올린다
+        self.cache.publish("settings", {
+            (collection, doc_id): copy.deepcopy(data) for doc_id, data in updates.items()
+        })
+
+    def _handle_signal(self, signum, frame):
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        self.cache.start()
+        config.add_settings_observer(self._relay_settings)
+        config.init_settings_listeners()
+
+        for worker in self.workers:
+            self._spawn(worker)
+
+        try:
+            while not self._stopping:
+                self._check_workers()
+                time.sleep(1.0)
+        finally:
+            self._shutdown()
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.proc is None:
+                if now >= worker.restart_at:
+                    self._spawn(worker)
+                continue
+            code = worker.proc.poll()
+            if code is None:
+                continue
+            lifetime = now - worker.started_at
+            worker.failures = 0 if lifetime >= STABLE_SECONDS else worker.failures + 1
+            delay = min(RESTART_BACKOFF_MAX, 2.0 ** worker.failures) if worker.failures else 1.0
+            worker.proc = None
+            worker.restart_at = now + delay
+            worker.restarts += 1
+            print(f"[supervisor] 워커 {worker.worker_id} 종료 (exit={code}, {lifetime:.0f}s 실행) "
+                  f"→ {delay:.0f}s 후 재시작", flush=True)
+
+    def _shutdown(self):
+        print("[supervisor] 종료 — 워커에 SIGTERM 전달", flush=True)
+        running = [w.proc for w in self.workers if w.proc is not None and w.proc.poll() is None]
+        for proc in running:
+            proc.send_signal(signal.SIGTERM)
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for proc in running:
+            try:
+                proc.wait(timeout=max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        config.shutdown_settings_listeners()
+        self.cache.close()
+
+
+def run_supervisor():
+    """main.py 진입점 — BOT_WORKERS 개 워커로 샤드를 나눠 실행합니다."""
+    workers = config.BOT_WORKERS
+    shard_count = config.SHARD_COUNT
+    if not shard_count:
+        try:
+            shard_count = recommended_shard_count(config.DISCORD_TOKEN)
+        except Exception as e:
+            print(f"[supervisor] 권장 샤드 수 조회 실패 → 워커 수로 대체: {e}", flush=True)
+            shard_count = workers
+    shard_count = max(shard_count, workers)
+    print(f"[supervisor] 샤드 {shard_count}개 / 워커 {workers}개", flush=True)
+    Supervisor(workers, shard_count).run()
@@ -0,0 +1,260 @@
+"""
+Firestore write-behind 큐
+
+상호작용 기록 / DM 기록 / 명령어 로그 / 통계처럼 응답에 결과가 필요 없는 단건 쓰기를
+메모리에 모았다가 백그라운드 스레드에서 batch 로 커밋한다.
+
+- 같은 문서에 대한 갱신은 flush 주기 안에서 하나로 합친다 (필드는 마지막 값, 카운터는 합산)
+- 카운터는 read-modify-write 대신 firestore.Increment, 배열 추가는 firestore.ArrayUnion
+- 필드 이름에 tuple 을 주면 하위 map 경로 (("members", user_id) → members.<user_id>)
+- add() 문서(명령어 로그)는 순서대로 모아 batch set
+- 종료 시 flush 보장 (bot.close + atexit), 큐 깊이/flush 지연 지표 제공
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+from run.core import metrics
+
+FLUSH_INTERVAL = float(os.getenv("WRITE_QUEUE_FLUSH_INTERVAL", "2.0"))
+FLUSH_THRESHOLD = int(os.getenv("WRITE_QUEUE_FLUSH_THRESHOLD", "400"))  # 이만큼 쌓이면 주기 전에 flush
+BATCH_LIMIT = 450  # Firestore batch 500 op 제한
+MAX_RETRIES = 3
+
+# config 의 직접 쓰기 경로도 같은 메트릭을 쓴다 (op: get_guild / batch_commit ..., path: direct / write_behind)
+FIRESTORE_RPC_SECONDS = metrics.histogram(
+    "firestore_rpc_seconds", "Firestore RPC 소요 시간 (초)", ("op",))
+FIRESTORE_DOCS_WRITTEN = metrics.counter(
+    "firestore_docs_written_total", "Firestore 에 쓴 문서 수", ("path",))
+
+
+class _PendingDoc:
+    __slots__ = ("fields", "increments", "appends", "retries")
+
+    def __init__(self):
+        self.fields = {}
+        self.increments = {}
+        self.appends = {}
+        self.retries = 0
+
+    def merge(self, other: "_PendingDoc"):
+        """먼저 들어온 other 위에 self 를 덮어쓴 결과로 self 를 갱신 (재시도 재적재용)."""
+        fields = dict(other.fields)
+        fields.update(self.fields)
+        self.fields = fields
+        for key, amount in other.increments.items():
+            self.increments[key] = self.increments.get(key, 0) + amount
+        for key, items in other.appends.items():
+            self.appends[key] = items + self.appends.get(key, [])
+        self.retries = max(self.retries, other.retries)
+
+
+def _nested(values: dict):
+    """{이름 | (경로, ...): 값} → (중첩 dict, 필드 경로 목록). set(merge=경로) 용."""
+    data, paths = {}, []
+    for name, value in values.items():
+        parts = name if isinstance(name, tuple) else (name,)
+        parts = tuple(str(part) for part in parts)
+        node = data
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+        paths.append(parts)
+    return data, paths
+
+
+class WriteBehindQueue:
+    """문서 단위로 합쳐서 모아 쓰는 Firestore 쓰기 큐."""
+
+    def __init__(self, client_getter, flush_interval: float = FLUSH_INTERVAL,
+                 flush_threshold: int = FLUSH_THRESHOLD):
+        self._client_getter = client_getter
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._docs = {}  # (collection, doc_id) -> _PendingDoc
+        self._adds = deque()  # (collection, data, retries)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "docs_written": 0,
+            "failures": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    # ───────── 적재 ─────────
+
+    def update(self, collection: str, doc_id, fields=None, increments=None, appends=None):
+        """문서의 필드 교체 + 카운터 증가 + 배열 추가를 예약합니다 (문서 없으면 생성)."""
+        key = (collection, str(doc_id))
+        with self._lock:
+            pending = self._docs.get(key)
+            if pending is None:
+                pending = self._docs[key] = _PendingDoc()
+            else:
+                self.stats["coalesced"] += 1
+            if fields:
+                pending.fields.update(fields)
+            for name, amount in (increments or {}).items():
+                pending.increments[name] = pending.increments.get(name, 0) + amount
+            for name, items in (appends or {}).items():
+                pending.appends.setdefault(name, []).extend(items)
+            self.stats["enqueued"] += 1
+            depth = len(self._docs) + len(self._adds)
+        self._ensure_thread()
+        if depth >= self.flush_threshold:
+            self._wakeup.set()
+
+    def add(self, collection: str, data: dict):
+        """새 문서 추가(자동 ID)를 예약합니다."""
+        with self._lock:
+            self._adds.append((collection, data, 0))
+            self.stats["enqueued"] += 1
+            depth = len(self._docs) + len(self._adds)
+        self._ensure_thread()
+        if depth >= self.flush_threshold:
+            self._wakeup.set()
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._docs) + len(self._adds)
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["depth"] = self.depth()
+        return stats
+
+    # ───────── flush ─────────
+
+    def _ensure_thread(self):
+        if self._thread is not None or self._stopped:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="firestore-write-behind", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[write-behind] flush 오류: {e}", flush=True)
+
+    def flush(self) -> bool:
+        """지금까지 쌓인 쓰기를 batch 커밋합니다. 실패한 항목은 재시도 한도까지 다시 적재."""
+        with self._flush_lock:
+            with self._lock:
+                docs, self._docs = self._docs, {}
+                adds, self._adds = self._adds, deque()
+            if not docs and not adds:
+                return True
+
+            fs = self._client_getter()
+            if not fs:
+                self._requeue(docs, adds)
+                return False
+
+            from google.cloud import firestore
+
+            ops = []
+            for (collection, doc_id), pending in docs.items():
+                ops.append(("doc", collection, doc_id, pending))
+            for collection, data, retries in adds:
+                ops.append(("add", collection, data, retries))
+
+            t0 = time.perf_counter()
+            ok = True
+            for i in range(0, len(ops), BATCH_LIMIT):
+                chunk = ops[i:i + BATCH_LIMIT]
+                batch = fs.batch()
+                for kind, collection, target, payload in chunk:
+                    if kind == "add":
+                        batch.set(fs.collection(collection).document(), target)
+                        continue
+                    values = dict(payload.fields)
+                    for name, amount in payload.increments.items():
+                        values[name] = firestore.Increment(amount)
+                    for name, items in payload.appends.items():
+                        values[name] = firestore.ArrayUnion(items)
+                    data, paths = _nested(values)
+                    batch.set(
+                        fs.collection(collection).document(target),
+                        data,
+                        merge=[firestore.FieldPath(*parts) for parts in paths],
+                    )
+                try:
+                    with FIRESTORE_RPC_SECONDS.time(op="batch_commit"):
+                        batch.commit()
+                    self.stats["docs_written"] += len(chunk)
+                    FIRESTORE_DOCS_WRITTEN.inc(len(chunk), path="write_behind")
+                except Exception as e:
+                    ok = False
+                    self.stats["failures"] += 1
+                    print(f"[write-behind] batch 커밋 실패 ({len(chunk)}건): {e}", flush=True)
+                    self._requeue(
+                        {(c, t): p for kind, c, t, p in chunk if kind == "doc"},
+                        [(c, t, p) for kind, c, t, p in chunk if kind == "add"],
+                    )
+
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            self.stats["flushes"] += 1
+            self.stats["last_flush_ms"] = round(elapsed_ms, 1)
+            self.stats["max_flush_ms"] = round(max(self.stats["max_flush_ms"], elapsed_ms), 1)
+            return ok
+
+    def _requeue(self, docs, adds):
+        with self._lock:
+            for key, pending in docs.items():
+                pending.retries += 1
+                if pending.retries > MAX_RETRIES:
+                    self.stats["dropped"] += 1
+                    continue
+                newer = self._docs.get(key)
+                if newer is not None:
+                    newer.merge(pending)
+                else:
+                    self._docs[key] = pending
+            kept = []
+            for collection, data, retries in adds:
+                if retries + 1 > MAX_RETRIES:
+                    self.stats["dropped"] += 1
+                    continue
+                kept.append((collection, data, retries + 1))
+            self._adds.extendleft(reversed(kept))  # 원래 순서 유지하며 앞쪽에
+
+    def shutdown(self, timeout: float = 10.0):
+        """백그라운드 스레드를 멈추고 남은 쓰기를 flush 합니다."""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        deadline = time.monotonic() + timeout
+        while self.depth() and time.monotonic() < deadline:
+            if not self.flush():
+                time.sleep(0.5)
+        remaining = self.depth()
+        if remaining:
+            print(f"[write-behind] 종료 flush 미완료 — {remaining}건 유실", flush=True)
+
+
+def _firestore_client():
+    from run.core.config import get_firestore_client
+    return get_firestore_client()
+
+
+write_queue = WriteBehindQueue(_firestore_client)
+atexit.register(write_queue.shutdown)
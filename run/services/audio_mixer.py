@@ -0,0 +1,268 @@
+"""
+서버별 오디오 믹서
+
+voice_client 는 AudioSource 를 하나만 재생할 수 있어서, 예전에는 TTS 가 음악을 vc.stop() 으로
+끊고 재시작 콜백으로 다시 틀었다 (스트림 URL 재추출 + 새 ffmpeg + 처음부터 재생).
+GuildMixer 는 서버당 하나의 AudioSource 로 여러 입력(음악/퀴즈/TTS/효과음)을 20ms 프레임
+단위로 섞고, 우선순위가 높은 입력이 재생되는 동안 낮은 입력을 제자리에서 줄이거나(duck)
+멈춘다(pause). 높은 입력이 끝나면 낮은 입력은 같은 위치에서 그대로 이어진다.
+
+선인코딩된 Opus 입력(is_opus() 이고 read_pcm() 을 가진 소스)이 혼자 재생될 때는 패킷을 그대로
+내보내고 is_opus() 가 그 프레임에 대해 True 를 반환해 플레이어 스레드의 재인코딩을 건너뛴다.
+다른 입력과 겹치면 read_pcm() 으로 디코딩해 섞는다.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import warnings
+from typing import Callable, List, Optional
+
+import discord
+
+with warnings.catch_warnings():
+    # 3.11~3.12 는 DeprecationWarning, 3.13+ 는 discord.py[voice] 가 설치하는 audioop-lts
+    warnings.simplefilter("ignore", DeprecationWarning)
+    import audioop
+
+logger = logging.getLogger(__name__)
+
+FRAME_SIZE = 3840  # 20ms @ 48kHz stereo s16le (discord.opus.Encoder.FRAME_SIZE)
+SILENCE = b"\x00" * FRAME_SIZE
+IDLE_GRACE_FRAMES = 25  # 입력이 모두 끝나도 0.5초는 무음 유지 (TTS 청크 사이 재시작 방지)
+
+# 우선순위 — 더 높은 입력이 재생 중이면 낮은 입력은 duck/pause
+PRIORITY_MUSIC = 0
+PRIORITY_QUIZ = 1
+PRIORITY_TTS = 2
+
+MIXER_DUCK_MODE = os.getenv("MIXER_DUCK_MODE", "duck").lower()  # duck | pause
+DUCK_GAIN = float(os.getenv("MIXER_DUCK_GAIN", "0.2"))
+
+
+def _is_preencoded(source: discord.AudioSource) -> bool:
+    return source.is_opus() and hasattr(source, "read_pcm")
+
+
+class MixerInput:
+    """믹서에 연결된 입력 하나 (음악 한 곡, TTS 한 클립 등)."""
+
+    def __init__(self, kind: str, source: discord.AudioSource, priority: int,
+                 gain: float, duck_mode: str, loop: asyncio.AbstractEventLoop):
+        self.kind = kind
+        self.source = source
+        self.priority = priority
+        self.gain = gain
+        self.duck_mode = duck_mode
+        self.paused = False
+        self.finished = False
+        self._loop = loop
+        self._done = loop.create_future()
+
+    async def wait(self):
+        """입력이 끝날 때까지 대기. 재생 중 오류가 있었으면 그 예외를 반환."""
+        return await asyncio.shield(self._done)
+
+    def _resolve(self, error: Optional[Exception]):
+        if not self._done.done():
+            self._done.set_result(error)
+
+
+class GuildMixer(discord.AudioSource):
+    """서버당 하나씩 voice_client 에 물려 있는 믹싱 AudioSource.
+
+    read() 는 discord.py 플레이어 스레드에서 20ms 마다 호출되고, 입력 추가/정지는 이벤트 루프에서
+    호출되므로 입력 목록은 락으로 보호한다. 재생할 입력이 없으면 잠깐 무음을 보낸 뒤 b'' 를 반환해
+    플레이어를 끝내고(무음 패킷 상시 전송 방지), 새 입력이 들어오면 다시 vc.play(self) 한다.
+    """
+
+    def __init__(self, guild_id: str, vc_getter: Callable[[], Optional[discord.VoiceClient]]):
+        self.guild_id = guild_id
+        self._vc_getter = vc_getter
+        self._inputs: List[MixerInput] = []
+        self._lock = threading.Lock()
+        self._idle_frames = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+        self._last_opus = False  # 직전 read() 가 Opus 패킷을 반환했는지
+        self.pcm_frames = 0  # 플레이어가 인코딩한 프레임 수 (무음 포함)
+        self.opus_frames = 0  # 인코딩 없이 그대로 보낸 프레임 수
+
+    # ───────── 이벤트 루프 측 API ─────────
+
+    def add(self, kind: str, source: discord.AudioSource, priority: int,
+            gain: float = 1.0, duck_mode: str = MIXER_DUCK_MODE) -> MixerInput:
+        """입력을 추가하고 재생을 보장합니다. 끝날 때까지 기다리려면 반환값의 wait()."""
+        self._loop = asyncio.get_running_loop()
+        self._closed = False
+        inp = MixerInput(kind, source, priority, gain, duck_mode, self._loop)
+        with self._lock:
+            self._inputs.append(inp)
+        self._ensure_playing()
+        return inp
+
+    async def play(self, kind: str, source: discord.AudioSource, priority: int, **kwargs) -> bool:
+        """입력을 추가하고 끝날 때까지 기다립니다. 오류 없이 끝나면 True."""
+        inp = self.add(kind, source, priority, **kwargs)
+        error = await inp.wait()
+        if error:
+            logger.error(f"[믹서] {kind} 재생 오류: {error}")
+        return error is None
+
+    def stop(self, kind: Optional[str] = None):
+        """kind 입력(없으면 전체)을 즉시 종료합니다."""
+        with self._lock:
+            targets = [i for i in self._inputs if kind is None or i.kind == kind]
+        for inp in targets:
+            self._finish(inp, None)
+
+    def set_paused(self, kind: str, paused: bool) -> bool:
+        """kind 입력을 제자리에서 일시정지/재개합니다. 대상이 있었으면 True."""
+        changed = False
+        with self._lock:
+            for inp in self._inputs:
+                if inp.kind == kind and inp.paused != paused:
+                    inp.paused = paused
+                    changed = True
+        if changed and not paused:
+            self._ensure_playing()
+        return changed
+
+    def is_active(self, kind: str) -> bool:
+        with self._lock:
+            return any(i.kind == kind for i in self._inputs)
+
+    def is_paused(self, kind: str) -> bool:
+        with self._lock:
+            return any(i.kind == kind and i.paused for i in self._inputs)
+
+    def is_ducking(self, kind: str) -> bool:
+        """kind 입력이 더 높은 우선순위 입력 때문에 줄어든/멈춘 상태인지."""
+        with self._lock:
+            active = [i for i in self._inputs if not i.paused]
+        if not active:
+            return False
+        top = max(i.priority for i in active)
+        return any(i.kind == kind and i.priority < top for i in active)
+
+    def close(self):
+        """모든 입력 종료 + 재시작 중단 (퇴장 시)."""
+        self._closed = True
+        self.stop()
+
+    def _ensure_playing(self):
+        if self._closed:
+            return
+        vc = self._vc_getter()
+        if vc is None or not vc.is_connected():
+            return
+        if vc.is_playing() or vc.is_paused():
+            if getattr(vc, "source", None) is self:
+                return
+            # 믹서를 거치지 않은 재생이 남아 있으면 정리하고 믹서로 교체
+            vc.stop()
+        self._idle_frames = 0
+        self._last_opus = False  # vc.play() 가 is_opus() 로 인코더 생성 여부를 정함
+        try:
+            vc.play(self, after=self._after_player)
+        except discord.ClientException:
+            # 플레이어가 막 끝나는 중 → _after_player 가 다시 시작한다
+            pass
+
+    def _restart_if_needed(self):
+        with self._lock:
+            pending = any(not i.paused for i in self._inputs)
+        if pending:
+            self._ensure_playing()
+
+    # ───────── 플레이어 스레드 측 ─────────
+
+    def _after_player(self, error: Optional[Exception]):
+        if error:
+            logger.error(f"[믹서] 플레이어 오류 ({self.guild_id}): {error}")
+        if self._loop and not self._closed:
+            try:
+                self._loop.call_soon_threadsafe(self._restart_if_needed)
+            except RuntimeError:
+                pass  # 루프 종료됨
+
+    def _finish(self, inp: MixerInput, error: Optional[Exception]):
+        with self._lock:
+            if inp.finished:
+                return
+            inp.finished = True
+            try:
+                self._inputs.remove(inp)
+            except ValueError:
+                pass
+        try:
+            inp.source.cleanup()
+        except Exception:
+            pass
+        try:
+            inp._loop.call_soon_threadsafe(inp._resolve, error)
+        except RuntimeError:
+            pass  # 루프 종료됨
+
+    def read(self) -> bytes:
+        with self._lock:
+            active = [i for i in self._inputs if not i.paused]
+        self._last_opus = False
+        if not active:
+            self._idle_frames += 1
+            if self._idle_frames > IDLE_GRACE_FRAMES:
+                return b""
+            self.pcm_frames += 1
+            return SILENCE
+        self._idle_frames = 0
+
+        top = max(i.priority for i in active)
+        # 읽지 않으면 소스 위치가 그대로 유지됨 (pause 모드로 밀린 입력)
+        readers = [i for i in active if not (i.priority < top and i.duck_mode == "pause")]
+
+        if len(readers) == 1 and _is_preencoded(readers[0].source) and readers[0].gain == 1.0:
+            inp = readers[0]
+            try:
+                packet = inp.source.read()
+            except Exception as e:
+                self._finish(inp, e)
+                packet = b""
+            if packet:
+                self._last_opus = True
+                self.opus_frames += 1
+                return packet
+            self._finish(inp, None)
+            self.pcm_frames += 1
+            return SILENCE
+
+        mixed = None
+        for inp in readers:
+            ducked = inp.priority < top
+            try:
+                if _is_preencoded(inp.source):
+                    frame = inp.source.read_pcm()
+                else:
+                    frame = inp.source.read()
+            except Exception as e:
+                self._finish(inp, e)
+                continue
+            if len(frame) < FRAME_SIZE:
+                self._finish(inp, None)
+                if not frame:
+                    continue
+                frame = frame.ljust(FRAME_SIZE, b"\x00")
+            gain = inp.gain * (DUCK_GAIN if ducked else 1.0)
+            if gain != 1.0:
+                frame = audioop.mul(frame, 2, gain)
+            mixed = frame if mixed is None else audioop.add(mixed, frame, 2)
+        self.pcm_frames += 1
+        return mixed if mixed is not None else SILENCE
+
+    def is_opus(self) -> bool:
+        # discord.py 플레이어는 read() 직후 같은 스레드에서 프레임마다 is_opus() 를 확인한다
+        return self._last_opus
+
+    def cleanup(self):
+        # 플레이어가 끝날 때마다 호출되지만 믹서는 서버 연결 동안 재사용 → 입력은 유지
+        pass
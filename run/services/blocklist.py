@@ -17,21 +17,34 @@
 - "tts"        : voice.handle_tts_message
 - "credits"    : 크레딧/도박 (잔고 봉인 — 향후 확장)
 
-가드: 모든 함수는 Firestore blocking — caller 가 to_thread 로 감쌈.
+조회 — is_blocked 는 settings snapshot 의 (서버, 유저) → 기능 bitset 색인을 읽는다.
+guilds 문서는 이미 snapshot listener 로 스트리밍되므로 Firestore 읽기 / 락 / to_thread 없이
+이벤트 루프에서 바로 호출한다 (TTS / 대화 메시지마다 불림).
+listener 가 꺼져 있으면 (시작 시 등록 실패 → 캐시 fallback) 스냅샷이 대시보드의 차단을 못 보므로
+서버 문서를 직접 읽는다 — FALLBACK_TTL 동안 재사용해 메시지마다 읽지는 않는다.
+
+쓰기 — set_blocked / unblock 은 blocked_users.<user_id> 하나만 set(merge) 하고 (읽기 없음)
+같은 값을 스냅샷 / settings_cache 에 바로 반영한다 (write-through — 레거시 save_settings 가 옛 맵으로 되돌려 쓰지 않게). 대시보드 프로세스의 쓰기는 봇 쪽 listener 로 들어온다.
+list_blocked / set_blocked / unblock 은 Firestore blocking — caller 가 to_thread 로 감쌈.
 """
 
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime, timezone
 from typing import Iterable
 
 from run.core import config as bot_config
+from run.core.settings_snapshot import BLOCK_FEATURE_BITS, thaw
 
 logger = logging.getLogger(__name__)
 
 
-VALID_FEATURES = ("chat", "solo_chat", "tts", "credits")
+VALID_FEATURES = tuple(BLOCK_FEATURE_BITS)  # ("chat", "solo_chat", "tts", "credits")
+
+FALLBACK_TTL = 30  # listener 비활성 시 직접 읽은 blocked_users 를 재사용하는 시간 (초)
+_fallback_maps: dict = {}  # guild_id -> (읽은 시각, blocked_users)
 
 
 def _now_iso() -> str:
@@ -48,24 +61,39 @@ def _normalize_features(features: Iterable[str]) -> list[str]:
 
 
 def is_blocked(guild_id, user_id, feature: str) -> bool:
-    """단일 (guild, user, feature) 차단 여부."""
+    """단일 (guild, user, feature) 차단 여부. 메모리 색인 조회 — 이벤트 루프에서 직접 호출."""
     if guild_id is None or user_id is None:
         return False
-    fs = bot_config.get_firestore_client()
-    if fs is None:
-        return False
-    try:
-        doc = fs.collection("guilds").document(str(guild_id)).get()
-        if not doc.exists:
-            return False
-        blocked = (doc.to_dict() or {}).get("blocked_users", {}) or {}
-        entry = blocked.get(str(user_id))
-        if not entry:
-            return False
-        return feature in (entry.get("features", []) or [])
-    except Exception as e:
-        logger.warning("blocklist 조회 실패 (guild=%s user=%s): %s", guild_id, user_id, e)
-        return False
+    if not bot_config.settings_listeners_active():
+        entry = _fallback_blocked_map(guild_id).get(str(user_id)) or {}
+        return feature in (entry.get("features") or [])
+    return bool(bot_config.get_blocked_features(guild_id, user_id) & BLOCK_FEATURE_BITS.get(feature, 0))
+
+
+def _fallback_blocked_map(guild_id) -> dict:
+    """listener 비활성일 때 — Firestore 직접 읽기 (FALLBACK_TTL 캐시). 읽는 동안 호출 스레드를 막는다."""
+    key = str(guild_id)
+    now = time.monotonic()
+    cached = _fallback_maps.get(key)
+    if cached is not None and now - cached[0] < FALLBACK_TTL:
+        return cached[1]
+    blocked = list_blocked(guild_id)
+    _fallback_maps[key] = (now, blocked)
+    return blocked
+
+
+def _write_through(guild_id, user_id, entry) -> None:
+    """Firestore 쓰기 성공 후 스냅샷 / settings_cache 의 blocked_users 를 같은 값으로 교체 (entry None 이면 제거)."""
+    if not bot_config.settings_listeners_active():
+        # 스냅샷을 유지하지 않는 프로세스 — 이 프로세스의 is_blocked 가 다음에 다시 읽게만
+        _fallback_maps.pop(str(guild_id), None)
+        return
+    blocked_map = thaw(bot_config.get_guild(guild_id).get("blocked_users")) or {}
+    if entry is None:
+        blocked_map.pop(str(user_id), None)
+    else:
+        blocked_map[str(user_id)] = entry
+    bot_config.apply_local_guild_fields(guild_id, {"blocked_users": blocked_map})
 
 
 def list_blocked(guild_id) -> dict:
@@ -101,17 +129,16 @@ def set_blocked(guild_id, user_id, features: Iterable[str], blocked_by) -> dict:
         return unblock(guild_id, user_id)
 
     try:
-        guild_ref = fs.collection("guilds").document(str(guild_id))
-        snap = guild_ref.get()
-        existing = (snap.to_dict() or {}) if snap.exists else {}
-        blocked_map = dict(existing.get("blocked_users", {}) or {})
         entry = {
             "features": norm,
             "blocked_at": _now_iso(),
             "blocked_by": str(blocked_by) if blocked_by is not None else None,
         }
-        blocked_map[str(user_id)] = entry
-        guild_ref.set({"blocked_users": blocked_map}, merge=True)
+        # merge=True 는 하위 map 도 병합 → 다른 유저 entry 는 그대로, 이 유저 entry 만 교체
+        fs.collection("guilds").document(str(guild_id)).set(
+            {"blocked_users": {str(user_id): entry}}, merge=True,
+        )
+        _write_through(guild_id, user_id, entry)
         return entry
     except Exception as e:
         logger.warning("blocklist 저장 실패: %s", e)
@@ -126,16 +153,12 @@ def unblock(guild_id, user_id) -> dict:
     if fs is None:
         return {}
     try:
-        guild_ref = fs.collection("guilds").document(str(guild_id))
-        snap = guild_ref.get()
-        if not snap.exists:
-            return {}
-        existing = snap.to_dict() or {}
-        blocked_map = dict(existing.get("blocked_users", {}) or {})
-        if str(user_id) not in blocked_map:
-            return {}
-        blocked_map.pop(str(user_id), None)
-        guild_ref.set({"blocked_users": blocked_map}, merge=True)
+        from google.cloud import firestore
+        # 예전처럼 맵 전체를 merge=True 로 다시 쓰면 빠진 키가 남는다 → 해당 키만 DELETE_FIELD
+        fs.collection("guilds").document(str(guild_id)).set(
+            {"blocked_users": {str(user_id): firestore.DELETE_FIELD}}, merge=True,
+        )
+        _write_through(guild_id, user_id, None)
         return {}
     except Exception as e:
         logger.warning("blocklist 해제 실패: %s", e)
@@ -0,0 +1,521 @@
+"""
+브로드캐스트 fan-out 엔진 (YouTube 새 영상 / 패치노트 / 쿠폰 알림 공용)
+
+- 대상은 설정 스냅샷(listener 가 유지하는 메모리 색인)에서 계산한다. 서버마다 Firestore 를 읽지 않는다.
+- 전송은 전역 토큰 버킷(초당 요청 수) + 동시 진행 대상 수 제한. 429 는 retry_after 만큼 쉬고 재시도하고,
+  전역 429 면 모든 전송을 그만큼 멈춘다. 한 대상(채널)의 요청은 순서대로 나가므로 같은 라우트 버킷을
+  동시에 두드리지 않는다.
+- 전달 상태는 브로드캐스트마다 로컬 ledger(JSON lines)에 대상 하나당 한 줄씩 append 한다.
+  프로세스가 중간에 죽어도 재시작 후 resume_pending() 이 아직 못 보낸 대상에만 이어서 보낸다.
+  이미 끝난 broadcast_id 로 다시 run() 하면 아무것도 보내지 않는다.
+- 끝나면 설정 쪽 결과(sticky 메시지 lastMessageId, DM 채널 ID)를 write-behind 큐로 한 번에 batch 기록.
+  (예전에는 DM 한 건마다 / 쿠폰 갱신마다 settings 전체를 load → save 했다.)
+
+    BROADCAST_RATE=40            # 초당 Discord 요청 수 (전역 한도 50/s 아래)
+    BROADCAST_CONCURRENCY=16     # 동시에 진행하는 대상 수
+    BROADCAST_LEDGER_DIR=$BOT_DATA_DIR/broadcasts
+    BROADCAST_LEDGER_KEEP_DAYS=7
+
+    engine = get_broadcast_engine(bot)
+    targets = notification_targets(snapshot, "patchNote", "patchnote", guild_ids)
+    await engine.run(Broadcast("patchnote-123", "patchnote", [{"content": text}], targets, sticky_prefix="patchnote"))
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from run.core import metrics
+
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "40"))
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "16"))
+LEDGER_DIR = Path(os.getenv("BROADCAST_LEDGER_DIR",
+                            os.path.join(os.getenv("BOT_DATA_DIR", "./data"), "broadcasts")))
+LEDGER_KEEP_DAYS = float(os.getenv("BROADCAST_LEDGER_KEEP_DAYS", "7"))
+MAX_ATTEMPTS = 4          # 5xx 재시도 포함 요청당 시도 횟수
+MAX_RATE_LIMITED = 10     # 요청 하나가 429 로 다시 기다리는 최대 횟수
+
+BROADCAST_DELIVERIES = metrics.counter(
+    "broadcast_deliveries_total", "브로드캐스트 대상별 전달 결과", ("kind", "status"))
+BROADCAST_SECONDS = metrics.histogram(
+    "broadcast_seconds", "브로드캐스트 한 건 전체 소요 시간 (초)", ("kind",),
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600))
+
+
+@dataclass(frozen=True)
+class BroadcastTarget:
+    """전송 대상 하나. 길드 채널이면 channel_id, DM 이면 user_id (+ 알고 있으면 DM channel_id)."""
+    key: str                                   # ledger 키 ("g:<guild_id>" / "u:<user_id>")
+    channel_id: Optional[int] = None
+    user_id: Optional[int] = None
+    guild_id: Optional[str] = None
+    replace_message_id: Optional[int] = None   # 새 메시지 전에 지울 이전 sticky 메시지
+
+    def to_row(self):
+        return [self.key, self.channel_id, self.user_id, self.guild_id, self.replace_message_id]
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+
+@dataclass
+class Broadcast:
+    """보낼 메시지(payload dict 목록: content / embed dict)와 대상 목록."""
+    broadcast_id: str
+    kind: str                                  # youtube / patchnote / coupon
+    messages: List[dict]
+    targets: List[BroadcastTarget]
+    sticky_prefix: Optional[str] = None        # 있으면 길드 sticky_messages 의 "<prefix>_<guild_id>" 갱신
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class Delivery:
+    status: str                                # sent / failed / missing
+    message_id: Optional[int] = None           # 마지막으로 보낸 메시지 (sticky lastMessageId)
+    dm_channel_id: Optional[int] = None        # 이번에 새로 연 DM 채널
+    error: Optional[str] = None
+
+
+class BroadcastHTTPError(Exception):
+    """Discord 응답 오류를 transport 종류와 상관없이 다루기 위한 형태 (status / retry_after / is_global)."""
+
+    def __init__(self, status: int, message: str = "", retry_after: float = 0.0, is_global: bool = False):
+        super().__init__(message or f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+        self.is_global = is_global
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+# ─────────────────────────── 대상 계산 (설정 스냅샷) ───────────────────────────
+
+def announcement_targets(snapshot, guild_ids: Iterable[str]) -> List[BroadcastTarget]:
+    """서버 공지 채널(ANNOUNCEMENT_CHANNEL_ID) 대상. guild_ids 는 이 워커가 맡은 서버."""
+    targets = []
+    for guild_id in guild_ids:
+        channel_id = _to_int(snapshot.get_guild(guild_id).get("ANNOUNCEMENT_CHANNEL_ID"))
+        if channel_id:
+            targets.append(BroadcastTarget(f"g:{guild_id}", channel_id=channel_id, guild_id=str(guild_id)))
+    return targets
+
+
+def notification_targets(snapshot, setting_key: str, sticky_prefix: str,
+                         guild_ids: Optional[Iterable[str]] = None) -> List[BroadcastTarget]:
+    """notification_settings.<setting_key> 가 켜진 서버 채널 대상 (이전 sticky 메시지 ID 포함)."""
+    allowed = None if guild_ids is None else {str(guild_id) for guild_id in guild_ids}
+    targets = []
+    for guild_id, doc in snapshot.guilds.items():
+        if allowed is not None and guild_id not in allowed:
+            continue
+        notif = (doc.get("notification_settings") or {}).get(setting_key) or {}
+        channel_id = _to_int(notif.get("channelId"))
+        if not notif.get("enabled") or not channel_id:
+            continue
+        sticky_id = f"{sticky_prefix}_{guild_id}"
+        old = next((sm for sm in doc.get("sticky_messages") or () if sm.get("id") == sticky_id), None)
+        targets.append(BroadcastTarget(
+            f"g:{guild_id}", channel_id=channel_id, guild_id=guild_id,
+            replace_message_id=_to_int(old.get("lastMessageId")) if old else None,
+        ))
+    return targets
+
+
+def youtube_subscriber_targets(snapshot) -> List[BroadcastTarget]:
+    """유튜브 DM 구독자 대상. 저장된 dm_channel_id 가 있으면 DM 채널을 새로 열지 않는다."""
+    targets = []
+    for user_id, doc in snapshot.users.items():
+        if not doc.get("youtube_subscribed"):
+            continue
+        uid = _to_int(user_id)
+        if uid:
+            targets.append(BroadcastTarget(f"u:{uid}", channel_id=_to_int(doc.get("dm_channel_id")), user_id=uid))
+    return targets
+
+
+# ─────────────────────────── Discord transport ───────────────────────────
+
+class DiscordTransport:
+    """discord.py 봇으로 보내는 transport. 채널/메시지는 partial 객체라 fetch 요청이 없다."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    def has_channel(self, channel_id: int) -> bool:
+        return self.bot.get_channel(channel_id) is not None
+
+    def channel_name(self, channel_id: int) -> str:
+        return getattr(self.bot.get_channel(channel_id), "name", "")
+
+    async def _guard(self, coro):
+        import discord
+        try:
+            return await coro
+        except discord.HTTPException as e:
+            retry_after = float(getattr(e, "retry_after", 0) or 0)
+            raise BroadcastHTTPError(e.status, str(e), retry_after) from e
+
+    async def open_dm(self, user_id: int) -> int:
+        user = self.bot.get_user(user_id) or await self._guard(self.bot.fetch_user(user_id))
+        channel = user.dm_channel or await self._guard(user.create_dm())
+        return channel.id
+
+    async def send(self, channel_id: int, message: dict) -> int:
+        import discord
+        embed = discord.Embed.from_dict(message["embed"]) if message.get("embed") else None
+        channel = self.bot.get_partial_messageable(channel_id)
+        sent = await self._guard(channel.send(content=message.get("content"), embed=embed))
+        return sent.id
+
+    async def delete(self, channel_id: int, message_id: int):
+        channel = self.bot.get_partial_messageable(channel_id)
+        await self._guard(channel.get_partial_message(message_id).delete())
+
+
+# ─────────────────────────── 속도 제한 ───────────────────────────
+
+class _RateLimiter:
+    """전역 토큰 버킷. 전역 429 를 받으면 pause() 로 모든 요청을 멈춘다."""
+
+    def __init__(self, rate: float):
+        self.rate = max(0.1, rate)
+        self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# ─────────────────────────── ledger ───────────────────────────
+
+class _Ledger:
+    """브로드캐스트 하나의 전달 기록 (JSON lines).
+
+    1행 header {id, kind, messages, targets, sticky_prefix, created_at},
+    이후 대상마다 [key, status, message_id, dm_channel_id], 마지막에 ["end", 요약].
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    @staticmethod
+    def load(path: Path):
+        """(header, {key: Delivery}, 요약 | None) — 요약이 있으면 끝난 브로드캐스트."""
+        header, results, summary = None, {}, None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    break  # 죽으면서 잘린 마지막 줄
+                if header is None:
+                    header = row
+                elif row and row[0] == "end":
+                    summary = row[1]
+                else:
+                    key, status, message_id, dm_channel_id = row
+                    results[key] = Delivery(status, message_id, dm_channel_id)
+        return header, results, summary
+
+    def open(self, broadcast: Broadcast, fresh: bool):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w" if fresh else "a", encoding="utf-8")
+        if fresh:
+            self._write({
+                "id": broadcast.broadcast_id,
+                "kind": broadcast.kind,
+                "messages": broadcast.messages,
+                "targets": [target.to_row() for target in broadcast.targets],
+                "sticky_prefix": broadcast.sticky_prefix,
+                "created_at": broadcast.created_at,
+            })
+
+    def _write(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()  # 프로세스가 죽어도 OS 버퍼에는 남는다
+
+    def record(self, key: str, delivery: Delivery):
+        self._write([key, delivery.status, delivery.message_id, delivery.dm_channel_id])
+
+    def finish(self, summary: dict):
+        self._write(["end", summary])
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ─────────────────────────── 설정 반영 (batch) ───────────────────────────
+
+def build_settings_updates(broadcast: Broadcast, results: dict, snapshot, channel_name=lambda _id: ""):
+    """전달 결과 → ({guild_id: fields}, {user_id: fields}). 최상위 필드 교체 형태."""
+    from run.core.settings_snapshot import thaw
+
+    guild_updates, user_updates = {}, {}
+    now = datetime.now().isoformat()
+    for target in broadcast.targets:
+        delivery = results.get(target.key)
+        if delivery is None or delivery.status != "sent":
+            continue
+        if broadcast.sticky_prefix and target.guild_id and delivery.message_id:
+            sticky_id = f"{broadcast.sticky_prefix}_{target.guild_id}"
+            new_sticky = {
+                "id": sticky_id,
+                "channelId": str(target.channel_id),
+                "channelName": channel_name(target.channel_id),
+                "content": broadcast.messages[-1].get("content", ""),
+                "enabled": True,
+                "lastMessageId": str(delivery.message_id),
+            }
+            stickies = thaw(snapshot.get_guild(target.guild_id).get("sticky_messages") or [])
+            for i, sm in enumerate(stickies):
+                if sm.get("id") == sticky_id:
+                    stickies[i] = new_sticky
+                    break
+            else:
+                stickies.append(new_sticky)
+            guild_updates[target.guild_id] = {"sticky_messages": stickies}
+        if target.user_id:
+            fields = {"last_dm": now}
+            if delivery.dm_channel_id:
+                fields["dm_channel_id"] = str(delivery.dm_channel_id)
+            user_updates[str(target.user_id)] = fields
+    return guild_updates, user_updates
+
+
+async def _write_settings(engine, broadcast: Broadcast, results: dict, summary: dict):
+    """설정 문서 갱신 + 브로드캐스트 요약 문서를 write-behind 큐에 넣고 한 번에 flush."""
+    from run.core import config
+
+    snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+    channel_name = getattr(engine.transport, "channel_name", lambda _id: "")
+    guild_updates, user_updates = build_settings_updates(broadcast, results, snapshot, channel_name)
+    if guild_updates:
+        await asyncio.to_thread(config.update_docs, "guilds", guild_updates, True)
+    if user_updates:
+        await asyncio.to_thread(config.update_docs, "users", user_updates, True)
+    config.write_queue.update("broadcasts", config.worker_key(broadcast.broadcast_id), fields={
+        **summary, "kind": broadcast.kind, "finishedAt": datetime.now().isoformat(),
+    })
+    await asyncio.to_thread(config.write_queue.flush)
+
+
+# ─────────────────────────── 엔진 ───────────────────────────
+
+class BroadcastEngine:
+    """대상 목록에 메시지를 나눠 보내고 ledger 에 기록하는 엔진."""
+
+    def __init__(self, transport, rate: float = BROADCAST_RATE, concurrency: int = BROADCAST_CONCURRENCY,
+                 ledger_dir: Path = LEDGER_DIR, writer=_write_settings):
+        self.transport = transport
+        self.concurrency = max(1, concurrency)
+        self.ledger_dir = Path(ledger_dir)
+        self.writer = writer
+        self._limiter = _RateLimiter(rate)
+        self._route_reset = {}  # 라우트 → 다시 보내도 되는 시각 (429 받은 라우트만)
+        self._route_locks = {}  # 429 를 받은 적 있는 라우트 → 직렬화 lock
+        self._running = set()
+        self.stats = {"requests": 0, "rate_limited": 0, "retries": 0}
+
+    def _ledger_path(self, broadcast_id: str) -> Path:
+        from run.core import config
+        safe = "".join(c if c.isalnum() or c in "-_.@" else "_" for c in config.worker_key(broadcast_id))
+        return self.ledger_dir / f"{safe}.jsonl"
+
+    async def _attempt(self, route, fn, args):
+        reset = self._route_reset.get(route, 0.0)
+        delay = reset - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self._limiter.acquire()
+        self.stats["requests"] += 1
+        return await fn(*args)
+
+    async def _call(self, route, fn, *args):
+        """요청 하나 (라우트 대기 + 토큰 버킷 통과 후). 429 / 5xx 는 재시도, 그 외 오류는 그대로 올린다.
+
+        route 는 Discord 버킷 단위 (채널별 send/delete, 전역 open_dm). 429 를 받은 라우트는 그 뒤로
+        한 번에 하나씩만 보내고 retry_after 가 지날 때까지 기다린다 (워커들이 풀리자마자 몰려가 다시
+        429 를 맞는 것 방지). 전역 429 면 토큰 버킷 자체를 멈춘다.
+        """
+        attempts = rate_limited = 0
+        while True:
+            lock = self._route_locks.get(route)
+            try:
+                if lock is None:
+                    return await self._attempt(route, fn, args)
+                async with lock:
+                    return await self._attempt(route, fn, args)
+            except Exception as e:
+                status = getattr(e, "status", None)
+                if status == 429 and rate_limited < MAX_RATE_LIMITED:
+                    rate_limited += 1
+                    self.stats["rate_limited"] += 1
+                    retry_after = float(getattr(e, "retry_after", 0) or 1.0)
+                    if getattr(e, "is_global", False):
+                        self._limiter.pause(retry_after)
+                    else:
+                        self._route_locks.setdefault(route, asyncio.Lock())
+                        self._route_reset[route] = max(self._route_reset.get(route, 0.0),
+                                                       time.monotonic() + retry_after)
+                    continue
+                attempts += 1
+                if isinstance(status, int) and status >= 500 and attempts < MAX_ATTEMPTS:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(0.5 * 2 ** attempts)
+                    continue
+                raise
+
+    async def _deliver(self, broadcast: Broadcast, target: BroadcastTarget) -> Delivery:
+        channel_id, opened = target.channel_id, None
+        try:
+            if channel_id is None:
+                channel_id = opened = await self._call(("open_dm",), self.transport.open_dm, target.user_id)
+            elif target.user_id is None and not self.transport.has_channel(channel_id):
+                return Delivery("missing")
+            if target.replace_message_id:
+                try:
+                    await self._call(("delete", channel_id), self.transport.delete,
+                                     channel_id, target.replace_message_id)
+                except Exception:
+                    pass  # 이미 지워졌거나 권한 없음 — 새 메시지는 그대로 보낸다
+            message_id = None
+            for i, message in enumerate(broadcast.messages):
+                try:
+                    message_id = await self._call(("send", channel_id), self.transport.send, channel_id, message)
+                except BroadcastHTTPError as e:
+                    # 저장된 DM 채널이 없어졌으면 한 번만 새로 연다
+                    if e.status != 404 or i or target.user_id is None or opened is not None:
+                        raise
+                    channel_id = opened = await self._call(("open_dm",), self.transport.open_dm, target.user_id)
+                    message_id = await self._call(("send", channel_id), self.transport.send, channel_id, message)
+            return Delivery("sent", message_id, opened)
+        except Exception as e:
+            return Delivery("failed", dm_channel_id=opened, error=f"{type(e).__name__}: {e}")
+
+    async def run(self, broadcast: Broadcast) -> dict:
+        """브로드캐스트를 보내고 요약 {targets, sent, failed, missing, skipped, elapsed_s} 을 반환합니다.
+
+        같은 broadcast_id 의 ledger 가 있으면 이어서 보내고, 이미 끝났으면 그 요약을 그대로 돌려준다.
+        """
+        path = self._ledger_path(broadcast.broadcast_id)
+        results, fresh = {}, True
+        if path.exists():
+            _header, results, summary = _Ledger.load(path)
+            if summary is not None:
+                return summary
+            fresh = False
+            print(f"[브로드캐스트] {broadcast.broadcast_id} 이어서 전송 (완료 {len(results)}/{len(broadcast.targets)})",
+                  flush=True)
+
+        if broadcast.broadcast_id in self._running:
+            return {"targets": len(broadcast.targets), "skipped": len(broadcast.targets), "running": True}
+        self._running.add(broadcast.broadcast_id)
+        ledger = _Ledger(path)
+        ledger.open(broadcast, fresh)
+        t0 = time.perf_counter()
+        try:
+            pending = iter([target for target in broadcast.targets if target.key not in results])
+            skipped = len(results)
+
+            async def worker():
+                for target in pending:
+                    delivery = await self._deliver(broadcast, target)
+                    results[target.key] = delivery
+                    ledger.record(target.key, delivery)
+                    BROADCAST_DELIVERIES.inc(kind=broadcast.kind, status=delivery.status)
+                    if delivery.status == "failed":
+                        print(f"[브로드캐스트] {broadcast.kind} {target.key} 전송 실패: {delivery.error}",
+                              flush=True)
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+            elapsed = time.perf_counter() - t0
+            counts = {"sent": 0, "failed": 0, "missing": 0}
+            for delivery in results.values():
+                counts[delivery.status] = counts.get(delivery.status, 0) + 1
+            summary = {"targets": len(broadcast.targets), **counts, "skipped": skipped,
+                       "elapsed_s": round(elapsed, 2)}
+            if self.writer is not None:
+                try:
+                    await self.writer(self, broadcast, results, summary)
+                except Exception as e:
+                    print(f"[브로드캐스트] {broadcast.broadcast_id} 결과 저장 실패: {e}", flush=True)
+            ledger.finish(summary)
+            BROADCAST_SECONDS.observe(elapsed, kind=broadcast.kind)
+            print(f"[브로드캐스트] {broadcast.kind} {broadcast.broadcast_id}: 전송 {counts['sent']} / "
+                  f"실패 {counts['failed']} / 채널 없음 {counts['missing']} ({elapsed:.1f}s)", flush=True)
+            return summary
+        finally:
+            ledger.close()
+            self._running.discard(broadcast.broadcast_id)
+
+    async def resume_pending(self) -> list:
+        """끝나지 않은 ledger 를 찾아 남은 대상에 이어서 보내고, 오래된 완료 ledger 는 지웁니다."""
+        if not self.ledger_dir.exists():
+            return []
+        summaries = []
+        cutoff = time.time() - LEDGER_KEEP_DAYS * 86400
+        for path in sorted(self.ledger_dir.glob("*.jsonl")):
+            try:
+                header, _results, summary = _Ledger.load(path)
+            except OSError:
+                continue
+            if header is None:
+                path.unlink(missing_ok=True)
+                continue
+            if summary is not None:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+                continue
+            if path != self._ledger_path(header["id"]):
+                continue  # 다른 워커의 ledger
+            broadcast = Broadcast(
+                header["id"], header["kind"], header["messages"],
+                [BroadcastTarget.from_row(row) for row in header["targets"]],
+                sticky_prefix=header.get("sticky_prefix"), created_at=header.get("created_at", 0),
+            )
+            summaries.append(await self.run(broadcast))
+        return summaries
+
+
+_engine = None
+
+
+def get_broadcast_engine(bot) -> BroadcastEngine:
+    global _engine
+    if _engine is None:
+        _engine = BroadcastEngine(DiscordTransport(bot))
+    return _engine
@@ -0,0 +1,63 @@
+"""ChannelContextBuffer — 채널별 최근 메시지 링 버퍼 (끼어들기 judge 맥락용).
+
+예전에는 게이트 후보 메시지마다 channel.history() REST 호출로 최근 메시지를 다시 가져왔다.
+이제 on_message 가 지정 채널 메시지를 (작성자, 정리된 본문, 시각) 으로 채널별 deque 에 넣고,
+맥락은 그 deque 를 자르기만 한다 (I/O 없음).
+
+- 채널당 최근 size 개 (deque maxlen), 채널 수는 TTLMap 상한 + 유휴 만료로 제한.
+- 봇 재시작 직후에는 비어 있다 — 새 메시지가 들어오면서 채워짐.
+- 삭제된 메시지는 discard() 로 빠진다 (모더레이션으로 지운 글이 judge 에 들어가지 않게).
+"""
+
+import time
+from collections import deque
+from typing import NamedTuple
+
+from run.utils.ttl_map import TTLMap
+
+MAX_TEXT_CHARS = 300  # 긴 메시지는 앞부분만 (judge 프롬프트 크기 제한)
+CHANNEL_MAX = 5000
+CHANNEL_TTL = 3600  # 이만큼 조용한 채널의 맥락은 버림 (오래된 대화에 끼어들지 않게)
+
+
+class ContextEntry(NamedTuple):
+    message_id: int
+    author: str
+    text: str
+    ts: float
+
+
+class ChannelContextBuffer:
+    """채널 ID → 최근 메시지 deque. 이벤트 루프 스레드 전용."""
+
+    def __init__(self, size: int, channel_max: int = CHANNEL_MAX, channel_ttl: float = CHANNEL_TTL):
+        self.size = size
+        self._channels = TTLMap(maxsize=channel_max, ttl=channel_ttl)
+
+    def record(self, message) -> None:
+        """메시지 하나 추가 (본문 없는 첨부/임베드 전용 메시지는 건너뜀)."""
+        text = (message.clean_content or "").strip()
+        if not text:
+            return
+        entries = self._channels.get_or_create(message.channel.id, lambda: deque(maxlen=self.size))
+        entries.append(ContextEntry(message.id, message.author.display_name, text[:MAX_TEXT_CHARS], time.time()))
+
+    def discard(self, channel_id: int, message_id: int) -> None:
+        entries = self._channels.get(channel_id)
+        if not entries:
+            return
+        for entry in entries:
+            if entry.message_id == message_id:
+                entries.remove(entry)
+                return
+
+    def lines(self, channel_id: int, limit: int) -> list[str]:
+        """최근 limit 개를 "작성자: 본문" 으로 (오래된 순)."""
+        entries = self._channels.get(channel_id)
+        if not entries:
+            return []
+        recent = list(entries)[-limit:]
+        return [f"{entry.author}: {entry.text}" for entry in recent]
+
+    def __len__(self) -> int:
+        return len(self._channels)
@@ -4,6 +4,8 @@ Modal(Gemma4 LoRA)과 Claude API 양쪽에서 공용. LoRA가 학습으로 흡
 Claude에서는 system prompt + few-shot으로 유도한다.
 """
 
+from run.services.chat.prompt_builder import PromptBuilder
+
 SYSTEM_PROMPT = (
     "너는 이터널 리턴의 쌍둥이 실험체 데비&마를렌이야. 한국어로만 대답해. 이모지 사용하지 마.\n"
     "데비(언니): 활발, 천진난만, 장난기. 직설적이고 솔직한 10대 소녀 말투.\n"
@@ -35,34 +37,20 @@ FEW_SHOT_EXAMPLES: list[dict] = [
 ]
 
 
-def build_system_blocks(context: str | None = None) -> list[dict]:
-    """Claude messages.create()의 system 파라미터용.
+def build_request(user_message: str, history: list[dict] | None = None, context: str | None = None,
+                  model: str | None = None) -> dict:
+    """Claude messages.create()용 {"system", "messages"} — 캐시 prefix 가 요청마다 같도록 조립.
 
-    프롬프트 캐싱: 시스템 프롬프트는 절대 변하지 않으므로 항상 cache_control.
-    context(패치노트·교정)는 뒤에 붙이고 캐시 안 함(매 호출 달라질 수 있음).
+    시스템 프롬프트 + few-shot 은 절대 변하지 않으므로 앞에 두고 cache breakpoint.
+    대화 히스토리 → context(패치노트·교정) → 이번 턴 입력 순으로 뒤에 붙인다 (context 를 system 에
+    넣으면 뒤따르는 few-shot 까지 캐시가 깨짐).
     """
-    blocks = [
-        {
-            "type": "text",
-            "text": SYSTEM_PROMPT,
-            "cache_control": {"type": "ephemeral"},
-        }
-    ]
-    if context:
-        blocks.append({"type": "text", "text": f"[추가 컨텍스트]\n{context}"})
-    return blocks
-
-
-def build_messages(user_message: str, history: list[dict] | None = None) -> list[dict]:
-    """few-shot + 대화 히스토리 + 이번 턴 입력을 합쳐서 messages 배열 반환."""
-    messages: list[dict] = list(FEW_SHOT_EXAMPLES)  # 복사
-
-    if history:
-        for turn in history:
-            role = turn.get("role")
-            content = turn.get("content")
-            if role in ("user", "assistant") and content:
-                messages.append({"role": role, "content": content})
-
-    messages.append({"role": "user", "content": user_message})
-    return messages
+    return (
+        PromptBuilder("character", model)
+        .system(SYSTEM_PROMPT)
+        .examples(FEW_SHOT_EXAMPLES)
+        .history(history)
+        .context("[추가 컨텍스트]", context)
+        .user(user_message)
+        .build()
+    )
@@ -39,11 +39,14 @@ import re
 import time
 from typing import Any, Optional, TypedDict
 
-from langgraph.graph import END, StateGraph
+from run.utils.lazy_import import lazy_import
 
 from .chat_client import ChatClient
 from .patchnote_search import get_patch_context
 
+# langgraph 는 build_chat_agent 첫 호출 때 로드 (PATCH_KEYWORDS 만 쓰는 chime_in 은 불필요)
+langgraph_graph = lazy_import("langgraph.graph")
+
 
 # 패치/밸런스 관련 키워드. 정규식이라 LLM 호출 없이 0.1ms 내 분류 가능.
 PATCH_KEYWORDS = re.compile(
@@ -143,7 +146,7 @@ def route_by_intent(state: ChatAgentState) -> str:
 
 def build_chat_agent(client: ChatClient):
     """chat_client를 주입받아 compile된 StateGraph 앱을 반환."""
-    graph = StateGraph(ChatAgentState)
+    graph = langgraph_graph.StateGraph(ChatAgentState)
 
     graph.add_node("classify_intent", classify_intent)
     graph.add_node("fetch_patchnote", fetch_patchnote)
@@ -163,6 +166,6 @@ def build_chat_agent(client: ChatClient):
     graph.add_edge("fetch_patchnote", "fetch_memory")
     graph.add_edge("skip_patchnote", "fetch_memory")
     graph.add_edge("fetch_memory", "call_llm")
-    graph.add_edge("call_llm", END)
+    graph.add_edge("call_llm", langgraph_graph.END)
 
     return graph.compile()
@@ -10,13 +10,33 @@ CHAT_API_URL: 전체 chat 엔드포인트 URL.
 import aiohttp
 import logging
 import os
+import time
 from typing import Optional
 
+from run.core import metrics
+
 logger = logging.getLogger(__name__)
 
 CHAT_API_URL = os.getenv("CHAT_API_URL", "http://localhost:5050/chat")
 CHAT_HEALTH_URL = os.getenv("CHAT_HEALTH_URL", "http://localhost:5050/health")
 
+# 챗 백엔드 공통 메트릭 (backend: modal / managed / chime_judge)
+LLM_REQUEST_SECONDS = metrics.histogram(
+    "llm_request_seconds", "LLM 요청 시간 (초)", ("backend", "status"))
+LLM_TOKENS = metrics.counter(
+    "llm_tokens_total", "LLM 토큰 사용량", ("backend", "kind"))
+_USAGE_KINDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+
+def record_usage(backend: str, usage) -> None:
+    """Anthropic usage 객체(또는 dict)의 토큰 수를 LLM_TOKENS 에 더합니다. 없는 필드는 무시."""
+    if not usage:
+        return
+    for kind in _USAGE_KINDS:
+        value = usage.get(kind) if isinstance(usage, dict) else getattr(usage, kind, None)
+        if isinstance(value, (int, float)) and value:
+            LLM_TOKENS.inc(value, backend=backend, kind=kind)
+
 
 class ChatClient:
     """비동기 HTTP 클라이언트 - 추론 서버 호출"""
@@ -43,16 +63,21 @@ class ChatClient:
         if context:
             payload["context"] = context
 
+        t0 = time.perf_counter()
+        status = "error"
         try:
             async with session.post(CHAT_API_URL, json=payload) as resp:
                 if resp.status != 200:
                     logger.error("추론 서버 에러: %s", resp.status)
                     return None
                 data = await resp.json()
+                status = "ok"
                 return data.get("response")
         except (aiohttp.ClientError, TimeoutError) as e:
             logger.error("추론 서버 연결 실패: %s", e)
             return None
+        finally:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - t0, backend="modal", status=status)
 
     async def health_check(self) -> bool:
         """서버 상태 확인 (chat 엔드포인트에 빈 요청)"""
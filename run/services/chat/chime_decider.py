@@ -6,6 +6,8 @@
     3. decaying 확률 (첫 기회 40% → 점차 감소)
     4. Claude judge (실제로 끼어들지 + 한 줄 대사 생성)
 
+1~3 은 passes_gates(), 4 는 judge_chime() — 호출자는 1~3 을 통과한 뒤에만 맥락을 만든다.
+
 채널 단위 상태. guild+channel을 키로 사용. 유저 발화 시 bot_streak=0 리셋.
 """
 
@@ -17,7 +19,12 @@ import time
 from dataclasses import dataclass, field
 from typing import Optional
 
-import anthropic
+from run.services.chat.chat_client import LLM_REQUEST_SECONDS, record_usage
+from run.services.chat.prompt_builder import PromptBuilder
+from run.utils.lazy_import import lazy_import
+from run.utils.ttl_map import TTLMap
+
+anthropic = lazy_import("anthropic")
 
 # "데비:" / "마를렌:" / "데비야:" / "마를렌아:" 같은 이름표·호격 prefix 제거용.
 # haiku judge가 프롬프트 지시 무시하고 자기 이름 + 호격조사(야/나/아) + 콜론 붙이는 케이스까지 방어.
@@ -45,6 +52,10 @@ COOLDOWN_SECONDS = 8.0
 MAX_BOT_STREAK = 3
 DECAY_PROBS = [0.40, 0.20, 0.08, 0.0]  # index = bot_streak 직전 값
 
+# 채널 상태 보관 — 이만큼 조용한 채널은 초기 상태(쿨다운 없음, streak 0)로 돌아가도 같다
+CHANNEL_STATE_MAX = 20000
+CHANNEL_STATE_TTL = 6 * 3600
+
 # 3단계 확률 구조 (지정 채널 내에서 메시지 성격에 따라 분기):
 #
 #   1. KEYWORD — "데비야/마를렌아" 같은 호명 키워드 포함 → 거의 확실히 답
@@ -100,6 +111,21 @@ def is_question(text: str) -> bool:
 JUDGE_MODEL = "claude-haiku-4-5-20251001"
 JUDGE_MAX_TOKENS = 120
 
+# judge 출력 규칙 — 페르소나 요약 뒤에 system 으로 (요청마다 같아서 캐시 prefix 에 들어감)
+JUDGE_RULES = "\n".join([
+    "출력 규칙 (엄격):",
+    "- 끼어들 맥락이면: 네가 하는 **1인칭 대사 한 줄**만 써. 따옴표도 붙이지 마.",
+    "  예시 (데비): 어 그거 나도 해봤어 ㅋㅋ",
+    "  예시 (마를렌): ...그런 거 뻔하지.",
+    "- 어색하거나 관심 없으면: 'SKIP' 한 단어만 써.",
+    "",
+    "절대 금지:",
+    "- 너 자신을 3인칭으로 부르지 마. '데비가 ~', '마를렌이 ~' 이런 거 금지.",
+    "- 상황 해설/판단 서술 금지. '~상황이네', '~타이밍이야', '~것 같아' 같은 메타 설명 금지.",
+    "- 생각 과정을 적지 마. 바로 대사 또는 SKIP만 출력해.",
+    "- 캐릭터 이름 접두사('데비:', '마를렌:', '데비야:', '마를렌아:') 금지.",
+])
+
 _PERSONA_BRIEF = {
     "debi": "너는 데비야. 활발하고 직설적인 10대 소녀 말투. 친근하게 끼어들어.",
     "marlene": "너는 마를렌이야. 냉소적이고 짧게 말하는 10대 소녀. '...' 자주 써. 무심한 듯 끼어들어.",
@@ -115,10 +141,10 @@ class _ChannelState:
 class ChimeInDecider:
     """솔로봇용. 프로세스당 1개 인스턴스. 내부 상태는 (guild_id, channel_id) 키."""
 
-    def __init__(self, identity: str, anthropic_client: anthropic.AsyncAnthropic):
+    def __init__(self, identity: str, anthropic_client: "anthropic.AsyncAnthropic"):
         self.identity = identity
         self._client = anthropic_client
-        self._state: dict[tuple, _ChannelState] = {}
+        self._state = TTLMap(maxsize=CHANNEL_STATE_MAX, ttl=CHANNEL_STATE_TTL)  # (guild, channel) -> _ChannelState
         self._persona_brief = _PERSONA_BRIEF.get(identity, "")
 
     def _key(self, guild_id, channel_id) -> tuple:
@@ -126,25 +152,23 @@ class ChimeInDecider:
 
     def on_user_message(self, guild_id, channel_id) -> None:
         """유저 발화 시 봇 streak 리셋."""
-        st = self._state.setdefault(self._key(guild_id, channel_id), _ChannelState())
+        st = self._state.get_or_create(self._key(guild_id, channel_id), _ChannelState)
         st.bot_streak = 0
 
     def on_bot_message(self, guild_id, channel_id) -> None:
         """다른 봇/자기 봇 메시지 감지 시 streak 증가 (chime 판단 여부와 무관)."""
-        st = self._state.setdefault(self._key(guild_id, channel_id), _ChannelState())
+        st = self._state.get_or_create(self._key(guild_id, channel_id), _ChannelState)
         st.bot_streak += 1
 
-    async def maybe_chime(
+    def passes_gates(
         self,
         guild_id,
         channel_id,
-        recent_context: list[str],
-        triggering_author: str,
         relaxed: bool = False,
         keyword_hit: bool = False,
         question_hit: bool = False,
-    ) -> Optional[str]:
-        """게이트 통과 시 대사 문자열 반환, 아니면 None.
+    ) -> bool:
+        """게이트 1~3 (쿨다운 → streak 캡 → 확률). 통과해야 맥락 수집 / judge 호출.
 
         우선순위: keyword_hit > question_hit > relaxed > normal
         - keyword_hit: 호명 키워드 ('데비야' 등) — 거의 확실히 답
@@ -152,7 +176,7 @@ class ChimeInDecider:
         - relaxed: 지정 채널 일반 채팅 — 드물게
         - 그 외: 비지정 채널 폴백 (현재 설계에선 호출 안 됨)
         """
-        st = self._state.setdefault(self._key(guild_id, channel_id), _ChannelState())
+        st = self._state.get_or_create(self._key(guild_id, channel_id), _ChannelState)
         now = time.time()
 
         if keyword_hit:
@@ -176,12 +200,12 @@ class ChimeInDecider:
         if now - st.last_chime_ts < cooldown:
             remain = cooldown - (now - st.last_chime_ts)
             print(f"[CHIME:{self.identity}:{mode}] skip cooldown (remain={remain:.1f}s)", flush=True)
-            return None
+            return False
 
         # 게이트 2: 봇 연속 발화 하드캡 (relaxed에서도 안전장치 유지)
         if st.bot_streak >= MAX_BOT_STREAK:
             print(f"[CHIME:{self.identity}:{mode}] skip streak_cap (streak={st.bot_streak})", flush=True)
-            return None
+            return False
 
         # 게이트 3: decaying 확률
         idx = min(max(st.bot_streak, 0), len(probs) - 1)
@@ -192,61 +216,57 @@ class ChimeInDecider:
                 f"[CHIME:{self.identity}:{mode}] skip prob (streak={st.bot_streak} prob={prob:.2f} roll={roll:.2f})",
                 flush=True,
             )
-            return None
+            return False
 
         print(
             f"[CHIME:{self.identity}:{mode}] gates passed → judge (streak={st.bot_streak} prob={prob:.2f} roll={roll:.2f})",
             flush=True,
         )
+        return True
 
-        # 게이트 4: Claude judge (가장 비쌈 — 여기까지 온 경우만)
+    async def judge_chime(
+        self,
+        guild_id,
+        channel_id,
+        recent_context: list[str],
+        triggering_author: str,
+    ) -> Optional[str]:
+        """게이트 4: Claude judge (가장 비쌈 — passes_gates 통과한 경우만). FIRE 면 대사 반환."""
         reply = await self._judge(recent_context, triggering_author)
         if not reply or reply.strip().upper().startswith("SKIP"):
             print(f"[CHIME:{self.identity}] judge SKIP: {reply!r}", flush=True)
             return None
 
         print(f"[CHIME:{self.identity}] judge FIRE: {reply[:80]!r}", flush=True)
-        st.last_chime_ts = now
+        st = self._state.get_or_create(self._key(guild_id, channel_id), _ChannelState)
+        st.last_chime_ts = time.time()
         st.bot_streak += 1  # 내가 곧 발화할 것
         return reply.strip()
 
     async def _judge(self, recent_context: list[str], triggering_author: str) -> Optional[str]:
-        prompt_lines = [
-            "[최근 대화]",
-            *recent_context,
-            "",
-            f"[방금 '{triggering_author}'이(가) 말함]",
-            "",
-            "여기에 네가 자연스럽게 한마디 끼어들 만한 상황이야?",
-            "",
-            "출력 규칙 (엄격):",
-            "- 끼어들 맥락이면: 네가 하는 **1인칭 대사 한 줄**만 써. 따옴표도 붙이지 마.",
-            "  예시 (데비): 어 그거 나도 해봤어 ㅋㅋ",
-            "  예시 (마를렌): ...그런 거 뻔하지.",
-            "- 어색하거나 관심 없으면: 'SKIP' 한 단어만 써.",
-            "",
-            "절대 금지:",
-            "- 너 자신을 3인칭으로 부르지 마. '데비가 ~', '마를렌이 ~' 이런 거 금지.",
-            "- 상황 해설/판단 서술 금지. '~상황이네', '~타이밍이야', '~것 같아' 같은 메타 설명 금지.",
-            "- 생각 과정을 적지 마. 바로 대사 또는 SKIP만 출력해.",
-            "- 캐릭터 이름 접두사('데비:', '마를렌:', '데비야:', '마를렌아:') 금지.",
-        ]
+        # 페르소나 + 규칙은 고정 (system, 캐시 prefix) — 최근 대화 / 트리거만 user 턴에
+        builder = (
+            PromptBuilder("chime_judge", JUDGE_MODEL)
+            .system(self._persona_brief, JUDGE_RULES)
+            .context("[최근 대화]", "\n".join(recent_context))
+            .user(f"[방금 '{triggering_author}'이(가) 말함]\n\n여기에 네가 자연스럽게 한마디 끼어들 만한 상황이야?")
+        )
+        t0 = time.perf_counter()
         try:
             resp = await asyncio.wait_for(
-                self._client.messages.create(
-                    model=JUDGE_MODEL,
-                    max_tokens=JUDGE_MAX_TOKENS,
-                    system=self._persona_brief,
-                    messages=[{"role": "user", "content": "\n".join(prompt_lines)}],
-                ),
+                self._client.messages.create(max_tokens=JUDGE_MAX_TOKENS, **builder.build()),
                 timeout=8.0,
             )
         except asyncio.TimeoutError:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - t0, backend="chime_judge", status="timeout")
             logger.warning("chime judge 타임아웃 — 스킵")
             return None
         except Exception as e:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - t0, backend="chime_judge", status="error")
             logger.warning("chime judge 실패: %s", e)
             return None
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - t0, backend="chime_judge", status="ok")
+        record_usage("chime_judge", getattr(resp, "usage", None))
 
         parts = getattr(resp, "content", []) or []
         text = "".join(getattr(b, "text", "") for b in parts).strip()
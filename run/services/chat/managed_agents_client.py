@@ -23,11 +23,22 @@ from typing import Any, Optional
 import anthropic
 
 from run.core import config as bot_config
+from run.services.chat.chat_client import LLM_REQUEST_SECONDS, record_usage
 from run.services.chat.persona import extract_persona_response
+from run.services.chat.prompt_builder import PromptBuilder
 from run.services.memory import session_store
 
 logger = logging.getLogger(__name__)
 
+# 참고 컨텍스트가 있을 때 턴 맨 앞에 붙는 고정 규칙
+CONTEXT_RULES = (
+    "[동작 규칙]\n"
+    "아래 [참고 컨텍스트]는 너희 둘이 이미 알고 있는 정보야. "
+    "톤은 평소처럼 츤츤대고 장난쳐도 좋은데, 핵심 정보는 반드시 답변에 포함해. "
+    '"모른다 / 정보 없다 / 또 같은 거 물어보네" 같은 회피·생략 금지. '
+    "정보 먼저 짧게 전달한 뒤에 캐릭터 코멘트 붙이는 식으로."
+)
+
 
 class ManagedAgentsClient:
     """Managed Agents 세션 재사용 기반 클라이언트.
@@ -112,20 +123,16 @@ class ManagedAgentsClient:
         if summary:
             logger.info("session 회전 직후 — summary inject (%d chars)", len(summary))
 
-        parts = []
+        # 고정 규칙 → 세션 요약 → 이번 참고 컨텍스트 → 질문 (덜 바뀌는 것부터)
+        builder = PromptBuilder("managed")
         if context:
-            parts.append(
-                "[동작 규칙]\n"
-                "아래 [참고 컨텍스트]는 너희 둘이 이미 알고 있는 정보야. "
-                "톤은 평소처럼 츤츤대고 장난쳐도 좋은데, 핵심 정보는 반드시 답변에 포함해. "
-                '"모른다 / 정보 없다 / 또 같은 거 물어보네" 같은 회피·생략 금지. '
-                "정보 먼저 짧게 전달한 뒤에 캐릭터 코멘트 붙이는 식으로."
-            )
-            parts.append(f"[참고 컨텍스트]\n{context}")
-        if summary:
-            parts.append(f"[이전 대화 요약 — 컨텍스트 복원용]\n{summary}")
-        parts.append(f"[지금 질문]\n{message}")
-        user_text = "\n\n".join(parts)
+            builder.system(CONTEXT_RULES)
+        user_text = (
+            builder.context("[이전 대화 요약 — 컨텍스트 복원용]", summary)
+            .context("[참고 컨텍스트]", context)
+            .user(f"[지금 질문]\n{message}")
+            .build_text()
+        )
 
         try:
             response = await self._send_and_collect(session_id, user_text)
@@ -186,6 +193,16 @@ class ManagedAgentsClient:
 
     async def _send_and_collect(self, session_id: str, user_text: str) -> Optional[str]:
         """user_text 보내고 응답 텍스트 모아서 반환. custom tool round-trip 포함."""
+        t0 = time.perf_counter()
+        status = "error"
+        try:
+            text = await self._stream_turn(session_id, user_text)
+            status = "ok" if text else "empty"
+            return text
+        finally:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - t0, backend="managed", status=status)
+
+    async def _stream_turn(self, session_id: str, user_text: str) -> Optional[str]:
         agent_text_parts: list[str] = []
         pending_tool_calls: list[dict] = []
 
@@ -204,6 +221,9 @@ class ManagedAgentsClient:
             async for event in stream:
                 ev_type = getattr(event, "type", None)
 
+                # 모델 호출이 끝난 이벤트에 토큰 사용량이 실려 온다 (이벤트 스키마는 beta 라 방어적으로)
+                record_usage("managed", getattr(event, "model_usage", None) or getattr(event, "usage", None))
+
                 if ev_type == "agent.message":
                     for block in getattr(event, "content", []):
                         if getattr(block, "type", None) == "text":
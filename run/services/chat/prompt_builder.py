@@ -0,0 +1,143 @@
+"""Claude 요청 조립기 — 프롬프트 캐시가 맞도록 "안 변하는 것 먼저, 매번 바뀌는 것 마지막".
+
+Anthropic 프롬프트 캐시는 tools → system → messages 순서의 **앞부분(prefix)이 바이트 단위로 같을 때만**
+맞는다. 페르소나 / 규칙 사이에 교정·패치노트 컨텍스트나 최근 대화가 끼면 그 뒤는 매번 새로 계산된다.
+
+    builder = PromptBuilder("chime_judge", JUDGE_MODEL)
+    builder.system(persona_brief, JUDGE_RULES)          # 안 변함 — 마지막 블록에 cache breakpoint
+    builder.examples(FEW_SHOT_EXAMPLES)                 # 안 변함 — 마지막 예시에 breakpoint
+    builder.history(turns)                              # 유저별, 뒤에만 붙음
+    builder.context("[참고 컨텍스트]", patch_context)     # 매번 바뀜 — 마지막 user 턴 앞부분
+    builder.user(message)
+    resp = await client.messages.create(max_tokens=..., **builder.build())
+
+- 컨텍스트는 system 이 아니라 마지막 user 턴에 넣는다 (system 에 넣으면 뒤따르는 few-shot 캐시까지 깨짐).
+- 토큰 수는 추정치 (한글 음절 ≈ 1토큰, 그 외 ≈ 3.5자/토큰). 안 변하는 부분이 모델의 최소 캐시 길이
+  (MIN_CACHEABLE_TOKENS) 보다 짧으면 breakpoint 를 달아도 캐시되지 않는다 — cacheable 로 확인.
+- build() 때 llm_prompt_tokens_estimated_total{backend, segment=stable|volatile} 에 추정치를 더한다.
+  실제 캐시 적중은 record_usage 가 쌓는 llm_tokens_total{kind=cache_read_input_tokens} 와
+  {kind=input_tokens} (캐시 안 된 입력) 으로 비교.
+- Claude messages API 가 아닌 백엔드(Managed Agents 턴 텍스트)는 build_text() 로 같은 순서의 문자열.
+"""
+
+import re
+from typing import Optional
+
+from run.core import metrics
+
+PROMPT_TOKENS_ESTIMATED = metrics.counter(
+    "llm_prompt_tokens_estimated_total", "요청 입력 토큰 추정치 (stable = 캐시 대상 prefix)",
+    ("backend", "segment"))
+
+# 모델별 최소 캐시 길이 (토큰) — 이보다 짧은 prefix 는 cache_control 이 있어도 캐시 안 됨
+MIN_CACHEABLE_TOKENS = {
+    "claude-haiku-4-5": 4096,
+    "claude-3-5-haiku": 2048,
+    "claude-3-haiku": 2048,
+}
+DEFAULT_MIN_CACHEABLE_TOKENS = 1024  # Sonnet / Opus
+
+_CACHE = {"type": "ephemeral"}
+_HANGUL_RE = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (토크나이저 없이 — 메트릭 / 캐시 가능 여부 판단용)."""
+    if not text:
+        return 0
+    hangul = len(_HANGUL_RE.findall(text))
+    return hangul + int((len(text) - hangul) / 3.5) + 1
+
+
+def min_cacheable_tokens(model: Optional[str]) -> int:
+    for prefix, tokens in MIN_CACHEABLE_TOKENS.items():
+        if model and model.startswith(prefix):
+            return tokens
+    return DEFAULT_MIN_CACHEABLE_TOKENS
+
+
+class PromptBuilder:
+    """요청 하나 분량. 호출 순서와 관계없이 stable → volatile 순으로 조립."""
+
+    def __init__(self, backend: str, model: Optional[str] = None):
+        self.backend = backend
+        self.model = model
+        self._system: list[str] = []       # 안 변함
+        self._examples: list[dict] = []    # 안 변함 (few-shot)
+        self._history: list[dict] = []     # 유저별 (뒤에만 붙음)
+        self._context: list[str] = []      # 매번 바뀜
+        self._user: Optional[str] = None
+
+    def system(self, *texts: str) -> "PromptBuilder":
+        self._system.extend(t for t in texts if t)
+        return self
+
+    def examples(self, turns: list[dict]) -> "PromptBuilder":
+        self._examples.extend(turns)
+        return self
+
+    def history(self, turns: Optional[list[dict]]) -> "PromptBuilder":
+        for turn in turns or ():
+            role, content = turn.get("role"), turn.get("content")
+            if role in ("user", "assistant") and content:
+                self._history.append({"role": role, "content": content})
+        return self
+
+    def context(self, title: str, text: Optional[str]) -> "PromptBuilder":
+        """이번 요청에만 쓰는 참고 정보 (교정 / 패치노트 / 최근 대화 / 세션 요약)."""
+        if text:
+            self._context.append(f"{title}\n{text}" if title else text)
+        return self
+
+    def user(self, text: str) -> "PromptBuilder":
+        self._user = text
+        return self
+
+    # --- 추정 ---
+
+    def stable_tokens(self) -> int:
+        return (sum(estimate_tokens(t) for t in self._system)
+                + sum(estimate_tokens(str(turn.get("content", ""))) for turn in self._examples))
+
+    def volatile_tokens(self) -> int:
+        return (sum(estimate_tokens(str(turn["content"])) for turn in self._history)
+                + sum(estimate_tokens(t) for t in self._context) + estimate_tokens(self._user or ""))
+
+    @property
+    def cacheable(self) -> bool:
+        return self.stable_tokens() >= min_cacheable_tokens(self.model)
+
+    def _record(self):
+        PROMPT_TOKENS_ESTIMATED.inc(self.stable_tokens(), backend=self.backend, segment="stable")
+        PROMPT_TOKENS_ESTIMATED.inc(self.volatile_tokens(), backend=self.backend, segment="volatile")
+
+    # --- 조립 ---
+
+    def _final_user_text(self) -> str:
+        return "\n\n".join([*self._context, *([self._user] if self._user else [])])
+
+    def build(self) -> dict:
+        """messages.create(**builder.build()) 용 {"system": [...], "messages": [...]}."""
+        system = [{"type": "text", "text": text} for text in self._system]
+        if system:
+            system[-1]["cache_control"] = _CACHE
+
+        messages = [dict(turn) for turn in self._examples]
+        if messages:
+            last = messages[-1]
+            last["content"] = [{"type": "text", "text": last["content"], "cache_control": _CACHE}]
+        messages.extend(self._history)
+        messages.append({"role": "user", "content": self._final_user_text()})
+
+        self._record()
+        request = {"messages": messages}
+        if system:
+            request["system"] = system
+        if self.model:
+            request["model"] = self.model
+        return request
+
+    def build_text(self) -> str:
+        """system / context / user 를 한 문자열로 (같은 순서) — 턴 텍스트만 보내는 백엔드용."""
+        self._record()
+        return "\n\n".join([*self._system, self._final_user_text()])
@@ -0,0 +1,129 @@
+"""일일 무료 대화 쿼터 — 봇 프로세스들이 같이 쓰는 SQLite(WAL) 카운터.
+
+예전에는 cogs/chat.py 의 모듈 dict 에 (유저, 날짜) 별로 세서, 재시작하면 리셋되고
+통합봇 / debi / marlene 솔로봇이 각자 따로 셌고, 지난 날짜 키가 지워지지 않았다.
+이제 같은 BOT_DATA_DIR 을 쓰는 프로세스들이 한 파일의 (scope, day) 행을 공유한다.
+
+- 증가 + 한도 확인은 BEGIN IMMEDIATE 트랜잭션 하나 (SQLite 쓰기 락 안에서 원자적) — 여러 프로세스가 동시에 눌러도
+  하루 한도를 넘겨 승인하지 않는다.
+- 날짜는 KST 기준 문자열이라 자정이 지나면 새 행에서 0 부터 (리셋 작업 없음).
+- 프로세스마다 하루 한 번 RETENTION_DAYS 보다 오래된 행을 지운다.
+
+데이터 위치:
+    BOT_DATA_DIR 환경변수 (기본값: ./data) / chat_quota.db
+
+    used = chat_quota.consume(user_id, DAILY_FREE_CHAT)   # None 이면 오늘 무료 소진
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+DB_DIR = Path(os.getenv("BOT_DATA_DIR", "./data"))
+DB_PATH = DB_DIR / "chat_quota.db"
+
+RETENTION_DAYS = 2  # 오늘 + 어제까지만 남김 (자정 직후 표시 / 시계 차이 여유)
+BUSY_TIMEOUT = 5.0  # 다른 프로세스가 쓰는 중이면 이만큼까지 대기 (초)
+# 필요한 SQLite (WITHOUT ROWID). 배포 이미지(python:3.11-slim-bullseye)는 3.34.1 —
+# 그보다 새 문법(RETURNING 3.35 등)은 로컬에서만 돌고 운영에서는 OperationalError
+SQLITE_MIN_VERSION = (3, 8, 2)
+SQLITE_DEPLOY_VERSION = (3, 34, 1)
+
+_KST = timezone(timedelta(hours=9))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_quota (
+    scope TEXT    NOT NULL,
+    day   TEXT    NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (scope, day)
+) WITHOUT ROWID;
+"""
+
+_lock = threading.Lock()  # 프로세스 안 connection 1개를 스레드들이 나눠 씀
+_conn: Optional[sqlite3.Connection] = None
+_pruned_day: Optional[str] = None
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        DB_DIR.mkdir(parents=True, exist_ok=True)
+        # autocommit — 문장 하나가 곧 트랜잭션
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _conn = conn
+    return _conn
+
+
+def today() -> str:
+    return datetime.now(_KST).strftime("%Y-%m-%d")
+
+
+def _scope(user_id) -> str:
+    return f"u:{user_id}" if user_id is not None else "anon"
+
+
+def _prune(conn: sqlite3.Connection, day: str) -> None:
+    global _pruned_day
+    if _pruned_day == day:
+        return
+    cutoff = (datetime.strptime(day, "%Y-%m-%d") - timedelta(days=RETENTION_DAYS - 1)).strftime("%Y-%m-%d")
+    deleted = conn.execute("DELETE FROM chat_quota WHERE day < ?", (cutoff,)).rowcount
+    _pruned_day = day
+    if deleted:
+        print(f"[CHAT_QUOTA] 지난 쿼터 {deleted}행 정리 (< {cutoff})", flush=True)
+
+
+def consume(user_id, limit: int, day: Optional[str] = None) -> Optional[int]:
+    """오늘 사용량이 limit 미만이면 1 올리고 새 사용량 반환, 이미 limit 이면 None.
+
+    블로킹 (다른 프로세스가 쓰는 중이면 최대 BUSY_TIMEOUT) — 이벤트 루프에서는 to_thread 로.
+    """
+    if limit <= 0:
+        return None
+    day = day or today()
+    scope = _scope(user_id)
+    with _lock:
+        conn = _connection()
+        _prune(conn, day)
+        # RETURNING / UPSERT 없이 (배포 이미지 bullseye 의 SQLite 3.34 는 RETURNING 미지원)
+        # BEGIN IMMEDIATE 로 쓰기 락을 먼저 잡아 UPDATE → 행이 없으면 INSERT 를 한 트랜잭션으로
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            updated = conn.execute(
+                "UPDATE chat_quota SET count = count + 1 WHERE scope=? AND day=? AND count < ?",
+                (scope, day, limit),
+            ).rowcount
+            if updated:
+                count = conn.execute(
+                    "SELECT count FROM chat_quota WHERE scope=? AND day=?", (scope, day),
+                ).fetchone()[0]
+            else:
+                # 행이 이미 있으면 (= 한도 도달) 무시됨
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO chat_quota (scope, day, count) VALUES (?, ?, 1)", (scope, day),
+                ).rowcount
+                count = 1 if inserted else None
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    return count
+
+
+def used(user_id, day: Optional[str] = None) -> int:
+    """오늘 쓴 무료 횟수."""
+    with _lock:
+        row = _connection().execute(
+            "SELECT count FROM chat_quota WHERE scope=? AND day=?",
+            (_scope(user_id), day or today()),
+        ).fetchone()
+    return row[0] if row else 0
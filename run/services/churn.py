@@ -20,9 +20,10 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
-from google.cloud.firestore_v1.base_query import FieldFilter
-
 from run.core import config
+from run.utils.lazy_import import lazy_import
+
+base_query = lazy_import("google.cloud.firestore_v1.base_query")
 
 CHURN_COLLECTION = "churn_feedback"
 
@@ -92,7 +93,7 @@ def record_poll_vote(*, message_id, answer_id) -> bool:
     try:
         now = datetime.now(timezone.utc).isoformat()
         col = fs.collection(CHURN_COLLECTION)
-        docs = list(col.where(filter=FieldFilter("poll_message_id", "==", str(message_id))).stream())
+        docs = list(col.where(filter=base_query.FieldFilter("poll_message_id", "==", str(message_id))).stream())
         if not docs:
             return False
         for d in docs:
@@ -0,0 +1,342 @@
+"""명령어 사용 로그 파이프라인 — 메모리 ring buffer → 묶음 chunk 문서 + 서버·일별 rollup 카운터.
+
+예전에는 명령어마다 command_logs 에 문서 1개를 쓰고(write-behind 로 batch 커밋은 했지만 문서 수는 그대로),
+대시보드는 order_by + limit 1000 으로 원본 로그를 훑어서 요약을 만들었다.
+
+쓰기 (봇):
+- record(): 이벤트 루프에서 바로 (RPC / 스레드 전환 없음). 원본 레코드는 크기 제한 ring buffer 로,
+  카운터는 (범위, 날짜)별 메모리 합계로. 버퍼가 넘치면 가장 오래된 레코드부터 버린다 (카운터는 그대로).
+- 샘플링: COMMAND_LOG_SAMPLE 에 적은 명령어는 원본 레코드를 그 비율만 남긴다. 카운터는 샘플링 없이 전부.
+- flush(): COMMAND_LOG_FLUSH_INTERVAL 마다 (그리고 종료 시) 레코드를 압축 리스트로 묶은 chunk 문서
+  (날짜당 최대 CHUNK_RECORDS 개씩) + rollup Increment 갱신을 write-behind 큐에 넣는다.
+
+Firestore:
+- command_log_chunks/{자동 id}
+    { day, start, end, worker, guild_ids: [...], commands: [...], sample_rates: {명령어: 비율},
+      records: [{t: epoch초, c: 명령어, u: user_id, g?: guild_id, ch?: channel_id, a?: args}, ...],
+      names: {"u:<id>" | "g:<id>" | "c:<id>": 이름}, expireAt }   (TTL 정책 COMMAND_LOGS_TTL_DAYS)
+- command_stats/{범위}_{YYYY-MM-DD}  — 범위 = guild_id | "dm" | "all"
+    { scope, date, total(Increment), commands: {명령어: Increment}, hours: {"HH": Increment},
+      users: {user_id: Increment} (서버 / dm), guilds: {guild_id: Increment} ("all"), expireAt }
+      (TTL 정책 COMMAND_STATS_TTL_DAYS)
+
+조회 (대시보드): get_summary() 는 rollup 문서만 get_all, load_logs() 는 chunk 를 최신순으로 필요한 만큼만.
+load_logs() 쿼리(guild_ids / commands array_contains + day 범위 + day·end 정렬)는 복합 색인이 필요하다 —
+저장소 루트 firestore.indexes.json (TTL 필드 설정 포함). 배포:
+    firebase deploy --only firestore:indexes      (firebase.json 의 firestore.indexes 로 이 파일 지정)
+또는 색인마다
+    gcloud firestore indexes composite create --collection-group=command_log_chunks \
+        --field-config=field-path=guild_ids,array-config=contains \
+        --field-config=field-path=day,order=descending --field-config=field-path=end,order=descending
+(commands 도 같은 모양, 필터 없는 조회용으로 day·end 만 있는 것 하나 더). 색인이 없으면 조회는 빈 목록 +
+색인 생성 링크가 담긴 경고 로그.
+
+    COMMAND_LOG_BUFFER=5000
+    COMMAND_LOG_FLUSH_INTERVAL=60
+    COMMAND_LOG_SAMPLE="대화=0.2,TTS=0.5"
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from run.core import metrics
+from run.core.config import BOT_IDENTITY, get_firestore_client, worker_key, write_queue
+
+CHUNKS_COLLECTION = 'command_log_chunks'
+STATS_COLLECTION = 'command_stats'
+COMMAND_LOGS_TTL_DAYS = 30
+COMMAND_STATS_TTL_DAYS = 90
+
+BUFFER_SIZE = int(os.getenv('COMMAND_LOG_BUFFER', '5000'))
+FLUSH_INTERVAL = float(os.getenv('COMMAND_LOG_FLUSH_INTERVAL', '60'))
+CHUNK_RECORDS = 500  # chunk 문서당 레코드 수 (1MB 문서 제한 아래)
+QUERY_CHUNKS = 50    # load_logs 가 한 번에 훑는 chunk 상한
+
+KST = timezone(timedelta(hours=9))
+
+logger = logging.getLogger(__name__)
+
+COMMAND_LOG_RECORDS = metrics.counter(
+    "command_log_records_total", "명령어 로그 레코드 처리 결과", ("result",))  # kept / sampled_out / dropped
+
+
+def _parse_sample_rates(raw: str) -> dict:
+    """"대화=0.2,TTS=0.5" → {"대화": 0.2, "TTS": 0.5} (0~1 로 자름, 잘못된 항목은 무시)."""
+    rates = {}
+    for item in (raw or '').split(','):
+        name, _, value = item.partition('=')
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return {name: rate for name, rate in rates.items() if name}
+
+
+SAMPLE_RATES = _parse_sample_rates(os.getenv('COMMAND_LOG_SAMPLE', ''))
+
+
+def stats_doc_id(scope, day: str) -> str:
+    return f"{scope}_{day}"
+
+
+def _recent_days(days: int, today: str = None) -> list[str]:
+    end = date.fromisoformat(today or datetime.now(KST).strftime('%Y-%m-%d'))
+    return [(end - timedelta(days=i)).isoformat() for i in range(days - 1, -1, -1)]
+
+
+# ───────────────────── 쓰기: ring buffer + 카운터 → flush ─────────────────────
+
+class _Rollup:
+    __slots__ = ("total", "commands", "hours", "members")
+
+    def __init__(self):
+        self.total = 0
+        self.commands = Counter()
+        self.hours = Counter()
+        self.members = Counter()  # 서버 / dm: user_id, "all": guild_id
+
+
+class CommandLogBuffer:
+    """명령어 로그를 모았다가 flush 때 chunk 문서 + rollup 갱신으로 write-behind 큐에 넣는다."""
+
+    def __init__(self, capacity: int = BUFFER_SIZE, sample_rates: dict = None,
+                 flush_interval: float = FLUSH_INTERVAL, rng: random.Random = None):
+        self.sample_rates = SAMPLE_RATES if sample_rates is None else sample_rates
+        self.flush_interval = flush_interval
+        self._records = deque(maxlen=capacity)  # (day, 레코드, names)
+        self._rollups = defaultdict(_Rollup)    # (scope, day) -> _Rollup
+        self._lock = threading.Lock()
+        self._rng = rng or random.Random()
+        self._task = None
+        self.worker = worker_key(BOT_IDENTITY)
+
+    def record(self, command_name: str, user_id, user_name: str = None, guild_id=None,
+               guild_name: str = None, channel_id=None, channel_name: str = None,
+               args: dict = None, now: datetime = None):
+        now = now or datetime.now(KST)
+        day, hour = now.strftime('%Y-%m-%d'), now.strftime('%H')
+        user_id = str(user_id)
+        guild_id = str(guild_id) if guild_id else None
+        channel_id = str(channel_id) if channel_id else None
+
+        rate = self.sample_rates.get(command_name, 1.0)
+        keep = rate >= 1.0 or self._rng.random() < rate
+        self._ensure_running()
+        with self._lock:
+            for scope, member in ((guild_id or 'dm', user_id), ('all', guild_id or 'dm')):
+                rollup = self._rollups[(scope, day)]
+                rollup.total += 1
+                rollup.commands[command_name] += 1
+                rollup.hours[hour] += 1
+                rollup.members[member] += 1
+            if not keep:
+                COMMAND_LOG_RECORDS.inc(result='sampled_out')
+                return
+            if len(self._records) == self._records.maxlen:
+                COMMAND_LOG_RECORDS.inc(result='dropped')
+            # 짧은 키 map (Firestore 는 배열 안 배열을 못 씀), 없는 값은 생략
+            row = {'t': int(now.timestamp()), 'c': command_name, 'u': user_id}
+            if guild_id:
+                row['g'] = guild_id
+            if channel_id:
+                row['ch'] = channel_id
+            if args:
+                row['a'] = args
+            names = {}
+            if user_name:
+                names[f"u:{user_id}"] = user_name
+            if guild_id and guild_name:
+                names[f"g:{guild_id}"] = guild_name
+            if channel_id and channel_name:
+                names[f"c:{channel_id}"] = channel_name
+            self._records.append((day, row, names))
+        COMMAND_LOG_RECORDS.inc(result='kept')
+
+    def drain(self) -> tuple:
+        """(레코드 목록, rollup dict) 를 꺼내고 비운다."""
+        with self._lock:
+            records, self._records = list(self._records), deque(maxlen=self._records.maxlen)
+            rollups, self._rollups = self._rollups, defaultdict(_Rollup)
+        return records, rollups
+
+    def flush(self) -> int:
+        """모은 것을 write-behind 큐에 넣는다 (RPC 없음). 넣은 문서 수 반환."""
+        records, rollups = self.drain()
+        docs = 0
+
+        by_day = defaultdict(list)
+        for day, row, names in records:
+            by_day[day].append((row, names))
+        expire_at = datetime.now(timezone.utc) + timedelta(days=COMMAND_LOGS_TTL_DAYS)
+        for day, rows in by_day.items():
+            for i in range(0, len(rows), CHUNK_RECORDS):
+                chunk = rows[i:i + CHUNK_RECORDS]
+                names = {}
+                for _, row_names in chunk:
+                    names.update(row_names)
+                chunk_rows = [row for row, _ in chunk]
+                commands = sorted({row['c'] for row in chunk_rows})
+                write_queue.add(CHUNKS_COLLECTION, {
+                    'day': day,
+                    'start': datetime.fromtimestamp(chunk_rows[0]['t'], KST).isoformat(),
+                    'end': datetime.fromtimestamp(chunk_rows[-1]['t'], KST).isoformat(),
+                    'worker': self.worker,
+                    'guild_ids': sorted({row['g'] for row in chunk_rows if 'g' in row}),
+                    'commands': commands,
+                    'sample_rates': {c: self.sample_rates[c] for c in commands if c in self.sample_rates},
+                    'records': chunk_rows,
+                    'names': names,
+                    'expireAt': expire_at,
+                })
+                docs += 1
+
+        stats_expire_at = datetime.now(timezone.utc) + timedelta(days=COMMAND_STATS_TTL_DAYS)
+        for (scope, day), rollup in rollups.items():
+            increments = {'total': rollup.total}
+            increments.update({('commands', name): n for name, n in rollup.commands.items()})
+            increments.update({('hours', hour): n for hour, n in rollup.hours.items()})
+            member_field = 'guilds' if scope == 'all' else 'users'
+            increments.update({(member_field, member): n for member, n in rollup.members.items()})
+            write_queue.update(STATS_COLLECTION, stats_doc_id(scope, day),
+                               fields={'scope': scope, 'date': day, 'expireAt': stats_expire_at},
+                               increments=increments)
+            docs += 1
+        return docs
+
+    def _ensure_running(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            pass  # 이벤트 루프 밖 (스크립트 / 스레드) — 종료 flush 나 다음 루프 호출이 처리
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[명령어 로그] flush 실패: {e}", flush=True)
+
+
+command_logs = CommandLogBuffer()
+
+
+def flush() -> int:
+    """종료 시 호출 — write-behind 큐 flush 전에."""
+    return command_logs.flush()
+
+
+# ───────────────────── 조회 API (대시보드) ─────────────────────
+
+def get_summary(guild_id=None, days: int = 7, top: int = 10) -> dict:
+    """최근 days 일 명령어 사용 요약. guild_id 없으면 전체 ("all" rollup). rollup 문서 days 개만 읽는다."""
+    fs = get_firestore_client()
+    scope = str(guild_id) if guild_id else 'all'
+    empty = {'daily': [], 'commands': [], 'hours': [0] * 24, 'top': [], 'total': 0}
+    if not fs:
+        return empty
+    col = fs.collection(STATS_COLLECTION)
+    refs = [col.document(stats_doc_id(scope, day)) for day in _recent_days(days)]
+    try:
+        docs = sorted((snap.to_dict() or {} for snap in fs.get_all(refs) if snap.exists),
+                      key=lambda d: d.get('date', ''))
+    except Exception as e:
+        print(f"[명령어 로그] rollup 조회 실패 ({scope}): {e}", flush=True)
+        return empty
+
+    member_field = 'guilds' if scope == 'all' else 'users'
+    active_key = 'activeGuilds' if scope == 'all' else 'activeUsers'
+    commands, hours, members = Counter(), [0] * 24, Counter()
+    for doc in docs:
+        commands.update({k: int(v or 0) for k, v in (doc.get('commands') or {}).items()})
+        for hour, n in (doc.get('hours') or {}).items():
+            if hour.isdigit() and int(hour) < 24:
+                hours[int(hour)] += int(n or 0)
+        members.update({k: int(v or 0) for k, v in (doc.get(member_field) or {}).items()})
+    return {
+        'daily': [{'date': doc.get('date'), 'total': int(doc.get('total', 0) or 0),
+                   active_key: len(doc.get(member_field) or {})} for doc in docs],
+        'commands': [{'name': name, 'count': n} for name, n in commands.most_common()],
+        'hours': hours,
+        'top': [{'id': member_id, 'count': n} for member_id, n in members.most_common(top)],
+        'total': sum(int(doc.get('total', 0) or 0) for doc in docs),
+    }
+
+
+def _expand(chunk: dict) -> list[dict]:
+    """chunk 문서 → 예전 command_logs 문서 모양의 dict 목록."""
+    names = chunk.get('names') or {}
+    logs = []
+    for row in chunk.get('records') or []:
+        user_id, guild_id, channel_id = row.get('u'), row.get('g'), row.get('ch')
+        logs.append({
+            'command_name': row.get('c'),
+            'user_id': user_id,
+            'user_name': names.get(f"u:{user_id}"),
+            'guild_id': guild_id,
+            'guild_name': names.get(f"g:{guild_id}") if guild_id else None,
+            'channel_id': channel_id,
+            'channel_name': names.get(f"c:{channel_id}") if channel_id else None,
+            'timestamp': datetime.fromtimestamp(int(row.get('t', 0)), KST).isoformat(),
+            'args': row.get('a') or {},
+        })
+    return logs
+
+
+def load_logs(filters: Optional[dict] = None) -> list[dict]:
+    """원본 로그 조회 (샘플링된 명령어는 일부만). config.load_command_logs 와 같은 필터 / 반환 모양.
+
+    filters: guild_id, user_id, command_name, start_date, end_date (ISO str), limit (기본 1000)
+    """
+    fs = get_firestore_client()
+    if not fs:
+        return []
+    filters = filters or {}
+    limit = int(filters.get('limit') or 1000)
+    start, end = filters.get('start_date'), filters.get('end_date')
+    try:
+        query = fs.collection(CHUNKS_COLLECTION)
+        # array_contains 는 쿼리당 하나 — 서버 필터 우선, 나머지는 펼친 뒤 메모리에서
+        if filters.get('guild_id'):
+            query = query.where('guild_ids', 'array_contains', str(filters['guild_id']))
+        elif filters.get('command_name'):
+            query = query.where('commands', 'array_contains', filters['command_name'])
+        if start:
+            query = query.where('day', '>=', start[:10])
+        if end:
+            query = query.where('day', '<=', end[:10])
+
+        from google.cloud.firestore_v1 import Query as FsQuery
+        query = query.order_by('day', direction=FsQuery.DESCENDING) \
+                     .order_by('end', direction=FsQuery.DESCENDING).limit(QUERY_CHUNKS)
+
+        logs = []
+        for snap in query.stream():
+            for log in _expand(snap.to_dict() or {}):
+                if filters.get('guild_id') and log['guild_id'] != str(filters['guild_id']):
+                    continue
+                if filters.get('user_id') and log['user_id'] != str(filters['user_id']):
+                    continue
+                if filters.get('command_name') and log['command_name'] != filters['command_name']:
+                    continue
+                if (start and log['timestamp'] < start) or (end and log['timestamp'] > end):
+                    continue
+                logs.append(log)
+            if len(logs) >= limit * 2:  # chunk 는 워커별로 시간이 겹친다 — 조금 넉넉히 모은 뒤 정렬
+                break
+        logs.sort(key=lambda log: log['timestamp'], reverse=True)
+        return logs[:limit]
+    except Exception as e:
+        # 복합 색인이 없으면 FAILED_PRECONDITION — 메시지에 색인 생성 링크가 들어 있다 (firestore.indexes.json)
+        logger.warning(f"[명령어 로그] 로그 조회 실패 (filters={filters}): {e}")
+        return []
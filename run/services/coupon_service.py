@@ -133,69 +133,27 @@ class CouponService:
 
         return "\n".join(lines)
 
-    async def update_sticky_messages(self, coupons: list[dict]):
-        """쿠폰이 변경되면 모든 구독 채널에 알림 전송 + 고정 메시지 등록."""
-        settings = await asyncio.to_thread(config.load_settings, True)
-        content = self.format_coupon_message(coupons)
-
-        changed = False
-
-        for guild_id, guild_data in settings.get("guilds", {}).items():
-            notif = guild_data.get("notification_settings", {})
-            coupon_config = notif.get("coupon", {})
-
-            if not coupon_config.get("enabled") or not coupon_config.get("channelId"):
-                continue
+    async def update_sticky_messages(self, coupons: list[dict], coupons_hash: str):
+        """쿠폰이 변경되면 모든 구독 채널에 알림 전송 + 고정 메시지 등록 (broadcast 엔진).
 
-            channel_id_str = str(coupon_config["channelId"])
-            channel = self.bot.get_channel(int(channel_id_str))
-            if not channel:
-                continue
-
-            # 이전 고정 메시지 삭제 (sticky_messages에서)
-            sticky_messages = guild_data.get("sticky_messages", [])
-            old_sticky = None
-            for sm in sticky_messages:
-                if sm.get("id") == f"coupon_{guild_id}":
-                    old_sticky = sm
-                    break
-
-            if old_sticky and old_sticky.get("lastMessageId"):
-                try:
-                    old_msg = await channel.fetch_message(int(old_sticky["lastMessageId"]))
-                    await old_msg.delete()
-                except Exception:
-                    pass
-
-            # 새 메시지 전송 (알림 울리게 - 갱신 알림)
-            try:
-                new_msg = await channel.send(content)
-            except Exception as e:
-                print(f"[쿠폰] 메시지 전송 실패 ({guild_id}): {e}", flush=True)
-                continue
+        이전 고정 메시지 삭제 → 새 메시지 전송(알림 울리게)을 채널 여러 개 동시에 진행하고,
+        sticky_messages 의 lastMessageId 는 끝날 때 한 번에 batch 기록한다.
+        """
+        from run.services.broadcast_service import Broadcast, get_broadcast_engine, notification_targets
 
-            # sticky_messages에 등록/갱신 (이후 _handle_sticky_message가 고정 유지)
-            new_sticky = {
-                "id": f"coupon_{guild_id}",
-                "channelId": channel_id_str,
-                "channelName": getattr(channel, "name", ""),
-                "content": content,
-                "enabled": True,
-                "lastMessageId": str(new_msg.id),
-            }
-
-            if old_sticky:
-                idx = sticky_messages.index(old_sticky)
-                sticky_messages[idx] = new_sticky
-            else:
-                if "sticky_messages" not in guild_data:
-                    settings["guilds"][guild_id]["sticky_messages"] = []
-                settings["guilds"][guild_id]["sticky_messages"].append(new_sticky)
-
-            changed = True
-
-        if changed:
-            await asyncio.to_thread(config.save_settings, settings, True)
+        snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+        targets = notification_targets(
+            snapshot, "coupon", "coupon", [str(guild.id) for guild in self.bot.guilds],
+        )
+        if not targets:
+            return None
+        content = self.format_coupon_message(coupons)
+        # 같은 쿠폰 목록으로 되돌아와도 새 전송이어야 함 — 해시만으로 만들면 완료된 ledger 를 다시 찾는다
+        broadcast_id = f"coupon-{coupons_hash[:16]}-{datetime.now(KST):%Y%m%d%H%M%S}"
+        return await get_broadcast_engine(self.bot).run(Broadcast(
+            broadcast_id, "coupon", [{"content": content}], targets,
+            sticky_prefix="coupon",
+        ))
 
     async def check_coupons(self):
         """쿠폰 변경 확인 및 갱신"""
@@ -214,18 +172,18 @@ class CouponService:
             is_first_run = self._last_hash is None
             self._last_hash = current_hash
 
-            # GCS에 쿠폰 데이터 저장
-            settings = await asyncio.to_thread(config.load_settings, True)
-            settings.setdefault("global", {})["coupons"] = coupons
-            settings["global"]["coupons_hash"] = current_hash
-            await asyncio.to_thread(config.save_settings, settings, True)
+            # 쿠폰 데이터 저장 (전역 필드만 — sticky lastMessageId 등 다른 문서를 되돌려 쓰지 않게)
+            await asyncio.to_thread(config.save_global_settings, {
+                "coupons": coupons,
+                config.worker_key("coupons_hash"): current_hash,
+            })
 
             # 첫 실행이어도 메시지가 없는 채널에는 전송
             if is_first_run:
                 print(f"[쿠폰] 초기 실행 ({len(coupons)}개 쿠폰 감지)", flush=True)
 
             # 스티키 메시지 갱신
-            await self.update_sticky_messages(coupons)
+            await self.update_sticky_messages(coupons, current_hash)
             print(f"[쿠폰] {len(coupons)}개 쿠폰 갱신 완료", flush=True)
 
         except Exception as e:
@@ -250,7 +208,9 @@ def start_coupon_service(bot):
 
     # GCS에서 마지막 해시 복원
     settings = config.load_settings()
-    _coupon_service._last_hash = settings.get("global", {}).get("coupons_hash")
+    global_settings = settings.get("global", {})
+    _coupon_service._last_hash = global_settings.get(config.worker_key("coupons_hash"),
+                                                     global_settings.get("coupons_hash"))
 
     if not check_coupons_task.is_running():
         check_coupons_task.start()
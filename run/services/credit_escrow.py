@@ -0,0 +1,696 @@
+"""크레딧 escrow (lease) — TTS / 대화 차감을 로컬에서 즉시 승인하고 모아서 정산.
+
+예전에는 캐릭터 보이스 TTS 메시지 / 무료 초과 대화 메시지마다 credits.debit 트랜잭션
+(유저 문서 읽기 → 잔고 갱신 → ledger 추가)을 오디오 생성 / 응답 전에 직렬로 돌렸다.
+이제는 프로세스가 유저 잔고에서 일정량(chunk)을 lease 로 떼어 와 차감을 메모리에서 바로 승인하고,
+소비량은 주기적으로 여러 유저를 묶은 트랜잭션에서 사유별 합산 ledger 로 정산한다.
+
+Firestore credits/{user_id} 에 leases 맵:
+    leases = { "<holder>": {granted, settled, token, expires_at} }
+    holder     = 프로세스 키 (worker_key(BOT_IDENTITY)) — 재시작해도 같은 값
+    granted    = 이 lease 로 balance 에서 옮겨 온 누적 양
+    settled    = 정산(ledger 기록)까지 끝난 누적 소비량
+    token      = lease 를 새로 만들 때마다 바뀌는 값 (만료 회수 후 재생성 구분)
+    expires_at = epoch 초. 정산 때마다 연장
+
+불변식 (유저별): balance + Σ(granted - settled) + Σ(정산된 ledger 차감) = 유입 합계.
+lease 발급 / 정산 / 반환 / 만료 회수 모두 이 합을 보존하고, 어떤 경로도 balance 를 음수로 만들지 않는다.
+
+- 승인: 로컬 lease 잔량(granted - spent)이 충분하고 만료 SAFETY 초 전이면 즉시 승인 (RPC / 스레드 전환 없음).
+  모자라면 유저별로 한 번만 lease 를 보충(트랜잭션)하고, 그동안 같은 유저의 다른 차감은 기다린다.
+- 정산: SETTLE_INTERVAL 마다 미정산분이 있거나 만료가 가까운 lease 를 트랜잭션 하나에 묶어 정산 + 연장.
+  IDLE_RELEASE 동안 안 쓴 lease 는 남은 양을 balance 로 돌려준다 (대시보드 뽑기/기부가 쓸 수 있게).
+- 만료 회수: 그 유저 문서를 건드리는 트랜잭션(보충 / 정산)이 expires_at 이 지난 다른 lease 의 남은 양
+  (granted - settled)을 balance 로 돌려준다. 만료 전 SAFETY 초부터는 로컬에서도 승인하지 않으므로,
+  회수된 lease 로 승인되는 일은 없다.
+- 반환 / 회수된 lease 는 지우지 않고 closed tombstone 으로 남기고, 새 lease 는 이어받은 token 의 정산량(prev)을
+  기억한다 — 커밋 응답을 못 받아 같은 정산 / 보충을 다시 보내도 이중 차감하지 않는다.
+- 크래시: 승인할 때마다 lease 의 누적 소비량을 로컬 journal(JSON lines)에 남긴다. 기록은 JOURNAL_FLUSH_DELAY 동안
+  (lease 별 마지막 값만) 모았다가 전용 스레드 하나가 순서대로 쓴다 — 이벤트 루프에서 파일 I/O 없음.
+  재시작 후 recover() 가 lease 가 살아 있으면 정산 + 반환, 이미 만료 회수됐으면 미정산분을 balance 에서
+  (0 하한) 차감한다. 실패한 줄은 journal 에 남겨 정산 주기마다 다시 시도한다. 쓰기 전에 죽어 잃는 건
+  마지막 JOURNAL_FLUSH_DELAY 초의 승인분 — 덜 청구될 뿐 과소비는 아니다.
+- lease 밖 직접 차감 (대시보드 기부 / 뽑기 / 충전 환불): prepare_direct_debit 이 만료 lease 를 먼저 회수하고,
+  balance 만으로 모자라지만 살아 있는 lease 잔량까지 합치면 되면 그 lease 에 release_requested 를 표시한다.
+  holder 는 정산 주기마다 자기 lease 중 표시된 것을 조회해 반환하므로 잠시 뒤 다시 시도하면 된다
+  (살아 있는 lease 는 holder 가 로컬에서 승인 중일 수 있어 직접 가져오지 않는다).
+
+    CREDIT_LEASE_CHUNK=20           # 한 번에 떼어 오는 양
+    CREDIT_LEASE_TTL=600            # lease 만료 (초), 정산 때마다 연장
+    CREDIT_LEASE_IDLE_RELEASE=120   # 이만큼 안 쓰면 반환
+    CREDIT_SETTLE_INTERVAL=10
+    CREDIT_ESCROW_DIR=$BOT_DATA_DIR/credit_escrow
+
+    charge = await get_credit_escrow().debit(user_id, 2, "chat_message")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from run.core import config, metrics
+
+LEASE_CHUNK = int(os.getenv("CREDIT_LEASE_CHUNK", "20"))
+LEASE_TTL = float(os.getenv("CREDIT_LEASE_TTL", "600"))
+IDLE_RELEASE = float(os.getenv("CREDIT_LEASE_IDLE_RELEASE", "120"))
+SETTLE_INTERVAL = float(os.getenv("CREDIT_SETTLE_INTERVAL", "10"))
+SAFETY = 30.0  # 만료 이만큼 전부터 로컬 승인 중단 (프로세스 간 시계 차이 여유)
+ESCROW_DIR = Path(os.getenv("CREDIT_ESCROW_DIR",
+                            os.path.join(os.getenv("BOT_DATA_DIR", "./data"), "credit_escrow")))
+PREV_TOKENS = 4  # lease 가 기억하는 이전 token 수 (응답 유실 재시도 / 늦은 recover 용)
+SETTLE_USERS_PER_TXN = 100  # 유저당 쓰기 = 문서 1 + ledger 사유 수 → batch 500 제한 아래
+JOURNAL_FLUSH_DELAY = 0.2  # journal 기록을 이만큼 모아서 한 번에 (크래시 때 잃을 수 있는 승인 구간)
+
+ESCROW_DEBITS = metrics.counter(
+    "credit_escrow_debits_total", "크레딧 차감 요청 결과", ("path",))  # lease / refill / insufficient / error
+ESCROW_SETTLE_SECONDS = metrics.histogram(
+    "credit_escrow_settle_seconds", "lease 정산 트랜잭션 소요 시간 (초)", ("op",))
+
+
+# ─────────────────────────── 트랜잭션 본문 (순수 함수) ───────────────────────────
+# data 는 credits/{user_id} 문서의 수정 가능한 dict. Firestore 트랜잭션과 검증 스크립트가 같이 쓴다.
+
+def _ledger_entries(reasons: dict, total: int) -> list:
+    """{사유: [횟수, 양]} → [(사유 문자열, -양)] (합이 total 이 되도록, 사유 없으면 한 줄)."""
+    entries, left = [], total
+    for reason, (count, amount) in sorted(reasons.items()):
+        amount = min(int(amount), left)
+        if amount > 0:
+            entries.append((f"{reason} x{count}" if count > 1 else reason, -amount))
+            left -= amount
+    if left > 0:
+        entries.append(("escrow_settle", -left))
+    return entries
+
+
+def _reclaim_expired(data: dict, now: float, keep: Optional[str]) -> int:
+    """token 이 keep 이 아닌 만료 lease 의 남은 양을 balance 로 돌려주고 돌려준 양을 반환.
+
+    같은 holder 라도 token 이 다르면 호출한 프로세스가 모르는 lease (커밋 응답 유실로 생긴 것)다.
+
+    entry 는 지우지 않고 잔량 0 + closed 표시로 남긴다 — 늦게 온 정산이 같은 token 으로
+    settled 이후분만 balance 에서 가져가도록 (이중 차감 / 회수분 재사용 방지).
+    """
+    leases = data.setdefault("leases", {})
+    returned = 0
+    for lease in leases.values():
+        if lease.get("token") != keep and not lease.get("closed") and float(lease.get("expires_at", 0)) <= now:
+            returned += max(0, int(lease.get("granted", 0)) - int(lease.get("settled", 0)))
+            lease["granted"] = int(lease.get("settled", 0))
+            lease["closed"] = True
+    data["balance"] = int(data.get("balance", 0)) + returned
+    return returned
+
+
+def _take_balance(data: dict, amount: int) -> int:
+    """balance 에서 amount 를 (0 하한으로) 빼고 실제로 뺀 양을 반환."""
+    charge = min(max(0, amount), int(data.get("balance", 0)))
+    data["balance"] = int(data.get("balance", 0)) - charge
+    return charge
+
+
+def _charge_late(data: dict, delta: int, reasons: dict) -> list:
+    """회수된 lease 의 미정산분 → balance 에서 직접 (0 하한). ledger 항목 반환."""
+    charge = _take_balance(data, delta)
+    return _ledger_entries(reasons, charge) if charge else []
+
+
+def _settle_into(data: dict, lease: dict, spent: int, reasons: dict) -> list:
+    """같은 token 의 lease 에 누적 소비량 spent 까지 정산. lease 잔량을 넘는 부분
+    (회수 / 반환 뒤에 도착한 소비)은 balance 에서 직접 가져온다. ledger 항목 반환."""
+    settled = int(lease.get("settled", 0))
+    delta = max(0, spent - settled)
+    if not delta:
+        return []
+    covered = min(delta, max(0, int(lease.get("granted", 0)) - settled))
+    late = _take_balance(data, delta - covered)
+    lease["settled"] = spent
+    lease["granted"] = max(int(lease.get("granted", 0)), spent)
+    return _ledger_entries(reasons, covered + late) if covered + late else []
+
+
+def _settle_replaced(data: dict, lease: Optional[dict], token: str, spent: int, settled: int,
+                     reasons: dict) -> list:
+    """문서 lease 가 다른 token 으로 바뀐 뒤의 정산. 새 lease 가 이 token 을 이어받은 것이면
+    (prev) 거기 기록된 양 이후만 청구해서, 응답 유실로 다시 와도 두 번 받지 않는다."""
+    prev = (lease or {}).get("prev")
+    if prev is not None and token in prev:
+        settled = max(settled, int(prev[token]))
+        prev[token] = max(spent, int(prev[token]))
+    return _charge_late(data, spent - settled, reasons)
+
+
+def apply_acquire(data: dict, holder: str, token: Optional[str], spent: int, settled: int,
+                  amount: int, chunk: int, ttl: float, now: float) -> tuple:
+    """lease 발급 / 보충. amount = 이번에 승인하려는 양 (부족분은 문서 lease 기준으로 계산).
+
+    로컬 token 이 문서의 살아 있는 lease 와 다르면(처음 / 회수됨 / 로컬 상태 유실) 로컬 미정산분
+    (spent - settled)을 먼저 정산하고 새 token 으로 lease 를 만든다.
+    Returns: ({ok, lease, fresh, available}, ledger 항목)
+    """
+    _reclaim_expired(data, now, keep=token)
+    leases = data["leases"]
+    lease = leases.get(holder)
+    ledger = []
+    # release_requested: 대시보드 직접 차감이 반환을 요청함 → 남은 양을 돌려주고 이번에 필요한 만큼만 새로
+    requested = lease is not None and bool(lease.get("release_requested"))
+    fresh = lease is None or lease.get("token") != token or bool(lease.get("closed")) or requested
+    if fresh:
+        if token is not None:
+            if lease is not None and lease.get("token") == token:
+                ledger = _settle_into(data, lease, spent, {})
+            else:
+                ledger = _settle_replaced(data, lease, token, spent, settled, {})
+        # 이어받은 token -> 정산된 양. 늦게 / 다시 오는 정산이 그 이후만 내도록 최근 몇 개만 기억
+        prev = dict((lease or {}).get("prev") or {})
+        if lease is not None:  # 예전 lease → 남은 양 반환
+            data["balance"] += max(0, int(lease.get("granted", 0)) - int(lease.get("settled", 0)))
+            prev[lease["token"]] = int(lease.get("settled", 0))
+        if token is not None:
+            prev[token] = max(spent, int(prev.get(token, 0)))
+        # 예전 entry 는 바로 교체 — 아래에서 잔고 부족으로 끝나도 돌려준 양이 두 번 잡히지 않게
+        lease = leases[holder] = {"granted": 0, "settled": 0, "token": uuid.uuid4().hex, "expires_at": now,
+                                  "prev": dict(list(prev.items())[-PREV_TOKENS:])}
+    # 로컬 granted 는 응답 유실로 문서보다 작거나(보충) 클 수 있다(반환) — 문서 기준으로 계산
+    need = amount if fresh else max(0, spent + amount - int(lease["granted"]))
+    balance = int(data["balance"])
+    take = min(balance, need if requested else max(chunk, need)) if need else 0
+    if take < need:
+        available = balance + (0 if fresh else int(lease["granted"]) - spent)
+        if not fresh:
+            lease["expires_at"] = now + ttl
+        return {"ok": False, "lease": dict(lease), "fresh": fresh, "available": available}, ledger
+    data["balance"] = balance - take
+    lease["granted"] = int(lease["granted"]) + take
+    lease["expires_at"] = now + ttl
+    return {"ok": True, "lease": dict(lease), "fresh": fresh,
+            "available": data["balance"] + lease["granted"] - (0 if fresh else spent)}, ledger
+
+
+def apply_settle(data: dict, holder: str, token: str, spent: int, settled: int, reasons: dict,
+                 release: bool, ttl: float, now: float) -> tuple:
+    """누적 소비량 spent 까지 정산 (+ release 면 남은 양 반환). 멱등 — 같은 spent 로 다시 불러도 그대로.
+
+    release_requested 가 표시된 lease 는 release 가 아니어도 반환한다.
+    Returns: (status "ok" | "released" (요청으로 반환) | "reclaimed", ledger 항목)
+    """
+    _reclaim_expired(data, now, keep=token)
+    leases = data["leases"]
+    lease = leases.get(holder)
+    if lease is None or lease.get("token") != token:
+        return "reclaimed", _settle_replaced(data, lease, token, spent, settled, reasons)
+    ledger = _settle_into(data, lease, spent, reasons)
+    if lease.get("closed"):
+        return "reclaimed", ledger
+    requested = bool(lease.pop("release_requested", False))
+    if release or requested:
+        # 남은 양 반환. entry 는 잔량 0 인 closed tombstone 으로 남겨 같은 정산이 다시 와도 멱등
+        # (커밋 응답을 못 받고 재시도해도 이중 차감 / 반환된 양으로 승인하지 않음). 다음 보충 때 교체된다.
+        data["balance"] = int(data.get("balance", 0)) + max(0, int(lease["granted"]) - int(lease["settled"]))
+        lease["granted"] = lease["settled"]
+        lease["expires_at"] = now
+        lease["closed"] = True
+        return ("ok" if release else "released"), ledger
+    lease["expires_at"] = now + ttl
+    return "ok", ledger
+
+
+def held_amount(data: dict) -> int:
+    """문서 기준 lease 로 잡혀 있는 양 (아직 정산 안 된 소비 포함)."""
+    return sum(max(0, int(l.get("granted", 0)) - int(l.get("settled", 0)))
+               for l in (data.get("leases") or {}).values())
+
+
+def prepare_direct_debit(data: dict, amount: int, now: float) -> str:
+    """lease 밖 직접 차감 전 확인 (credits.debit / donate / gacha / refund_topup 트랜잭션 안에서).
+
+    만료 lease 를 회수한 뒤 balance 가 amount 이상이면 "ok" (차감은 호출자가 balance 에서).
+    모자라지만 살아 있는 lease 잔량까지 합치면 되면 그 lease 들에 반환 요청을 표시하고 "held",
+    합쳐도 모자라면 "insufficient". 어느 쪽이든 바뀐 문서는 escrow_fields(data) 로 같이 써야 한다.
+    """
+    _reclaim_expired(data, now, keep=None)
+    balance = int(data.get("balance", 0))
+    if balance >= amount:
+        return "ok"
+    if balance + held_amount(data) < amount:
+        return "insufficient"
+    for lease in data["leases"].values():
+        if not lease.get("closed") and int(lease.get("granted", 0)) > int(lease.get("settled", 0)):
+            lease["release_requested"] = True
+    return "held"
+
+
+def escrow_fields(data: dict) -> dict:
+    """prepare_direct_debit 뒤 문서에 쓸 필드 (balance + lease 가 있으면 leases)."""
+    fields = {"balance": int(data.get("balance", 0))}
+    if data.get("leases"):
+        fields["leases"] = data["leases"]
+    return fields
+
+
+# ─────────────────────────── 저장소 (Firestore) ───────────────────────────
+
+class FirestoreEscrowStore:
+    """apply_* 를 Firestore 트랜잭션 안에서 실행 (블로킹 — to_thread 로 호출)."""
+
+    def acquire(self, user_id: str, holder: str, token, spent: int, settled: int,
+                amount: int, chunk: int, ttl: float) -> dict:
+        from run.services import credits as credits_service
+        fs = config.get_firestore_client()
+        if not fs:
+            return {"ok": False, "error": "firestore_unavailable"}
+        firestore = credits_service.firestore
+        user_ref = fs.collection(credits_service.CREDITS_COLLECTION).document(user_id)
+
+        @firestore.transactional
+        def _txn(transaction):
+            snap = user_ref.get(transaction=transaction)
+            data = snap.to_dict() if snap.exists else credits_service._empty_user_doc()
+            result, ledger = apply_acquire(data, holder, token, spent, settled, amount, chunk, ttl, time.time())
+            fields = {"balance": data["balance"], "leases": data.get("leases", {})}
+            if snap.exists:
+                transaction.update(user_ref, fields)
+            elif result["ok"]:
+                base = credits_service._empty_user_doc()
+                base.update(fields)
+                transaction.set(user_ref, base)
+            for reason, amount in ledger:
+                credits_service._add_ledger(transaction, user_id, "debit", amount, reason)
+            return result
+
+        with ESCROW_SETTLE_SECONDS.time(op="acquire"):
+            return _txn(fs.transaction())
+
+    def release_requests(self, holder: str) -> set:
+        """반환 요청(release_requested)이 표시된 이 holder 의 lease 가 있는 유저 ID (map 하위 필드 자동 색인)."""
+        from run.services import credits as credits_service
+        fs = config.get_firestore_client()
+        if not fs:
+            return set()
+        path = credits_service.firestore.FieldPath("leases", holder, "release_requested").to_api_repr()
+        query = fs.collection(credits_service.CREDITS_COLLECTION).where(path, "==", True).select(["balance"])
+        with ESCROW_SETTLE_SECONDS.time(op="release_requests"):
+            return {snap.id for snap in query.stream()}
+
+    def settle_batch(self, items: list, ttl: float) -> dict:
+        """items: [(user_id, holder, token, spent, settled, reasons, release)] → {user_id: status}."""
+        from run.services import credits as credits_service
+        fs = config.get_firestore_client()
+        if not fs:
+            raise RuntimeError("firestore_unavailable")
+        firestore = credits_service.firestore
+        col = fs.collection(credits_service.CREDITS_COLLECTION)
+        statuses = {}
+        for i in range(0, len(items), SETTLE_USERS_PER_TXN):
+            chunk = items[i:i + SETTLE_USERS_PER_TXN]
+
+            @firestore.transactional
+            def _txn(transaction):
+                refs = [col.document(item[0]) for item in chunk]
+                snaps = {snap.id: snap for snap in fs.get_all(refs, transaction=transaction)}
+                out = {}
+                for (user_id, holder, token, spent, settled, reasons, release), ref in zip(chunk, refs):
+                    snap = snaps.get(user_id)
+                    exists = snap is not None and snap.exists
+                    data = (snap.to_dict() or {}) if exists else {}
+                    status, ledger = apply_settle(data, holder, token, spent, settled, reasons,
+                                                  release, ttl, time.time())
+                    if exists:
+                        transaction.update(ref, {"balance": int(data.get("balance", 0)),
+                                                 "leases": data.get("leases", {})})
+                    for reason, amount in ledger:
+                        credits_service._add_ledger(transaction, user_id, "debit", amount, reason)
+                    out[user_id] = status
+                return out
+
+            with ESCROW_SETTLE_SECONDS.time(op="settle"):
+                statuses.update(_txn(fs.transaction()))
+        return statuses
+
+
+# ─────────────────────────── 로컬 lease ───────────────────────────
+
+class _LocalLease:
+    __slots__ = ("user_id", "token", "granted", "spent", "settled", "expires_at",
+                 "reasons", "last_used", "refilling", "closing", "settling", "idle")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.token = None
+        self.granted = 0        # 문서의 granted 와 같음
+        self.spent = 0          # 로컬 누적 승인량
+        self.settled = 0        # 정산 확인된 누적 소비량
+        self.expires_at = 0.0
+        self.reasons = defaultdict(lambda: [0, 0])  # 미정산 사유 -> [횟수, 양]
+        self.last_used = time.monotonic()
+        self.refilling = False
+        self.closing = False    # 반환 정산 중 — 끝날 때까지 승인 안 함
+        self.settling = False   # 정산 트랜잭션 중 — 승인은 계속, 보충만 끝날 때까지 대기
+        self.idle = asyncio.Event()  # refilling / closing / settling 이 아닐 때 set
+        self.idle.set()
+
+    def usable(self, amount: int, safety: float) -> bool:
+        return (self.token is not None and not self.refilling and not self.closing
+                and time.time() < self.expires_at - safety
+                and self.granted - self.spent >= amount)
+
+    def row(self):
+        return [self.user_id, self.token, self.granted, self.spent, self.settled,
+                {k: list(v) for k, v in self.reasons.items()}]
+
+
+class _Journal:
+    """lease 별 누적 소비량 (JSON lines, (유저, token) 마다 마지막 줄이 최신). 정산 주기마다 현재 상태로 다시 쓴다.
+
+    append / rewrite 는 이벤트 루프에서 부르고, 파일 쓰기는 전용 스레드 하나가 받은 순서대로 한다.
+    """
+
+    def __init__(self, path: Path, flush_delay: float = JOURNAL_FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._file = None  # journal 스레드 전용
+        self._pending = {}  # (user_id, token) -> 줄 — 다음 flush 때 쓸 것 (lease 별 마지막 값만)
+        self._flush_handle = None
+        self._executor = None
+
+    @staticmethod
+    def load(path: Path) -> dict:
+        rows = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        break  # 죽으면서 잘린 마지막 줄
+                    if row[1]:
+                        rows[(row[0], row[1])] = row
+        except FileNotFoundError:
+            pass
+        return rows
+
+    def append(self, lease: _LocalLease):
+        self._pending[(lease.user_id, lease.token)] = lease.row()
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_delay, self.flush)
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        rows, self._pending = list(self._pending.values()), {}
+        if rows:
+            self._submit(self._write_rows, rows)
+
+    def rewrite(self, rows: list):
+        """현재 상태 rows 로 파일 교체 (쌓여 있던 append 는 rows 에 이미 들어 있으니 버림)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending = {}
+        self._submit(self._rewrite_rows, rows)
+
+    def _submit(self, fn, rows):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="credit-journal")
+        self._executor.submit(fn, rows).add_done_callback(_report_journal_error)
+
+    # ───────── journal 스레드 ─────────
+
+    def _write_rows(self, rows):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows))
+        self._file.flush()
+
+    def _rewrite_rows(self, rows):
+        self._close_file()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """남은 기록을 쓰고 스레드 종료 (블로킹 — 종료 경로에서만)."""
+        if self._pending or self._flush_handle is not None:
+            self.flush()
+        if self._executor is not None:
+            self._executor.submit(self._close_file)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _report_journal_error(future):
+    error = future.exception()
+    if error is not None:
+        print(f"[크레딧 escrow] journal 기록 실패: {error}", flush=True)
+
+
+class CreditEscrow:
+    """프로세스 하나의 lease 모음. 승인(debit)은 이벤트 루프에서, Firestore 는 store 를 스레드에서."""
+
+    def __init__(self, store=None, holder: str = None, journal_path: Path = None,
+                 chunk: int = LEASE_CHUNK, ttl: float = LEASE_TTL,
+                 idle_release: float = IDLE_RELEASE, settle_interval: float = SETTLE_INTERVAL,
+                 safety: float = SAFETY):
+        self.store = store or FirestoreEscrowStore()
+        self.holder = holder or config.worker_key(config.BOT_IDENTITY)
+        self.chunk = chunk
+        self.ttl = ttl
+        self.idle_release = idle_release
+        self.settle_interval = settle_interval
+        self.safety = safety
+        self._journal = _Journal(journal_path or ESCROW_DIR / f"{self.holder}.jsonl")
+        self._leases = {}  # user_id -> _LocalLease
+        # (user_id, token) -> journal 줄. 지난 실행에서 정산 못 한 lease — recover() 가 처리
+        self._orphans = _Journal.load(self._journal.path)
+        self._task = None
+        self._settle_lock = None
+
+    # ───────── 승인 ─────────
+
+    async def debit(self, user_id, amount: int, reason: str) -> dict:
+        """amount 차감 승인. credits.debit 과 같은 형태의 결과 dict."""
+        user_id = str(user_id)
+        if amount <= 0:
+            return {"ok": True, "charged": 0, "balance": self.local_available(user_id)}
+        self._ensure_running()
+        while True:
+            lease = self._leases.get(user_id)
+            if lease is None:
+                lease = self._leases[user_id] = _LocalLease(user_id)
+            if lease.usable(amount, self.safety):
+                return self._grant(lease, amount, reason, "lease")
+            if not lease.idle.is_set():
+                await lease.idle.wait()  # 다른 보충 / 반환이 끝나면 다시 판단
+                continue
+            return await self._refill(lease, amount, reason)
+
+    def _grant(self, lease: _LocalLease, amount: int, reason: str, path: str) -> dict:
+        lease.spent += amount
+        entry = lease.reasons[reason]
+        entry[0] += 1
+        entry[1] += amount
+        lease.last_used = time.monotonic()
+        self._journal.append(lease)
+        ESCROW_DEBITS.inc(path=path)
+        return {"ok": True, "charged": amount, "balance": lease.granted - lease.spent}
+
+    async def _refill(self, lease: _LocalLease, amount: int, reason: str) -> dict:
+        lease.refilling = True
+        lease.idle.clear()
+        try:
+            spent, settled = lease.spent, lease.settled
+            # 잔량이 있어도 만료가 가까우면 여기로 온다 — 보충 트랜잭션이 expires_at 도 연장
+            try:
+                result = await asyncio.to_thread(
+                    self.store.acquire, lease.user_id, self.holder, lease.token, spent, settled,
+                    amount, self.chunk, self.ttl)
+            except Exception as e:
+                ESCROW_DEBITS.inc(path="error")
+                print(f"[크레딧 escrow] lease 보충 실패 ({lease.user_id}): {e}", flush=True)
+                return {"ok": False, "reason": "firestore_unavailable", "balance": 0}
+            if result.get("error"):
+                ESCROW_DEBITS.inc(path="error")
+                return {"ok": False, "reason": result["error"], "balance": 0}
+            doc_lease = result.get("lease")
+            if result.get("fresh"):
+                # 로컬 미정산분은 트랜잭션 안에서 balance 로 정산됨 → 새 lease 기준으로 초기화
+                lease.spent = lease.settled = 0
+                lease.reasons.clear()
+                lease.token = doc_lease["token"] if doc_lease else None
+            if doc_lease:
+                lease.granted = int(doc_lease["granted"])
+                lease.expires_at = float(doc_lease["expires_at"])
+            if not result.get("ok"):
+                ESCROW_DEBITS.inc(path="insufficient")
+                return {"ok": False, "reason": "insufficient", "needed": amount,
+                        "balance": max(0, int(result.get("available", 0)))}
+            return self._grant(lease, amount, reason, "refill")
+        finally:
+            lease.refilling = False
+            lease.idle.set()
+
+    def local_available(self, user_id) -> int:
+        lease = self._leases.get(str(user_id))
+        return max(0, lease.granted - lease.spent) if lease else 0
+
+    def unsettled(self, user_id) -> int:
+        """이 프로세스가 승인했지만 아직 정산 안 된 양 (잔고 표시 보정용)."""
+        lease = self._leases.get(str(user_id))
+        return max(0, lease.spent - lease.settled) if lease else 0
+
+    # ───────── 정산 ─────────
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._settle_loop())
+
+    async def _settle_loop(self):
+        while True:
+            await asyncio.sleep(self.settle_interval)
+            try:
+                await self.settle()
+                if self._orphans:
+                    await self.recover()
+            except Exception as e:
+                print(f"[크레딧 escrow] 정산 실패: {e}", flush=True)
+
+    async def settle(self, release_all: bool = False) -> int:
+        """미정산분 / 만료 임박 / idle lease 를 한 번에 정산. 정산한 lease 수 반환."""
+        if self._settle_lock is None:
+            self._settle_lock = asyncio.Lock()
+        async with self._settle_lock:
+            requested = set()
+            if self._leases and not release_all:
+                try:
+                    requested = await asyncio.to_thread(self.store.release_requests, self.holder)
+                except Exception as e:
+                    print(f"[크레딧 escrow] 반환 요청 조회 실패: {e}", flush=True)
+            now_mono, now = time.monotonic(), time.time()
+            batch = []
+            for lease in list(self._leases.values()):
+                if lease.refilling or lease.token is None:
+                    if lease.token is None and not lease.refilling:
+                        self._leases.pop(lease.user_id, None)
+                    continue
+                release = (release_all or now_mono - lease.last_used >= self.idle_release
+                           or lease.user_id in requested)
+                if not (release or lease.spent > lease.settled
+                        or lease.expires_at - now < self.ttl / 2):
+                    continue
+                lease.settling = True
+                lease.closing = release
+                lease.idle.clear()
+                reasons = {k: list(v) for k, v in lease.reasons.items()}
+                batch.append((lease, lease.spent, reasons, release))
+            if not batch:
+                return 0
+
+            items = [(lease.user_id, self.holder, lease.token, spent, lease.settled, reasons, release)
+                     for lease, spent, reasons, release in batch]
+            statuses = {}
+            try:
+                statuses = await asyncio.to_thread(self.store.settle_batch, items, self.ttl)
+            except Exception as e:
+                print(f"[크레딧 escrow] 정산 트랜잭션 실패 ({len(items)}명): {e}", flush=True)
+            finally:
+                # 취소돼도(종료 / 크래시 시뮬레이션) 플래그는 풀어 둔다 — 결과 모름으로 처리
+                self._apply_statuses(batch, statuses, now)
+            self._rewrite_journal()
+            return sum(1 for lease, *_ in batch if statuses.get(lease.user_id) is not None)
+
+    def _apply_statuses(self, batch: list, statuses: dict, now: float):
+        for lease, spent, reasons, release in batch:
+            status = statuses.get(lease.user_id)
+            if status is not None:
+                lease.settled = spent
+                for reason, (count, amount) in reasons.items():
+                    entry = lease.reasons[reason]
+                    entry[0] -= count
+                    entry[1] -= amount
+                    if entry[0] <= 0 and entry[1] <= 0:
+                        del lease.reasons[reason]
+                if status == "ok" and not release:
+                    lease.expires_at = now + self.ttl
+                elif lease.spent > spent:
+                    # 회수됐는데 트랜잭션 도중 승인이 더 있었다 — 그만큼은 다음 정산에서 balance 로
+                    lease.expires_at = 0.0
+                else:
+                    self._leases.pop(lease.user_id, None)
+            elif release:
+                # 반환이 커밋됐는지 모름 — 문서 기준으로 다시 맞출 때까지(보충 / 재정산) 승인 안 함
+                lease.expires_at = 0.0
+            lease.settling = lease.closing = False
+            lease.idle.set()
+
+    def _rewrite_journal(self):
+        rows = list(self._orphans.values())
+        rows += [lease.row() for lease in self._leases.values() if lease.token is not None]
+        self._journal.rewrite(rows)
+
+    async def recover(self) -> int:
+        """지난 실행의 journal 에 남은 lease 를 정산 + 반환 (시작 시, 실패분은 정산 주기마다 다시)."""
+        if self._settle_lock is None:
+            self._settle_lock = asyncio.Lock()
+        async with self._settle_lock:
+            done = 0
+            while self._orphans:
+                # 한 트랜잭션에 유저당 한 줄 (같은 유저의 예전 token 이 여러 개면 다음 묶음으로)
+                chunk = {}
+                for key, row in self._orphans.items():
+                    chunk.setdefault(key[0], (key, row))
+                    if len(chunk) >= SETTLE_USERS_PER_TXN:
+                        break
+                items = [(user_id, self.holder, token, int(spent), int(settled),
+                          {k: list(v) for k, v in (reasons or {}).items()}, True)
+                         for _, (user_id, token, granted, spent, settled, reasons) in chunk.values()]
+                statuses = await asyncio.to_thread(self.store.settle_batch, items, self.ttl)
+                for user_id in statuses:
+                    self._orphans.pop(chunk[user_id][0], None)
+                done += len(statuses)
+                # 처리한 만큼 journal 에서 빼 둔다 (중간에 실패해도 남은 것만 다음에)
+                self._rewrite_journal()
+            if done:
+                print(f"[크레딧 escrow] 지난 실행 lease {done}개 정산/반환", flush=True)
+            return done
+
+    async def close(self):
+        """종료 시 모든 lease 정산 + 반환."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._leases:
+            await self.settle(release_all=True)
+        await asyncio.to_thread(self._journal.close)
+
+
+_escrow: Optional[CreditEscrow] = None
+
+
+def get_credit_escrow() -> CreditEscrow:
+    global _escrow
+    if _escrow is None:
+        _escrow = CreditEscrow()
+    return _escrow
+
+
+def peek_credit_escrow() -> Optional[CreditEscrow]:
+    """이 프로세스에 escrow 가 만들어져 있으면 반환 (대시보드 프로세스는 None)."""
+    return _escrow
@@ -14,18 +14,28 @@ Firestore 컬렉션:
 
 모든 mutating 연산은 firestore transaction 으로 race 방지.
 ledger 는 같은 트랜잭션에 추가해서 원장-잔고 정합성 유지.
+
+봇의 메시지별 차감은 credit_escrow lease 로 잔고 일부를 떼어 가 있을 수 있다 (credits/{id}.leases).
+직접 차감(debit / donate / gacha / refund_topup)은 prepare_direct_debit 으로 만료 lease 를 회수하고,
+balance 만으로 모자라지만 lease 잔량까지 합치면 되면 봇에 반환을 요청하고 held_in_escrow 로 실패한다
+(봇이 다음 정산 주기에 돌려주므로 retry_after 초 뒤 다시 시도).
 """
 
 from __future__ import annotations
 
 import math
 import random
+import time
 from datetime import date, datetime, timezone
 from typing import Optional
 
-from google.cloud import firestore  # type: ignore
-
 from run.core.config import get_firestore_client
+from run.services.credit_escrow import (
+    SETTLE_INTERVAL, escrow_fields, held_amount, peek_credit_escrow, prepare_direct_debit,
+)
+from run.utils.lazy_import import lazy_import
+
+firestore = lazy_import("google.cloud.firestore")  # 첫 트랜잭션 때 로드
 
 
 CREDITS_COLLECTION = 'credits'
@@ -91,6 +101,15 @@ def _add_ledger(transaction, user_id: str, type_: str, amount: int, reason: str,
     transaction.set(ref, payload)
 
 
+def _direct_debit_failure(status: str, data: dict, amount: int) -> dict:
+    """prepare_direct_debit 이 ok 가 아닐 때의 결과. balance 는 lease 잔량 포함 (get_balance 와 같은 값)."""
+    balance = int(data.get('balance', 0)) + held_amount(data)
+    if status == 'held':
+        return {'ok': False, 'reason': 'held_in_escrow', 'balance': balance, 'needed': amount,
+                'retry_after': int(SETTLE_INTERVAL * 2)}
+    return {'ok': False, 'reason': 'insufficient', 'balance': balance, 'needed': amount}
+
+
 # ───────────────────── 조회 ─────────────────────
 
 def get_balance(user_id) -> dict:
@@ -101,8 +120,13 @@ def get_balance(user_id) -> dict:
     doc = fs.collection(CREDITS_COLLECTION).document(str(user_id)).get()
     data = doc.to_dict() if doc.exists else _empty_user_doc()
     today = _today_kst_str()
+    # escrow lease 로 잡혀 있는 양도 유저 잔고 — 이 프로세스가 승인했지만 아직 정산 안 된 양은 뺀다
+    escrow = peek_credit_escrow()
+    personal = int(data.get('balance', 0)) + held_amount(data)
+    if escrow is not None:
+        personal -= escrow.unsettled(user_id)
     return {
-        'personal': int(data.get('balance', 0)),
+        'personal': max(0, personal),
         'last_check_in': data.get('last_check_in'),
         'streak_days': int(data.get('streak_days', 0)),
         'daily_bet': int(data.get('daily_bet', 0)) if data.get('daily_bet_date') == today else 0,
@@ -200,16 +224,19 @@ def debit(user_id, amount: int, reason: str) -> dict:
     def _txn(transaction):
         snap = user_ref.get(transaction=transaction)
         data = snap.to_dict() if snap.exists else _empty_user_doc()
-        balance = int(data.get('balance', 0))
-        if balance < amount:
-            return {'ok': False, 'reason': 'insufficient', 'balance': balance, 'needed': amount}
-        new_balance = balance - amount
+        status = prepare_direct_debit(data, amount, time.time())
+        if status != 'ok':
+            if snap.exists:
+                transaction.update(user_ref, escrow_fields(data))  # 만료 회수 / 반환 요청
+            return _direct_debit_failure(status, data, amount)
+        new_balance = int(data['balance']) - amount
+        data['balance'] = new_balance
         if not snap.exists:
             base = _empty_user_doc()
             base['balance'] = new_balance
             transaction.set(user_ref, base)
         else:
-            transaction.update(user_ref, {'balance': new_balance})
+            transaction.update(user_ref, escrow_fields(data))
         _add_ledger(transaction, str(user_id), 'debit', -amount, reason)
         return {'ok': True, 'balance': new_balance, 'charged': amount}
 
@@ -244,11 +271,18 @@ def credit(user_id, amount: int, reason: str) -> dict:
     return _txn(fs.transaction())
 
 
-def debit_for_tts(user_id, seconds: float, reason_suffix: str = '') -> dict:
-    """TTS 길이 기반 차감. 10초당 1, ceil. 0.5초 미만은 무료."""
+def tts_cost(seconds: float) -> int:
+    """TTS 길이 기반 비용. 10초당 1, ceil. 0.5초 이하는 무료 (0)."""
     if seconds <= 0.5:
+        return 0
+    return max(1, math.ceil(seconds / 10.0)) * TTS_COST_PER_10S
+
+
+def debit_for_tts(user_id, seconds: float, reason_suffix: str = '') -> dict:
+    """TTS 길이 기반 차감 (즉시 트랜잭션). 봇의 메시지별 차감은 credit_escrow 를 쓴다."""
+    cost = tts_cost(seconds)
+    if not cost:
         return {'ok': True, 'charged': 0, 'balance': get_balance(user_id)['personal']}
-    cost = max(1, math.ceil(seconds / 10.0)) * TTS_COST_PER_10S
     reason = f'tts_{seconds:.1f}s' + (f' {reason_suffix}' if reason_suffix else '')
     return debit(user_id, cost, reason)
 
@@ -273,20 +307,23 @@ def donate(user_id, guild_id, amount: int) -> dict:
         g_snap = guild_ref.get(transaction=transaction)
 
         u_data = u_snap.to_dict() if u_snap.exists else _empty_user_doc()
-        balance = int(u_data.get('balance', 0))
-        if balance < amount:
-            return {'ok': False, 'reason': 'insufficient', 'balance': balance, 'needed': amount}
+        status = prepare_direct_debit(u_data, amount, time.time())
+        if status != 'ok':
+            if u_snap.exists:
+                transaction.update(user_ref, escrow_fields(u_data))  # 만료 회수 / 반환 요청
+            return _direct_debit_failure(status, u_data, amount)
 
         g_balance = int((g_snap.to_dict() or {}).get('balance', 0)) if g_snap.exists else 0
-        new_user_balance = balance - amount
+        new_user_balance = int(u_data['balance']) - amount
         new_guild_balance = g_balance + amount
+        u_data['balance'] = new_user_balance
 
         if not u_snap.exists:
             base = _empty_user_doc()
             base['balance'] = new_user_balance
             transaction.set(user_ref, base)
         else:
-            transaction.update(user_ref, {'balance': new_user_balance})
+            transaction.update(user_ref, escrow_fields(u_data))
 
         if not g_snap.exists:
             transaction.set(guild_ref, {'balance': new_guild_balance})
@@ -325,7 +362,6 @@ def gacha(user_id, bet: int) -> dict:
     def _txn(transaction):
         snap = user_ref.get(transaction=transaction)
         data = snap.to_dict() if snap.exists else _empty_user_doc()
-        balance = int(data.get('balance', 0))
 
         # 일일 베팅 합산 (날짜 다르면 리셋)
         used_today = int(data.get('daily_bet', 0)) if data.get('daily_bet_date') == today else 0
@@ -334,8 +370,12 @@ def gacha(user_id, bet: int) -> dict:
                 'ok': False, 'reason': 'daily_cap', 'cap': GACHA_DAILY_BET_CAP,
                 'used_today': used_today, 'remaining': GACHA_DAILY_BET_CAP - used_today,
             }
-        if balance < bet:
-            return {'ok': False, 'reason': 'insufficient', 'balance': balance, 'needed': bet}
+        status = prepare_direct_debit(data, bet, time.time())
+        if status != 'ok':
+            if snap.exists:
+                transaction.update(user_ref, escrow_fields(data))  # 만료 회수 / 반환 요청
+            return _direct_debit_failure(status, data, bet)
+        balance = int(data['balance'])
 
         # 결과 추첨
         roll = random.random()
@@ -348,9 +388,10 @@ def gacha(user_id, bet: int) -> dict:
         net = payout - bet
         new_balance = balance - bet + payout
         new_daily_bet = used_today + bet
+        data['balance'] = new_balance
 
         update = {
-            'balance': new_balance,
+            **escrow_fields(data),
             'daily_bet': new_daily_bet,
             'daily_bet_date': today,
         }
@@ -678,15 +719,23 @@ def refund_topup(order_id: str) -> dict:
         credits_amount = int(order['credits'])
         user_ref = fs.collection(CREDITS_COLLECTION).document(user_id)
         u_snap = user_ref.get(transaction=transaction)
-        balance = int((u_snap.to_dict() or {}).get('balance', 0)) if u_snap.exists else 0
-
-        # 미사용분만 환불: 충전 크레딧이 잔고에 그대로 남아있어야 환불 가능.
-        if balance < credits_amount:
+        u_data = (u_snap.to_dict() or {}) if u_snap.exists else {}
+
+        # 미사용분만 환불: 충전 크레딧이 잔고(봇 lease 로 잡힌 양 포함)에 그대로 남아있어야 환불 가능.
+        status = prepare_direct_debit(u_data, credits_amount, time.time())
+        if status == 'held':
+            transaction.update(user_ref, escrow_fields(u_data))  # 반환 요청
+            return _direct_debit_failure(status, u_data, credits_amount)
+        if status != 'ok':
+            if u_data.get('leases'):
+                transaction.update(user_ref, escrow_fields(u_data))  # 만료 회수
             return {'ok': False, 'reason': 'credits_already_used',
-                    'balance': balance, 'topup_credits': credits_amount}
+                    'balance': int(u_data.get('balance', 0)) + held_amount(u_data),
+                    'topup_credits': credits_amount}
 
-        new_balance = balance - credits_amount
-        transaction.update(user_ref, {'balance': new_balance})
+        new_balance = int(u_data['balance']) - credits_amount
+        u_data['balance'] = new_balance
+        transaction.update(user_ref, escrow_fields(u_data))
         transaction.update(order_ref, {'status': 'refunded', 'refunded_at': _now_iso()})
         _add_ledger(transaction, user_id, 'topup', -credits_amount, f'refund_{order_id}')
         return {'ok': True, 'refund_credits': credits_amount, 'balance': new_balance,
@@ -1,9 +1,15 @@
 import asyncio
 import aiohttp
+import time
 import urllib.parse
 from datetime import date, timedelta
 from typing import Optional, Dict, Any, List
 
+from run.core import metrics
+
+DAKGG_LATENCY = metrics.histogram("dakgg_request_seconds", "DAK.GG API 응답 시간", ("endpoint",))
+DAKGG_REQUESTS = metrics.counter("dakgg_requests_total", "DAK.GG API 요청 수 (HTTP 상태별)", ("endpoint", "status"))
+
 # 글로벌 봇 인스턴스 저장
 _bot_instance = None
 
@@ -230,8 +236,12 @@ API_HEADERS = {
 
 # --- 데이터 초기화 ---
 
-async def initialize_game_data():
-    import sys
+GAME_DATA_SHARED_KEY = "game_data:dakgg"
+GAME_DATA_SHARED_TTL = 6 * 3600  # 샤드 워커 재시작 시 공유 캐시 재사용 기간 (초)
+
+
+async def _fetch_game_data_raw() -> Optional[Dict[str, Any]]:
+    """DAK.GG 정적 데이터 9종을 한 번에 받아 {이름: JSON | 실패값} 으로 반환 (HTTP 오류 시 None)."""
     # 15초 타임아웃으로 ClientSession 생성
     timeout = aiohttp.ClientTimeout(total=15)
     async with aiohttp.ClientSession(headers=API_HEADERS, timeout=timeout) as session:
@@ -248,11 +258,16 @@ async def initialize_game_data():
                 'weathers': session.get(f"{DAKGG_API_BASE}/data/weathers?hl=ko")
             }
             
-            responses = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            with DAKGG_LATENCY.time(endpoint="data/bulk"):
+                responses = await asyncio.gather(*tasks.values(), return_exceptions=True)
             results: Dict[str, Any] = {}
 
             # Session이 닫히기 전에 모든 JSON 데이터를 미리 읽어둠
             for key, resp in zip(tasks.keys(), responses):
+                DAKGG_REQUESTS.inc(
+                    endpoint=f"data/{key}",
+                    status=str(resp.status) if isinstance(resp, aiohttp.ClientResponse) else "error",
+                )
                 if isinstance(resp, aiohttp.ClientResponse) and resp.status == 200:
                     try:
                         results[key] = await resp.json()
@@ -266,7 +281,33 @@ async def initialize_game_data():
 
         except Exception as e:
             print(f"[오류] HTTP 요청 중 오류: {e}", flush=True)
+            return None
+    return results
+
+
+async def initialize_game_data():
+    # 샤드 워커 실행이면 먼저 받은 워커의 원본 JSON 을 공유 캐시에서 재사용
+    from run.core.shared_cache import get_shared_cache
+    shared = get_shared_cache()
+    results = None
+    if shared is not None:
+        try:
+            results = await asyncio.to_thread(shared.get, GAME_DATA_SHARED_KEY)
+        except Exception as e:
+            print(f"[경고] 공유 캐시 게임 데이터 조회 실패: {e}", flush=True)
+        if results is not None:
+            print("[시작] 게임 데이터: 공유 캐시 사용", flush=True)
+
+    if results is None:
+        results = await _fetch_game_data_raw()
+        if results is None:
             return
+        # 9종 모두 성공했을 때만 공유 (일부 실패면 다른 워커가 다시 받아보게)
+        if shared is not None and all(isinstance(v, dict) for v in results.values()):
+            try:
+                await asyncio.to_thread(shared.set, GAME_DATA_SHARED_KEY, results, GAME_DATA_SHARED_TTL)
+            except Exception as e:
+                print(f"[경고] 공유 캐시 게임 데이터 저장 실패: {e}", flush=True)
 
     # 현재 시즌 데이터 처리 (v0/current-season 우선 사용)
     current_season_data = results.get('current_season')
@@ -351,10 +392,27 @@ async def initialize_game_data():
 
 # --- API 호출 로직 ---
 
+def _endpoint_label(url: str) -> str:
+    """메트릭 라벨용 엔드포인트 (닉네임/ID 제거): .../players/{닉}/profile → players/profile"""
+    path = urllib.parse.urlsplit(url).path
+    for prefix in ("/api/v1/", "/api/v0/"):
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    parts = path.strip("/").split("/")
+    if len(parts) >= 2 and parts[0] == "players":
+        parts = [parts[0]] + parts[2:]
+    return "/".join(part for part in parts if not part.isdigit()) or "/"
+
+
 async def _fetch_api(url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+    endpoint = _endpoint_label(url)
+    t0 = time.perf_counter()
+    status = "error"
     try:
         async with aiohttp.ClientSession() as session:
             async with session.get(url, headers=API_HEADERS, params=params, timeout=10) as response:
+                status = str(response.status)
                 if response.status == 200:
                     result = await response.json()
                     return result
@@ -363,11 +421,18 @@ async def _fetch_api(url: str, params: Optional[Dict] = None) -> Optional[Dict]:
                 error_text = await response.text()
                 print(f"[오류] API Error response: {error_text[:200]}", flush=True)
                 return None
+    except asyncio.TimeoutError:
+        status = "timeout"
+        print(f"[오류] API 시간 초과: {url}", flush=True)
+        return None
     except Exception as e:
         print(f"An unexpected error occurred during API fetch for {url}: {e}", flush=True)
         import traceback
         traceback.print_exc()
         return None
+    finally:
+        DAKGG_LATENCY.observe(time.perf_counter() - t0, endpoint=endpoint)
+        DAKGG_REQUESTS.inc(endpoint=endpoint, status=status)
 
 async def get_character_stats(dt: int = 7, team_mode: str = "SQUAD", tier: str = "diamond_plus") -> Optional[Dict]:
     """캐릭터 통계 정보를 가져옵니다"""
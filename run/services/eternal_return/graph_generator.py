@@ -1,9 +1,13 @@
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import io
 import base64
-import matplotlib.font_manager as fm
+
+from run.utils.lazy_import import lazy_import
+
+# 첫 MMR 그래프 생성 때 로드
+plt = lazy_import("matplotlib.pyplot")
+mdates = lazy_import("matplotlib.dates")
+fm = lazy_import("matplotlib.font_manager")
 
 def create_mmr_graph(mmr_history, nickname="플레이어"):
     """
@@ -16,6 +20,15 @@ def create_mmr_graph(mmr_history, nickname="플레이어"):
     Returns:
         base64 인코딩된 이미지 데이터
     """
+    png = render_mmr_graph_png(mmr_history, nickname)
+    return base64.b64encode(png).decode() if png else None
+
+def render_mmr_graph_png(mmr_history, nickname="플레이어"):
+    """
+    MMR 그래프 PNG 바이트 (데이터가 부족하면 None)
+
+    봇에서는 render_service 의 MmrGraphJob 으로 렌더 워커 프로세스에서 호출된다.
+    """
     if not mmr_history or len(mmr_history) < 2:
         return None
     
@@ -149,13 +162,9 @@ def create_mmr_graph(mmr_history, nickname="플레이어"):
     buffer = io.BytesIO()
     plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight', 
                 facecolor='#2f3136', edgecolor='none')
-    buffer.seek(0)
-    
-    # base64 인코딩
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
     plt.close()
     
-    return image_base64
+    return buffer.getvalue()
 
 def save_mmr_graph_to_file(mmr_history, nickname="플레이어", filename="mmr_graph.png"):
     """
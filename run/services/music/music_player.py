@@ -17,9 +17,13 @@ import discord
 
 from run.services.music.youtube_extractor import Song, YouTubeExtractor
 from run.services.voice_manager import voice_manager, AudioType
+from run.core import metrics
+from run.services.audio_mixer import PRIORITY_MUSIC
 
 logger = logging.getLogger(__name__)
 
+VOICE_QUEUE_DEPTH = metrics.gauge("voice_queue_depth", "음성 재생 대기열 길이 (전체 서버 합)", ("kind",))
+
 
 def find_ffmpeg() -> str:
     """ffmpeg 실행 파일의 경로를 찾습니다."""
@@ -56,7 +60,6 @@ class MusicPlayer:
         self.queue: deque[Song] = deque()
         self.current: Optional[Song] = None
         self.is_playing: bool = False
-        self._play_next_event = asyncio.Event()
 
     async def join(self, channel: discord.VoiceChannel) -> bool:
         """음성 채널에 입장합니다."""
@@ -69,9 +72,7 @@ class MusicPlayer:
         """음성 채널에서 퇴장합니다."""
         try:
             # 재생 중지
-            vc = voice_manager.get_voice_client(self.guild_id)
-            if vc and vc.is_playing():
-                vc.stop()
+            voice_manager.get_mixer(self.guild_id).stop("music")
 
             # 상태 정리
             self.queue.clear()
@@ -132,21 +133,15 @@ class MusicPlayer:
                     **FFMPEG_OPTIONS
                 )
 
-                self._play_next_event.clear()
-
-                def after_play(error):
-                    if error:
-                        logger.error(f"[Music] 재생 오류: {error}")
-                    self._play_next_event.set()
-
                 # 음악 재생 상태 설정
                 voice_manager.set_music_playing(self.guild_id)
 
-                vc.play(audio_source, after=after_play)
                 logger.info(f"[Music] 재생 시작: {self.current.title}")
 
-                # 재생 완료 대기
-                await self._play_next_event.wait()
+                # 재생 완료 대기 (TTS 는 믹서에서 음악을 줄였다가 같은 위치에서 이어감)
+                await voice_manager.get_mixer(self.guild_id).play(
+                    "music", audio_source, PRIORITY_MUSIC
+                )
 
             except Exception as e:
                 logger.error(f"[Music] 재생 실패: {e}")
@@ -158,40 +153,27 @@ class MusicPlayer:
 
     def pause(self) -> bool:
         """현재 곡을 일시정지합니다."""
-        vc = voice_manager.get_voice_client(self.guild_id)
-        if vc and vc.is_playing():
-            vc.pause()
-            return True
-        return False
+        return voice_manager.get_mixer(self.guild_id).set_paused("music", True)
 
     def resume(self) -> bool:
         """일시정지된 곡을 재개합니다."""
-        vc = voice_manager.get_voice_client(self.guild_id)
-        if vc and vc.is_paused():
-            vc.resume()
-            return True
-        return False
+        return voice_manager.get_mixer(self.guild_id).set_paused("music", False)
 
     def is_paused(self) -> bool:
         """일시정지 상태인지 확인합니다."""
-        vc = voice_manager.get_voice_client(self.guild_id)
-        return vc.is_paused() if vc else False
+        return voice_manager.get_mixer(self.guild_id).is_paused("music")
 
     async def skip(self) -> Optional[Song]:
         """현재 곡을 건너뜁니다."""
         skipped = self.current
-        vc = voice_manager.get_voice_client(self.guild_id)
-        if vc and (vc.is_playing() or vc.is_paused()):
-            vc.stop()
+        voice_manager.get_mixer(self.guild_id).stop("music")
         return skipped
 
     async def stop(self) -> Optional[Song]:
         """현재 재생을 정지하고 대기열을 비웁니다. 마지막 곡을 반환합니다."""
         last = self.current
-        vc = voice_manager.get_voice_client(self.guild_id)
-        if vc and (vc.is_playing() or vc.is_paused()):
-            vc.stop()
         self.queue.clear()
+        voice_manager.get_mixer(self.guild_id).stop("music")
         self.current = None
         self.is_playing = False
         voice_manager.clear_music_state(self.guild_id)
@@ -230,3 +212,8 @@ class MusicManager:
     def has_player(cls, guild_id: str) -> bool:
         """서버에 MusicPlayer가 있는지 확인합니다."""
         return guild_id in cls._players
+
+
+VOICE_QUEUE_DEPTH.set_function(
+    lambda: sum(len(player.queue) for player in list(MusicManager._players.values())), kind="music"
+)
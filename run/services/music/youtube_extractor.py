@@ -4,13 +4,14 @@ YouTube 오디오 추출기
 yt-dlp를 사용하여 YouTube에서 오디오 스트림 URL을 추출합니다.
 """
 
-import asyncio
 import logging
 import os
 from dataclasses import dataclass
 from typing import Optional
 import discord
 
+from run.services.music.ytdlp_pool import YtDlpPool
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -66,6 +67,15 @@ class YouTubeExtractor:
             opts['cookiefile'] = cookie_path
         return opts
 
+    _pool: Optional[YtDlpPool] = None
+
+    @classmethod
+    def get_pool(cls) -> YtDlpPool:
+        """yt-dlp 전용 실행 풀 (기본 loop executor 와 분리)."""
+        if cls._pool is None:
+            cls._pool = YtDlpPool(lambda: yt_dlp.YoutubeDL(cls._get_options()))
+        return cls._pool
+
     @classmethod
     async def extract_info(
         cls,
@@ -91,22 +101,12 @@ class YouTubeExtractor:
             query = f"ytsearch:{query}"
 
         try:
-            # 비동기로 실행 (블로킹 방지)
-            loop = asyncio.get_event_loop()
-            info = await loop.run_in_executor(
-                None,
-                lambda: cls._extract_with_ytdlp(query)
-            )
+            # 전용 풀에서 실행 (블로킹 방지, 검색 결과는 첫 번째 항목으로 풀려서 옴)
+            info = await cls.get_pool().extract(query)
 
             if info is None:
                 return None
 
-            # 검색 결과인 경우 첫 번째 결과 사용
-            if 'entries' in info:
-                if not info['entries']:
-                    return None
-                info = info['entries'][0]
-
             # Song 객체 생성
             return Song(
                 url=info.get('webpage_url', info.get('url', query)),
@@ -121,16 +121,6 @@ class YouTubeExtractor:
             logger.error(f"YouTube 정보 추출 실패: {e}")
             return None
 
-    @classmethod
-    def _extract_with_ytdlp(cls, query: str) -> Optional[dict]:
-        """yt-dlp로 정보 추출 (동기 함수)"""
-        try:
-            with yt_dlp.YoutubeDL(cls._get_options()) as ydl:
-                return ydl.extract_info(query, download=False)
-        except Exception as e:
-            logger.error(f"yt-dlp 추출 오류: {e}")
-            return None
-
     @classmethod
     async def refresh_stream_url(cls, song: Song) -> Optional[str]:
         """
@@ -146,11 +136,7 @@ class YouTubeExtractor:
             return None
 
         try:
-            loop = asyncio.get_event_loop()
-            info = await loop.run_in_executor(
-                None,
-                lambda: cls._extract_with_ytdlp(song.url)
-            )
+            info = await cls.get_pool().extract(song.url)
 
             if info and 'url' in info:
                 return info['url']
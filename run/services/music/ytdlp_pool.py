@@ -0,0 +1,171 @@
+"""
+yt-dlp 전용 실행 풀
+
+yt-dlp 추출은 수 초씩 블로킹되는 동기 호출이라 기본 loop executor 에 넣으면
+Firestore/blocklist/credits 의 asyncio.to_thread 호출까지 같이 밀린다.
+전용 ThreadPoolExecutor 로 분리하고, 워커 스레드마다 YoutubeDL 인스턴스를 재사용하며,
+검색어 → video id 결과를 TTL 캐시해 같은 검색어는 검색 요청 없이 바로 영상 URL 로 추출한다.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+YTDLP_MAX_WORKERS = int(os.getenv("YTDLP_MAX_WORKERS", "3"))
+SEARCH_CACHE_TTL = int(os.getenv("YTDLP_SEARCH_CACHE_TTL", str(6 * 3600)))  # 검색 결과는 잘 안 바뀜
+SEARCH_CACHE_MAX = 512
+
+SEARCH_PREFIX = "ytsearch:"
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+
+
+class SearchCache:
+    """검색어 → video id TTL 캐시 (LRU 상한)."""
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, max_size: int = SEARCH_CACHE_MAX):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def get(self, query: str) -> Optional[str]:
+        key = self._key(query)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            video_id, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return video_id
+
+    def put(self, query: str, video_id: str):
+        key = self._key(query)
+        with self._lock:
+            self._data[key] = (video_id, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, query: str):
+        with self._lock:
+            self._data.pop(self._key(query), None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class YtDlpPool:
+    """yt-dlp 추출 전용 스레드 풀.
+
+    YoutubeDL 인스턴스는 스레드 안전하지 않으므로 워커 스레드별로 하나씩 만들어 재사용한다.
+    추출 중 예외가 나면 해당 스레드의 인스턴스를 버리고 다음 호출에서 새로 만든다.
+    """
+
+    def __init__(
+        self,
+        ydl_factory: Callable[[], object],
+        max_workers: int = YTDLP_MAX_WORKERS,
+        search_cache: Optional[SearchCache] = None,
+    ):
+        self._ydl_factory = ydl_factory
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._local = threading.local()
+        self.search_cache = search_cache if search_cache is not None else SearchCache()
+        self.in_flight = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers,
+                        thread_name_prefix="ytdlp",
+                    )
+        return self._executor
+
+    def _get_ydl(self):
+        ydl = getattr(self._local, "ydl", None)
+        if ydl is None:
+            ydl = self._ydl_factory()
+            self._local.ydl = ydl
+        return ydl
+
+    def _discard_ydl(self):
+        ydl = getattr(self._local, "ydl", None)
+        self._local.ydl = None
+        if ydl is not None and hasattr(ydl, "close"):
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+    def _extract_sync(self, query: str) -> Optional[dict]:
+        """워커 스레드에서 실행되는 동기 추출."""
+        try:
+            return self._get_ydl().extract_info(query, download=False)
+        except Exception as e:
+            logger.error(f"yt-dlp 추출 오류: {e}")
+            self._discard_ydl()
+            return None
+
+    async def _run(self, query: str) -> Optional[dict]:
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), self._extract_sync, query)
+        finally:
+            self.in_flight -= 1
+
+    async def extract(self, query: str) -> Optional[dict]:
+        """URL 또는 'ytsearch:' 검색어를 추출합니다.
+
+        검색어는 캐시된 video id 가 있으면 검색 단계를 건너뛰고 영상 URL 로 바로 추출한다.
+        검색 결과는 첫 번째 항목으로 풀어서 반환한다.
+        """
+        if not query.startswith(SEARCH_PREFIX):
+            return await self._run(query)
+
+        search_terms = query[len(SEARCH_PREFIX):]
+        video_id = self.search_cache.get(search_terms)
+        if video_id:
+            info = await self._run(WATCH_URL.format(video_id))
+            if info:
+                return info
+            # 영상이 내려갔거나 추출 실패 → 캐시 버리고 다시 검색
+            self.search_cache.invalidate(search_terms)
+
+        info = await self._run(query)
+        if info and "entries" in info:
+            entries = info.get("entries") or []
+            if not entries:
+                return None
+            info = entries[0]
+        if info and info.get("id"):
+            self.search_cache.put(search_terms, info["id"])
+        return info
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,252 @@
+"""
+Opus 선인코딩 캐시
+
+캐시된 TTS 클립/효과음/대사는 같은 파일을 여러 서버에서 반복 재생하는데, 매번 FFmpegPCMAudio
+(또는 PCMAudio) → 플레이어 스레드에서 20ms 마다 Opus 인코딩을 다시 한다.
+재사용되는 파일은 처음 재생할 때 백그라운드에서 한 번만 Opus 패킷으로 인코딩해 디스크
+(OPUS_CACHE_DIR)와 메모리 LRU 에 두고, 이후 재생은 PreEncodedOpusSource 가 패킷을 그대로
+내보낸다 (is_opus() == True → ffmpeg 프로세스도, 프레임별 인코딩도 없음).
+
+파일 포맷 (.opusf): MAGIC + [2바이트 big-endian 길이 + Opus 패킷] 반복. 패킷 하나 = 20ms.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import struct
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+OPUS_CACHE_DIR = os.environ.get(
+    "OPUS_CACHE_DIR",
+    os.path.join(os.environ.get("TTS_CACHE_DIR", "/tmp/tts_cache"), "opus"),
+)
+OPUS_CACHE_MAX = int(os.environ.get("OPUS_CACHE_MAX", "2000"))
+OPUS_MEMORY_CACHE_BYTES = int(os.environ.get("OPUS_MEMORY_CACHE_MB", "32")) * 1024 * 1024
+
+MAGIC = b"OPF1"
+FRAME_SIZE = 3840  # 20ms @ 48kHz stereo s16le
+SAMPLES_PER_FRAME = 960
+
+# 재사용되는 파일만 선인코딩 (스트리밍 TTS 청크 같은 일회성 임시 파일은 제외)
+_ASSETS_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "assets"))
+_CACHEABLE_ROOTS = (
+    os.path.realpath(os.environ.get("TTS_CACHE_DIR", "/tmp/tts_cache")),
+    _ASSETS_DIR,
+)
+
+
+class PreEncodedOpusSource(discord.AudioSource):
+    """선인코딩된 Opus 패킷을 그대로 내보내는 AudioSource.
+
+    믹서가 다른 입력과 섞어야 할 때는 read_pcm() 으로 디코딩된 PCM 프레임을 받는다.
+    """
+
+    def __init__(self, packets: List[bytes]):
+        self._packets = packets
+        self._pos = 0
+        self._decoder = None
+
+    def read(self) -> bytes:
+        if self._pos >= len(self._packets):
+            return b""
+        packet = self._packets[self._pos]
+        self._pos += 1
+        return packet
+
+    def read_pcm(self) -> bytes:
+        packet = self.read()
+        if not packet:
+            return b""
+        if self._decoder is None:
+            self._decoder = discord.opus.Decoder()
+        return self._decoder.decode(packet, fec=False)
+
+    def is_opus(self) -> bool:
+        return True
+
+
+class OpusCache:
+    """파일 경로 → Opus 패킷 목록 캐시 (디스크 + 메모리 LRU)."""
+
+    def __init__(self, cache_dir: str = OPUS_CACHE_DIR,
+                 max_files: int = OPUS_CACHE_MAX,
+                 memory_bytes: int = OPUS_MEMORY_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.memory_bytes = memory_bytes
+        self._memory: "OrderedDict[str, List[bytes]]" = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.encoded = 0
+
+    @staticmethod
+    def is_cacheable(audio_path: str) -> bool:
+        """TTS 캐시/에셋처럼 반복 재생되는 파일인지."""
+        real = os.path.realpath(audio_path)
+        return any(real.startswith(root + os.sep) for root in _CACHEABLE_ROOTS)
+
+    @staticmethod
+    def _key(audio_path: str) -> Optional[str]:
+        try:
+            st = os.stat(audio_path)
+        except OSError:
+            return None
+        raw = f"{os.path.realpath(audio_path)}:{st.st_size}:{st.st_mtime_ns}"
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.opusf")
+
+    # ───────── 조회 ─────────
+
+    def get(self, audio_path: str) -> Optional[PreEncodedOpusSource]:
+        """캐시된 패킷이 있으면 재생용 소스를, 없으면 None 을 반환 (블로킹 디스크 읽기 포함)."""
+        if not discord.opus.is_loaded():
+            return None
+        key = self._key(audio_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            packets = self._memory.get(key)
+            if packets is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return PreEncodedOpusSource(packets)
+
+        packets = self._read_file(self._path_for(key))
+        if packets is None:
+            self.misses += 1
+            return None
+        self._remember(key, packets)
+        self.hits += 1
+        return PreEncodedOpusSource(packets)
+
+    async def get_async(self, audio_path: str) -> Optional[PreEncodedOpusSource]:
+        return await asyncio.to_thread(self.get, audio_path)
+
+    def _remember(self, key: str, packets: List[bytes]):
+        size = sum(len(p) for p in packets)
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = packets
+            self._memory_size += size
+            while self._memory_size > self.memory_bytes and self._memory:
+                _, old = self._memory.popitem(last=False)
+                self._memory_size -= sum(len(p) for p in old)
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[List[bytes]]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data.startswith(MAGIC):
+            return None
+        packets = []
+        pos = len(MAGIC)
+        while pos + 2 <= len(data):
+            (length,) = struct.unpack_from(">H", data, pos)
+            pos += 2
+            packets.append(data[pos:pos + length])
+            pos += length
+        return packets or None
+
+    # ───────── 인코딩 ─────────
+
+    def schedule_encode(self, audio_path: str):
+        """백그라운드에서 audio_path 를 인코딩해 캐시에 넣습니다 (이번 재생은 기존 경로)."""
+        if not discord.opus.is_loaded() or not self.is_cacheable(audio_path):
+            return
+        key = self._key(audio_path)
+        if key is None or key in self._pending:
+            return
+        self._pending.add(key)
+
+        async def _run():
+            try:
+                await asyncio.to_thread(self._encode_sync, audio_path, key)
+            except Exception as e:
+                logger.warning(f"Opus 선인코딩 실패 (무시): {os.path.basename(audio_path)} - {e}")
+            finally:
+                self._pending.discard(key)
+
+        asyncio.get_running_loop().create_task(_run())
+
+    def _encode_sync(self, audio_path: str, key: str):
+        pcm = self._load_pcm(audio_path)
+        if not pcm:
+            return
+        encoder = discord.opus.Encoder()
+        packets = []
+        for offset in range(0, len(pcm), FRAME_SIZE):
+            frame = pcm[offset:offset + FRAME_SIZE]
+            if len(frame) < FRAME_SIZE:
+                frame = frame.ljust(FRAME_SIZE, b"\x00")
+            packets.append(encoder.encode(frame, SAMPLES_PER_FRAME))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            for packet in packets:
+                f.write(struct.pack(">H", len(packet)))
+                f.write(packet)
+        os.replace(tmp_path, path)
+        self._remember(key, packets)
+        self.encoded += 1
+        self._evict_if_needed()
+        logger.info(f"Opus 선인코딩: {os.path.basename(audio_path)} ({len(packets)} 프레임)")
+
+    @staticmethod
+    def _load_pcm(audio_path: str) -> Optional[bytes]:
+        """48kHz stereo s16le PCM 로 읽기 (.pcm 은 그대로, 나머지는 ffmpeg 1회 디코딩)."""
+        if audio_path.endswith(".pcm"):
+            with open(audio_path, "rb") as f:
+                return f.read()
+        from run.services.voice_manager import FFMPEG_PATH
+        result = subprocess.run(
+            [FFMPEG_PATH, "-nostdin", "-loglevel", "error", "-i", audio_path,
+             "-f", "s16le", "-ar", "48000", "-ac", "2", "pipe:1"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=30,
+        )
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    def _evict_if_needed(self):
+        """디스크 캐시가 최대 개수를 초과하면 오래된 것부터 삭제 (TTS 캐시와 같은 방식)."""
+        try:
+            files = [
+                os.path.join(self.cache_dir, f)
+                for f in os.listdir(self.cache_dir)
+                if f.endswith(".opusf")
+            ]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for f in files[:len(files) - self.max_files]:
+                os.remove(f)
+        except Exception as e:
+            logger.warning(f"Opus 캐시 정리 실패: {e}")
+
+
+opus_cache = OpusCache()
@@ -89,7 +89,10 @@ class PatchNoteChecker:
         """GCS에서 마지막으로 확인한 패치노트 ID를 가져옵니다."""
         try:
             settings = await asyncio.to_thread(config.load_settings)
-            return settings.get("global", {}).get("last_patchnote_id")
+            global_settings = settings.get("global", {})
+            # 멀티 워커: 워커별 키 (처음 전환 시 단일 프로세스 값 이어받기)
+            return global_settings.get(config.worker_key("last_patchnote_id"),
+                                       global_settings.get("last_patchnote_id"))
         except Exception as e:
             print(f"[패치노트] 마지막 ID 로드 실패: {e}", flush=True)
             return None
@@ -97,40 +100,11 @@ class PatchNoteChecker:
     async def save_last_patchnote_id(self, patchnote_id):
         """GCS에 마지막으로 확인한 패치노트 ID를 저장합니다."""
         try:
-            settings = await asyncio.to_thread(config.load_settings)
-            if "global" not in settings:
-                settings["global"] = {}
-            settings["global"]["last_patchnote_id"] = patchnote_id
-            await asyncio.to_thread(config.save_settings, settings)
+            # 전역 키 하나만 — save_settings 로 통째로 저장하면 방금 broadcast 가 쓴 lastMessageId 를 되돌릴 수 있음
+            await asyncio.to_thread(config.save_global_setting, config.worker_key("last_patchnote_id"), patchnote_id)
         except Exception as e:
             print(f"[패치노트] 마지막 ID 저장 실패: {e}", flush=True)
 
-    async def get_subscribed_channels(self):
-        """패치노트 알림이 활성화된 채널 목록을 가져옵니다."""
-        channels = []
-        try:
-            settings = await asyncio.to_thread(config.load_settings, force_reload=True)
-            guilds = settings.get("guilds", {})
-
-            for guild_id, guild_settings in guilds.items():
-                notification_settings = guild_settings.get("notification_settings", {})
-                patch_note = notification_settings.get("patchNote", {})
-
-                if patch_note.get("enabled") and patch_note.get("channelId"):
-                    channel_id = int(patch_note["channelId"])
-                    channel = self.bot.get_channel(channel_id)
-                    if channel:
-                        channels.append(channel)
-                    else:
-                        print(
-                            f"[패치노트] 채널을 찾을 수 없음: {channel_id} (서버: {guild_id})",
-                            flush=True,
-                        )
-        except Exception as e:
-            print(f"[패치노트] 구독 채널 조회 실패: {e}", flush=True)
-
-        return channels
-
     def format_patchnote_message(self, patch_note):
         """패치노트를 고정 메시지용 텍스트로 포맷합니다."""
         lines = [
@@ -144,64 +118,26 @@ class PatchNoteChecker:
         lines.append(patch_note.get("url", ""))
         return "\n".join(lines)
 
-    async def send_notification(self, channel, patch_note):
-        """패치노트 알림을 전송하고 sticky_messages에 등록합니다."""
-        guild_id = str(channel.guild.id)
-        channel_id_str = str(channel.id)
-        content = self.format_patchnote_message(patch_note)
+    async def send_notifications(self, patch_note):
+        """구독 채널들에 패치노트를 보내고 sticky_messages 를 갱신합니다 (broadcast 엔진).
 
-        try:
-            # 이전 고정 메시지 삭제
-            settings = await asyncio.to_thread(config.load_settings, True)
-            guild_data = settings.get("guilds", {}).get(guild_id, {})
-            sticky_messages = guild_data.get("sticky_messages", [])
-
-            old_sticky = None
-            for sm in sticky_messages:
-                if sm.get("id") == f"patchnote_{guild_id}":
-                    old_sticky = sm
-                    break
-
-            if old_sticky and old_sticky.get("lastMessageId"):
-                try:
-                    old_msg = await channel.fetch_message(int(old_sticky["lastMessageId"]))
-                    await old_msg.delete()
-                except Exception:
-                    pass
-
-            # 새 메시지 전송 (알림 울리게)
-            new_msg = await channel.send(content)
-
-            # sticky_messages에 등록/갱신
-            new_sticky = {
-                "id": f"patchnote_{guild_id}",
-                "channelId": channel_id_str,
-                "channelName": getattr(channel, "name", ""),
-                "content": content,
-                "enabled": True,
-                "lastMessageId": str(new_msg.id),
-            }
-
-            if old_sticky:
-                idx = sticky_messages.index(old_sticky)
-                sticky_messages[idx] = new_sticky
-            else:
-                if "sticky_messages" not in settings.get("guilds", {}).get(guild_id, {}):
-                    settings["guilds"][guild_id]["sticky_messages"] = []
-                settings["guilds"][guild_id]["sticky_messages"].append(new_sticky)
-
-            await asyncio.to_thread(config.save_settings, settings, True)
-
-        except discord.Forbidden:
-            print(
-                f"[패치노트] 메시지 전송 권한 없음: #{channel.name} ({channel.guild.name})",
-                flush=True,
-            )
-        except Exception as e:
-            print(
-                f"[패치노트] 알림 전송 실패: #{channel.name} ({channel.guild.name}) - {e}",
-                flush=True,
-            )
+        대상은 설정 스냅샷에서 이 워커가 맡은 서버만. 이전 고정 메시지 삭제 → 새 메시지 전송을
+        채널 여러 개 동시에 진행하고, lastMessageId 는 끝날 때 한 번에 batch 기록한다.
+        """
+        from run.services.broadcast_service import Broadcast, get_broadcast_engine, notification_targets
+
+        snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+        targets = notification_targets(
+            snapshot, "patchNote", "patchnote", [str(guild.id) for guild in self.bot.guilds],
+        )
+        if not targets:
+            print("[패치노트] 구독 채널 없음 - 알림 미전송", flush=True)
+            return None
+        content = self.format_patchnote_message(patch_note)
+        return await get_broadcast_engine(self.bot).run(Broadcast(
+            f"patchnote-{patch_note['id']}", "patchnote", [{"content": content}], targets,
+            sticky_prefix="patchnote",
+        ))
 
     async def check_new_patchnotes(self):
         """새로운 패치노트를 확인하고 알림을 보냅니다."""
@@ -223,17 +159,8 @@ class PatchNoteChecker:
 
             print(f"[패치노트] 새 패치노트 발견: {latest['title']}", flush=True)
 
-            # 구독 채널들에 알림 전송
-            channels = await self.get_subscribed_channels()
-            if channels:
-                for channel in channels:
-                    await self.send_notification(channel, latest)
-                print(
-                    f"[패치노트] 알림 전송 완료 ({len(channels)}개 채널)",
-                    flush=True,
-                )
-            else:
-                print("[패치노트] 구독 채널 없음 - 알림 미전송", flush=True)
+            # 구독 채널들에 알림 전송 (중간에 죽으면 같은 패치노트 ID 로 다음 회차에 이어서 전송)
+            await self.send_notifications(latest)
 
             # 마지막 ID 업데이트
             await self.save_last_patchnote_id(latest["id"])
@@ -21,6 +21,18 @@ GLOBAL_DOC = 'global'
 SESSIONS_SUBCOLLECTION = 'sessions'
 MAX_SESSIONS_PER_GUILD = 50
 
+# 곡 목록 저장 시 증가 → song_quiz 의 곡 목록/정답 인덱스 캐시 무효화 신호
+_songs_version = 0
+
+
+def songs_version() -> int:
+    return _songs_version
+
+
+def _bump_songs_version():
+    global _songs_version
+    _songs_version += 1
+
 
 def _get_fs():
     """봇의 config 모듈 Firestore 클라이언트 재사용."""
@@ -45,6 +57,7 @@ def _set_global_songs(songs: list) -> bool:
     if not fs:
         return False
     fs.collection(QUIZ_COLLECTION).document(GLOBAL_DOC).set({'songs': songs}, merge=True)
+    _bump_songs_version()
     return True
 
 
@@ -64,6 +77,8 @@ def _set_guild_fields(guild_id: str, fields: dict) -> bool:
     if not fs:
         return False
     fs.collection(QUIZ_COLLECTION).document(str(guild_id)).set(fields, merge=True)
+    if 'songs' in fields:
+        _bump_songs_version()
     return True
 
 
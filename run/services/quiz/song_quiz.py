@@ -5,24 +5,40 @@ YouTube에서 노래 클립을 재생하고 채팅으로 제목/가수를 맞추
 """
 
 import asyncio
-import difflib
+import io
 import logging
+import os
 import random
 import re
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional, List
+from functools import cached_property
+from typing import Deque, Dict, Optional, List, Tuple
 
 import discord
 
 from run.services.music.youtube_extractor import YouTubeExtractor
 from run.services.voice_manager import voice_manager, FFMPEG_PATH
+from run.services.audio_mixer import PRIORITY_QUIZ
 
 logger = logging.getLogger(__name__)
 
 CLIP_DURATION = 25  # 클립 재생 시간 (초)
 ANSWER_TIMEOUT = 30  # 정답 입력 제한 시간 (초)
 HINT_DELAY = 15  # 힌트 제공까지 대기 시간 (초)
-SIMILARITY_THRESHOLD = 0.7  # 유사도 기준
+SIMILARITY_THRESHOLD = 0.7  # 유사도 기준 (자모 단위 편집거리 유사도)
+SONG_LIST_CACHE_TTL = 300  # 서버별 곡 목록 캐시 (대시보드 수정 반영 주기, 초)
+
+# 다음 문제 클립을 미리 받아둘 개수. 클립 1개 = 25초 * 48kHz * 2ch * 16bit ≈ 4.8MB
+PREFETCH_DEPTH = int(os.getenv("SONG_QUIZ_PREFETCH", "2"))
+PREBUFFER_TIMEOUT = 20  # 클립 다운로드/디코딩 제한 시간 (초)
+DEFAULT_TRACK_DURATION = 180  # 길이를 모를 때 가정하는 곡 길이 (초)
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
 
 
 SKIP_KEYWORDS = {"스킵", "넘기기", "skip", "pass", "넘겨"}
@@ -32,6 +48,9 @@ CHOSUNG_LIST = [
     'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ',
 ]
 
+_NON_WORD_RE = re.compile(r'[^\w\s가-힣]')
+_SPACES_RE = re.compile(r'\s+')
+
 
 @dataclass
 class SongEntry:
@@ -41,6 +60,11 @@ class SongEntry:
     aliases: Optional[List[str]] = None  # 가수 별칭 (한글 등)
     title_aliases: Optional[List[str]] = None  # 제목 별칭 (한글, 약칭 등)
 
+    @cached_property
+    def answer_index(self) -> "SongAnswerIndex":
+        """정답 비교용 정규화/자모 분해 결과 (곡당 1회 계산)."""
+        return SongAnswerIndex(self)
+
 
 # 내장 곡 목록 (GCS에 곡이 없을 때 폴백용)
 DEFAULT_SONG_LIST: List[SongEntry] = [
@@ -95,13 +119,91 @@ DEFAULT_SONG_LIST: List[SongEntry] = [
 ]
 
 
+@dataclass
+class PreparedClip:
+    """재생 준비가 끝난 문제 클립.
+
+    pcm 이 있으면 미리 디코딩된 48kHz/stereo s16le 데이터로 바로 재생하고,
+    없으면 (출제 모드/미리받기 실패) stream_url 에서 start 지점부터 실시간 재생한다.
+    """
+    song: SongEntry
+    stream_url: str
+    start: int
+    pcm: Optional[bytes] = None
+
+
+# 문제 시작 → 첫 오디오 프레임까지 지연 (ms, 최근 N개)
+_audio_latency_samples: Deque[tuple] = deque(maxlen=200)
+
+
+def record_audio_latency(latency_ms: float, prebuffered: bool):
+    _audio_latency_samples.append((latency_ms, prebuffered))
+    logger.info(f"[노래퀴즈] 문제→오디오 지연 {latency_ms:.0f}ms (prebuffered={prebuffered})")
+
+
+def get_audio_latency_summary() -> dict:
+    """문제→오디오 지연 요약 (prebuffered / live 별 평균, 샘플 수)."""
+    summary = {}
+    for key, flag in (("prebuffered", True), ("live", False)):
+        values = [ms for ms, pre in _audio_latency_samples if pre is flag]
+        summary[key] = {
+            "count": len(values),
+            "avg_ms": round(sum(values) / len(values), 1) if values else None,
+        }
+    return summary
+
+
+def pick_clip_start(duration: int) -> int:
+    """랜덤 시작 지점 (최소 10초부터, 안전 마진 확보)"""
+    if duration < 60:
+        return 0
+    return random.randint(10, max(10, duration - CLIP_DURATION - 10))
+
+
+class _FirstFrameSource(discord.AudioSource):
+    """첫 프레임을 읽는 순간을 콜백으로 알려주는 래퍼 (플레이어 스레드에서 호출됨)."""
+
+    def __init__(self, inner: discord.AudioSource, on_first_frame):
+        self._inner = inner
+        self._on_first_frame = on_first_frame
+
+    def read(self) -> bytes:
+        data = self._inner.read()
+        if self._on_first_frame is not None:
+            callback, self._on_first_frame = self._on_first_frame, None
+            try:
+                callback()
+            except Exception:
+                pass
+        return data
+
+    def is_opus(self) -> bool:
+        return self._inner.is_opus()
+
+    def cleanup(self):
+        self._inner.cleanup()
+
+
+# guild_id(None=글로벌) → (만료 시각, 곡 목록 버전, 곡 목록)
+_song_list_cache: Dict[Optional[str], Tuple[float, int, List[SongEntry]]] = {}
+
+
 def get_song_list(guild_id: str = None) -> List[SongEntry]:
-    """GCS에서 곡 목록을 로드합니다. 없으면 기본 목록 사용."""
-    from run.services.quiz.quiz_storage import load_song_list
+    """GCS에서 곡 목록을 로드합니다. 없으면 기본 목록 사용.
+
+    서버별로 SONG_LIST_CACHE_TTL 동안 캐시하고, 봇 프로세스에서 곡 목록을 저장하면
+    (quiz_storage.songs_version 증가) 즉시 무효화됩니다. 정답 인덱스는 로드 시 미리 계산합니다.
+    """
+    from run.services.quiz.quiz_storage import load_song_list, songs_version
+
+    version = songs_version()
+    cached = _song_list_cache.get(guild_id)
+    if cached and cached[0] > time.monotonic() and cached[1] == version:
+        return cached[2]
 
     gcs_songs = load_song_list(guild_id)
     if gcs_songs:
-        return [
+        songs = [
             SongEntry(
                 title=s["title"],
                 artist=s["artist"],
@@ -111,17 +213,145 @@ def get_song_list(guild_id: str = None) -> List[SongEntry]:
             )
             for s in gcs_songs
         ]
-    return DEFAULT_SONG_LIST
+    else:
+        songs = DEFAULT_SONG_LIST
+
+    for song in songs:
+        _ = song.answer_index  # 정답 인덱스 선계산
+    _song_list_cache[guild_id] = (time.monotonic() + SONG_LIST_CACHE_TTL, version, songs)
+    return songs
+
+
+def invalidate_song_list_cache(guild_id: str = None):
+    """곡 목록 캐시를 비웁니다. guild_id 가 없으면 전체."""
+    if guild_id is None:
+        _song_list_cache.clear()
+    else:
+        _song_list_cache.pop(guild_id, None)
 
 
 def _normalize(text: str) -> str:
     """비교용 텍스트 정규화"""
     text = text.lower().strip()
-    text = re.sub(r'[^\w\s가-힣]', '', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = _NON_WORD_RE.sub('', text)
+    text = _SPACES_RE.sub(' ', text)
     return text
 
 
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분해합니다 (그 외 문자는 그대로).
+
+    '뉴진스' 와 '뉴징스' 처럼 받침 하나 틀린 오타가 음절 단위로는 1/3 차이지만
+    자모 단위로는 1/7 차이가 되어, 한글 오타에 관대한 유사도 비교가 가능해집니다.
+    """
+    out = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(chr(0x1100 + code // 588))
+            out.append(chr(0x1161 + (code % 588) // 28))
+            if code % 28:
+                out.append(chr(0x11A7 + code % 28))
+        else:
+            out.append(char)
+    return ''.join(out)
+
+
+def _within_edit_distance(a: str, b: str, max_dist: int) -> bool:
+    """a, b 의 편집거리가 max_dist 이하인지 (행 최솟값이 넘치면 조기 종료)."""
+    if abs(len(a) - len(b)) > max_dist:
+        return False
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_dist:
+            return False
+        previous = current
+    return previous[-1] <= max_dist
+
+
+class _MatchForm:
+    """정답 후보 1개의 비교용 형태."""
+
+    __slots__ = ("text", "jamo", "chars")
+
+    def __init__(self, raw: str):
+        self.text = _normalize(raw)
+        self.jamo = decompose_jamo(self.text.replace(' ', ''))
+        self.chars = frozenset(self.jamo)
+
+
+class _UserInput:
+    """채팅 입력 1개의 비교용 형태 (메시지당 1회 계산)."""
+
+    __slots__ = ("text", "jamo", "chars")
+
+    def __init__(self, normalized: str):
+        self.text = normalized
+        self.jamo = decompose_jamo(normalized.replace(' ', ''))
+        self.chars = frozenset(self.jamo)
+
+
+def _match_form(user: _UserInput, form: _MatchForm) -> bool:
+    target = form.text
+    if not target:
+        return False
+    if target in user.text or user.text in target:
+        return True
+    longest = max(len(user.jamo), len(form.jamo))
+    max_dist = int((1 - SIMILARITY_THRESHOLD) * longest + 1e-9)
+    # 한쪽에만 있는 자모 종류 수는 편집거리의 하한 → 잡담 메시지는 DP 없이 탈락
+    if len(user.chars - form.chars) > max_dist or len(form.chars - user.chars) > max_dist:
+        return False
+    return _within_edit_distance(user.jamo, form.jamo, max_dist)
+
+
+class SongAnswerIndex:
+    """곡 하나의 제목/가수(별칭 포함) 정규화 결과를 미리 계산해둔 인덱스."""
+
+    __slots__ = ("titles", "artists")
+
+    def __init__(self, song: "SongEntry"):
+        self.titles = self._forms([song.title] + list(song.title_aliases or []))
+        self.artists = self._forms([song.artist] + list(song.aliases or []))
+
+    @staticmethod
+    def _forms(raw_values: List[str]) -> Tuple[_MatchForm, ...]:
+        seen = set()
+        forms = []
+        for raw in raw_values:
+            form = _MatchForm(raw or '')
+            if form.text and form.text not in seen:
+                seen.add(form.text)
+                forms.append(form)
+        return tuple(forms)
+
+    def match(self, normalized: str) -> Optional[str]:
+        """정규화된 입력으로 "title" / "artist" / None 판정."""
+        if not normalized:
+            return None
+        user = _UserInput(normalized)
+        for form in self.titles:
+            if _match_form(user, form):
+                return "title"
+        for form in self.artists:
+            if _match_form(user, form):
+                return "artist"
+        return None
+
+
 def is_skip_command(user_input: str) -> bool:
     """스킵 명령어인지 판정합니다."""
     return _normalize(user_input) in SKIP_KEYWORDS
@@ -129,12 +359,7 @@ def is_skip_command(user_input: str) -> bool:
 
 def _match_target(normalized: str, target: str) -> bool:
     """정규화된 입력과 대상 문자열을 비교합니다."""
-    if not target:
-        return False
-    if target in normalized or normalized in target:
-        return True
-    ratio = difflib.SequenceMatcher(None, normalized, target).ratio()
-    return ratio >= SIMILARITY_THRESHOLD
+    return _match_form(_UserInput(normalized), _MatchForm(target))
 
 
 def check_answer(user_input: str, song: SongEntry) -> Optional[str]:
@@ -145,31 +370,7 @@ def check_answer(user_input: str, song: SongEntry) -> Optional[str]:
         "artist" - 가수를 맞힌 경우
         None - 정답이 아닌 경우
     """
-    normalized = _normalize(user_input)
-    if not normalized:
-        return None
-
-    # 제목 체크
-    if _match_target(normalized, _normalize(song.title)):
-        return "title"
-
-    # 제목 별칭 체크
-    if song.title_aliases:
-        for alias in song.title_aliases:
-            if _match_target(normalized, _normalize(alias)):
-                return "title"
-
-    # 가수 체크
-    if _match_target(normalized, _normalize(song.artist)):
-        return "artist"
-
-    # 가수 별칭 체크
-    if song.aliases:
-        for alias in song.aliases:
-            if _match_target(normalized, _normalize(alias)):
-                return "artist"
-
-    return None
+    return song.answer_index.match(_normalize(user_input))
 
 
 def is_correct_answer(user_input: str, song: SongEntry) -> bool:
@@ -234,48 +435,97 @@ class SongQuiz:
         return None
 
     @staticmethod
-    async def play_clip(guild_id: str, stream_url: str, duration: int) -> bool:
-        """음성 채널에서 노래 클립을 재생합니다."""
-        vc = voice_manager.get_voice_client(guild_id)
-        if not vc or not vc.is_connected():
-            return False
+    async def prepare_clip(song: SongEntry, bot_user: discord.Member) -> Optional[PreparedClip]:
+        """스트림 URL 확인 + 클립 구간(CLIP_DURATION)만 PCM 으로 미리 디코딩합니다.
 
-        # 랜덤 시작 지점 (최소 10초부터, 안전 마진 확보)
-        start = random.randint(10, max(10, duration - CLIP_DURATION - 10))
-        if duration < 60:
-            start = 0
+        디코딩이 실패해도 스트림 URL 이 있으면 실시간 재생용 클립을 반환합니다.
+        """
+        result = await YouTubeExtractor.extract_info(song.query, bot_user)
+        if not result or not result.stream_url:
+            return None
 
-        before_options = (
-            f'-ss {start} -t {CLIP_DURATION} '
-            '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 '
-            '-user_agent "Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-            'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"'
-        )
+        start = pick_clip_start(result.duration or DEFAULT_TRACK_DURATION)
+        clip = PreparedClip(song=song, stream_url=result.stream_url, start=start)
+        clip.pcm = await SongQuiz._decode_clip(result.stream_url, start)
+        return clip
 
+    @staticmethod
+    async def _decode_clip(stream_url: str, start: int) -> Optional[bytes]:
+        """ffmpeg 로 start 지점부터 CLIP_DURATION 만큼만 받아 48kHz/stereo s16le 로 디코딩합니다."""
+        args = [
+            FFMPEG_PATH, '-nostdin', '-loglevel', 'error',
+            '-ss', str(start), '-t', str(CLIP_DURATION),
+            '-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '5',
+            '-user_agent', _USER_AGENT,
+            '-i', stream_url,
+            '-vn', '-f', 's16le', '-ar', '48000', '-ac', '2', 'pipe:1',
+        ]
+        proc = None
         try:
-            audio_source = discord.FFmpegPCMAudio(
-                stream_url,
-                executable=FFMPEG_PATH,
-                before_options=before_options,
-                options='-vn',
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
+            pcm, err = await asyncio.wait_for(proc.communicate(), timeout=PREBUFFER_TIMEOUT)
+            if proc.returncode != 0 or not pcm:
+                logger.warning(f"노래 클립 디코딩 실패 (code={proc.returncode}): {err[-200:]!r}")
+                return None
+            return pcm
+        except asyncio.CancelledError:
+            if proc and proc.returncode is None:
+                proc.kill()
+            raise
+        except Exception as e:
+            if proc and proc.returncode is None:
+                proc.kill()
+            logger.warning(f"노래 클립 디코딩 오류: {e}")
+            return None
 
-            play_finished = asyncio.Event()
+    @staticmethod
+    async def play_clip(guild_id: str, clip: PreparedClip, question_started: Optional[float] = None) -> bool:
+        """음성 채널에서 노래 클립을 재생합니다.
 
-            def after_play(error):
-                if error:
-                    logger.error(f"노래 클립 재생 오류: {error}")
-                play_finished.set()
+        question_started(time.monotonic) 가 주어지면 첫 프레임까지의 지연을 기록합니다.
+        """
+        vc = voice_manager.get_voice_client(guild_id)
+        if not vc or not vc.is_connected():
+            return False
 
-            vc.play(audio_source, after=after_play)
-            # 클립 끝날 때까지 기다리되, 최대 CLIP_DURATION + 5초
-            await asyncio.wait_for(play_finished.wait(), timeout=CLIP_DURATION + 5)
+        try:
+            if clip.pcm:
+                audio_source = discord.PCMAudio(io.BytesIO(clip.pcm))
+            else:
+                before_options = (
+                    f'-ss {clip.start} -t {CLIP_DURATION} '
+                    '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 '
+                    f'-user_agent "{_USER_AGENT}"'
+                )
+                audio_source = discord.FFmpegPCMAudio(
+                    clip.stream_url,
+                    executable=FFMPEG_PATH,
+                    before_options=before_options,
+                    options='-vn',
+                )
+
+            if question_started is not None:
+                prebuffered = bool(clip.pcm)
+                audio_source = _FirstFrameSource(
+                    audio_source,
+                    lambda: record_audio_latency(
+                        (time.monotonic() - question_started) * 1000, prebuffered
+                    ),
+                )
+
+            mixer = voice_manager.get_mixer(guild_id)
+            clip_input = mixer.add("quiz", audio_source, PRIORITY_QUIZ)
+            try:
+                # 클립 끝날 때까지 기다리되, 최대 CLIP_DURATION + 5초
+                await asyncio.wait_for(clip_input.wait(), timeout=CLIP_DURATION + 5)
+            except asyncio.TimeoutError:
+                mixer.stop("quiz")
             return True
 
-        except asyncio.TimeoutError:
-            if vc.is_playing():
-                vc.stop()
-            return True
         except Exception as e:
             logger.error(f"노래 클립 재생 실패: {e}")
             return False
@@ -283,6 +533,54 @@ class SongQuiz:
     @staticmethod
     def stop_playback(guild_id: str):
         """재생 중인 오디오를 중지합니다."""
-        vc = voice_manager.get_voice_client(guild_id)
-        if vc and vc.is_playing():
-            vc.stop()
+        mixer = voice_manager.mixers.get(guild_id)
+        if mixer:
+            mixer.stop("quiz")
+
+
+class ClipPrefetcher:
+    """현재 문제가 진행되는 동안 다음 PREFETCH_DEPTH 개 클립을 미리 준비합니다.
+
+    곡 선택(pick_song)도 미리 하므로 한 번 만든 prefetcher 로 문제 수만큼 next() 를 호출합니다.
+    """
+
+    def __init__(self, quiz: SongQuiz, bot_user: discord.Member, depth: int = PREFETCH_DEPTH):
+        self.quiz = quiz
+        self.bot_user = bot_user
+        self.depth = max(1, depth)
+        self._remaining = quiz.total_questions
+        self._pending: Deque[tuple] = deque()  # (SongEntry, Task[PreparedClip])
+
+    def _fill(self):
+        while len(self._pending) < self.depth and self._remaining > 0:
+            song = self.quiz.pick_song()
+            if song is None:
+                self._remaining = 0
+                break
+            self._remaining -= 1
+            task = asyncio.create_task(SongQuiz.prepare_clip(song, self.bot_user))
+            self._pending.append((song, task))
+
+    def start(self):
+        """첫 문제부터 미리 준비를 시작합니다."""
+        self._fill()
+
+    async def next(self) -> tuple:
+        """다음 문제 (SongEntry, PreparedClip | None). 곡이 더 없으면 (None, None)."""
+        self._fill()
+        if not self._pending:
+            return None, None
+        song, task = self._pending.popleft()
+        # 꺼내자마자 빈 자리를 채워 다음 문제 준비를 현재 문제와 겹치게 한다
+        self._fill()
+        try:
+            return song, await task
+        except Exception as e:
+            logger.error(f"노래 클립 준비 실패: {e}")
+            return song, None
+
+    def close(self):
+        """남은 준비 작업을 취소합니다 (퀴즈 중단/종료 시)."""
+        while self._pending:
+            _, task = self._pending.popleft()
+            task.cancel()
@@ -0,0 +1,253 @@
+"""
+이미지 렌더링 프로세스 풀
+
+환영 이미지(Pillow 합성 + LANCZOS 리사이즈 + PNG 인코딩), MMR 그래프(matplotlib),
+아이템 이모지 합성은 한 건에 수십~수백 ms 동안 CPU 를 붙잡는다. 이벤트 루프에서 직접 돌리면
+그동안 gateway heartbeat / 다른 인터랙션이 전부 멈추므로 별도 프로세스 풀에서 렌더링한다.
+
+- 작업은 pickle 가능한 frozen dataclass (WelcomeImageJob / MmrGraphJob / ItemEmojiJob).
+  네트워크 I/O(아바타, 아이템 이미지 다운로드)는 호출 쪽 async 코드에서 끝내고 바이트만 넘긴다.
+- 결과는 항상 PNG bytes (그릴 데이터가 없으면 None).
+- 워커는 시작 때 PIL / matplotlib(Agg) / 폰트 탐색을 미리 끝내 둔다 (첫 요청 지연 제거).
+- 작업마다 타임아웃. 타임아웃이 나면 해당 워커가 계속 CPU 를 쓰고 있을 수 있으므로 풀을 통째로 교체.
+  교체 때 그 풀에서 대기 / 실행 중이던 다른 작업도 RenderTimeout 으로 실패한다 (CancelledError 가 아님).
+- spawn 워커는 __main__ 모듈(main.py)을 다시 import 하므로 main.py 는 모듈 최상단에서 봇을 import 하지
+  않는다 — scripts/check_render_workers.py 로 확인.
+
+    RENDER_WORKERS=2      # 워커 프로세스 수 (0 이면 프로세스 풀 없이 스레드에서 렌더링)
+    RENDER_TIMEOUT=20     # 작업당 기본 타임아웃 (초)
+
+    png = await render_service.render(MmrGraphJob(tuple(map(tuple, history)), nickname))
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "20"))
+
+
+class RenderTimeout(Exception):
+    """렌더링 작업이 타임아웃 안에 끝나지 않음."""
+
+
+# ─────────────────────────── 작업 정의 ───────────────────────────
+
+@dataclass(frozen=True)
+class WelcomeImageJob:
+    """환영/작별 이미지 (WelcomeImageGenerator.render 인자 그대로)."""
+    user_name: str
+    server_name: str
+    member_count: int
+    is_welcome: bool = True
+    config: Optional[dict] = None
+    background_image: Optional[bytes] = None
+    avatar_image: Optional[bytes] = None
+
+    def run(self) -> bytes:
+        from run.services.welcome.image_generator import get_worker_generator
+        return get_worker_generator().render(
+            user_name=self.user_name,
+            server_name=self.server_name,
+            member_count=self.member_count,
+            is_welcome=self.is_welcome,
+            config=self.config,
+            background_image=self.background_image,
+            avatar_image=self.avatar_image,
+        )
+
+
+@dataclass(frozen=True)
+class MmrGraphJob:
+    """MMR 히스토리 그래프. mmr_history 는 [[날짜, ..., mmr], ...] 를 튜플로."""
+    mmr_history: Tuple[tuple, ...]
+    nickname: str = "플레이어"
+
+    def run(self) -> Optional[bytes]:
+        from run.services.eternal_return.graph_generator import render_mmr_graph_png
+        return render_mmr_graph_png(self.mmr_history, self.nickname)
+
+
+@dataclass(frozen=True)
+class ItemEmojiJob:
+    """아이템/캐릭터 이모지 리사이즈 (+ 등급 배경 합성)."""
+    image_data: bytes
+    width: int
+    height: int
+    grade: Optional[str] = None
+
+    def run(self) -> bytes:
+        from run.utils.emoji_utils import render_emoji_png
+        return render_emoji_png(self.image_data, self.width, self.height, self.grade)
+
+
+def _run_job(job):
+    return job.run()
+
+
+def _warm_worker():
+    """워커 initializer — 무거운 import 와 폰트 탐색을 첫 작업 전에 끝낸다."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+    import matplotlib.dates  # noqa: F401
+    from matplotlib import font_manager
+    font_manager.fontManager.ttflist  # 폰트 캐시 로드
+    import PIL.Image  # noqa: F401
+    import PIL.ImageDraw  # noqa: F401
+    from run.services.welcome.image_generator import get_worker_generator
+    get_worker_generator()._get_font(48, bold=True)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _loaded_modules(names):
+    """워커에 이미 import 된 모듈 중 names 에 든 것 (check_render_workers 용)."""
+    return [name for name in names if name in sys.modules]
+
+
+class _PoolReplaced(Exception):
+    """다른 작업의 타임아웃 / 풀 손상으로 풀이 교체되면서 이 작업도 취소됨."""
+
+
+# ─────────────────────────── 서비스 ───────────────────────────
+
+class RenderService:
+    """ProcessPoolExecutor 래퍼 (이벤트 루프 쪽 API 는 async render 하나)."""
+
+    def __init__(self, workers: int = RENDER_WORKERS, timeout: float = RENDER_TIMEOUT):
+        self.workers = max(0, workers)
+        self.timeout = timeout
+        self._pool = None
+        self._ready = False  # 현재 풀의 워커 warm-up 완료 여부
+        self._start_lock = None
+        self.stats = {"jobs": 0, "failures": 0, "timeouts": 0, "restarts": 0, "render_ms": 0.0}
+
+    def _new_pool(self):
+        # fork 는 discord.py / gRPC 스레드가 있는 프로세스에서 안전하지 않으므로 spawn
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    def _get_pool(self):
+        if self._pool is None and self.workers:
+            self._pool = self._new_pool()
+            self._ready = False
+        return self._pool
+
+    def _reset_pool(self, pool):
+        """pool 을 버리고 다음 render 때 새로 만든다. 이미 교체된 풀이면 아무것도 안 함."""
+        if pool is None or self._pool is not pool:
+            return
+        self._pool = None
+        self._ready = False
+        # 멈춘 워커는 shutdown 으로 끝나지 않으므로 직접 종료
+        for proc in list((getattr(pool, "_processes", None) or {}).values()):
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.stats["restarts"] += 1
+
+    async def start(self):
+        """워커를 모두 띄우고 warm-up(initializer)이 끝날 때까지 대기합니다.
+
+        풀이 교체된 뒤 첫 render 도 이걸 거치므로 warm-up 시간이 작업 타임아웃을 잡아먹지 않는다.
+        """
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            pool = self._get_pool()
+            if pool is None or self._ready:
+                return pool
+            loop = asyncio.get_running_loop()
+            t0 = time.perf_counter()
+            pids = await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(self.workers)))
+            self._ready = True
+            logger.info(f"[렌더] 워커 {len(set(pids))}개 준비 ({(time.perf_counter() - t0) * 1000:.0f}ms)")
+            return pool
+
+    async def _run_in_pool(self, pool, job, timeout: float):
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(pool, _run_job, job), timeout)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                raise  # 호출자 쪽 취소
+            # _reset_pool 의 shutdown(cancel_futures=True) 에 대기 중이던 작업이 같이 취소됨
+            raise _PoolReplaced() from None
+        except BrokenProcessPool:
+            if self._pool is not pool:
+                raise _PoolReplaced() from None  # 교체하면서 terminate 한 워커에서 돌던 작업
+            raise
+
+    async def render(self, job, timeout: Optional[float] = None):
+        """job 을 워커에서 실행하고 결과(PNG bytes | None)를 반환합니다.
+
+        타임아웃이면 (다른 작업의 타임아웃으로 풀이 교체돼 같이 취소된 경우 포함) RenderTimeout,
+        작업 안에서 난 예외는 그대로 전달됩니다.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        t0 = time.perf_counter()
+        self.stats["jobs"] += 1
+        pool = None
+        try:
+            pool = await self.start()
+            if pool is None:
+                return await asyncio.wait_for(asyncio.to_thread(_run_job, job), timeout)
+            try:
+                return await self._run_in_pool(pool, job, timeout)
+            except BrokenProcessPool:
+                # 워커가 죽었으면 (OOM 등) 풀을 새로 만들고 한 번 재시도
+                logger.warning(f"[렌더] 프로세스 풀 손상 → 재생성 ({type(job).__name__})")
+                self._reset_pool(pool)
+                pool = await self.start()
+                return await self._run_in_pool(pool, job, timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.error(f"[렌더] {type(job).__name__} {timeout:.0f}s 타임아웃 → 풀 교체")
+            if self.workers:
+                self._reset_pool(pool)
+            raise RenderTimeout(f"{type(job).__name__} 렌더링 타임아웃 ({timeout:.0f}s)") from None
+        except _PoolReplaced:
+            self.stats["timeouts"] += 1
+            logger.warning(f"[렌더] {type(job).__name__} 풀 교체로 취소됨")
+            raise RenderTimeout(f"{type(job).__name__} 렌더링 취소 (다른 작업 타임아웃으로 풀 교체)") from None
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+        finally:
+            self.stats["render_ms"] += (time.perf_counter() - t0) * 1000
+
+    def get_stats(self) -> dict:
+        jobs = self.stats["jobs"]
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "avg_ms": round(self.stats["render_ms"] / jobs, 1) if jobs else 0.0,
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._ready = False
+
+
+render_service = RenderService()
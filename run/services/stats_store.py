@@ -0,0 +1,301 @@
+"""서버 활동 통계 저장소 — 서버별·일별 rollup 문서 (time-series).
+
+예전에는 StatsCog 가 guilds/{id} 설정 문서 안의 stats.daily / stats.members / stats.logs(최대 1000개)에
+누적해서, snapshot listener 갱신 / load_settings 복사 / 대시보드 설정 조회 / 전체 설정 저장마다
+통계 payload 가 같이 딸려 다녔다. 통계는 설정과 분리된 컬렉션에 append-only 로 쌓는다.
+
+Firestore 컬렉션 guild_stats:
+- {guild_id}_{YYYY-MM-DD}: 일별 rollup
+    { guild_id, date, kind: "day", messages(Increment), member_count,
+      members: {user_id: 메시지 수(Increment)}, names: {user_id: 표시 이름},
+      logs: [활동 로그(ArrayUnion)] }
+- {guild_id}_{YYYY-MM}: 월별 rollup (보존 기간이 지난 일별 문서를 합친 것, 로그는 버림)
+    { guild_id, month, kind: "month", messages, members, names }
+
+쓰기 (봇):
+- StatsBuffer 가 메모리 카운터를 모았다가 flush 때 (서버, 날짜)당 갱신 1건을 write-behind 큐로.
+  읽기 / read-modify-write 없음. 로그는 (서버, 날짜)당 STATS_LOGS_PER_DAY 개까지.
+- compact(): STATS_DAILY_RETENTION_DAYS 지난 일별 문서 → 월별 문서로 합치고 삭제,
+  STATS_MONTHLY_RETENTION_MONTHS 지난 월별 문서는 삭제. 주 워커가 하루 한 번.
+
+조회 (대시보드 /servers/<id>/stats 가 직접 사용):
+- get_daily / get_top_members / get_logs / get_member_stats
+- 문서 id 가 결정적이라 쿼리 인덱스 없이 필요한 날짜 문서만 get_all 로 읽는다.
+
+    STATS_DAILY_RETENTION_DAYS=35
+    STATS_MONTHLY_RETENTION_MONTHS=12
+    STATS_LOGS_PER_DAY=1000
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from run.core.config import get_firestore_client, write_queue
+
+STATS_COLLECTION = 'guild_stats'
+
+DAILY_RETENTION_DAYS = int(os.getenv('STATS_DAILY_RETENTION_DAYS', '35'))
+MONTHLY_RETENTION_MONTHS = int(os.getenv('STATS_MONTHLY_RETENTION_MONTHS', '12'))
+LOGS_PER_DAY = int(os.getenv('STATS_LOGS_PER_DAY', '1000'))
+
+_DELETE_BATCH = 450
+
+
+def _today() -> str:
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def day_doc_id(guild_id, day: str) -> str:
+    return f"{guild_id}_{day}"
+
+
+def month_doc_id(guild_id, month: str) -> str:
+    return f"{guild_id}_{month}"
+
+
+def _recent_days(days: int, today: str = None) -> list[str]:
+    end = date.fromisoformat(today or _today())
+    return [(end - timedelta(days=i)).isoformat() for i in range(days - 1, -1, -1)]
+
+
+# ───────────────────── 쓰기: 메모리 카운터 → 일별 문서 ─────────────────────
+
+class _DayBucket:
+    __slots__ = ("messages", "members", "names", "logs", "member_count")
+
+    def __init__(self):
+        self.messages = 0
+        self.members = defaultdict(int)  # user_id -> 메시지 수
+        self.names = {}                  # user_id -> 표시 이름
+        self.logs = []
+        self.member_count = None
+
+
+class StatsBuffer:
+    """flush 주기 동안의 통계를 (서버, 날짜)별로 모은다. 이벤트 루프 스레드 전용."""
+
+    def __init__(self, logs_per_day: int = LOGS_PER_DAY):
+        self.logs_per_day = logs_per_day
+        self._buckets = {}  # (guild_id, date) -> _DayBucket
+        self._logs_written = defaultdict(int)  # (guild_id, date) -> 이 프로세스가 쓴 로그 수
+
+    def _bucket(self, guild_id) -> _DayBucket:
+        key = (str(guild_id), _today())
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _DayBucket()
+        return bucket
+
+    def __bool__(self):
+        return bool(self._buckets)
+
+    def record_message(self, guild_id, user_id, display_name: str = None):
+        bucket = self._bucket(guild_id)
+        bucket.messages += 1
+        bucket.members[str(user_id)] += 1
+        if display_name:
+            bucket.names[str(user_id)] = display_name
+
+    def record_log(self, guild_id, entry: dict):
+        key = (str(guild_id), _today())
+        pending = self._buckets.get(key)
+        if self._logs_written.get(key, 0) + (len(pending.logs) if pending else 0) >= self.logs_per_day:
+            return  # 하루 상한 (문서 1MB 제한)
+        self._bucket(guild_id).logs.append(entry)
+
+    def set_member_count(self, guild_id, count: int):
+        self._bucket(guild_id).member_count = count
+
+    def drain(self) -> dict:
+        """모은 버킷을 꺼내고 비웁니다. {(guild_id, date): _DayBucket}"""
+        buckets, self._buckets = self._buckets, {}
+        today = _today()
+        for key, bucket in buckets.items():
+            self._logs_written[key] += len(bucket.logs)
+        # 지난 날짜의 로그 상한 카운터는 더 필요 없음
+        for key in [k for k in self._logs_written if k[1] < today]:
+            del self._logs_written[key]
+        return buckets
+
+    def flush(self, member_counts=None) -> int:
+        """버킷을 write-behind 큐에 넣습니다. member_counts: {guild_id: 현재 멤버 수}. 넣은 문서 수 반환."""
+        buckets = self.drain()
+        for (guild_id, day), bucket in buckets.items():
+            fields = {'guild_id': guild_id, 'date': day, 'kind': 'day'}
+            member_count = bucket.member_count
+            if member_count is None and member_counts:
+                member_count = member_counts.get(guild_id)
+            if member_count is not None:
+                fields['member_count'] = member_count
+            for user_id, name in bucket.names.items():
+                fields[('names', user_id)] = name
+            increments = {('members', user_id): count for user_id, count in bucket.members.items()}
+            if bucket.messages:
+                increments['messages'] = bucket.messages
+            write_queue.update(
+                STATS_COLLECTION, day_doc_id(guild_id, day),
+                fields=fields,
+                increments=increments,
+                appends={'logs': bucket.logs} if bucket.logs else None,
+            )
+        return len(buckets)
+
+
+# ───────────────────── 조회 API (대시보드) ─────────────────────
+
+def _load_days(guild_id, days: int) -> list[dict]:
+    """최근 days 일의 일별 문서를 날짜 오름차순으로 (없는 날은 빠짐)."""
+    fs = get_firestore_client()
+    if not fs:
+        return []
+    col = fs.collection(STATS_COLLECTION)
+    refs = [col.document(day_doc_id(guild_id, day)) for day in _recent_days(days)]
+    try:
+        docs = [snap.to_dict() or {} for snap in fs.get_all(refs) if snap.exists]
+    except Exception as e:
+        print(f"[통계] 일별 문서 조회 실패 ({guild_id}): {e}", flush=True)
+        return []
+    return sorted(docs, key=lambda d: d.get('date', ''))
+
+
+def _daily_row(doc: dict) -> dict:
+    return {
+        'date': doc.get('date'),
+        'messages': int(doc.get('messages', 0) or 0),
+        'member_count': int(doc.get('member_count', 0) or 0),
+        'active_users': len(doc.get('members') or {}),
+    }
+
+
+def _sum_members(docs) -> dict:
+    """{user_id: {'messages': n, 'name': 마지막 이름}} — docs 는 날짜 오름차순."""
+    members = {}
+    for doc in docs:
+        names = doc.get('names') or {}
+        for user_id, count in (doc.get('members') or {}).items():
+            entry = members.setdefault(user_id, {'messages': 0, 'name': ''})
+            entry['messages'] += int(count or 0)
+        for user_id, name in names.items():
+            if user_id in members and name:
+                members[user_id]['name'] = name
+    return members
+
+
+def _top(members: dict, limit: int) -> list[dict]:
+    return sorted(
+        ({'id': user_id, **entry} for user_id, entry in members.items()),
+        key=lambda x: x['messages'],
+        reverse=True,
+    )[:limit]
+
+
+def _collect_logs(docs, log_type=None, user_id=None, limit=100) -> list[dict]:
+    logs = [log for doc in docs for log in (doc.get('logs') or [])]
+    if log_type:
+        logs = [log for log in logs if log.get('type') == log_type]
+    if user_id:
+        logs = [log for log in logs if log.get('user_id') == str(user_id)]
+    return sorted(logs, key=lambda x: x.get('timestamp', ''), reverse=True)[:limit]
+
+
+def get_daily(guild_id, days: int = 30) -> list[dict]:
+    """일별 메시지 수 / 멤버 수 / 활성 유저 수 (날짜 오름차순)."""
+    return [_daily_row(doc) for doc in _load_days(guild_id, days)]
+
+
+def get_top_members(guild_id, days: int = 30, limit: int = 20) -> list[dict]:
+    """최근 days 일 메시지 수 상위 멤버."""
+    return _top(_sum_members(_load_days(guild_id, days)), limit)
+
+
+def get_logs(guild_id, log_type=None, user_id=None, limit: int = 100, days: int = 7) -> list[dict]:
+    """최근 days 일 활동 로그 (최신순)."""
+    return _collect_logs(_load_days(guild_id, days), log_type, user_id, limit)
+
+
+def get_guild_stats(guild_id, days: int = 30, top: int = 20, logs: int = 100) -> dict:
+    """대시보드 통계 화면 한 번에 — 일별 문서를 한 번만 읽는다."""
+    docs = _load_days(guild_id, days)
+    return {
+        'daily': [_daily_row(doc) for doc in docs],
+        'topMembers': _top(_sum_members(docs), top),
+        'logs': _collect_logs(docs, limit=logs),
+    }
+
+
+def get_member_stats(guild_id, user_id, days: int = 30, logs: int = 50) -> dict:
+    """특정 멤버의 최근 days 일 메시지 수 + 로그."""
+    docs = _load_days(guild_id, days)
+    member = _sum_members(docs).get(str(user_id), {'messages': 0, 'name': ''})
+    return {'member': member, 'logs': _collect_logs(docs, user_id=user_id, limit=logs)}
+
+
+# ───────────────────── 보존 기간 compaction ─────────────────────
+
+def _month_cutoff(today: date, months: int) -> str:
+    year, month = today.year, today.month - months
+    while month <= 0:
+        year, month = year - 1, month + 12
+    return f"{year:04d}-{month:02d}"
+
+
+def _delete_refs(fs, refs) -> int:
+    for i in range(0, len(refs), _DELETE_BATCH):
+        batch = fs.batch()
+        for ref in refs[i:i + _DELETE_BATCH]:
+            batch.delete(ref)
+        batch.commit()
+    return len(refs)
+
+
+def compact(today: str = None) -> dict:
+    """보존 기간이 지난 일별 문서를 월별 rollup 으로 합치고 삭제합니다 (블로킹, to_thread 로 호출).
+
+    월별 합산은 write-behind 큐 Increment 로 넣고 flush 가 끝난 뒤에만 일별 문서를 지운다
+    (중간에 죽으면 다음 실행이 같은 문서를 다시 합친다 — 이중 합산보다 유실을 피함).
+    """
+    fs = get_firestore_client()
+    result = {'days_compacted': 0, 'months_deleted': 0}
+    if not fs:
+        return result
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    today_date = date.fromisoformat(today or _today())
+    day_cutoff = (today_date - timedelta(days=DAILY_RETENTION_DAYS)).isoformat()
+    col = fs.collection(STATS_COLLECTION)
+
+    expired = list(col.where(filter=FieldFilter('date', '<', day_cutoff)).stream())
+    if expired:
+        months = defaultdict(lambda: {'messages': 0, 'members': defaultdict(int), 'names': {}})
+        for snap in sorted(expired, key=lambda s: (s.to_dict() or {}).get('date', '')):
+            doc = snap.to_dict() or {}
+            guild_id, day = doc.get('guild_id'), doc.get('date', '')
+            if not guild_id or len(day) < 7:
+                continue
+            rollup = months[(guild_id, day[:7])]
+            rollup['messages'] += int(doc.get('messages', 0) or 0)
+            for user_id, count in (doc.get('members') or {}).items():
+                rollup['members'][user_id] += int(count or 0)
+            rollup['names'].update(doc.get('names') or {})
+        for (guild_id, month), rollup in months.items():
+            fields = {'guild_id': guild_id, 'month': month, 'kind': 'month'}
+            fields.update({('names', user_id): name for user_id, name in rollup['names'].items()})
+            increments = {('members', user_id): n for user_id, n in rollup['members'].items()}
+            increments['messages'] = rollup['messages']
+            write_queue.update(STATS_COLLECTION, month_doc_id(guild_id, month),
+                               fields=fields, increments=increments)
+        if not write_queue.flush():
+            print("[통계] 월별 rollup flush 미완료 — 일별 문서 삭제는 다음 compaction 으로", flush=True)
+            return result
+        result['days_compacted'] = _delete_refs(fs, [snap.reference for snap in expired])
+
+    month_cutoff = _month_cutoff(today_date, MONTHLY_RETENTION_MONTHS)
+    old_months = list(col.where(filter=FieldFilter('month', '<', month_cutoff)).stream())
+    result['months_deleted'] = _delete_refs(fs, [snap.reference for snap in old_months])
+    if result['days_compacted'] or result['months_deleted']:
+        print(f"[통계] compaction: 일별 {result['days_compacted']}개 → 월별 rollup, "
+              f"월별 {result['months_deleted']}개 삭제", flush=True)
+    return result
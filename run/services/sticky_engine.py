@@ -0,0 +1,171 @@
+"""스티키 메시지 엔진 — 채널이 조용해지면 한 번 다시 보내기 (trailing debounce).
+
+예전에는 메시지마다 (채널별 쿨다운 5초만 지나면) 이전 스티키를 fetch_message 로 가져와 지우고
+새로 보내고 sticky_messages 를 바로 저장했다. 바쁜 채널에서는 5초마다 REST 3번 + Firestore 쓰기 1번.
+
+- 채널 색인: 어떤 채널에 어떤 스티키가 있는지는 설정 스냅샷의 ChannelFeatures.stickies (설정 로드 없음).
+- trailing debounce: 메시지가 오면 타이머만 (다시) 건다. QUIET 초 동안 새 메시지가 없거나,
+  첫 메시지 뒤 MAX_WAIT 초가 지나면 (계속 바쁜 채널) 그때 한 번 다시 보낸다. 직전 전송 뒤
+  MIN_INTERVAL 초 안에는 보내지 않는다.
+- 새 스티키를 먼저 보내고(빈틈 없음) 이전 것은 캐시된 ID 로 PartialMessage.delete — fetch 없이 1번.
+- lastMessageId 는 write-behind 큐로 (서버 문서의 sticky_messages 필드만, flush 주기 안의 여러 채널
+  갱신은 한 번의 쓰기로 합쳐짐) + 스냅샷 write-through. 저장이 실패해 스냅샷이 뒤처져도 메모리
+  캐시로 방금 보낸 메시지를 지운다 (공지 / 쿠폰 브로드캐스트가 바꾼 ID 는 스냅샷 쪽이 우선).
+
+    STICKY_QUIET_SECONDS=4
+    STICKY_MAX_WAIT_SECONDS=30
+    STICKY_MIN_INTERVAL_SECONDS=5
+
+    sticky_engine.on_message(message, features)   # on_message 에서, await 없음
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Optional
+
+import discord
+
+from run.core import config, metrics
+from run.core.settings_snapshot import thaw
+from run.utils.ttl_map import TTLMap
+
+QUIET_SECONDS = float(os.getenv("STICKY_QUIET_SECONDS", "4"))
+MAX_WAIT_SECONDS = float(os.getenv("STICKY_MAX_WAIT_SECONDS", "30"))
+MIN_INTERVAL_SECONDS = float(os.getenv("STICKY_MIN_INTERVAL_SECONDS", "5"))
+CHANNEL_STATE_MAX = 20000
+MESSAGE_ID_TTL = 24 * 3600  # 캐시는 저장 실패 대비용 — 하루 지나면 스냅샷 값만 믿음
+
+STICKY_RESENDS = metrics.counter(
+    "sticky_resends_total", "스티키 메시지 재전송", ("trigger",))  # quiet / max_wait
+
+
+class _ChannelState:
+    __slots__ = ("channel", "guild_id", "first_at", "last_at", "task")
+
+    def __init__(self, channel, guild_id: str, now: float):
+        self.channel = channel
+        self.guild_id = guild_id
+        self.first_at = now   # 마지막 재전송 이후 첫 메시지
+        self.last_at = now    # 가장 최근 메시지
+        self.task: Optional[asyncio.Task] = None
+
+
+class StickyEngine:
+    """채널별 debounce 상태 + 스티키 메시지 ID 캐시. 이벤트 루프 스레드 전용."""
+
+    def __init__(self, quiet: float = QUIET_SECONDS, max_wait: float = MAX_WAIT_SECONDS,
+                 min_interval: float = MIN_INTERVAL_SECONDS, features_getter=None, persist=None):
+        self.quiet = quiet
+        self.max_wait = max_wait
+        self.min_interval = min_interval
+        self._features = features_getter or config.get_channel_features
+        self._persist = persist or _persist_last_ids
+        self._channels = {}   # channel_id -> _ChannelState (재전송 대기 중인 채널만)
+        # channel_id -> 마지막 재전송 시각 (loop time) — min_interval 이 지나면 필요 없음
+        self._last_sent = TTLMap(maxsize=CHANNEL_STATE_MAX, ttl=min_interval, touch_on_get=False)
+        # (channel_id, sticky_messages 인덱스) -> (지운 메시지 ID, 보낸 메시지 ID)
+        self._last_ids = TTLMap(maxsize=CHANNEL_STATE_MAX, ttl=MESSAGE_ID_TTL, touch_on_get=False)
+
+    def on_message(self, message, features) -> None:
+        """채널에 사람 메시지가 왔다 — 재전송 타이머만 (다시) 건다."""
+        if not features or not features.stickies:
+            return
+        now = asyncio.get_running_loop().time()
+        channel_id = message.channel.id
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = self._channels[channel_id] = _ChannelState(message.channel, str(message.guild.id), now)
+        else:
+            state.channel = message.channel
+            state.last_at = now
+        if state.task is None:
+            state.task = asyncio.create_task(self._run(channel_id, state))
+
+    def pending(self) -> int:
+        return len(self._channels)
+
+    async def _run(self, channel_id: int, state: _ChannelState):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                now = loop.time()
+                due = min(state.last_at + self.quiet, state.first_at + self.max_wait)
+                due = max(due, self._last_sent.get(channel_id, 0.0) + self.min_interval)
+                if now < due:
+                    await asyncio.sleep(due - now)
+                    continue
+                trigger = "quiet" if now >= state.last_at + self.quiet else "max_wait"
+                started = now
+                await self._resend(channel_id, state)
+                STICKY_RESENDS.inc(trigger=trigger)
+                self._last_sent[channel_id] = loop.time()
+                if state.last_at <= started:
+                    break
+                # 보내는 동안 새 메시지가 왔다 — 스티키가 또 밀렸으니 다음 창을 연다
+                state.first_at = state.last_at
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[스티키] 재전송 실패 ({channel_id}): {e}", flush=True)
+        finally:
+            if self._channels.get(channel_id) is state:
+                del self._channels[channel_id]
+
+    async def _resend(self, channel_id: int, state: _ChannelState):
+        # 대기하는 동안 설정이 바뀌었을 수 있으니 보낼 때 다시 본다
+        features = self._features(channel_id)
+        if not features or not features.stickies:
+            return
+        channel = state.channel
+        sent = {}
+        for idx, sticky in features.stickies:
+            key = (channel_id, idx)
+            old_id = sticky.get("lastMessageId")
+            cached = self._last_ids.get(key)
+            if cached and old_id == cached[0]:
+                old_id = cached[1]  # 지난번 저장이 스냅샷에 반영되지 않음
+            try:
+                new_msg = await channel.send(sticky["content"], silent=True)
+            except Exception as e:
+                print(f"[스티키] 메시지 전송 실패: {e}", flush=True)
+                continue
+            self._last_ids[key] = (old_id, str(new_msg.id))
+            sent[idx] = str(new_msg.id)
+            if old_id:
+                try:
+                    await channel.get_partial_message(int(old_id)).delete()
+                except (discord.NotFound, discord.HTTPException):
+                    pass  # 이미 지워졌거나 권한 없음
+                except Exception as e:
+                    print(f"[스티키] 이전 메시지 삭제 실패: {e}", flush=True)
+        if sent:
+            await self._persist(state.guild_id, channel_id, sent)
+
+    def close(self):
+        for state in list(self._channels.values()):
+            if state.task is not None:
+                state.task.cancel()
+        self._channels.clear()
+
+
+async def _persist_last_ids(guild_id: str, channel_id: int, sent: dict):
+    """{sticky_messages 인덱스: 새 메시지 ID} → 서버 문서 sticky_messages 필드 (write-behind)."""
+    updated = thaw(config.get_guild(guild_id).get("sticky_messages")) or []
+    changed = False
+    for idx, message_id in sent.items():
+        # 대기 / 전송 중에 목록이 바뀌었으면 같은 채널 항목일 때만 반영
+        if idx < len(updated) and str(updated[idx].get("channelId", "")) == str(channel_id):
+            updated[idx]["lastMessageId"] = message_id
+            changed = True
+    if not changed:
+        return
+    try:
+        # Firestore 는 배열 원소 하나만 갱신할 수 없어 필드 통째로 — 같은 서버의 갱신은 flush 때 하나로 합쳐짐
+        await asyncio.to_thread(config.update_guild, guild_id, {"sticky_messages": updated}, defer=True)
+    except Exception as e:
+        print(f"[스티키] 설정 저장 실패: {e}", flush=True)
+
+
+sticky_engine = StickyEngine()
@@ -10,10 +10,14 @@ import logging
 from typing import Optional
 from collections import deque
 
-from run.services.voice_manager import voice_manager
+from run.core import metrics
+from run.services.voice_manager import GUILD_STATE_MAX, GUILD_STATE_TTL, voice_manager
+from run.utils.ttl_map import TTLMap
 
 logger = logging.getLogger(__name__)
 
+VOICE_QUEUE_DEPTH = metrics.gauge("voice_queue_depth", "음성 재생 대기열 길이 (전체 서버 합)", ("kind",))
+
 
 class AudioPlayer:
     """
@@ -25,12 +29,14 @@ class AudioPlayer:
 
     def __init__(self):
         """오디오 플레이어 초기화"""
-        # 서버별 TTS 재생 큐
-        self.tts_queues: dict[str, deque] = {}
+        # 서버별 TTS 재생 큐 (빈 큐만 만료)
+        self.tts_queues = TTLMap(maxsize=GUILD_STATE_MAX, ttl=GUILD_STATE_TTL, keep=lambda _, queue: bool(queue))
 
         # 서버별 재생 중 상태
         self.is_playing: dict[str, bool] = {}
 
+        VOICE_QUEUE_DEPTH.set_function(lambda: sum(len(q) for q in self.tts_queues.values()), kind="tts")
+
     async def join_voice_channel(self, voice_channel: discord.VoiceChannel) -> bool:
         """음성 채널에 입장합니다."""
         guild_id = str(voice_channel.guild.id)
@@ -124,7 +130,6 @@ class AudioPlayer:
             return
 
         audio_queue = asyncio.Queue()
-        producer_done = asyncio.Event()
 
         async def producer():
             try:
@@ -138,7 +143,6 @@ class AudioPlayer:
             except Exception as e:
                 logger.error(f"[TTS] 청크 생성 실패: {e}")
             finally:
-                producer_done.set()
                 await audio_queue.put(None)
 
         async def consumer():
@@ -149,12 +153,7 @@ class AudioPlayer:
                 if not voice_manager.is_connected(guild_id):
                     break
                 try:
-                    # 마지막 청크인지 확인: producer 완료 + 큐 비어있음
-                    is_last = producer_done.is_set() and audio_queue.empty()
-                    await voice_manager.play_tts(
-                        guild_id, audio_path,
-                        suppress_music_restart=not is_last
-                    )
+                    await voice_manager.play_tts(guild_id, audio_path)
                     await asyncio.sleep(0.05)
                 except Exception as e:
                     logger.error(f"[TTS] 청크 재생 실패: {e}")
@@ -14,14 +14,20 @@ TTS 서비스
 
 import os
 import hashlib
+import time
 from typing import Optional
 import logging
 
+from run.core import metrics
 from .text_preprocessor import preprocess_text_for_tts
 from .audio_utils import convert_to_discord_pcm
 
 logger = logging.getLogger(__name__)
 
+TTS_SYNTH_SECONDS = metrics.histogram("tts_synth_seconds", "TTS 합성 시간 (캐시 미스, PCM 변환 포함)", ("engine",))
+TTS_CACHE_REQUESTS = metrics.counter("tts_cache_requests_total", "TTS 캐시 조회 (hit/miss)", ("engine", "result"))
+TTS_FIRST_CHUNK_SECONDS = metrics.histogram("tts_first_chunk_seconds", "스트리밍 TTS 첫 청크까지 시간", ("engine",))
+
 # TTS 캐시 디렉토리 (서버 재시작해도 유지)
 TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "/tmp/tts_cache")
 # 캐시 최대 개수 (초과 시 오래된 것부터 삭제)
@@ -156,26 +162,32 @@ class TTSService:
         cache_path = os.path.join(self.cache_dir, f"{cache_key}.pcm")
 
         if os.path.exists(cache_path) and os.path.getsize(cache_path) > 0:
+            TTS_CACHE_REQUESTS.inc(engine=self.engine, result="hit")
             logger.info(f"TTS 캐시 히트: '{processed_text[:30]}...' -> {cache_path}")
             return cache_path
+        TTS_CACHE_REQUESTS.inc(engine=self.engine, result="miss")
 
         # 캐시 미스: TTS 생성
-        audio_path = await self.tts_backend.text_to_speech(
-            text=processed_text,
-            speaker=self.speaker,
-            language=self.language,
-            output_path=output_path,
-            guild_name=guild_name,
-            channel_name=channel_name,
-            user_name=user_name
-        )
-
-        # PCM 변환 후 캐시 저장
-        pcm_path = await convert_to_discord_pcm(audio_path)
+        with TTS_SYNTH_SECONDS.time(engine=self.engine):
+            audio_path = await self.tts_backend.text_to_speech(
+                text=processed_text,
+                speaker=self.speaker,
+                language=self.language,
+                output_path=output_path,
+                guild_name=guild_name,
+                channel_name=channel_name,
+                user_name=user_name
+            )
+
+            # PCM 변환 후 캐시 저장
+            pcm_path = await convert_to_discord_pcm(audio_path)
         try:
             if pcm_path != cache_path:
                 import shutil
-                shutil.copy2(pcm_path, cache_path)
+                # 샤드 워커들이 캐시 디렉토리를 공유 → 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 rename 으로 교체
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                shutil.copy2(pcm_path, tmp_path)
+                os.replace(tmp_path, cache_path)
             self._evict_cache_if_needed()
             logger.info(f"TTS 캐시 저장: '{processed_text[:30]}...' -> {cache_path}")
         except Exception as e:
@@ -201,6 +213,8 @@ class TTSService:
 
         # Modal / CosyVoice3 클라이언트 스트리밍 지원
         if self.engine in ("modal", "cosyvoice3") and hasattr(self.tts_backend, "text_to_speech_streaming"):
+            t0 = time.perf_counter()
+            first = True
             async for audio_path in self.tts_backend.text_to_speech_streaming(
                 text=processed_text,
                 speaker=self.speaker,
@@ -208,6 +222,9 @@ class TTSService:
                 channel_name=channel_name,
                 user_name=user_name,
             ):
+                if first:
+                    TTS_FIRST_CHUNK_SECONDS.observe(time.perf_counter() - t0, engine=self.engine)
+                    first = False
                 yield audio_path
         else:
             # 다른 엔진: 전체 생성 후 단일 yield (fallback)
@@ -234,7 +251,10 @@ class TTSService:
             cache_files.sort(key=lambda f: os.path.getmtime(f))
             # 초과분 삭제
             for f in cache_files[:len(cache_files) - TTS_CACHE_MAX]:
-                os.remove(f)
+                try:
+                    os.remove(f)
+                except FileNotFoundError:
+                    continue  # 다른 워커가 먼저 정리
                 logger.info(f"캐시 정리: {os.path.basename(f)}")
         except Exception as e:
             logger.warning(f"캐시 정리 실패: {e}")
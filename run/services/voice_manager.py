@@ -3,7 +3,7 @@
 
 서버별 하나의 음성 연결을 관리합니다.
 TTS와 음악이 동일한 voice_client를 공유합니다.
-TTS는 음악보다 우선순위가 높아 끼어들기합니다.
+모든 재생은 서버별 GuildMixer 를 거치며, TTS가 나오는 동안 음악은 제자리에서 줄어들었다가 이어집니다.
 """
 
 import asyncio
@@ -12,11 +12,16 @@ import logging
 import os
 import glob
 import platform
-from typing import Optional, Dict, Callable, Any
+import time
+from typing import Optional, Dict
 from enum import Enum
 
 import discord
 
+from run.services.audio_mixer import GuildMixer, PRIORITY_TTS
+from run.services.opus_cache import opus_cache
+from run.utils.ttl_map import TTLMap
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,13 +53,17 @@ class AudioType(Enum):
 
 IDLE_TIMEOUT_SECONDS = 5  # 사용자 모두 나가면 5초 후 퇴장
 
+# 서버별 보조 상태(락, TTS 큐) 보관 — 이만큼 안 쓴 서버는 다음에 새로 만듦
+GUILD_STATE_MAX = 5000
+GUILD_STATE_TTL = 3600
+
 
 class VoiceManager:
     """
     서버별 음성 연결 관리자
 
     TTS와 음악이 동일한 voice_client를 공유합니다.
-    TTS는 음악보다 우선순위가 높습니다.
+    TTS는 음악보다 우선순위가 높습니다 (GuildMixer 우선순위 ducking).
     """
 
     _instance: Optional["VoiceManager"] = None
@@ -75,17 +84,12 @@ class VoiceManager:
         # 서버별 현재 재생 중인 오디오 타입
         self.current_type: Dict[str, Optional[AudioType]] = {}
 
-        # 서버별 TTS 끼어들기 상태
-        self.tts_interrupting: Dict[str, bool] = {}
-
-        # 서버별 음악 재시작 콜백
-        self.music_restart_callbacks: Dict[str, Optional[Callable]] = {}
-
-        # 서버별 재생 완료 이벤트
-        self.play_finished_events: Dict[str, asyncio.Event] = {}
+        # 서버별 오디오 믹서 (음악/퀴즈/TTS/효과음을 하나의 AudioSource 로 섞음)
+        self.mixers: Dict[str, GuildMixer] = {}
 
         # 서버별 락 (동시 접근 방지)
-        self.locks: Dict[str, asyncio.Lock] = {}
+        # 잡혀 있는 락은 버리지 않음 — 버리면 다음 호출이 새 락을 받아 동시 진입
+        self.locks = TTLMap(maxsize=GUILD_STATE_MAX, ttl=GUILD_STATE_TTL, keep=lambda _, lock: lock.locked())
 
         # 서버별 idle 타이머 태스크
         self.idle_tasks: Dict[str, asyncio.Task] = {}
@@ -93,14 +97,53 @@ class VoiceManager:
         # 서버별 듣기 모드 (VoiceRecvClient 사용 중)
         self.listening_guilds: set = set()
 
+        # 재생 CPU 측정용 직전 샘플 (monotonic, process_time)
+        self._cpu_sample = (time.monotonic(), time.process_time())
+
         self._initialized = True
         logger.info("VoiceManager 초기화 완료")
 
+    def get_mixer(self, guild_id: str) -> GuildMixer:
+        """서버별 믹서를 가져옵니다. 없으면 생성합니다."""
+        mixer = self.mixers.get(guild_id)
+        if mixer is None:
+            mixer = GuildMixer(guild_id, lambda: self.voice_clients.get(guild_id))
+            self.mixers[guild_id] = mixer
+        return mixer
+
+    def get_playback_stats(self) -> dict:
+        """음성 연결당 CPU 사용량과 인코딩/선인코딩 프레임 수 (직전 호출 이후 구간).
+
+        CPU 는 프로세스 전체 기준이라 음성 외 작업도 포함되지만, 연결 수에 따른 추세 비교용으로 충분하다.
+        """
+        now, cpu = time.monotonic(), time.process_time()
+        prev_now, prev_cpu = self._cpu_sample
+        self._cpu_sample = (now, cpu)
+        elapsed = max(now - prev_now, 1e-6)
+        connections = sum(1 for vc in self.voice_clients.values() if vc.is_connected())
+        cpu_percent = (cpu - prev_cpu) / elapsed * 100
+        pcm_frames = sum(m.pcm_frames for m in self.mixers.values())
+        opus_frames = sum(m.opus_frames for m in self.mixers.values())
+        return {
+            "voice_connections": connections,
+            "cpu_percent": round(cpu_percent, 2),
+            "cpu_percent_per_connection": round(cpu_percent / connections, 2) if connections else 0.0,
+            "pcm_frames": pcm_frames,
+            "opus_frames": opus_frames,
+            "opus_cache_hits": opus_cache.hits,
+            "opus_cache_misses": opus_cache.misses,
+        }
+
+    def clear_guild_state(self, guild_id: str):
+        """연결 해제 시 서버별 재생 상태를 정리합니다."""
+        self.current_type.pop(guild_id, None)
+        mixer = self.mixers.pop(guild_id, None)
+        if mixer:
+            mixer.close()
+
     def _get_lock(self, guild_id: str) -> asyncio.Lock:
         """서버별 락을 가져옵니다."""
-        if guild_id not in self.locks:
-            self.locks[guild_id] = asyncio.Lock()
-        return self.locks[guild_id]
+        return self.locks.get_or_create(guild_id, asyncio.Lock)
 
     async def join(self, channel: discord.VoiceChannel) -> bool:
         """음성 채널에 입장합니다."""
@@ -146,17 +189,13 @@ class VoiceManager:
             try:
                 if guild_id in self.voice_clients:
                     vc = self.voice_clients[guild_id]
+                    # 믹서 먼저 닫아야 vc.stop() 후 재시작하지 않음
+                    self.clear_guild_state(guild_id)
                     if vc.is_playing():
                         vc.stop()
                     await vc.disconnect()
                     del self.voice_clients[guild_id]
 
-                    # 상태 정리
-                    self.current_type.pop(guild_id, None)
-                    self.tts_interrupting.pop(guild_id, None)
-                    self.music_restart_callbacks.pop(guild_id, None)
-                    self.play_finished_events.pop(guild_id, None)
-
                     logger.info(f"음성 채널 퇴장: {guild_id}")
                     return True
                 return False
@@ -175,38 +214,27 @@ class VoiceManager:
         """음성 클라이언트를 가져옵니다."""
         return self.voice_clients.get(guild_id)
 
-    def set_music_restart_callback(self, guild_id: str, callback: Callable):
-        """음악 재시작 콜백을 설정합니다."""
-        self.music_restart_callbacks[guild_id] = callback
-
     def is_tts_interrupting(self, guild_id: str) -> bool:
-        """TTS가 음악을 끼어들기 중인지 확인합니다."""
-        return self.tts_interrupting.get(guild_id, False)
+        """TTS 때문에 음악이 줄어든(duck) 상태인지 확인합니다."""
+        mixer = self.mixers.get(guild_id)
+        return bool(mixer and mixer.is_ducking("music"))
 
-    async def play_tts(self, guild_id: str, audio_path: str, suppress_music_restart: bool = False) -> bool:
+    async def play_tts(self, guild_id: str, audio_path: str) -> bool:
         """
         TTS 오디오를 재생합니다. (음악보다 우선)
 
-        음악이 재생 중이면 정지하고 TTS 재생 후 재시작합니다.
+        음악은 멈추지 않고 믹서에서 줄어들었다가 TTS 가 끝나면 같은 위치에서 이어집니다.
         """
         if guild_id not in self.voice_clients:
             logger.warning(f"음성 채널에 연결되지 않음: {guild_id}")
             return False
 
-        vc = self.voice_clients[guild_id]
-        was_music_playing = False
-
-        # 음악 재생 중이면 정지 (TTS 끼어들기)
-        if vc.is_playing() and self.current_type.get(guild_id) == AudioType.MUSIC:
-            self.tts_interrupting[guild_id] = True
-            was_music_playing = True
-            vc.stop()  # pause 대신 stop (play()가 오디오 소스를 교체하므로)
-            logger.info("음악 정지 (TTS 끼어들기)")
-            await asyncio.sleep(0.1)  # 정지 완료 대기
-
         try:
-            # TTS 재생
-            self.current_type[guild_id] = AudioType.TTS
+            # 선인코딩된 Opus 가 있으면 ffmpeg/인코딩 없이 패킷 그대로 재생 (캐시 TTS, 효과음, 대사)
+            audio_source = await opus_cache.get_async(audio_path)
+            if audio_source is not None:
+                return await self.get_mixer(guild_id).play("tts", audio_source, PRIORITY_TTS)
+            opus_cache.schedule_encode(audio_path)
 
             # .pcm 파일: FFmpeg 없이 직접 재생 (GCloud TTS)
             if audio_path.endswith('.pcm'):
@@ -221,42 +249,18 @@ class VoiceManager:
                     options="-vn"
                 )
 
-            play_finished = asyncio.Event()
-
-            def after_playing(error):
-                if error:
-                    logger.error(f"TTS 재생 오류: {error}")
-                play_finished.set()
-
-            vc.play(audio_source, after=after_playing)
-            await play_finished.wait()
-
-            self.current_type[guild_id] = None
-            self.tts_interrupting[guild_id] = False
-
-            # TTS 완료 후 음악 재시작 (청크 모드에서는 마지막 청크만)
-            if was_music_playing and not suppress_music_restart:
-                callback = self.music_restart_callbacks.get(guild_id)
-                if callback:
-                    logger.info("음악 재시작 콜백 호출")
-                    asyncio.create_task(callback())
-                else:
-                    logger.warning("음악 재시작 콜백 없음")
-
-            return True
+            return await self.get_mixer(guild_id).play("tts", audio_source, PRIORITY_TTS)
 
         except Exception as e:
             logger.error(f"TTS 재생 실패: {e}")
-            self.tts_interrupting[guild_id] = False
-            self.current_type[guild_id] = None
             return False
 
     def is_music_playing(self, guild_id: str) -> bool:
         """음악이 재생 중인지 확인합니다."""
         if guild_id not in self.voice_clients:
             return False
-        vc = self.voice_clients[guild_id]
-        return (vc.is_playing() or vc.is_paused()) and self.current_type.get(guild_id) == AudioType.MUSIC
+        mixer = self.mixers.get(guild_id)
+        return bool(mixer and mixer.is_active("music")) and self.current_type.get(guild_id) == AudioType.MUSIC
 
     def set_music_playing(self, guild_id: str):
         """음악 재생 상태로 설정합니다."""
@@ -10,13 +10,22 @@
 - 하단 좌측 태그들
 """
 
+from __future__ import annotations
+
 import io
 import os
 import logging
 import aiohttp
-from PIL import Image, ImageDraw, ImageFont
 from typing import Optional, Dict, Any, Tuple
 
+from run.services.render_service import WelcomeImageJob, render_service
+from run.utils.lazy_import import lazy_import
+
+# 첫 환영 이미지 생성 때 로드
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+ImageFont = lazy_import("PIL.ImageFont")
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_WIDTH = 1024
@@ -40,7 +49,7 @@ class WelcomeImageGenerator:
         self._font_cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
         self._default_font_path = None
         self._bold_font_path = None
-        self._load_default_font()
+        self._fonts_loaded = False  # 첫 이미지 생성 때 폰트 탐색 (PIL import 지연)
 
     # ------------------------------------------------------------------
     # 폰트
@@ -84,6 +93,9 @@ class WelcomeImageGenerator:
 
     def _get_font(self, size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
         """폰트 캐싱"""
+        if not self._fonts_loaded:
+            self._load_default_font()
+            self._fonts_loaded = True
         path = (self._bold_font_path if bold and self._bold_font_path else self._default_font_path)
         key = (path, size)
         if key not in self._font_cache:
@@ -109,14 +121,13 @@ class WelcomeImageGenerator:
         ImageDraw.Draw(big).ellipse((0, 0, size * scale, size * scale), fill=255)
         return big.resize((size, size), Image.Resampling.LANCZOS)
 
-    async def _download_image(self, url: str) -> Optional[Image.Image]:
-        """URL에서 이미지 다운로드"""
+    async def _download_image(self, url: str) -> Optional[bytes]:
+        """URL에서 이미지 다운로드 (디코딩은 렌더 워커에서)"""
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url) as response:
                     if response.status == 200:
-                        data = await response.read()
-                        return Image.open(io.BytesIO(data)).convert('RGBA')
+                        return await response.read()
         except Exception as e:
             logger.error(f"[Welcome] 이미지 다운로드 실패: {e}")
         return None
@@ -309,6 +320,39 @@ class WelcomeImageGenerator:
         Returns:
             PNG 이미지 바이트
         """
+        # 렌더 워커가 run.core(봇 전체)를 import 하지 않도록 함수 안에서
+        from run.core.settings_snapshot import thaw
+
+        # 아바타 다운로드만 이벤트 루프에서, 합성/인코딩은 렌더 프로세스 풀에서
+        cfg = self._normalize_config(config, is_welcome, server_name)
+        avatar_image = None
+        if cfg.get('avatar', {}).get('enabled', True) and user_avatar_url:
+            avatar_image = await self._download_image(user_avatar_url)
+
+        return await render_service.render(WelcomeImageJob(
+            user_name=user_name,
+            server_name=server_name,
+            member_count=member_count,
+            is_welcome=is_welcome,
+            config=thaw(config) if config else None,  # 스냅샷(MappingProxy)은 pickle 불가
+            background_image=background_image,
+            avatar_image=avatar_image,
+        ))
+
+    def render(
+        self,
+        user_name: str,
+        server_name: str,
+        member_count: int,
+        is_welcome: bool = True,
+        config: Optional[Dict[str, Any]] = None,
+        background_image: Optional[bytes] = None,
+        avatar_image: Optional[bytes] = None,
+    ) -> bytes:
+        """이미지 합성 + PNG 인코딩 (동기, 렌더 워커 프로세스에서 실행)
+
+        avatar_image: 다운로드해 둔 아바타 원본 바이트 (없으면 아바타 생략)
+        """
         cfg = self._normalize_config(config, is_welcome, server_name)
 
         # --- 배경 ---
@@ -389,7 +433,12 @@ class WelcomeImageGenerator:
 
         # --- 아바타 ---
         if avatar_enabled:
-            avatar_img = await self._download_image(user_avatar_url)
+            avatar_img = None
+            if avatar_image:
+                try:
+                    avatar_img = Image.open(io.BytesIO(avatar_image)).convert('RGBA')
+                except Exception as e:
+                    logger.error(f"[Welcome] 아바타 디코딩 실패: {e}")
             if avatar_img:
                 avatar_img = avatar_img.resize((avatar_size, avatar_size), Image.Resampling.LANCZOS)
 
@@ -522,3 +571,14 @@ class WelcomeImageGenerator:
             member_count=member_count,
             is_welcome=is_welcome,
         )
+
+
+_worker_generator = None
+
+
+def get_worker_generator() -> WelcomeImageGenerator:
+    """렌더 워커 프로세스용 인스턴스 (폰트 캐시를 작업 간에 재사용)."""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = WelcomeImageGenerator()
+    return _worker_generator
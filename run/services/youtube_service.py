@@ -1,10 +1,13 @@
 import asyncio
 import discord
 from discord.ext import tasks
-from googleapiclient.discovery import build
 
 from run.core.config import YOUTUBE_API_KEY, ETERNAL_RETURN_CHANNEL_ID, get_guild_settings
 from run.core import config
+from run.utils.lazy_import import lazy_import
+
+# initialize_youtube 때 로드 (솔로봇은 YouTube 서비스를 쓰지 않음)
+discovery = lazy_import("googleapiclient.discovery")
 
 youtube = None
 bot_instance = None
@@ -40,7 +43,7 @@ async def initialize_youtube():
     global youtube
     if YOUTUBE_API_KEY:
         try:
-            youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+            youtube = discovery.build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
             print("[완료] 유튜브 API 초기화 완료 - 채널 메시지 기반 중복 체크 사용")
         except Exception as e:
             print(f"[오류] 유튜브 API 초기화 실패: {e}")
@@ -96,65 +99,60 @@ async def get_last_sent_video_id_from_channel(channel):
         print(f"[오류] 채널 '{channel.name}'에서 마지막 영상 ID 확인 중 오류: {e}")
     return None
 
+def _build_video_embed(video_id, snippet, is_shorts):
+    """영상 알림 embed. 쇼츠면 데비, 일반 영상이면 마를렌."""
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    if is_shorts:
+        char_color = 0x0000FF  # 파랑
+        char_image = "https://panel.debimarlene.com/assets/debi.png"
+        author_text = "데비가 새로운 쇼츠를 발견했어!"
+        action_text = "새로운 쇼츠를 발견했어!"
+    else:
+        char_color = 0xDC143C  # 빨강
+        char_image = "https://panel.debimarlene.com/assets/marlen.png"
+        author_text = "마를렌이 새로운 영상을 가져왔어."
+        action_text = "새로운 영상을 가져왔어."
+
+    embed = discord.Embed(
+        title=f"**{snippet['title']}**",
+        url=video_url,
+        description=snippet.get('description', '')[:150] + '...' if snippet.get('description') else action_text,
+        color=char_color
+    )
+    embed.set_author(name=author_text, icon_url=char_image)
+    embed.set_thumbnail(url=snippet['thumbnails']['high']['url'])
+    return embed
+
+
+def _build_video_messages(video_id, snippet, is_shorts):
+    """브로드캐스트 payload — 영상 URL(플레이어 미리보기) 다음에 캐릭터 embed."""
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    return [{"content": video_url}, {"embed": _build_video_embed(video_id, snippet, is_shorts).to_dict()}]
+
+
 async def _send_notification(channel_or_user, video_id, snippet, is_shorts=None):
-    """지정된 채널 또는 유저에게 알림을 보냅니다.
+    """지정된 채널 또는 유저에게 알림을 보냅니다 (수동 테스트용 — 자동 알림은 broadcast_service).
 
-    is_shorts 를 미리 넘기면 영상 길이 API 를 전송 대상마다 중복 호출하지 않음.
+    is_shorts 를 미리 넘기면 영상 길이 API 를 중복 호출하지 않음.
     """
     video_url = f"https://www.youtube.com/watch?v={video_id}"
     try:
         if is_shorts is None:
             is_shorts = await check_video_duration(video_id)
+        embed = _build_video_embed(video_id, snippet, is_shorts)
 
-        # 쇼츠면 데비, 일반 영상이면 마를렌
-        if is_shorts:
-            char_color = 0x0000FF  # 파랑
-            char_image = "https://panel.debimarlene.com/assets/debi.png"
-            author_text = "데비가 새로운 쇼츠를 발견했어!"
-            action_text = "새로운 쇼츠를 발견했어!"
-        else:
-            char_color = 0xDC143C  # 빨강
-            char_image = "https://panel.debimarlene.com/assets/marlen.png"
-            author_text = "마를렌이 새로운 영상을 가져왔어."
-            action_text = "새로운 영상을 가져왔어."
-
-        embed = discord.Embed(
-            title=f"**{snippet['title']}**",
-            url=video_url,
-            description=snippet.get('description', '')[:150] + '...' if snippet.get('description') else action_text,
-            color=char_color
-        )
-        embed.set_author(name=author_text, icon_url=char_image)
-        embed.set_thumbnail(url=snippet['thumbnails']['high']['url'])
-
-        # DM 메시지 전송
         sent_message = await channel_or_user.send(video_url)
         await channel_or_user.send(embed=embed)
 
-        # User에게 DM을 보낸 경우, 채널 정보를 GCS에 저장
+        # User에게 DM을 보낸 경우 DM 채널 정보 기록 (write-behind — 설정 전체를 다시 쓰지 않음)
         if isinstance(channel_or_user, (discord.User, discord.Member)) and sent_message:
             try:
                 from datetime import datetime
-                user_name = channel_or_user.display_name or channel_or_user.global_name or channel_or_user.name
-                user_id = str(channel_or_user.id)
-                channel_id = str(sent_message.channel.id)
-
-                # settings.json에 DM 채널 정보 저장
-                settings = await asyncio.to_thread(config.load_settings)
-                if 'users' not in settings:
-                    settings['users'] = {}
-
-                if user_id not in settings['users']:
-                    settings['users'][user_id] = {}
-
-                # DM 채널 정보 업데이트
-                settings['users'][user_id]['dm_channel_id'] = channel_id
-                settings['users'][user_id]['user_name'] = user_name
-                settings['users'][user_id]['last_dm'] = datetime.now().isoformat()
-
-                # GCS에 저장
-                await asyncio.to_thread(config.save_settings, settings)
-                print(f"  -> [저장] DM 채널 정보 GCS에 저장: {user_name} ({channel_id})")
+                await asyncio.to_thread(config.update_user, channel_or_user.id, {
+                    'dm_channel_id': str(sent_message.channel.id),
+                    'user_name': channel_or_user.display_name or channel_or_user.global_name or channel_or_user.name,
+                    'last_dm': datetime.now().isoformat(),
+                }, True)
             except Exception as save_error:
                 print(f"  -> [경고] DM 채널 정보 저장 실패 (메시지는 전송됨): {save_error}")
 
@@ -211,62 +209,29 @@ async def check_new_videos():
 
             print(f"[유튜브] 신규 영상 {len(videos_to_send)}개 처리 시작")
 
-            # 4. 동시 전송 폭주 방지 — 무제한 gather 는 길드 수백 × 전송이
-            #    Discord REST 429 폭발 + 게이트웨이 하트비트 누락(1006 끊김)을 유발
-            send_semaphore = asyncio.Semaphore(10)
-
-            async def send_to_guild(guild, video_id, snippet, is_shorts):
-                """개별 서버에 알림을 보내는 비동기 함수.
-
-                중복 방지는 상위 claim_video_id 가 전역으로 담당하므로 채널 history 를
-                다시 읽지 않는다. (전엔 길드마다 history(50) 조회가 전송 사이클을 9분까지
-                늘려 하트비트를 막던 주범이었고, 활발한 채널은 50개 밖으로 밀려나
-                중복도 못 막았다.)
-                """
-                async with send_semaphore:
-                    guild_settings = await asyncio.to_thread(config.get_guild_settings, guild.id)
-                    channel_id = guild_settings.get("ANNOUNCEMENT_CHANNEL_ID")
-                    if not channel_id:
-                        return
-                    channel = bot_instance.get_channel(int(channel_id))
-                    if not channel:
-                        print(f"  -> 서버 '{guild.name}' (ID: {guild.id}): 채널 ID {channel_id}를 찾을 수 없음")
-                        return
-                    print(f"  -> 서버 '{guild.name}' (ID: {guild.id})의 #{channel.name} 채널에 새 영상 전송")
-                    await _send_notification(channel, video_id, snippet, is_shorts)
-
-            async def send_to_user(user_id, video_id, snippet, is_shorts):
-                """개별 사용자에게 DM을 보내는 비동기 함수.
-
-                중복 방지는 상위 claim_video_id 가 전역으로 담당 → DM history 재조회 불필요.
-                """
-                async with send_semaphore:
-                    try:
-                        user = await bot_instance.fetch_user(user_id)
-                        print(f"  -> 구독자 '{user.name}#{user.discriminator}' (ID: {user_id})에게 DM 전송")
-                        await _send_notification(user, video_id, snippet, is_shorts)
-                    except discord.NotFound:
-                        print(f"  -> [오류] 구독자 ID({user_id})를 찾을 수 없습니다. 목록에서 제거를 고려해보세요.")
-                    except Exception as e:
-                        print(f"  -> [오류] 구독자 ID({user_id}) 처리 중 오류: {e}")
-
-            # 5. 각 영상을 순차로 전송 (길드/구독자는 세마포로 제한 동시)
-            subscribers = await asyncio.to_thread(config.get_youtube_subscribers)
-            print(f"  총 {len(subscribers)}명의 개인 구독자, {len(bot_instance.guilds)}개 서버")
+            # 4. 전송은 broadcast 엔진 — 대상은 설정 스냅샷에서 계산 (서버마다 Firestore 읽기 없음),
+            #    속도 제한 + 동시 전송 제한, 대상별 전달 기록(ledger)으로 재시작 시 이어서 전송.
+            #    DM 구독자는 샤드와 무관 → 멀티 워커 실행이면 primary 워커만 보낸다 (서버는 워커별 자기 샤드)
+            from run.services.broadcast_service import (
+                Broadcast, announcement_targets, get_broadcast_engine, youtube_subscriber_targets,
+            )
+            engine = get_broadcast_engine(bot_instance)
+            snapshot = await asyncio.to_thread(config.get_settings_snapshot)
+            targets = announcement_targets(snapshot, [str(guild.id) for guild in bot_instance.guilds])
+            if config.is_primary_worker():
+                targets += youtube_subscriber_targets(snapshot)
+            print(f"  대상 {len(targets)}개 (서버 {len(bot_instance.guilds)}개 기준)")
 
             for video in videos_to_send:
                 v_id = video['snippet']['resourceId']['videoId']
                 v_snippet = video['snippet']
                 print(f"- 영상 처리: {v_snippet.get('title', '')[:40]}")
 
-                # 쇼츠 여부는 영상당 1회만 — 전엔 전송 대상(수백)마다 중복 호출해 스레드풀 포화
+                # 쇼츠 여부는 영상당 1회만
                 v_is_shorts = await check_video_duration(v_id)
-
-                guild_tasks = [send_to_guild(guild, v_id, v_snippet, v_is_shorts) for guild in bot_instance.guilds]
-                user_tasks = [send_to_user(user_id, v_id, v_snippet, v_is_shorts) for user_id in subscribers]
-                all_tasks = guild_tasks + user_tasks
-                if all_tasks:
-                    await asyncio.gather(*all_tasks, return_exceptions=True)
+                await engine.run(Broadcast(
+                    f"youtube-{v_id}", "youtube", _build_video_messages(v_id, v_snippet, v_is_shorts), targets,
+                ))
 
             # SENT_VIDEO_IDS 등록은 전송 *전* claim_video_id 단계에서 이미 완료됨.
             print(f"[완료] 신규 영상 {len(videos_to_send)}개 전송 완료 (SENT_VIDEO_IDS 등록됨).")
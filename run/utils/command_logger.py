@@ -1,15 +1,12 @@
 """
 명령어 사용 로깅 유틸리티
 
-Discord 봇의 모든 명령어 사용 내역을 GCS에 기록합니다.
+Discord 봇의 모든 명령어 사용 내역을 run.services.command_log_store 파이프라인에 기록합니다
+(메모리 버퍼 → 주기적으로 chunk 문서 + 서버·일별 rollup 카운터).
 """
 
-import asyncio
-from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 
-KST = timezone(timedelta(hours=9))
-
 
 async def log_command_usage(
     command_name: str,
@@ -22,7 +19,7 @@ async def log_command_usage(
     args: Optional[Dict[str, Any]] = None
 ):
     """
-    명령어 사용을 GCS에 로깅합니다.
+    명령어 사용을 기록합니다 (메모리 버퍼에 넣기만 함 — Firestore 쓰기는 flush 때 묶어서).
 
     Args:
         command_name: 명령어 이름 (예: "전적", "통계", "설정")
@@ -35,21 +32,14 @@ async def log_command_usage(
         args: 명령어 인자 (dict 형식)
     """
     try:
-        from run.core import config
-
-        log_entry = {
-            "command_name": command_name,
-            "user_id": str(user_id),
-            "user_name": user_name,
-            "guild_id": str(guild_id) if guild_id else None,
-            "guild_name": guild_name,
-            "channel_id": str(channel_id) if channel_id else None,
-            "channel_name": channel_name,
-            "timestamp": datetime.now(KST).isoformat(),
-            "args": args or {}
-        }
-
-        await asyncio.to_thread(config.save_command_log, log_entry)
+        from run.services.command_log_store import command_logs
+
+        command_logs.record(
+            command_name, user_id, user_name,
+            guild_id=guild_id, guild_name=guild_name,
+            channel_id=channel_id, channel_name=channel_name,
+            args=args,
+        )
 
     except Exception as e:
         # 로깅 실패해도 명령어 실행에는 영향 없도록
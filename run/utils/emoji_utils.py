@@ -262,10 +262,15 @@ import aiohttp
 import base64
 import logging
 from datetime import time, datetime
-from PIL import Image, ImageDraw
+from run.utils.lazy_import import lazy_import
 from io import BytesIO
 from discord.ext import tasks
 from typing import Set
+from run.services.render_service import ItemEmojiJob, render_service
+
+# 아이템 이모지 합성 때만 로드
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
 
 # 아이템 등급별 배경 그라데이션 (하단 색상, 상단 색상) - dak.gg 소스 기준
 GRADE_COLORS = {
@@ -280,6 +285,66 @@ GRADE_COLORS = {
 logger = logging.getLogger(__name__)
 
 
+def render_emoji_png(image_data: bytes, width: int, height: int, grade: str = None) -> bytes:
+    """이모지 이미지 리사이즈 -> PNG (렌더 워커 프로세스에서 실행)
+
+    grade 가 지정되면 등급 색상 둥근 사각형 배경 위에 아이콘을 합성합니다.
+    """
+    # 리사이즈 (비율 유지, 투명 패딩)
+    img = Image.open(BytesIO(image_data))
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+
+    # 비율 유지하면서 캔버스에 꽉 차게 스케일 (확대/축소 모두)
+    scale = min(width / img.width, height / img.height)
+    new_w = int(img.width * scale)
+    new_h = int(img.height * scale)
+    img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+    # 등급 배경 합성 (grade가 지정된 경우)
+    if grade and grade in GRADE_COLORS:
+        bottom_color, top_color = GRADE_COLORS[grade]
+        canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        # 수직 그라데이션 생성 (위=어두운색, 아래=밝은색, dak.gg 0deg 방향)
+        gradient = Image.new('RGBA', (1, height))
+        for y_pos in range(height):
+            ratio = y_pos / (height - 1) if height > 1 else 0
+            r = int(top_color[0] + (bottom_color[0] - top_color[0]) * ratio)
+            g = int(top_color[1] + (bottom_color[1] - top_color[1]) * ratio)
+            b = int(top_color[2] + (bottom_color[2] - top_color[2]) * ratio)
+            gradient.putpixel((0, y_pos), (r, g, b, 255))
+        gradient = gradient.resize((width, height), Image.Resampling.NEAREST)
+        # 둥근 사각형 마스크
+        mask = Image.new('L', (width, height), 0)
+        mask_draw = ImageDraw.Draw(mask)
+        mask_draw.rounded_rectangle(
+            [(0, 0), (width - 1, height - 1)],
+            radius=16, fill=255
+        )
+        canvas.paste(gradient, (0, 0), mask)
+        # 아이콘을 배경보다 약간 작게 (패딩 8px)
+        icon_scale = min((width - 16) / img.width, (height - 16) / img.height)
+        icon_w = int(img.width * icon_scale)
+        icon_h = int(img.height * icon_scale)
+        icon = img.resize((icon_w, icon_h), Image.Resampling.LANCZOS)
+        ix = (width - icon_w) // 2
+        iy = (height - icon_h) // 2
+        canvas.paste(icon, (ix, iy), icon)
+        img_resized = canvas
+    else:
+        # 투명 캔버스에 중앙 배치
+        canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        x = (width - new_w) // 2
+        y = (height - new_h) // 2
+        canvas.paste(img, (x, y))
+        img_resized = canvas
+
+    # PNG로 인코딩
+    output = BytesIO()
+    img_resized.save(output, 'PNG', optimize=True)
+    return output.getvalue()
+
+
 class EmojiAutoUpdater:
     """
     이모지 자동 업데이트 관리 클래스
@@ -1046,59 +1111,8 @@ class EmojiAutoUpdater:
                     return False
                 image_data = await response.read()
 
-            # 2. 리사이즈 (비율 유지, 투명 패딩)
-            img = Image.open(BytesIO(image_data))
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-
-            # 비율 유지하면서 캔버스에 꽉 차게 스케일 (확대/축소 모두)
-            scale = min(width / img.width, height / img.height)
-            new_w = int(img.width * scale)
-            new_h = int(img.height * scale)
-            img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-            # 등급 배경 합성 (grade가 지정된 경우)
-            if grade and grade in GRADE_COLORS:
-                bottom_color, top_color = GRADE_COLORS[grade]
-                canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-                # 수직 그라데이션 생성 (위=어두운색, 아래=밝은색, dak.gg 0deg 방향)
-                gradient = Image.new('RGBA', (1, height))
-                for y_pos in range(height):
-                    ratio = y_pos / (height - 1) if height > 1 else 0
-                    r = int(top_color[0] + (bottom_color[0] - top_color[0]) * ratio)
-                    g = int(top_color[1] + (bottom_color[1] - top_color[1]) * ratio)
-                    b = int(top_color[2] + (bottom_color[2] - top_color[2]) * ratio)
-                    gradient.putpixel((0, y_pos), (r, g, b, 255))
-                gradient = gradient.resize((width, height), Image.Resampling.NEAREST)
-                # 둥근 사각형 마스크
-                mask = Image.new('L', (width, height), 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.rounded_rectangle(
-                    [(0, 0), (width - 1, height - 1)],
-                    radius=16, fill=255
-                )
-                canvas.paste(gradient, (0, 0), mask)
-                # 아이콘을 배경보다 약간 작게 (패딩 8px)
-                icon_scale = min((width - 16) / img.width, (height - 16) / img.height)
-                icon_w = int(img.width * icon_scale)
-                icon_h = int(img.height * icon_scale)
-                icon = img.resize((icon_w, icon_h), Image.Resampling.LANCZOS)
-                ix = (width - icon_w) // 2
-                iy = (height - icon_h) // 2
-                canvas.paste(icon, (ix, iy), icon)
-                img_resized = canvas
-            else:
-                # 투명 캔버스에 중앙 배치
-                canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-                x = (width - new_w) // 2
-                y = (height - new_h) // 2
-                canvas.paste(img, (x, y))
-                img_resized = canvas
-
-            # PNG로 인코딩
-            output = BytesIO()
-            img_resized.save(output, 'PNG', optimize=True)
-            png_data = output.getvalue()
+            # 2. 리사이즈 + 등급 배경 합성 (렌더 프로세스 풀)
+            png_data = await render_service.render(ItemEmojiJob(image_data, width, height, grade))
 
             # 3. Base64 인코딩
             base64_data = base64.b64encode(png_data).decode('utf-8')
@@ -0,0 +1,93 @@
+"""
+시작 import 프로파일링
+
+`python -X importtime` 출력은 인터프리터가 C 레벨 stderr 로 직접 쓰기 때문에 실행 중인 프로세스
+안에서는 가로챌 수 없다. 그래서 봇 시작 경로(main + setup_all_cogs 가 import 하는 Cog 모듈)를
+자식 프로세스에서 `-X importtime` 으로 import 해 보고, 패키지별 합계 표로 요약한다.
+
+    BOT_IMPORT_PROFILE=1 python main.py      # 부팅 전에 요약 출력
+    python scripts/bench_startup.py --importtime
+"""
+
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# main.py → setup_hook 에서 import 되는 모듈 (unified 기준, setup_all_cogs 와 맞출 것)
+STARTUP_MODULES = (
+    "main",
+    "run.cogs",
+    "run.cogs.eternal_return",
+    "run.cogs.voice",
+    "run.cogs.music",
+    "run.cogs.youtube",
+    "run.cogs.utility",
+    "run.cogs.welcome",
+    "run.cogs.stats",
+    "run.cogs.quiz",
+    "run.cogs.voice_listen",
+    "run.cogs.credits",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+_CHILD_CODE = (
+    "import importlib, sys\n"
+    "for name in sys.argv[1:]:\n"
+    "    try:\n"
+    "        importlib.import_module(name)\n"
+    "    except Exception as e:\n"
+    "        print(f'{name}: {type(e).__name__}: {e}', file=sys.stdout)\n"
+)
+
+
+def parse_importtime(text: str):
+    """-X importtime 출력 → [(self_us, cumulative_us, depth, module)]."""
+    entries = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cum_us, indent, name = match.groups()
+            entries.append((int(self_us), int(cum_us), (len(indent) - 1) // 2, name))
+    return entries
+
+
+def summarize(entries, top: int = 15) -> dict:
+    """전체 import 시간 + 최상위 패키지별 self 시간 합계 상위 top 개."""
+    total_us = sum(cum for _, cum, depth, _ in entries if depth == 0)
+    by_package = defaultdict(int)
+    for self_us, _, _, name in entries:
+        by_package[name.split(".", 1)[0]] += self_us
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(entries),
+        "packages": [(name, round(us / 1000, 1)) for name, us in ranked],
+    }
+
+
+def run_import_profile(modules=STARTUP_MODULES, top: int = 15, env=None) -> dict:
+    """자식 프로세스에서 modules 를 -X importtime 으로 import 하고 요약을 반환합니다."""
+    child_env = dict(os.environ if env is None else env)
+    child_env.pop("BOT_IMPORT_PROFILE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_CODE, *modules],
+        cwd=str(REPO_ROOT), env=child_env, capture_output=True, text=True,
+    )
+    summary = summarize(parse_importtime(proc.stderr), top=top)
+    summary["errors"] = [line for line in proc.stdout.splitlines() if line.strip()]
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"[import] 시작 경로 import {summary['total_ms']:.0f}ms (모듈 {summary['modules']}개)"]
+    for name, ms in summary["packages"]:
+        lines.append(f"  {name:<28} {ms:8.1f}ms")
+    for error in summary.get("errors", ()):
+        lines.append(f"  [실패] {error}")
+    return "\n".join(lines)
@@ -0,0 +1,64 @@
+"""
+무거운 선택 의존성 지연 import
+
+matplotlib / PIL / anthropic / openai / webrtcvad / davey / langgraph / googleapiclient 등은
+해당 기능을 처음 쓸 때까지 import 하지 않는다. 모듈 상단에서
+
+    anthropic = lazy_import("anthropic")
+    Image = lazy_import("PIL.Image")
+
+처럼 facade 를 만들어 두면 첫 속성 접근 시점에 실제 모듈을 불러온다 (이후엔 일반 모듈과 동일).
+주의: 모듈 수준 코드(데코레이터, def 시점 타입 힌트 등)에서 속성을 건드리면 그 자리에서 로드되므로
+타입 힌트는 `from __future__ import annotations` 또는 문자열로 둔다.
+
+첫 로드에 걸린 시간은 get_lazy_import_stats() 로 확인할 수 있다.
+"""
+
+import importlib
+import threading
+import time
+import types
+
+_load_times = {}  # 모듈 이름 -> 첫 로드 소요 (ms)
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """첫 속성 접근 때 실제 모듈을 import 하는 facade."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_target"]
+        if module is not None:
+            return module
+        with _lock:
+            module = self.__dict__["_lazy_target"]
+            if module is None:
+                t0 = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                _load_times[self.__name__] = round((time.perf_counter() - t0) * 1000, 1)
+                self.__dict__["_lazy_target"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """name 모듈의 지연 로딩 facade 를 반환합니다 (import 는 첫 사용 시)."""
+    return LazyModule(name)
+
+
+def get_lazy_import_stats() -> dict:
+    """지금까지 실제로 로드된 지연 모듈과 첫 로드 소요 (ms)."""
+    return dict(_load_times)
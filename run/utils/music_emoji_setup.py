@@ -12,7 +12,9 @@ import logging
 from io import BytesIO
 from typing import Dict
 
-from PIL import Image
+from run.utils.lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")  # 이모지가 없어 새로 만들 때만 로드
 
 logger = logging.getLogger(__name__)
 
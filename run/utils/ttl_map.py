@@ -0,0 +1,170 @@
+"""
+크기 상한 + TTL 만료가 있는 dict (채널 / 유저 / 서버별 상태 테이블용)
+
+봇이 오래 돌면 "한 번이라도 본" 채널·유저·서버마다 상태가 하나씩 쌓이고 지워지지 않는다
+(끼어들기 쿨다운, 스티키 재전송 시각, 듣기 모드, 서버별 락 / TTS 큐 ...). TTLMap 은
+마지막으로 쓴(또는 읽은) 뒤 ttl 초가 지난 항목과, maxsize 를 넘긴 가장 오래된 항목을 버린다.
+
+    self._state = TTLMap(maxsize=20000, ttl=6 * 3600)
+    st = self._state.get_or_create(key, _ChannelState)
+
+만료 순서: ttl 이 맵 하나에 고정이라 "마지막 갱신 순서 == 만료 순서". OrderedDict 한 줄이
+LRU 순서이자 만료 큐가 되어, 쓰기 때마다 맨 앞의 만료된 항목만 꺼내면 된다 (항목당 O(1),
+전체 스캔 / 타이머 태스크 없음). 읽을 때는 그 항목의 만료만 본다.
+
+keep(key, value) 가 True 인 항목(잡혀 있는 락, 비어 있지 않은 큐, 말하는 중인 감지기 등)은
+만료 / 상한에 걸려도 버리지 않고 ttl 만큼 연장한다 — 상한은 이런 항목 수만큼 넘을 수 있다.
+
+스레드 안전하지 않다 — 맵 하나는 한 스레드(보통 이벤트 루프)에서만 쓴다. 예외로 len() / values() /
+items() 는 맵을 고치지 않고 (만료 처리 없이 deadline 으로 거르기만) 복사본을 읽으므로, 메트릭 scrape
+스레드 같은 다른 스레드에서 불러도 된다.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+class _Entry:
+    __slots__ = ("value", "deadline")
+
+    def __init__(self, value, deadline: float):
+        self.value = value
+        self.deadline = deadline
+
+
+class TTLMap(MutableMapping):
+    """maxsize 개까지, 마지막 갱신 후 ttl 초까지만 보관하는 dict."""
+
+    def __init__(self, maxsize: int, ttl: float, touch_on_get: bool = True, keep=None, on_evict=None,
+                 clock=None):
+        """
+        Args:
+            maxsize: 최대 항목 수 (넘으면 가장 오래 안 쓴 것부터 버림)
+            ttl: 마지막 갱신 후 보관 시간 (초)
+            touch_on_get: 읽기도 갱신으로 칠지 (False 면 쓴 시각 기준 — 듣기 모드 같은 고정 만료)
+            keep: keep(key, value) 가 True 면 버리지 않고 연장
+            on_evict: on_evict(key, value) — 만료 / 상한으로 버릴 때 (del / pop 은 제외)
+            clock: 시간 함수 (기본 time.monotonic, soak 테스트에서 가짜 시계 주입)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.touch_on_get = touch_on_get
+        self.clock = clock or time.monotonic
+        self._keep = keep
+        self._on_evict = on_evict
+        self._data = OrderedDict()  # key -> _Entry, 앞쪽이 먼저 만료
+        self.evictions = 0
+
+    # --- 내부 ---
+
+    def _kept(self, key, entry: _Entry, now: float) -> bool:
+        if self._keep is None or not self._keep(key, entry.value):
+            return False
+        entry.deadline = now + self.ttl
+        self._data.move_to_end(key)
+        return True
+
+    def _evict(self, key, entry: _Entry):
+        del self._data[key]
+        self.evictions += 1
+        if self._on_evict is not None:
+            self._on_evict(key, entry.value)
+
+    def _expire(self, now: float):
+        """맨 앞부터 만료된 항목을 버림 (keep 항목은 뒤로 돌리되 한 바퀴까지만)."""
+        data = self._data
+        budget = len(data)
+        while data and budget:
+            key, entry = next(iter(data.items()))
+            if entry.deadline > now:
+                break
+            budget -= 1
+            if not self._kept(key, entry, now):
+                self._evict(key, entry)
+
+    def _shrink(self, now: float):
+        data = self._data
+        budget = len(data)
+        while len(data) > self.maxsize and budget:
+            key, entry = next(iter(data.items()))
+            budget -= 1
+            if not self._kept(key, entry, now):
+                self._evict(key, entry)
+
+    def _live(self, key, touch: bool):
+        """만료 안 된 항목 (없으면 None). 만료됐으면 그 자리에서 버림."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        now = self.clock()
+        if entry.deadline <= now:
+            if not self._kept(key, entry, now):
+                self._evict(key, entry)
+                return None
+        elif touch:
+            entry.deadline = now + self.ttl
+            self._data.move_to_end(key)
+        return entry
+
+    def _live_entries(self):
+        """만료 안 된 (key, entry) 복사본. 맵을 고치지 않음 — 만료 / 상한 처리는 쓰기 때 소유 스레드에서."""
+        now = self.clock()
+        keep = self._keep
+        return [(key, entry) for key, entry in list(self._data.items())
+                if entry.deadline > now or (keep is not None and keep(key, entry.value))]
+
+    # --- dict 인터페이스 ---
+
+    def __getitem__(self, key):
+        entry = self._live(key, self.touch_on_get)
+        if entry is None:
+            raise KeyError(key)
+        return entry.value
+
+    def __setitem__(self, key, value):
+        now = self.clock()
+        self._expire(now)
+        entry = self._data.get(key)
+        if entry is None:
+            self._data[key] = _Entry(value, now + self.ttl)
+            self._shrink(now)
+        else:
+            entry.value = value
+            entry.deadline = now + self.ttl
+            self._data.move_to_end(key)
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __contains__(self, key) -> bool:
+        return self._live(key, touch=False) is not None
+
+    def __iter__(self):
+        self._expire(self.clock())
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._live_entries())
+
+    def values(self):
+        """만료 안 된 값 목록 (갱신으로 치지 않음 — 메트릭 집계용, 다른 스레드에서 호출 가능)."""
+        return [entry.value for _, entry in self._live_entries()]
+
+    def items(self):
+        return [(key, entry.value) for key, entry in self._live_entries()]
+
+    def clear(self):
+        self._data.clear()
+
+    def get_or_create(self, key, factory):
+        """있으면 그 값 (갱신), 없으면 factory() 를 넣고 반환."""
+        entry = self._live(key, touch=True)
+        if entry is not None:
+            return entry.value
+        value = factory()
+        self[key] = value
+        return value
+
+    def setdefault(self, key, default=None):
+        return self.get_or_create(key, lambda: default)
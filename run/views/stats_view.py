@@ -5,8 +5,7 @@ Components V2 기반 레이아웃 (Section + Thumbnail)으로 메인 전적을 
 최근전적/통계(그래프)/유니온 등 embed가 필요한 화면은 StatsView로 전환.
 """
 import discord
-import tempfile
-import os
+import io
 import asyncio
 import logging
 from typing import Optional, List, Dict, Any
@@ -24,7 +23,7 @@ from run.services.eternal_return.api_client import (
     extract_team_members_info,
     game_data
 )
-from run.services.eternal_return.graph_generator import save_mmr_graph_to_file
+from run.services.render_service import MmrGraphJob, render_service
 from run.utils.emoji_utils import (
     get_character_emoji,
     get_tier_emoji,
@@ -37,6 +36,12 @@ from run.utils.emoji_utils import (
 )
 
 
+async def _render_mmr_graph(mmr_history, nickname) -> Optional[bytes]:
+    """MMR 그래프 PNG (렌더 프로세스 풀에서 생성)"""
+    history = tuple(tuple(entry) for entry in mmr_history)
+    return await render_service.render(MmrGraphJob(history, nickname))
+
+
 class StatsLayoutView(discord.ui.LayoutView):
     """Components V2 기반 전적 조회 UI (Section + Thumbnail 레이아웃)"""
 
@@ -273,18 +278,12 @@ class StatsLayoutView(discord.ui.LayoutView):
         self.add_item(discord.ui.Container(discord.ui.TextDisplay("\n".join(lines))))
 
         # 그래프 이미지 (MediaGallery로 인라인 표시)
-        graph_path = None
         file_attachment = None
         if mmr_history and len(mmr_history) >= 2:
             try:
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                    graph_path = save_mmr_graph_to_file(
-                        mmr_history,
-                        self.player_data.get('nickname', '플레이어'),
-                        tmp_file.name
-                    )
-                if graph_path and os.path.exists(graph_path):
-                    file_attachment = discord.File(graph_path, filename="mmr_graph.png")
+                graph_png = await _render_mmr_graph(mmr_history, self.player_data.get('nickname', '플레이어'))
+                if graph_png:
+                    file_attachment = discord.File(io.BytesIO(graph_png), filename="mmr_graph.png")
                     self.add_item(discord.ui.MediaGallery(
                         discord.MediaGalleryItem(media="attachment://mmr_graph.png")
                     ))
@@ -298,9 +297,6 @@ class StatsLayoutView(discord.ui.LayoutView):
         else:
             await interaction.edit_original_response(view=self)
 
-        if graph_path and os.path.exists(graph_path):
-            os.unlink(graph_path)
-
     async def _build_recent_game(self, interaction):
         """최근전적 한 게임을 LayoutView로 표시"""
         game = self._recent_games[self._recent_index]
@@ -764,17 +760,13 @@ class StatsView(discord.ui.View):
         embed = discord.Embed(title=f"{self.player_data['nickname']}님의 통계", color=0xE67E22)
         stats = self.player_data.get('stats', {})
         file_attachment = None
-        graph_path = None
         mmr_history = self.player_data.get('mmr_history', [])
 
         if mmr_history and len(mmr_history) >= 2:
             try:
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                    graph_path = save_mmr_graph_to_file(
-                        mmr_history, self.player_data.get('nickname', '플레이어'), tmp_file.name
-                    )
-                if graph_path and os.path.exists(graph_path):
-                    file_attachment = discord.File(graph_path, filename="mmr_graph.png")
+                graph_png = await _render_mmr_graph(mmr_history, self.player_data.get('nickname', '플레이어'))
+                if graph_png:
+                    file_attachment = discord.File(io.BytesIO(graph_png), filename="mmr_graph.png")
                     embed.set_image(url="attachment://mmr_graph.png")
             except Exception as e:
                 print(f"그래프 생성 오류: {e}")
@@ -791,8 +783,6 @@ class StatsView(discord.ui.View):
 
         if file_attachment:
             await interaction.edit_original_response(embed=embed, attachments=[file_attachment], view=self)
-            if graph_path:
-                os.unlink(graph_path)
         else:
             await interaction.edit_original_response(embed=embed, view=self)
 
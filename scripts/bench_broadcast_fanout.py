@@ -0,0 +1,291 @@
+"""알림 브로드캐스트 dry-run 벤치마크 — 기존 fan-out 루프 vs broadcast 엔진 (Discord HTTP 는 mock).
+
+사용법:
+    python3 scripts/bench_broadcast_fanout.py [--guilds 5000] [--subscribers 20000] [--other-users 30000] [--speed 200]
+
+유튜브 새 영상 알림 한 건(영상 URL + embed 2 메시지)을 서버 공지 채널 + DM 구독자에게 보낸다.
+mock Discord 는 라우트별 버킷(채널당 5건/5초, DM 열기 2건/1초 등)과 전역 50건/초 한도를 두고,
+넘치면 429 + retry_after 를 돌려준다. 요청 지연은 --latency, Firestore RPC 는 --fs-latency.
+--speed 배로 시간을 압축해서 돌린다 (출력의 '환산' 은 실제 시간 기준으로 되돌린 값).
+    legacy → 세마포 10, 서버마다 설정 문서 읽기, DM 마다 fetch_user + DM 열기 + 설정 저장 (변경 전 동작)
+    engine → BroadcastEngine (스냅샷 대상, 토큰 버킷, ledger, 끝에 batch 기록 1회)
+             결과 기록은 실제 _write_settings → config.update_docs → write-behind 큐 경로를 그대로 탄다
+             (SETTINGS_BACKEND=firestore, 스냅샷은 구독자 + --other-users 명). 가짜는 Firestore 클라이언트
+             (batch.commit) 뿐이라 '커밋' 은 batch 커밋 수, '문서' 는 실제로 쓴 문서 수다.
+    resume → engine 을 절반쯤에서 강제 중단 → 새 엔진으로 resume_pending, 중복/누락 전송 수 확인
+"""
+
+import argparse
+import asyncio
+import collections
+import sys
+import tempfile
+import threading
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.core import config  # noqa: E402
+from run.core.settings_snapshot import SettingsSnapshot  # noqa: E402
+from run.services.broadcast_service import (  # noqa: E402
+    Broadcast, BroadcastEngine, BroadcastHTTPError, _write_settings, announcement_targets,
+    youtube_subscriber_targets,
+)
+
+CHANNEL_BASE = 10_000_000
+DM_BASE = 50_000_000
+
+# 라우트 → (한도, 창 길이 초). 실제 Discord 버킷 값에 가깝게.
+ROUTE_LIMITS = {
+    "send": (5, 5.0),       # POST /channels/{id}/messages (채널별)
+    "delete": (5, 1.0),     # DELETE /channels/{id}/messages/{id} (채널별)
+    "open_dm": (2, 1.0),    # POST /users/@me/channels
+    "fetch_user": (30, 1.0),
+}
+GLOBAL_LIMIT = (50, 1.0)
+
+
+class MockDiscord:
+    """라우트 버킷 + 전역 한도를 흉내 내는 transport (BroadcastEngine transport 인터페이스)."""
+
+    def __init__(self, speed: float, latency: float):
+        self.speed = speed
+        self.latency = latency / speed
+        self._hits = collections.defaultdict(collections.deque)
+        self.requests = 0
+        self.rate_limited = 0
+        self.sends = collections.Counter()  # channel_id -> 전송 수
+        self.on_send = None
+
+    def _check(self, bucket, limit, window, is_global=False):
+        window /= self.speed
+        now = time.monotonic()
+        hits = self._hits[bucket]
+        while hits and now - hits[0] >= window:
+            hits.popleft()
+        if len(hits) >= limit:
+            self.rate_limited += 1
+            raise BroadcastHTTPError(429, "rate limited", hits[0] + window - now, is_global)
+        hits.append(now)
+
+    async def _request(self, route, major):
+        self.requests += 1
+        self._check("global", *GLOBAL_LIMIT, is_global=True)
+        self._check((route, major), *ROUTE_LIMITS[route])
+        await asyncio.sleep(self.latency)
+
+    def has_channel(self, channel_id):
+        return True
+
+    def channel_name(self, channel_id):
+        return f"ch-{channel_id}"
+
+    async def fetch_user(self, user_id):
+        await self._request("fetch_user", None)
+        return user_id
+
+    async def open_dm(self, user_id):
+        await self._request("open_dm", None)
+        return DM_BASE + user_id
+
+    async def send(self, channel_id, message):
+        await self._request("send", channel_id)
+        self.sends[channel_id] += 1
+        if self.on_send:
+            self.on_send()
+        return self.requests
+
+    async def delete(self, channel_id, message_id):
+        await self._request("delete", channel_id)
+
+
+class MockFirestore:
+    def __init__(self, speed: float, latency: float):
+        self.latency = latency / speed
+        self.reads = 0
+        self.writes = 0          # RPC (batch 커밋) 수
+        self.docs_written = 0    # 쓴 문서 수
+        self._lock = threading.Lock()
+
+    async def read(self, docs=1):
+        self.reads += docs
+        await asyncio.sleep(self.latency)
+
+    async def write(self, docs=1):
+        self.writes += 1
+        self.docs_written += docs
+        await asyncio.sleep(self.latency)
+
+    def client(self):
+        """write-behind 큐가 쓰는 google.cloud.firestore.Client 흉내 (batch 커밋만, 스레드에서 호출)."""
+        fs = self
+
+        class Batch:
+            def __init__(self):
+                self.ops = 0
+
+            def set(self, ref, data, merge=None):
+                self.ops += 1
+
+            def commit(self):
+                time.sleep(fs.latency)
+                with fs._lock:
+                    fs.writes += 1
+                    fs.docs_written += self.ops
+
+        return types.SimpleNamespace(
+            batch=Batch,
+            collection=lambda name: types.SimpleNamespace(document=lambda doc_id=None: (name, doc_id)),
+        )
+
+
+def build_snapshot(guilds: int, subscribers: int, other_users: int = 0) -> SettingsSnapshot:
+    users = {
+        # 절반은 예전에 DM 을 받아서 dm_channel_id 가 저장돼 있다
+        str(i): {"youtube_subscribed": True, **({"dm_channel_id": str(DM_BASE + i)} if i % 2 else {})}
+        for i in range(1, subscribers + 1)
+    }
+    # 구독하지 않은 유저 문서 — 대상은 아니지만 스냅샷 갱신 비용에는 들어간다
+    users.update({str(i): {"credits": 0} for i in range(subscribers + 1, subscribers + other_users + 1)})
+    return SettingsSnapshot.from_dict({
+        "guilds": {str(i): {"ANNOUNCEMENT_CHANNEL_ID": str(CHANNEL_BASE + i)} for i in range(guilds)},
+        "users": users,
+        "global": {},
+    })
+
+
+MESSAGES = [
+    {"content": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"},
+    {"embed": {"title": "**새 영상**", "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "color": 0xDC143C}},
+]
+
+
+async def run_legacy(snapshot, transport: MockDiscord, fs: MockFirestore):
+    """변경 전 check_new_videos 의 전송 부분."""
+    semaphore = asyncio.Semaphore(10)
+
+    async def call(fn, *args):
+        # discord.py 는 429 면 retry_after 만큼 자고 재시도한다
+        while True:
+            try:
+                return await fn(*args)
+            except BroadcastHTTPError as e:
+                if e.status != 429:
+                    raise
+                await asyncio.sleep(e.retry_after)
+
+    async def send_to_guild(guild_id):
+        async with semaphore:
+            await fs.read()  # config.get_guild_settings
+            channel_id = int(snapshot.get_guild(guild_id)["ANNOUNCEMENT_CHANNEL_ID"])
+            for message in MESSAGES:
+                await call(transport.send, channel_id, message)
+
+    async def send_to_user(user_id):
+        async with semaphore:
+            await call(transport.fetch_user, user_id)
+            channel_id = await call(transport.open_dm, user_id)  # user.send 가 DM 채널을 연다
+            for message in MESSAGES:
+                await call(transport.send, channel_id, message)
+            # load_settings 는 listener 캐시라 RPC 없음, save_settings 는 바뀐 사용자 문서 1개 쓰기
+            await fs.write()
+
+    await asyncio.gather(
+        *(send_to_guild(guild_id) for guild_id in snapshot.guilds),
+        *(send_to_user(int(user_id)) for user_id, doc in snapshot.users.items()
+          if doc.get("youtube_subscribed")),
+    )
+
+
+def make_writer(snapshot, fs: MockFirestore, timings: dict):
+    """실제 _write_settings 를 부르는 writer — 그 전에 config 를 firestore 모드 + 이 스냅샷으로 맞춘다."""
+    async def writer(engine, broadcast, results, summary):
+        config.SETTINGS_BACKEND = "firestore"
+        config._listeners_active = True  # listener 가 살아 있는 봇처럼 (스냅샷 참조만 읽음)
+        config._snapshot = snapshot
+        config.write_queue._client_getter = fs.client
+        t0, cpu0 = time.perf_counter(), time.process_time()
+        await _write_settings(engine, broadcast, results, summary)
+        timings["wall"] = time.perf_counter() - t0
+        timings["cpu"] = time.process_time() - cpu0
+    return writer
+
+
+def make_broadcast(snapshot, broadcast_id="youtube-bench"):
+    targets = announcement_targets(snapshot, list(snapshot.guilds)) + youtube_subscriber_targets(snapshot)
+    return Broadcast(broadcast_id, "youtube", MESSAGES, targets)
+
+
+def _report(name, elapsed, speed, transport, fs, targets):
+    print(f"{name:<7} 대상 {targets:>6} | {elapsed:6.2f}s (환산 {elapsed * speed / 60:6.1f}분) | "
+          f"요청 {transport.requests:>6} 429 {transport.rate_limited:>6} | "
+          f"Firestore 읽기 {fs.reads:>10} 커밋 {fs.writes:>6} 문서 {fs.docs_written:>6}")
+
+
+async def main_async(args):
+    snapshot = build_snapshot(args.guilds, args.subscribers, args.other_users)
+    targets = args.guilds + args.subscribers
+    rate = args.rate * args.speed
+
+    if not args.skip_legacy:
+        transport, fs = MockDiscord(args.speed, args.latency), MockFirestore(args.speed, args.fs_latency)
+        t0 = time.perf_counter()
+        await run_legacy(snapshot, transport, fs)
+        _report("legacy", time.perf_counter() - t0, args.speed, transport, fs, targets)
+
+    with tempfile.TemporaryDirectory() as ledger_dir:
+        transport, fs = MockDiscord(args.speed, args.latency), MockFirestore(args.speed, args.fs_latency)
+        timings = {}
+        engine = BroadcastEngine(transport, rate=rate, concurrency=args.concurrency,
+                                 ledger_dir=Path(ledger_dir), writer=make_writer(snapshot, fs, timings))
+        t0 = time.perf_counter()
+        summary = await engine.run(make_broadcast(snapshot))
+        _report("engine", time.perf_counter() - t0, args.speed, transport, fs, targets)
+        print(f"        요약 {summary}")
+        print(f"        설정 기록 (update_docs + flush, 유저 문서 {len(snapshot.users)}개 스냅샷) "
+              f"{timings.get('wall', 0):.2f}s, CPU {timings.get('cpu', 0):.2f}s")
+
+    # 절반쯤 보낸 시점에 프로세스가 죽은 것처럼 중단 → 새 엔진이 ledger 로 이어서 전송
+    with tempfile.TemporaryDirectory() as ledger_dir:
+        transport, fs = MockDiscord(args.speed, args.latency), MockFirestore(args.speed, args.fs_latency)
+        broadcast = make_broadcast(snapshot, "youtube-resume")
+        first = BroadcastEngine(transport, rate=rate, concurrency=args.concurrency,
+                                ledger_dir=Path(ledger_dir), writer=make_writer(snapshot, fs, {}))
+        task = asyncio.create_task(first.run(broadcast))
+        stop_at = targets * len(MESSAGES) // 2
+        transport.on_send = lambda: task.cancel() if sum(transport.sends.values()) >= stop_at else None
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        transport.on_send = None
+        sent_before = sum(transport.sends.values())
+        second = BroadcastEngine(transport, rate=rate, concurrency=args.concurrency,
+                                 ledger_dir=Path(ledger_dir), writer=make_writer(snapshot, fs, {}))
+        summaries = await second.resume_pending()
+        expected = {target.channel_id or DM_BASE + target.user_id: len(MESSAGES) for target in broadcast.targets}
+        duplicates = sum(max(0, transport.sends[ch] - n) for ch, n in expected.items())
+        missing = sum(max(0, n - transport.sends[ch]) for ch, n in expected.items())
+        print(f"resume  중단 전 메시지 {sent_before}건 → 재개 요약 {summaries[0] if summaries else None}")
+        print(f"        중복 전송 {duplicates} (중단 순간 진행 중이던 대상만), 누락 {missing}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=5000)
+    parser.add_argument("--subscribers", type=int, default=20000)
+    parser.add_argument("--other-users", type=int, default=30000, help="구독하지 않은 유저 문서 수 (스냅샷 크기)")
+    parser.add_argument("--speed", type=float, default=200.0, help="시간 압축 배수")
+    parser.add_argument("--latency", type=float, default=0.08, help="Discord 요청 지연 (초)")
+    parser.add_argument("--fs-latency", type=float, default=0.03, help="Firestore RPC 지연 (초)")
+    parser.add_argument("--rate", type=float, default=40.0, help="엔진 초당 요청 수 (압축 전)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""on_message 디스패치 벤치마크 — 메시지당 설정 조회 비용 (기존 load_settings 스캔 vs 채널 기능 색인).
+
+사용법:
+    python3 scripts/bench_on_message.py [--guilds 3000] [--messages 200000]
+
+메시지 하나가 거치는 설정 조회를 흉내낸다 (스티키 → TTS → ChatCog → ChimeInCog).
+    legacy → 핸들러마다 load_settings() 얕은 복사 + guild dict 조회 + sticky_messages 스캔
+             (get_solo_chat_channels 의 Firestore 단건 read 는 네트워크라 제외 — 실제로는 더 느림)
+    index  → get_channel_features(channel_id) dict 조회 (기능 없는 채널은 여기서 끝)
+설정은 snapshot listener callback 에 가짜 문서를 넣어 실제 색인 경로로 만든다.
+"""
+
+import argparse
+import random
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.core import config  # noqa: E402
+
+
+class _Doc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Change:
+    def __init__(self, doc):
+        self.type = types.SimpleNamespace(name="ADDED")
+        self.document = doc
+
+
+def build_settings(n_guilds: int, rng: random.Random):
+    """서버마다 채널 20개, 그중 일부에만 TTS/스티키/솔로 채널 지정."""
+    changes = []
+    channels = []
+    for g in range(n_guilds):
+        gid = str(10_000 + g)
+        base = 1_000_000 + g * 100
+        guild_channels = [base + c for c in range(20)]
+        channels.extend(guild_channels)
+        data = {"GUILD_NAME": f"guild {g}", "chat_enabled": True,
+                "stats": {"daily": {}, "members": {}, "logs": []}}
+        if rng.random() < 0.3:
+            data["tts_channel_id"] = str(guild_channels[0])
+        if rng.random() < 0.2:
+            data["sticky_messages"] = [
+                {"channelId": str(guild_channels[1]), "enabled": True, "content": "공지", "lastMessageId": "1"},
+                {"channelId": str(guild_channels[2]), "enabled": False, "content": "꺼짐"},
+            ]
+        if rng.random() < 0.1:
+            data["solo_chat_channels"] = {"debi": [guild_channels[3]]}
+        changes.append(_Change(_Doc(gid, data)))
+    return changes, channels
+
+
+def legacy_dispatch(guild_id: str, channel_id: int):
+    channel_id_str = str(channel_id)
+    # 스티키
+    settings = config.load_settings()
+    sticky_messages = settings.get("guilds", {}).get(guild_id, {}).get("sticky_messages", [])
+    [sm for sm in sticky_messages if str(sm.get("channelId", "")) == channel_id_str and sm.get("enabled")]
+    # TTS
+    settings = config.load_settings()
+    settings.get("guilds", {}).get(guild_id, {}).get("tts_channel_id") == channel_id_str
+    # ChatCog / ChimeInCog 대화 토글
+    for _ in range(2):
+        config.load_settings().get("guilds", {}).get(guild_id, {}).get("chat_enabled", True)
+
+
+def index_dispatch(guild_id: str, channel_id: int):
+    # 봇 on_message + ChatCog + ChimeInCog 각각 한 번씩
+    for _ in range(3):
+        features = config.get_channel_features(channel_id)
+        if features is None:
+            continue
+        _ = features.stickies, features.tts, features.solo_identities
+
+
+def run(label, fn, messages):
+    t0 = time.perf_counter()
+    for gid, cid in messages:
+        fn(gid, cid)
+    elapsed = time.perf_counter() - t0
+    print(f"[{label:>6}] 메시지당 {elapsed / len(messages) * 1e6:.2f}µs | 총 {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--guilds", type=int, default=3000)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    changes, channels = build_settings(args.guilds, rng)
+    config._listeners_active = True
+    t0 = time.perf_counter()
+    config._on_guilds_snapshot(None, changes, None)
+    print(f"[setup] 서버 {args.guilds}개 첫 snapshot + 색인 {time.perf_counter() - t0:.2f}s")
+
+    messages = []
+    for _ in range(args.messages):
+        cid = rng.choice(channels)
+        messages.append((str(10_000 + (cid - 1_000_000) // 100), cid))
+
+    featured = sum(1 for _, cid in messages if config.get_channel_features(cid) is not None)
+    print(f"[setup] 기능 있는 채널 메시지 비율 {featured / len(messages) * 100:.1f}%")
+
+    run("legacy", legacy_dispatch, messages)
+    run("index", index_dispatch, messages)
+
+
+if __name__ == "__main__":
+    main()
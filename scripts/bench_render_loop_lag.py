@@ -0,0 +1,123 @@
+"""렌더링 중 이벤트 루프 지연 벤치마크 — 루프에서 직접 렌더링 (기존) vs 렌더 프로세스 풀.
+
+사용법:
+    python3 scripts/bench_render_loop_lag.py [--jobs 30] [--workers 2] [--interval 0.01]
+
+환영 이미지 / MMR 그래프 / 아이템 이모지 작업을 섞어 jobs 개 요청하는 동안
+interval 마다 깨어나는 ticker 태스크의 지연(예정 시각 대비 늦은 정도)을 잰다.
+gateway heartbeat 나 다른 인터랙션 응답이 겪는 지연이 이 값이다.
+    inline → job.run() 을 코루틴 안에서 바로 호출 (변경 전 동작)
+    pool   → render_service.render(job) (ProcessPoolExecutor, warm-up 후 측정)
+입력 이미지는 랜덤 노이즈로 만든다 (실제 아바타/배경 크기 기준).
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services.render_service import (  # noqa: E402
+    ItemEmojiJob, MmrGraphJob, RenderService, WelcomeImageJob,
+)
+
+
+def _noise_image(width: int, height: int, fmt: str, seed: int) -> bytes:
+    from PIL import Image
+    rng = random.Random(seed)
+    img = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def build_jobs(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    avatar = _noise_image(512, 512, "PNG", seed)
+    background = _noise_image(1920, 1080, "JPEG", seed + 1)
+    item = _noise_image(256, 256, "PNG", seed + 2)
+    history, mmr = [], 5000
+    for day in range(30):
+        mmr += rng.randint(-80, 100)
+        history.append((20250801 + day, mmr, mmr, mmr))
+    makers = [
+        lambda i: WelcomeImageJob(f"유저{i}", "테스트 서버", 1000 + i, config={"tags": ["신규", "환영"]},
+                                  background_image=background, avatar_image=avatar),
+        lambda i: MmrGraphJob(tuple(history), f"플레이어{i}"),
+        lambda i: ItemEmojiJob(item, 128, 128, "Epic"),
+    ]
+    return [makers[i % len(makers)](i) for i in range(n)]
+
+
+async def _ticker(interval: float, lags: list, stop: asyncio.Event):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def _run_mode(mode: str, jobs, service: RenderService, interval: float, concurrency: int):
+    lags, stop = [], asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(job):
+        async with semaphore:
+            if mode == "inline":
+                job.run()
+                await asyncio.sleep(0)
+            else:
+                await service.render(job)
+
+    ticker = asyncio.create_task(_ticker(interval, lags, stop))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(job) for job in jobs))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await ticker
+    return elapsed, lags
+
+
+def _report(mode: str, elapsed: float, lags: list, n_jobs: int):
+    ordered = sorted(lags) or [0.0]
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{mode:<7} 작업 {n_jobs}개 {elapsed:6.2f}s ({n_jobs / elapsed:5.1f}/s) | "
+          f"루프 지연 p50 {statistics.median(ordered):7.1f}ms  p99 {p99:7.1f}ms  max {ordered[-1]:7.1f}ms")
+
+
+async def main_async(args):
+    jobs = build_jobs(args.jobs)
+    service = RenderService(workers=args.workers, timeout=args.timeout)
+
+    # inline 도 첫 import/폰트 탐색 비용은 빼고 비교 (각 작업 종류 1회씩)
+    for job in jobs[:3]:
+        job.run()
+    t0 = time.perf_counter()
+    await service.start()
+    print(f"렌더 워커 {args.workers}개 warm-up {time.perf_counter() - t0:.2f}s")
+
+    for mode in ("inline", "pool"):
+        elapsed, lags = await _run_mode(mode, jobs, service, args.interval, args.concurrency)
+        _report(mode, elapsed, lags, len(jobs))
+    print(f"pool 통계: {service.get_stats()}")
+    service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 요청하는 작업 수")
+    parser.add_argument("--interval", type=float, default=0.01, help="ticker 주기 (초)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""노래 퀴즈 정답 판정 벤치마크 — 초당 판정 수 (기존 difflib vs 선계산 인덱스).
+
+사용법:
+    python3 scripts/bench_song_matcher.py [--messages 20000]
+
+기존 방식은 메시지마다 곡의 제목/가수/별칭을 다시 정규화하고 difflib 로 비교했다.
+새 방식은 곡당 1회 정규화+자모 분해 후, 메시지는 1회만 정규화해 편집거리 상한 비교.
+오타 정답률(한글 받침/모음 오타)도 함께 출력한다.
+"""
+
+import argparse
+import difflib
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services.quiz.song_quiz import (  # noqa: E402
+    DEFAULT_SONG_LIST, SIMILARITY_THRESHOLD, check_answer,
+)
+
+CHATTER = [
+    "ㅋㅋㅋㅋ", "이거 뭐더라", "아 알 것 같은데", "모르겠다", "진짜 들어본 건데",
+    "스킵하자", "ㄹㅇ 어렵네", "와 이거 명곡", "다음 문제", "힌트 줘",
+]
+
+
+def _legacy_normalize(text):
+    text = text.lower().strip()
+    text = re.sub(r'[^\w\s가-힣]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text
+
+
+def _legacy_match(normalized, target):
+    if not target:
+        return False
+    if target in normalized or normalized in target:
+        return True
+    return difflib.SequenceMatcher(None, normalized, target).ratio() >= SIMILARITY_THRESHOLD
+
+
+def legacy_check_answer(user_input, song):
+    normalized = _legacy_normalize(user_input)
+    if not normalized:
+        return None
+    if _legacy_match(normalized, _legacy_normalize(song.title)):
+        return "title"
+    for alias in song.title_aliases or []:
+        if _legacy_match(normalized, _legacy_normalize(alias)):
+            return "title"
+    if _legacy_match(normalized, _legacy_normalize(song.artist)):
+        return "artist"
+    for alias in song.aliases or []:
+        if _legacy_match(normalized, _legacy_normalize(alias)):
+            return "artist"
+    return None
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    """한글 음절 하나의 종성/중성을 바꾸는 오타."""
+    chars = list(word)
+    idx = [i for i, c in enumerate(chars) if '가' <= c <= '힣']
+    if not idx:
+        return word
+    i = rng.choice(idx)
+    code = ord(chars[i]) - 0xAC00
+    lead, vowel, tail = code // 588, (code % 588) // 28, code % 28
+    if rng.random() < 0.5:
+        tail = (tail + 4) % 28
+    else:
+        vowel = (vowel + 1) % 21
+    chars[i] = chr(0xAC00 + lead * 588 + vowel * 28 + tail)
+    return ''.join(chars)
+
+
+def build_messages(n: int, rng: random.Random):
+    messages = []
+    for _ in range(n):
+        song = rng.choice(DEFAULT_SONG_LIST)
+        roll = rng.random()
+        if roll < 0.8:
+            messages.append((rng.choice(CHATTER), song, None))
+        elif roll < 0.9:
+            alias = rng.choice((song.aliases or []) + (song.title_aliases or []) or [song.title])
+            messages.append((alias, song, "exact"))
+        else:
+            alias = rng.choice((song.aliases or []) + (song.title_aliases or []) or [song.title])
+            messages.append((_typo(alias, rng), song, "typo"))
+    return messages
+
+
+def run(label, fn, messages):
+    t0 = time.perf_counter()
+    typo_hits = typo_total = 0
+    for text, song, kind in messages:
+        result = fn(text, song)
+        if kind == "typo":
+            typo_total += 1
+            typo_hits += result is not None
+    elapsed = time.perf_counter() - t0
+    rate = len(messages) / elapsed
+    typo_rate = typo_hits / typo_total * 100 if typo_total else 0.0
+    print(f"[{label:>6}] {rate:,.0f} 판정/초 | 오타 정답 인정 {typo_rate:.0f}% ({typo_hits}/{typo_total})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages, random.Random(args.seed))
+    for song in DEFAULT_SONG_LIST:
+        _ = song.answer_index  # 곡 목록 로드 시점과 동일하게 선계산
+
+    run("legacy", legacy_check_answer, messages)
+    run("index", check_answer, messages)
+
+
+if __name__ == "__main__":
+    main()
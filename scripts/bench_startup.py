@@ -0,0 +1,100 @@
+"""시작 벤치마크 — main.py import 부터 setup_hook(Cog 등록) 완료까지 걸리는 시간.
+
+사용법:
+    python3 scripts/bench_startup.py [--runs 5] [--identity unified] [--max-seconds 0] [--importtime]
+
+매 회 새 프로세스에서 `import main` → bot.setup_hook() 을 실행하고 단계별 시간을 잰다.
+Discord 로그인은 하지 않으며, Firestore listener 등록은 기본으로 건너뛴다 (--with-listeners 로 포함).
+결과에는 시작 시점에 이미 로드된 무거운 의존성 목록도 함께 나온다 (지연 import 회귀 확인용).
+--max-seconds 를 주면 중앙값이 그보다 느릴 때 종료 코드 1 (CI 게이트).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+HEAVY_MODULES = (
+    "matplotlib", "PIL", "numpy", "soundfile", "yt_dlp", "webrtcvad", "davey",
+    "anthropic", "openai", "langgraph", "googleapiclient", "google.cloud.texttospeech",
+)
+
+CHILD_CODE = """
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import main
+t_import = time.perf_counter()
+from run.core import config
+from run.core.bot import bot
+if not {with_listeners}:
+    config.init_settings_listeners = lambda *args, **kwargs: False
+asyncio.run(bot.setup_hook())
+t_setup = time.perf_counter()
+from run.utils.lazy_import import get_lazy_import_stats
+print("@@" + json.dumps({{
+    "import_s": t_import - t0,
+    "setup_hook_s": t_setup - t_import,
+    "heavy_loaded": [m for m in {heavy!r} if m in sys.modules],
+    "lazy_loaded": get_lazy_import_stats(),
+}}))
+"""
+
+
+def run_once(identity: str, with_listeners: bool) -> dict:
+    env = dict(os.environ)
+    env["BOT_IDENTITY"] = identity
+    env.pop("BOT_IMPORT_PROFILE", None)
+    code = CHILD_CODE.format(with_listeners=with_listeners, heavy=HEAVY_MODULES)
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=str(REPO_ROOT), env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    result_lines = [line for line in proc.stdout.splitlines() if line.startswith("@@")]
+    if proc.returncode != 0 or not result_lines:
+        sys.exit(f"시작 실패 (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    result = json.loads(result_lines[-1][2:])
+    result["wall_s"] = wall
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--identity", default="unified", help="BOT_IDENTITY (unified/debi/marlene)")
+    parser.add_argument("--with-listeners", action="store_true", help="Firestore listener 등록 포함")
+    parser.add_argument("--max-seconds", type=float, default=0.0, help="중앙값 상한 (0 = 검사 안 함)")
+    parser.add_argument("--importtime", action="store_true", help="-X importtime 패키지별 요약 출력")
+    args = parser.parse_args()
+
+    results = [run_once(args.identity, args.with_listeners) for _ in range(args.runs)]
+    for key, label in (("import_s", "import main"), ("setup_hook_s", "setup_hook"), ("wall_s", "프로세스 전체")):
+        values = [r[key] for r in results]
+        print(f"[{label:>10}] 중앙값 {statistics.median(values):.3f}s | 최소 {min(values):.3f}s | 최대 {max(values):.3f}s")
+
+    last = results[-1]
+    print(f"[heavy] 시작 시 로드됨: {', '.join(last['heavy_loaded']) or '없음'}")
+    if last["lazy_loaded"]:
+        loaded = ", ".join(f"{name} {ms}ms" for name, ms in last["lazy_loaded"].items())
+        print(f"[lazy] setup_hook 중 로드된 지연 모듈: {loaded}")
+
+    if args.importtime:
+        from run.utils.import_profile import format_summary, run_import_profile
+        env = dict(os.environ, BOT_IDENTITY=args.identity)
+        print(format_summary(run_import_profile(env=env)))
+
+    if args.max_seconds:
+        median = statistics.median(r["import_s"] + r["setup_hook_s"] for r in results)
+        if median > args.max_seconds:
+            print(f"[실패] 중앙값 {median:.3f}s > 상한 {args.max_seconds:.3f}s")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
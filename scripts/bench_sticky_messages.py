@@ -0,0 +1,169 @@
+"""스티키 메시지 벤치마크 — 채널 메시지 1000개당 Discord API 호출 / 설정 쓰기 수 (기존 쿨다운 vs debounce 엔진).
+
+사용법:
+    python3 scripts/bench_sticky_messages.py [--messages 1000] [--speed 200] [--pattern all]
+
+채널 하나에 스티키 1개, 사람 메시지를 패턴대로 흘려 보낸다 (시간은 --speed 배로 압축).
+    bursty → 2초 안에 5~30개 몰렸다가 10~60초 조용 (대화가 터졌다 멈추는 채널)
+    steady → 0.5~2.5초 간격으로 계속 (쉬지 않는 채널)
+    sparse → 5~20초 간격 (한산한 채널)
+
+    legacy → 메시지마다 5초 쿨다운이 지났으면 fetch_message + delete + send + update_guild (즉시 쓰기)
+    engine → run.services.sticky_engine.StickyEngine (--quiet / --max-wait / --min-interval, 기본값은 환경변수)
+             send + PartialMessage.delete, 설정은 write-behind (여기서는 호출 수만 셈)
+
+"끝 상태" 는 마지막 메시지 뒤 스티키가 채널 맨 아래에 있는지 (둘 다 있어야 정상).
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+import types
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services.sticky_engine import (  # noqa: E402
+    MAX_WAIT_SECONDS, MIN_INTERVAL_SECONDS, QUIET_SECONDS, StickyEngine,
+)
+
+CHANNEL_ID = 1_000_001
+GUILD_ID = 10_000
+LEGACY_COOLDOWN = 5.0
+
+
+class FakeChannel:
+    """API 호출 수를 세고 채널 맨 아래 메시지가 스티키인지 추적."""
+
+    def __init__(self, calls: Counter, latency: float):
+        self.id = CHANNEL_ID
+        self.calls = calls
+        self.latency = latency
+        self._ids = itertools.count(10_000)
+        self.last_is_sticky = False
+
+    async def _api(self, name):
+        self.calls[name] += 1
+        await asyncio.sleep(self.latency)
+
+    async def send(self, content, silent=False):
+        await self._api("send")
+        self.last_is_sticky = True
+        return types.SimpleNamespace(id=next(self._ids))
+
+    async def fetch_message(self, message_id):
+        await self._api("fetch_message")
+        return types.SimpleNamespace(delete=lambda: self._api("delete"))
+
+    def get_partial_message(self, message_id):
+        return types.SimpleNamespace(delete=lambda: self._api("delete"))
+
+    def human_message(self):
+        self.last_is_sticky = False
+        return types.SimpleNamespace(channel=self, guild=types.SimpleNamespace(id=GUILD_ID))
+
+
+def gaps(pattern: str, n: int, rng: random.Random):
+    """메시지 사이 간격 (초, 압축 전)."""
+    out = []
+    while len(out) < n:
+        if pattern == "bursty":
+            burst = rng.randint(5, 30)
+            out.extend(rng.uniform(0.02, 2.0 / burst) for _ in range(burst))
+            out.append(rng.uniform(10, 60))
+        elif pattern == "steady":
+            out.append(rng.uniform(0.5, 2.5))
+        else:
+            out.append(rng.uniform(5, 20))
+    return out[:n]
+
+
+class LegacySticky:
+    """bot.py 의 예전 _handle_sticky_message 그대로 (쿨다운 / fetch + delete / send / 즉시 저장)."""
+
+    def __init__(self, calls: Counter, scale: float):
+        self.calls = calls
+        self.cooldown = LEGACY_COOLDOWN * scale
+        self.last_sent = float("-inf")
+        self.last_id = "1"
+
+    async def on_message(self, message):
+        now = asyncio.get_running_loop().time()
+        if now - self.last_sent < self.cooldown:
+            return
+        self.last_sent = now
+        old = await message.channel.fetch_message(int(self.last_id))
+        await old.delete()
+        new_msg = await message.channel.send("공지", silent=True)
+        self.last_id = str(new_msg.id)
+        self.calls["settings_write"] += 1
+
+
+async def run(mode: str, pattern: str, args) -> dict:
+    rng = random.Random(args.seed)
+    scale = 1.0 / args.speed
+    calls = Counter()
+    channel = FakeChannel(calls, args.latency * scale)
+    sticky = {"channelId": str(CHANNEL_ID), "enabled": True, "content": "공지", "lastMessageId": "1"}
+    features = types.SimpleNamespace(stickies=((0, sticky),))
+
+    if mode == "legacy":
+        handler = LegacySticky(calls, scale)
+
+        def on_message(message):
+            return asyncio.create_task(handler.on_message(message))
+    else:
+        async def persist(guild_id, channel_id, sent):
+            calls["settings_write"] += 1  # write-behind 큐에 들어간 갱신 (flush 때 서버별로 합쳐짐)
+            sticky["lastMessageId"] = sent[0]
+
+        engine = StickyEngine(quiet=args.quiet * scale, max_wait=args.max_wait * scale,
+                              min_interval=args.min_interval * scale,
+                              features_getter=lambda cid: features, persist=persist)
+
+        def on_message(message):
+            engine.on_message(message, features)
+
+    tasks = []
+    for gap in gaps(pattern, args.messages, rng):
+        result = on_message(channel.human_message())
+        if result is not None:
+            tasks.append(result)
+        await asyncio.sleep(gap * scale)
+    await asyncio.gather(*tasks)
+    if mode == "engine":
+        while engine.pending():
+            await asyncio.sleep(0.01)
+    api = calls["send"] + calls["delete"] + calls["fetch_message"]
+    return {"api": api, "writes": calls["settings_write"], "sends": calls["send"],
+            "fetches": calls["fetch_message"], "sticky_last": channel.last_is_sticky}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--speed", type=float, default=200, help="시간 압축 배수")
+    parser.add_argument("--pattern", choices=("bursty", "steady", "sparse", "all"), default="all")
+    parser.add_argument("--latency", type=float, default=0.15, help="Discord API 왕복 (초, 압축 전)")
+    parser.add_argument("--quiet", type=float, default=QUIET_SECONDS)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT_SECONDS)
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL_SECONDS)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    patterns = ("bursty", "steady", "sparse") if args.pattern == "all" else (args.pattern,)
+    per = 1000 / args.messages
+    print(f"{'pattern':<8} {'mode':<7} {'API/1000':>9} {'send':>6} {'fetch':>6} {'설정쓰기/1000':>13}  끝 상태")
+    for pattern in patterns:
+        for mode in ("legacy", "engine"):
+            r = asyncio.run(run(mode, pattern, args))
+            print(f"{pattern:<8} {mode:<7} {r['api'] * per:>9.0f} {r['sends']:>6} {r['fetches']:>6} "
+                  f"{r['writes'] * per:>13.0f}  {'스티키가 맨 아래' if r['sticky_last'] else '스티키가 묻힘'}",
+                  flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""음성 재생 CPU 벤치마크 — 동시 음성 연결 수별 연결당 CPU (ffmpeg / PCM / 선인코딩 Opus).
+
+사용법:
+    python3 scripts/bench_voice_cpu.py [--connections 1 10 50] [--clips 5] [--seconds 3]
+
+비교 대상 (연결마다 TTS 클립을 --clips 번 재생):
+    ffmpeg → 재생마다 FFmpegPCMAudio 프로세스 + 플레이어 스레드 Opus 인코딩 (비-PCM 파일, 기존 방식)
+    pcm    → PCMAudio + 프레임별 Opus 인코딩 (캐시 .pcm, 기존 방식)
+    opus   → PreEncodedOpusSource 로 패킷 그대로 전송 (선인코딩 캐시)
+
+실시간 대기 없이 프레임을 모두 읽어 CPU 시간만 측정하고, "오디오 1초당 CPU 초" 를
+실시간 재생 기준 연결당 CPU % 로 환산한다. ffmpeg 자식 프로세스 CPU 도 포함.
+discord.py[voice] (libopus) 와 ffmpeg 가 필요하다.
+"""
+
+import argparse
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import discord  # noqa: E402
+
+from run.services.opus_cache import FRAME_SIZE, SAMPLES_PER_FRAME, PreEncodedOpusSource  # noqa: E402
+from run.services.voice_manager import FFMPEG_PATH  # noqa: E402
+
+FRAME_SECONDS = 0.02
+
+
+def make_clip(seconds: float) -> bytes:
+    """음성 대역 톤 + 잡음으로 48kHz stereo s16le PCM 생성 (무음보다 인코딩 비용이 현실적)."""
+    rng = random.Random(1)
+    samples = int(48000 * seconds)
+    out = bytearray()
+    for n in range(samples):
+        v = int(6000 * math.sin(2 * math.pi * 220 * n / 48000) + rng.randint(-1500, 1500))
+        out += v.to_bytes(2, "little", signed=True) * 2
+    return bytes(out)
+
+
+def write_wav(path: str, pcm: bytes):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(48000)
+        w.writeframes(pcm)
+
+
+def encode_packets(pcm: bytes) -> list:
+    encoder = discord.opus.Encoder()
+    return [
+        encoder.encode(pcm[i:i + FRAME_SIZE].ljust(FRAME_SIZE, b"\x00"), SAMPLES_PER_FRAME)
+        for i in range(0, len(pcm), FRAME_SIZE)
+    ]
+
+
+def drain(source: discord.AudioSource, encoder) -> int:
+    """플레이어 스레드처럼 read() → (필요하면) encode 를 끝까지 반복."""
+    frames = 0
+    while True:
+        data = source.read()
+        if not data:
+            break
+        if not source.is_opus():
+            encoder.encode(data, SAMPLES_PER_FRAME)
+        frames += 1
+    source.cleanup()
+    return frames
+
+
+def run_mode(mode: str, connections: int, clips: int, pcm: bytes, wav_path: str, packets: list):
+    import io
+
+    frames_total = [0]
+    lock = threading.Lock()
+
+    def connection():
+        encoder = discord.opus.Encoder()  # VoiceClient 마다 인코더 하나
+        frames = 0
+        for _ in range(clips):
+            if mode == "ffmpeg":
+                source = discord.FFmpegPCMAudio(
+                    wav_path, executable=FFMPEG_PATH,
+                    before_options="-nostdin -probesize 32 -analyzeduration 0", options="-vn",
+                )
+            elif mode == "pcm":
+                source = discord.PCMAudio(io.BytesIO(pcm))
+            else:
+                source = PreEncodedOpusSource(packets)
+            frames += drain(source, encoder)
+        with lock:
+            frames_total[0] += frames
+
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_before = time.process_time()
+    threads = [threading.Thread(target=connection) for _ in range(connections)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cpu = time.process_time() - cpu_before
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu += (children_after.ru_utime - children_before.ru_utime) + (children_after.ru_stime - children_before.ru_stime)
+
+    audio_seconds = frames_total[0] * FRAME_SECONDS
+    per_connection_percent = cpu / audio_seconds * 100 if audio_seconds else 0.0
+    return cpu, per_connection_percent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--clips", type=int, default=5, help="연결당 재생 횟수")
+    parser.add_argument("--seconds", type=float, default=3.0, help="클립 길이")
+    args = parser.parse_args()
+
+    if not discord.opus.is_loaded():
+        discord.opus._load_default()
+    if not discord.opus.is_loaded():
+        sys.exit("libopus 를 불러오지 못했습니다 (discord.py[voice] 필요)")
+
+    pcm = make_clip(args.seconds)
+    packets = encode_packets(pcm)
+    with tempfile.TemporaryDirectory() as tmp:
+        wav_path = os.path.join(tmp, "clip.wav")
+        write_wav(wav_path, pcm)
+
+        for n in args.connections:
+            for mode in ("ffmpeg", "pcm", "opus"):
+                cpu, per_conn = run_mode(mode, n, args.clips, pcm, wav_path, packets)
+                print(
+                    f"[{n:>3}연결 {mode:>6}] CPU {cpu:.2f}s | "
+                    f"연결당 CPU {per_conn:.2f}% (실시간 재생 기준) | "
+                    f"{n}연결 합계 {per_conn * n:.1f}%"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""yt-dlp 전용 풀 벤치마크 — 가짜 추출기로 기본 executor 고갈 여부 비교.
+
+사용법:
+    python3 scripts/bench_ytdlp_pool.py [--extractions 24] [--extract-delay 1.5]
+
+비교 대상:
+    before → 매 호출 YoutubeDL 생성 + 기본 loop executor (기존 방식)
+    after  → YtDlpPool (전용 스레드, 워커별 YoutubeDL 재사용, 검색어 캐시)
+
+측정:
+    - 추출이 몰린 동안 asyncio.to_thread 로 보낸 가벼운 작업(Firestore 읽기 대역)의 대기 지연
+    - 전체 추출 소요 시간, YoutubeDL 생성 횟수, 검색 캐시 히트 수
+네트워크/yt-dlp 설치 불필요.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services.music.ytdlp_pool import YtDlpPool  # noqa: E402
+
+
+class FakeYoutubeDL:
+    """yt_dlp.YoutubeDL 대역. 생성 비용과 추출 블로킹 시간만 흉내낸다."""
+
+    created = 0
+    _lock = threading.Lock()
+
+    def __init__(self, extract_delay: float, init_delay: float):
+        with FakeYoutubeDL._lock:
+            FakeYoutubeDL.created += 1
+        time.sleep(init_delay)
+        self.extract_delay = extract_delay
+
+    def extract_info(self, query, download=False):
+        time.sleep(self.extract_delay)
+        if query.startswith("ytsearch:"):
+            vid = f"id{abs(hash(query)) % 10000}"
+            return {"entries": [{"id": vid, "url": f"https://stream/{vid}", "title": query}]}
+        return {"id": query.rsplit("=", 1)[-1], "url": f"https://stream/{query}", "title": query}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+async def _probe_default_executor(stop: asyncio.Event, samples: list):
+    """기본 executor 대기 지연 측정 (Firestore/blocklist to_thread 호출 대역)."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.to_thread(lambda: None)
+        samples.append((time.perf_counter() - t0) * 1000)
+        await asyncio.sleep(0.05)
+
+
+async def _run(mode: str, args) -> dict:
+    FakeYoutubeDL.created = 0
+    queries = [f"ytsearch:song {i % args.distinct}" for i in range(args.extractions)]
+
+    if mode == "before":
+        def _extract(q):
+            with FakeYoutubeDL(args.extract_delay, args.init_delay) as ydl:
+                return ydl.extract_info(q, download=False)
+
+        async def extract(q):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, _extract, q)
+        pool = None
+    else:
+        pool = YtDlpPool(lambda: FakeYoutubeDL(args.extract_delay, args.init_delay),
+                         max_workers=args.workers)
+        extract = pool.extract
+
+    stop = asyncio.Event()
+    samples: list = []
+    probe = asyncio.create_task(_probe_default_executor(stop, samples))
+
+    t0 = time.perf_counter()
+    # 퀴즈 여러 판 + 음악 요청이 몰리는 상황: 두 번에 나눠 같은 검색어를 재요청
+    half = len(queries) // 2
+    await asyncio.gather(*(extract(q) for q in queries[:half]))
+    await asyncio.gather(*(extract(q) for q in queries[half:]))
+    total = time.perf_counter() - t0
+
+    stop.set()
+    await probe
+
+    result = {
+        "mode": mode,
+        "total_s": total,
+        "probe_p50_ms": statistics.median(samples) if samples else 0.0,
+        "probe_max_ms": max(samples) if samples else 0.0,
+        "ydl_created": FakeYoutubeDL.created,
+        "cache_hits": pool.search_cache.hits if pool else 0,
+    }
+    if pool:
+        pool.shutdown()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extractions", type=int, default=24)
+    parser.add_argument("--distinct", type=int, default=8, help="서로 다른 검색어 수")
+    parser.add_argument("--extract-delay", type=float, default=1.5)
+    parser.add_argument("--init-delay", type=float, default=0.2, help="YoutubeDL 생성 비용")
+    parser.add_argument("--workers", type=int, default=3)
+    args = parser.parse_args()
+
+    for mode in ("before", "after"):
+        r = asyncio.run(_run(mode, args))
+        print(
+            f"[{r['mode']:>6}] 총 {r['total_s']:.2f}s | "
+            f"to_thread 지연 p50 {r['probe_p50_ms']:.1f}ms max {r['probe_max_ms']:.1f}ms | "
+            f"YoutubeDL 생성 {r['ydl_created']}회 | 검색 캐시 히트 {r['cache_hits']}회"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""일일 무료 대화 쿼터 동시성 검사 — 여러 프로세스가 같은 SQLite 파일에 동시에 consume.
+
+사용법:
+    python3 scripts/check_chat_quota.py [--procs 6] [--threads 4] [--users 50] [--calls 3000] [--limit 5]
+
+통합봇 + 솔로봇 프로세스가 같은 BOT_DATA_DIR 을 쓰는 상황을 흉내 낸다. 프로세스마다 스레드 여러 개가
+무작위 유저 / 날짜(오늘·어제·오래된 날)에 run.services.chat_quota.consume 을 부른다.
+
+확인:
+  - 로컬 SQLite 가 chat_quota.SQLITE_MIN_VERSION 이상 (배포 이미지 버전도 같이 출력)
+  - (유저, 날짜)마다 승인된 횟수 == min(시도 수, limit) — 한도 초과 승인 / 잃어버린 증가 없음
+  - 승인 때 돌려받은 사용량이 1..limit 을 한 번씩만 (중복 번호 없음)
+  - 마지막에 RETENTION_DAYS 밖의 날짜 행이 정리됨
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def worker(data_dir: str, seed: int, args, out):
+    os.environ["BOT_DATA_DIR"] = data_dir
+    from run.services import chat_quota
+
+    today = chat_quota.today()
+    day0 = datetime.strptime(today, "%Y-%m-%d")
+    days = [today, (day0 - timedelta(days=1)).strftime("%Y-%m-%d")]
+    results = []
+    lock = threading.Lock()
+
+    def run(thread_seed):
+        rng = random.Random(thread_seed)
+        local = []
+        for _ in range(args.calls // (args.procs * args.threads)):
+            user = rng.randrange(args.users)
+            day = rng.choice(days)
+            local.append((user, day, chat_quota.consume(user, args.limit, day=day)))
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=run, args=(seed * 100 + i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    out.put(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procs", type=int, default=6)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=3000, help="전체 consume 호출 수")
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # 오래된 날짜 행을 미리 넣어 두고 정리되는지 본다
+        os.environ["BOT_DATA_DIR"] = data_dir
+        from run.services import chat_quota
+        deploy = ".".join(map(str, chat_quota.SQLITE_DEPLOY_VERSION))
+        print(f"SQLite {sqlite3.sqlite_version} (배포 이미지 {deploy}, 최소 "
+              f"{'.'.join(map(str, chat_quota.SQLITE_MIN_VERSION))})", flush=True)
+        if min(sqlite3.sqlite_version_info, chat_quota.SQLITE_DEPLOY_VERSION) < chat_quota.SQLITE_MIN_VERSION:
+            print("FAIL (SQLite 버전)")
+            sys.exit(1)
+        old_day = (datetime.strptime(chat_quota.today(), "%Y-%m-%d")
+                   - timedelta(days=chat_quota.RETENTION_DAYS + 3)).strftime("%Y-%m-%d")
+        chat_quota.consume("stale", 5, day=old_day)
+
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        t0 = time.perf_counter()
+        procs = [ctx.Process(target=worker, args=(data_dir, i, args, out)) for i in range(args.procs)]
+        for p in procs:
+            p.start()
+        results = [row for _ in procs for row in out.get()]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+
+        attempts, granted, numbers = Counter(), Counter(), defaultdict(list)
+        for user, day, used in results:
+            attempts[(user, day)] += 1
+            if used is not None:
+                granted[(user, day)] += 1
+                numbers[(user, day)].append(used)
+
+        problems = []
+        for key, n in attempts.items():
+            expected = min(n, args.limit)
+            if granted[key] != expected:
+                problems.append(f"{key}: 승인 {granted[key]} != 기대 {expected} (시도 {n})")
+            if sorted(numbers[key]) != list(range(1, granted[key] + 1)):
+                problems.append(f"{key}: 사용량 번호 {sorted(numbers[key])}")
+            stored = chat_quota.used(key[0], day=key[1])
+            if stored != expected:
+                problems.append(f"{key}: 저장된 사용량 {stored} != {expected}")
+        if chat_quota.used("stale", day=old_day):
+            problems.append(f"{old_day} 행이 정리되지 않음")
+
+    print(f"프로세스 {args.procs} x 스레드 {args.threads} | consume {len(results)}회 {elapsed:.2f}s "
+          f"({len(results) / elapsed:,.0f}/s) | 승인 {sum(granted.values())} / 거절 "
+          f"{len(results) - sum(granted.values())}")
+    for problem in problems[:20]:
+        print(f"  - {problem}")
+    print("OK" if not problems else f"FAIL ({len(problems)}건)")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
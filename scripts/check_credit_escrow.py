@@ -0,0 +1,303 @@
+"""크레딧 escrow 과소비(overspend) 검사 — 무작위 동시 차감 / 크래시 / 만료 회수 / 커밋 응답 유실.
+
+사용법:
+    python3 scripts/check_credit_escrow.py [--seeds 20] [--users 5] [--holders 3] [--ops 400]
+
+Firestore 는 메모리 store 로 흉내 낸다 (트랜잭션 = 전역 락 안에서 run.services.credit_escrow 의
+apply_acquire / apply_settle 실행, 스레드 지연 + 무작위 실패). 봇 워커 여러 개(holder)가 같은 유저들에게
+동시에 차감하고, 대시보드 쪽 직접 차감(기부 / 뽑기 — credits 와 같은 prepare_direct_debit) / 충전이 섞이고,
+워커가 무작위로 죽었다가 (정산 없이 버림, journal 버퍼는 비운 뒤) 같은 holder + journal 로 다시 떠서 recover() 한다.
+
+시드 전에 고정 시나리오 하나 (direct): lease 가 살아 있는 동안 기부 / 뽑기가 들어오면
+held_in_escrow 로 실패 + 반환 요청 → 봇 정산 주기에 lease 반환 → 다시 시도하면 성공, 보존 유지.
+
+매 시드마다 확인:
+  - 유저 잔고가 음수가 된 적 없음
+  - 승인된 차감 합 ≤ 유입 합 (초기 잔고 + 충전) — 과소비 없음
+  - 모두 종료·정산 후: balance + lease 잔량 + ledger 차감 합 = 유입 합 (보존), lease 잔량 0
+  - 승인 합 - ledger 차감 합 = 늦은 정산이 0 하한에 걸려 못 받은 양 (이중 청구 / 누락 없음)
+  - 과소비(승인 > 유입)는 그 못 받은 양 이내 — 크래시로 정산 못 한 lease 가 만료 회수된 경우만
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services import credit_escrow  # noqa: E402
+from run.services.credit_escrow import (  # noqa: E402
+    CreditEscrow, apply_acquire, apply_settle, held_amount, prepare_direct_debit,
+)
+
+TTL = 1.5  # lease 만료 (초) — 크래시 후 재시작 지연(최대 2초)보다 짧게 해서 만료 회수가 끼어들게
+
+
+class CommitLost(Exception):
+    """커밋은 됐는데 응답을 못 받은 경우."""
+
+
+class MemoryStore:
+    """FirestoreEscrowStore 와 같은 인터페이스. 문서 = dict, 트랜잭션 = 락."""
+
+    def __init__(self, rng: random.Random, balances: dict, fail_rate: float, latency: float):
+        self.rng = rng
+        self.docs = {uid: {"balance": bal, "leases": {}} for uid, bal in balances.items()}
+        self.ledger = defaultdict(int)  # user_id -> 정산된 차감 합 (양수)
+        self.lock = threading.Lock()
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.min_balance = min(balances.values())
+        self.shortfall = defaultdict(int)  # user_id -> 늦은 정산이 0 하한에 걸려 못 받은 양
+        self.current_user = None
+        take = credit_escrow._take_balance
+
+        def _take_balance(data, amount):
+            charge = take(data, amount)
+            self.shortfall[self.current_user] += max(0, amount) - charge
+            return charge
+        credit_escrow._take_balance = _take_balance
+
+    def _txn(self, fn):
+        time.sleep(self.rng.random() * self.latency)
+        if self.rng.random() < self.fail_rate:
+            raise RuntimeError("transaction aborted")
+        with self.lock:
+            result = fn()
+            for doc in self.docs.values():
+                self.min_balance = min(self.min_balance, doc["balance"])
+        if self.rng.random() < self.fail_rate / 2:
+            raise CommitLost("commit ack lost")
+        return result
+
+    def _record(self, user_id, ledger):
+        for _, amount in ledger:
+            self.ledger[user_id] += -amount
+
+    def acquire(self, user_id, holder, token, spent, settled, need, chunk, ttl):
+        def fn():
+            self.current_user = user_id
+            data = self.docs[user_id]
+            result, ledger = apply_acquire(data, holder, token, spent, settled, need, chunk, ttl, time.time())
+            self._record(user_id, ledger)
+            return result
+        return self._txn(fn)
+
+    def settle_batch(self, items, ttl):
+        def fn():
+            out = {}
+            for user_id, holder, token, spent, settled, reasons, release in items:
+                self.current_user = user_id
+                status, ledger = apply_settle(self.docs[user_id], holder, token, spent, settled,
+                                              reasons, release, ttl, time.time())
+                self._record(user_id, ledger)
+                out[user_id] = status
+            return out
+        return self._txn(fn)
+
+    def release_requests(self, holder):
+        time.sleep(self.rng.random() * self.latency)
+        if self.rng.random() < self.fail_rate:
+            raise RuntimeError("query failed")
+        with self.lock:
+            return {uid for uid, doc in self.docs.items()
+                    if (doc.get("leases", {}).get(holder) or {}).get("release_requested")}
+
+    # 대시보드 쪽 (lease 밖) 직접 차감 / 충전 — credits.donate / gacha 트랜잭션과 같은 가드
+    def direct_debit(self, user_id, amount) -> str:
+        with self.lock:
+            self.current_user = user_id
+            doc = self.docs[user_id]
+            status = prepare_direct_debit(doc, amount, time.time())
+            if status == "ok":
+                doc["balance"] -= amount
+                self.ledger[user_id] += amount
+                self.min_balance = min(self.min_balance, doc["balance"])
+            return status
+
+    def credit(self, user_id, amount):
+        with self.lock:
+            self.docs[user_id]["balance"] += amount
+
+
+async def run_seed(seed: int, args) -> dict:
+    rng = random.Random(seed)
+    users = [str(1000 + i) for i in range(args.users)]
+    funded = {uid: rng.randint(0, 60) for uid in users}
+    store = MemoryStore(rng, dict(funded), args.fail_rate, args.latency)
+    granted = defaultdict(int)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def new_escrow(holder):
+            return CreditEscrow(store=store, holder=holder, journal_path=Path(tmp) / f"{holder}.jsonl",
+                                chunk=rng.choice((4, 10, 20)), ttl=TTL, idle_release=0.4,
+                                settle_interval=0.1, safety=0.3)
+
+        escrows = {f"w{i}": new_escrow(f"w{i}") for i in range(args.holders)}
+        stats = defaultdict(int)
+
+        async def one_debit(escrow, user_id, amount):
+            try:
+                result = await escrow.debit(user_id, amount, rng.choice(("tts", "chat_message")))
+            except CommitLost:
+                result = {"ok": False}
+            if result.get("ok"):
+                granted[user_id] += result["charged"]
+                stats["granted"] += 1
+            else:
+                stats[result.get("reason", "error")] += 1
+
+        tasks = []
+        pending = defaultdict(list)  # holder -> 진행 중인 차감
+        for _ in range(args.ops):
+            roll = rng.random()
+            user_id = rng.choice(users)
+            if roll < 0.03:
+                # 워커 크래시 — 정산 없이 버리고, 잠시 뒤(만료 회수가 끼어들 수 있게) 같은 holder 로 재시작
+                holder = rng.choice(list(escrows))
+                await asyncio.gather(*pending.pop(holder, []))  # 진행 중인 승인은 끝난 뒤에 죽는다
+                dead = escrows.pop(holder)
+                if dead._task is not None:
+                    dead._task.cancel()
+                dead._journal.close()
+                stats["crashes"] += 1
+                await asyncio.sleep(rng.random() * 2.0)
+                escrows[holder] = new_escrow(holder)
+                try:
+                    await escrows[holder].recover()
+                except Exception:
+                    stats["recover_retry"] += 1
+            elif roll < 0.08:
+                amount = rng.randint(1, 15)
+                status = store.direct_debit(user_id, amount)
+                if status == "ok":
+                    granted[user_id] += amount
+                stats[f"direct_{status}"] += 1
+            elif roll < 0.10:
+                amount = rng.randint(1, 20)
+                store.credit(user_id, amount)
+                funded[user_id] += amount
+            else:
+                holder = rng.choice(list(escrows))
+                task = asyncio.create_task(one_debit(escrows[holder], user_id, rng.choice((1, 2, 2, 3, 5))))
+                tasks.append(task)
+                pending[holder].append(task)
+            if rng.random() < 0.3:
+                await asyncio.sleep(rng.random() * 0.02)
+        await asyncio.gather(*tasks)
+
+        # 종료: recover 가 실패했던 journal 까지 정리될 때까지 close / recover 반복
+        for _ in range(50):
+            for escrow in escrows.values():
+                try:
+                    await escrow.close()
+                    await escrow.recover()
+                except Exception:
+                    continue
+            if all(not escrow._leases and not escrow._orphans
+                   and not credit_escrow._Journal.load(escrow._journal.path) for escrow in escrows.values()):
+                break
+        else:
+            raise AssertionError(f"seed {seed}: 정산이 끝나지 않음")
+        # 커밋 응답 유실로 프로세스가 모르게 남은 lease 는 만료 후 그 유저 문서를 건드리는 다음 트랜잭션이 회수
+        await asyncio.sleep(TTL)
+        with store.lock:
+            for doc in store.docs.values():
+                credit_escrow._reclaim_expired(doc, time.time(), keep=None)
+
+    problems = []
+    if store.min_balance < 0:
+        problems.append(f"음수 잔고 {store.min_balance}")
+    undercharged = 0
+    for uid in users:
+        doc = store.docs[uid]
+        if granted[uid] - funded[uid] > store.shortfall[uid]:
+            problems.append(f"{uid} 과소비: 승인 {granted[uid]} > 유입 {funded[uid]} "
+                            f"(+ 못 받은 양 {store.shortfall[uid]})")
+        total = doc["balance"] + held_amount(doc) + store.ledger[uid]
+        if total != funded[uid]:
+            problems.append(f"{uid} 보존 깨짐: {total} != {funded[uid]}")
+        if held_amount(doc):
+            problems.append(f"{uid} lease 잔량 남음 {held_amount(doc)}")
+        if granted[uid] - store.ledger[uid] != store.shortfall[uid]:
+            problems.append(f"{uid} 청구 불일치: 승인 {granted[uid]} - ledger {store.ledger[uid]} "
+                            f"!= 못 받은 양 {store.shortfall[uid]}")
+        undercharged += granted[uid] - store.ledger[uid]
+    return {"problems": problems, "undercharged": undercharged,
+            "granted": sum(granted.values()), **stats}
+
+
+async def run_direct_during_lease() -> list:
+    """기부 / 뽑기가 봇 lease 가 살아 있는 동안 들어오는 경우 (무작위 없음)."""
+    funded = {"1": 30, "2": 30}
+    store = MemoryStore(random.Random(0), dict(funded), fail_rate=0.0, latency=0.0)
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        escrow = CreditEscrow(store=store, holder="w0", journal_path=Path(tmp) / "w0.jsonl", chunk=20,
+                              ttl=60, idle_release=60, settle_interval=60, safety=1)
+        for user_id, op, amount in (("1", "donate", 25), ("2", "gacha", 15)):
+            doc = store.docs[user_id]
+            await escrow.debit(user_id, 2, "chat_message")  # lease 20 → balance 10 + lease 잔량 18
+            first = store.direct_debit(user_id, amount)
+            requested = (doc["leases"].get("w0") or {}).get("release_requested")
+            if first != "held" or not requested:
+                problems.append(f"{op}: lease 중 첫 시도 {first} (held + 반환 요청이어야 함)")
+            await escrow.settle()  # 봇 정산 주기 — 반환 요청을 보고 lease 반환
+            if escrow.local_available(user_id) or held_amount(doc):
+                problems.append(f"{op}: 반환 요청 뒤에도 lease 잔량 남음 (로컬 {escrow.local_available(user_id)}, "
+                                f"문서 {held_amount(doc)})")
+            second = store.direct_debit(user_id, amount)
+            if second != "ok" or doc["balance"] != funded[user_id] - 2 - amount:
+                problems.append(f"{op}: 반환 뒤 재시도 {second}, 잔고 {doc['balance']}")
+            after = await escrow.debit(user_id, 2, "tts")  # 남은 잔고로 새 lease
+            if not after.get("ok"):
+                problems.append(f"{op}: 반환 뒤 봇 차감 실패 {after}")
+            if store.direct_debit(user_id, 100) != "insufficient":
+                problems.append(f"{op}: lease 잔량을 합쳐도 모자란 차감이 insufficient 가 아님")
+        await escrow.close()
+    for user_id, amount in (("1", 25), ("2", 15)):
+        doc = store.docs[user_id]
+        total = doc["balance"] + held_amount(doc) + store.ledger[user_id]
+        if total != funded[user_id] or store.ledger[user_id] != 2 + amount + 2:
+            problems.append(f"{user_id} 보존 / 청구 불일치: 잔고 {doc['balance']} ledger {store.ledger[user_id]}")
+    print(f"{'OK  ' if not problems else 'FAIL'} direct   lease 중 기부 / 뽑기 → 반환 요청 → 재시도", flush=True)
+    for problem in problems:
+        print(f"     - {problem}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--holders", type=int, default=3)
+    parser.add_argument("--ops", type=int, default=400)
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="트랜잭션 실패 확률")
+    parser.add_argument("--latency", type=float, default=0.01, help="트랜잭션 지연 상한 (초)")
+    args = parser.parse_args()
+
+    credit_escrow.print = lambda *a, **k: None  # 실패 주입 로그 생략
+    direct_failed = bool(asyncio.run(run_direct_during_lease()))
+    failed = 0
+    for seed in range(args.seeds):
+        result = asyncio.run(run_seed(seed, args))
+        status = "OK  " if not result["problems"] else "FAIL"
+        print(f"{status} seed={seed:<3} 승인 {result['granted']:>5} 과소청구 {result['undercharged']:>4} "
+              f"크래시 {result.get('crashes', 0):>2} 부족 {result.get('insufficient', 0):>4} "
+              f"오류 {result.get('firestore_unavailable', 0):>3} 직접차감 반환대기 {result.get('direct_held', 0):>2}",
+              flush=True)
+        for problem in result["problems"]:
+            print(f"     - {problem}")
+        failed += bool(result["problems"])
+    print(f"\n{args.seeds - failed}/{args.seeds} 시드 통과" + (", direct 시나리오 실패" if direct_failed else ""))
+    sys.exit(1 if failed or direct_failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""프롬프트 캐시 prefix 검사 — 유저 / 컨텍스트가 달라도 캐시 대상 앞부분이 바이트 단위로 같은지.
+
+사용법:
+    python3 scripts/check_prompt_cache.py            # 오프라인: prefix 비교 + 토큰 추정
+    python3 scripts/check_prompt_cache.py --live     # CLAUDE_API_KEY 로 같은 prefix 2번 호출, usage / 첫 토큰 시간
+
+확인하는 요청 (run.services.chat.prompt_builder 로 조립):
+    chime_judge  → ChimeInDecider._judge (페르소나 요약 + 출력 규칙 / 최근 대화)
+    character    → character_prompt.build_request (시스템 프롬프트 + few-shot / 히스토리 + 컨텍스트)
+    managed      → ManagedAgentsClient 턴 텍스트 (고정 규칙 / 요약 + 컨텍스트 + 질문)
+
+cacheable=no 는 안 변하는 부분이 모델 최소 캐시 길이보다 짧다는 뜻 — breakpoint 는 달려 있지만
+프롬프트가 그만큼 커지기 전까지 실제 캐시는 안 된다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services.chat import character_prompt  # noqa: E402
+from run.services.chat.chime_decider import _PERSONA_BRIEF, JUDGE_MODEL, JUDGE_RULES  # noqa: E402
+from run.services.chat.managed_agents_client import CONTEXT_RULES  # noqa: E402
+from run.services.chat.prompt_builder import PromptBuilder, min_cacheable_tokens  # noqa: E402
+
+CHARACTER_MODEL = "claude-sonnet-4-5"
+
+SAMPLES = [
+    {"author": "유저A", "recent": ["유저A: 오늘 랭크 몇 판 했어?", "유저B: 세 판 다 졌어"],
+     "history": [], "context": None, "message": "안녕"},
+    {"author": "유저C", "recent": ["유저C: 에이든 너프 됐대"],
+     "history": [{"role": "user", "content": "나 기억나?"}, {"role": "assistant", "content": "데비: 당연하지!"}],
+     "context": "패치 1.2: 에이든 기본 공격력 -3", "message": "에이든 이제 별로야?"},
+]
+
+
+def judge_builder(sample) -> PromptBuilder:
+    return (PromptBuilder("chime_judge", JUDGE_MODEL)
+            .system(_PERSONA_BRIEF["debi"], JUDGE_RULES)
+            .context("[최근 대화]", "\n".join(sample["recent"]))
+            .user(f"[방금 '{sample['author']}'이(가) 말함]"))
+
+
+def character_builder(sample) -> PromptBuilder:
+    return (PromptBuilder("character", CHARACTER_MODEL)
+            .system(character_prompt.SYSTEM_PROMPT)
+            .examples(character_prompt.FEW_SHOT_EXAMPLES)
+            .history(sample["history"])
+            .context("[추가 컨텍스트]", sample["context"])
+            .user(sample["message"]))
+
+
+def cached_prefix(request: dict) -> str:
+    """마지막 cache breakpoint 까지 (system + few-shot) 직렬화."""
+    prefix = {"system": request.get("system"), "messages": []}
+    for message in request["messages"]:
+        prefix["messages"].append(message)
+        content = message["content"]
+        if isinstance(content, list) and any("cache_control" in block for block in content):
+            break
+    else:
+        prefix["messages"] = []
+    return json.dumps(prefix, ensure_ascii=False, sort_keys=True)
+
+
+def offline() -> bool:
+    ok = True
+    for name, make in (("chime_judge", judge_builder), ("character", character_builder)):
+        builders = [make(sample) for sample in SAMPLES]
+        prefixes = {cached_prefix(b.build()) for b in builders}
+        same = len(prefixes) == 1
+        ok &= same
+        b = builders[0]
+        print(f"{name:<12} prefix 동일 {'OK ' if same else 'FAIL'}  stable≈{b.stable_tokens():>5} "
+              f"volatile≈{b.volatile_tokens():>4}  최소 {min_cacheable_tokens(b.model):>5}  "
+              f"cacheable={'yes' if b.cacheable else 'no'}")
+    texts = [PromptBuilder("managed").system(CONTEXT_RULES).context("[참고 컨텍스트]", s["context"])
+             .user(f"[지금 질문]\n{s['message']}").build_text() for s in SAMPLES]
+    same = all(t.startswith(CONTEXT_RULES) for t in texts)
+    ok &= same
+    print(f"{'managed':<12} 고정 규칙이 턴 맨 앞 {'OK ' if same else 'FAIL'}")
+    return ok
+
+
+async def live():
+    import anthropic
+    client = anthropic.AsyncAnthropic(api_key=os.getenv("CLAUDE_API_KEY") or os.getenv("ANTHROPIC_API_KEY"))
+    for name, make, model in (("chime_judge", judge_builder, JUDGE_MODEL),
+                              ("character", character_builder, CHARACTER_MODEL)):
+        for sample in SAMPLES:
+            request = make(sample).build()
+            request["model"] = model
+            t0 = time.perf_counter()
+            first = None
+            async with client.messages.stream(max_tokens=60, **request) as stream:
+                async for _ in stream.text_stream:
+                    first = first or time.perf_counter() - t0
+                usage = (await stream.get_final_message()).usage
+            print(f"{name:<12} 첫 토큰 {first or 0:.2f}s  input {usage.input_tokens:>5}  "
+                  f"cache_read {usage.cache_read_input_tokens or 0:>5}  "
+                  f"cache_write {usage.cache_creation_input_tokens or 0:>5}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="실제 API 호출 (요금 발생)")
+    args = parser.parse_args()
+
+    ok = offline()
+    if args.live:
+        asyncio.run(live())
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""렌더 프로세스 풀 점검 — 워커가 봇을 import 하지 않는지, 풀 교체 때 다른 작업이 어떻게 끝나는지.
+
+사용법:
+    python3 scripts/check_render_workers.py [--jobs 6]
+
+1. imports  → 봇을 띄울 때처럼 main.py 를 __main__ 으로 두고 spawn 워커를 띄운 뒤, 워커의
+              sys.modules 에 run.core.bot / run.cogs.* 가 없는지 확인 (있으면 워커마다 discord + 모든 Cog)
+2. timeout  → 워커 1개에 첫 작업만 아주 짧은 타임아웃으로 넣어 풀 교체를 일으킨다. 뒤에 줄 서 있던
+              작업은 CancelledError 가 아니라 RenderTimeout 으로 끝나야 하고, 새 풀은 정상 동작해야 한다.
+"""
+
+import argparse
+import asyncio
+import io
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from run.services.render_service import (  # noqa: E402
+    ItemEmojiJob, RenderService, RenderTimeout, _loaded_modules,
+)
+
+FORBIDDEN = ("run.core.bot", "run.cogs", "run.core.config")
+
+
+def _item_job() -> ItemEmojiJob:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), (120, 80, 200)).save(buffer, format="PNG")
+    return ItemEmojiJob(buffer.getvalue(), 128, 128, "Epic")
+
+
+async def check_imports() -> list:
+    # spawn 은 sys.modules['__main__'].__file__ 을 워커에서 __mp_main__ 으로 다시 실행한다
+    main_module = sys.modules["__main__"]
+    script_path, main_module.__file__ = main_module.__file__, str(ROOT / "main.py")
+    service = RenderService(workers=1)
+    try:
+        pool = await service.start()
+        loop = asyncio.get_running_loop()
+        loaded = await loop.run_in_executor(pool, _loaded_modules, FORBIDDEN)
+    except BrokenProcessPool as e:
+        return [f"워커 시작 실패 — main.py 를 다시 import 하다 죽음 ({e})"]
+    finally:
+        service.close()
+        main_module.__file__ = script_path
+    print(f"imports  워커에 로드된 금지 모듈: {loaded or '없음'}", flush=True)
+    return [f"워커가 {name} 를 import 함" for name in loaded]
+
+
+async def check_timeout(jobs: int) -> list:
+    service = RenderService(workers=1, timeout=30)
+    job = _item_job()
+    problems = []
+    try:
+        await service.start()
+        first = asyncio.create_task(service.render(job, timeout=0.001))
+        queued = [asyncio.create_task(service.render(job)) for _ in range(jobs)]
+        results = await asyncio.gather(first, *queued, return_exceptions=True)
+        kinds = [type(r).__name__ if isinstance(r, BaseException) else "ok" for r in results]
+        print(f"timeout  첫 작업 {kinds[0]}, 대기 작업 {kinds[1:]}", flush=True)
+        for kind in kinds:
+            if kind not in ("ok", "RenderTimeout"):
+                problems.append(f"풀 교체 중 작업이 {kind} 로 끝남")
+        if not isinstance(results[0], RenderTimeout):
+            problems.append("첫 작업이 타임아웃되지 않음 (--jobs 를 늘리거나 더 느린 환경에서 다시)")
+        after = await service.render(job)
+        print(f"timeout  교체 뒤 렌더링 {len(after)} bytes, stats {service.get_stats()}", flush=True)
+    finally:
+        service.close()
+    return problems
+
+
+async def main_async(args) -> list:
+    return await check_imports() + await check_timeout(args.jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=6, help="타임아웃 작업 뒤에 줄 세울 작업 수")
+    args = parser.parse_args()
+    problems = asyncio.run(main_async(args))
+    for problem in problems:
+        print(f"  - {problem}")
+    print("OK" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
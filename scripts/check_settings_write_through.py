@@ -0,0 +1,197 @@
+"""설정 write-through 검사 — 필드 쓰기 뒤의 레거시 load_settings() + save_settings() 가 옛 값을 되돌려 쓰지 않는지.
+
+사용법:
+    python3 scripts/check_settings_write_through.py
+
+Firestore 클라이언트만 가짜 (메모리 문서 + 커밋된 쓰기 기록), 나머지는 run.core.config 그대로.
+listener 가 살아 있는 봇처럼 _apply_collection_updates 로 캐시 / 스냅샷 / 저장 기준 상태를 채운 뒤:
+
+    direct → update_docs 로 sticky lastMessageId '111' → '222' (바로 쓰기)
+    defer  → 같은 변경을 update_docs(defer=True) + write-behind flush 로
+    block  → blocklist.set_blocked / unblock (blocked_users.<user_id> 쓰기 + write-through)
+    그 다음 listener echo 가 오기 전에 load_settings() → global 키 하나만 고쳐 save_settings()
+
+    fallback → listener 가 꺼진 봇 (캐시 fallback) 에서 다른 프로세스(대시보드)가 차단을 쓴 뒤 is_blocked
+
+확인:
+  - save_settings 가 guilds/1 을 다시 쓰지 않음 (쓰면 옛 lastMessageId / blocked_users 로 되돌린 것)
+  - load_settings() / get_guild() / is_blocked 가 새 값을 돌려줌
+"""
+
+import argparse
+import copy
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.core import config  # noqa: E402
+from run.core.settings_snapshot import SettingsSnapshot  # noqa: E402
+from run.services import blocklist  # noqa: E402
+
+GUILD = {"GUILD_NAME": "테스트", "sticky_messages": [{"channelId": "10", "content": "공지", "lastMessageId": "111"}]}
+FS_DOCS = {("guilds", "1"): GUILD, ("global", "settings"): {"LAST_CHECKED_VIDEO_ID": "old"}}
+
+
+def _merge(doc, data):
+    from google.cloud import firestore
+    for key, value in data.items():
+        if value is firestore.DELETE_FIELD:
+            doc.pop(key, None)
+        elif isinstance(value, dict) and isinstance(doc.get(key), dict):
+            _merge(doc[key], value)
+        else:
+            doc[key] = copy.deepcopy(value)
+
+
+class FakeFirestore:
+    """google.cloud.firestore.Client 흉내 — document set/get, batch set/update/commit 만."""
+
+    def __init__(self, docs):
+        self.docs = copy.deepcopy(docs)  # (collection, doc_id) -> dict
+        self.writes = []                 # (경로, 종류, 필드) — 커밋된 순서대로
+
+    def _write(self, key, kind, data):
+        self.writes.append((f"{key[0]}/{key[1]}", kind, copy.deepcopy(data)))
+        if kind == "set_full":
+            self.docs[key] = copy.deepcopy(data)
+        elif kind == "set_merge":  # set(merge=True) 는 하위 map 도 병합
+            _merge(self.docs.setdefault(key, {}), data)
+        else:  # update / merge=필드목록 — 이 검사에서 쓰는 필드는 전부 최상위라 교체로 충분
+            self.docs.setdefault(key, {}).update(copy.deepcopy(data))
+
+    def collection(self, name):
+        fs = self
+
+        class Doc:
+            def __init__(self, doc_id=None):
+                self.key = (name, str(doc_id))
+
+            def set(self, data, merge=None):
+                fs._write(self.key, "set_full" if not merge else
+                          "set_merge" if merge is True else "set_fields", data)
+
+            def get(self):
+                data = fs.docs.get(self.key)
+                return types.SimpleNamespace(exists=data is not None, to_dict=lambda: copy.deepcopy(data))
+
+        return types.SimpleNamespace(document=Doc)
+
+    def batch(self):
+        fs = self
+
+        class Batch:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, ref, data, merge=None):
+                self.ops.append((ref.key, "set_full" if not merge else
+                                 "set_merge" if merge is True else "set_fields", data))
+
+            def update(self, ref, fields):
+                self.ops.append((ref.key, "update", fields))
+
+            def commit(self):
+                for op in self.ops:
+                    fs._write(*op)
+
+        return Batch()
+
+
+def reset(fs_docs):
+    """listener 초기 스냅샷을 받은 직후의 봇 상태로."""
+    fs = FakeFirestore(fs_docs)
+    config.SETTINGS_BACKEND = "firestore"
+    config.firestore_client = fs
+    config.settings_cache = None
+    config._snapshot = SettingsSnapshot.from_dict({"guilds": {}, "users": {}, "global": {}})
+    config._persisted_docs.clear()
+    config._listeners_active = True
+    config.save_local_backup = lambda settings: True  # 저장소 backups/ 에 검사용 설정을 남기지 않음
+    blocklist._fallback_maps.clear()
+    for collection in ("guilds", "users"):
+        config._apply_collection_updates(
+            collection, {doc_id: copy.deepcopy(data) for (c, doc_id), data in fs_docs.items() if c == collection},
+            replace=True)
+    config._apply_collection_updates("global", {"settings": copy.deepcopy(fs_docs[("global", "settings")])})
+    return fs
+
+
+def legacy_save(fs, name) -> list:
+    """global 키 하나만 바꾸는 레거시 저장 — guilds/1 을 건드리면 옛 값을 되돌려 쓴 것."""
+    before = len(fs.writes)
+    settings = config.load_settings()
+    settings["global"]["LAST_CHECKED_VIDEO_ID"] = name
+    config.save_settings(settings, silent=True)
+    legacy = fs.writes[before:]
+    print(f"{name:<8} 이어진 save_settings: {legacy}", flush=True)
+    return [f"{name}: save_settings 가 guilds/1 을 다시 씀 ({kind} {data})"
+            for path, kind, data in legacy if path == "guilds/1"]
+
+
+def run_scenario(name, write) -> list:
+    fs = reset(FS_DOCS)
+    sticky = copy.deepcopy(GUILD["sticky_messages"])
+    sticky[0]["lastMessageId"] = "222"
+    write({"1": {"sticky_messages": sticky}})
+    problems = legacy_save(fs, name)
+
+    stored = fs.docs[("guilds", "1")]["sticky_messages"][0]["lastMessageId"]
+    if stored != "222":
+        problems.append(f"{name}: Firestore 의 lastMessageId 가 {stored}")
+    cached = config.load_settings()["guilds"]["1"]["sticky_messages"][0]["lastMessageId"]
+    viewed = config.get_guild("1")["sticky_messages"][0]["lastMessageId"]
+    if (cached, viewed) != ("222", "222"):
+        problems.append(f"{name}: load_settings {cached} / get_guild {viewed}")
+    return problems
+
+
+def run_block() -> list:
+    fs = reset(FS_DOCS)
+    blocklist.set_blocked("1", "7", ["tts"], "9")
+    problems = legacy_save(fs, "block")
+    if "7" not in fs.docs[("guilds", "1")].get("blocked_users", {}):
+        problems.append("block: Firestore 에서 차단이 사라짐")
+    if not blocklist.is_blocked("1", "7", "tts"):
+        problems.append("block: is_blocked 가 차단을 못 봄")
+
+    blocklist.unblock("1", "7")
+    problems += legacy_save(fs, "unblock")
+    if "7" in fs.docs[("guilds", "1")].get("blocked_users", {}):
+        problems.append("unblock: Firestore 에 차단이 되살아남")
+    if blocklist.is_blocked("1", "7", "tts"):
+        problems.append("unblock: is_blocked 가 아직 차단")
+    return problems
+
+
+def run_fallback() -> list:
+    fs = reset(FS_DOCS)
+    config._listeners_active = False  # 시작 시 listener 등록 실패 → 캐시 fallback
+    blocked_before = blocklist.is_blocked("1", "7", "tts")
+    # 대시보드 프로세스의 차단 — 이 프로세스의 스냅샷은 모른다
+    _merge(fs.docs[("guilds", "1")], {"blocked_users": {"7": {"features": ["tts"]}}})
+    blocklist._fallback_maps.clear()  # FALLBACK_TTL 이 지난 것처럼
+    blocked_after = blocklist.is_blocked("1", "7", "tts")
+    print(f"fallback is_blocked 대시보드 차단 전 {blocked_before} → 후 {blocked_after}", flush=True)
+    return [] if (blocked_before, blocked_after) == (False, True) else ["fallback: is_blocked 가 대시보드 차단을 못 봄"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    def deferred(updates):
+        config.update_docs("guilds", updates, defer=True)
+        config.write_queue.flush()
+
+    problems = (run_scenario("direct", lambda updates: config.update_docs("guilds", updates))
+                + run_scenario("defer", deferred) + run_block() + run_fallback())
+    for problem in problems:
+        print(f"  - {problem}")
+    print("OK" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""guilds/{id}.stats (설정 문서 안의 통계) → guild_stats 일별 문서 마이그레이션.
+
+StatsCog 가 서버 설정 문서에 쌓던 stats.daily / stats.members / stats.logs 를
+run.services.stats_store 의 서버별·일별 문서로 옮기고, 설정 문서의 stats 필드를 지운다.
+
+- stats.daily[날짜] → {guild_id}_{날짜} 의 messages / member_count
+- stats.members (날짜 없는 누적값) / stats.logs → 가장 최근 날짜 문서의 members / names / logs
+  (로그는 timestamp 날짜별 문서로 나눔)
+
+사용:
+    python3 scripts/migrate_guild_stats.py --dry-run   # 미리보기
+    python3 scripts/migrate_guild_stats.py             # 실제 실행
+
+재실행 안전: 일별 문서는 set(merge=True) 로 덮어쓰기 (Increment 아님), stats 필드가 없는 서버는 건너뜀.
+"""
+
+import argparse
+import os
+import sys
+from collections import defaultdict
+
+# 프로젝트 루트를 import 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import firestore  # noqa: E402
+
+from run.services.stats_store import STATS_COLLECTION, day_doc_id  # noqa: E402
+
+GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID', 'ironic-objectivist-465713-a6')
+
+
+def convert(guild_id: str, stats: dict) -> dict:
+    """레거시 stats 한 덩어리 → {문서 id: 일별 문서}."""
+    docs = {}
+
+    def _doc(day):
+        if day not in docs:
+            docs[day] = {'guild_id': guild_id, 'date': day, 'kind': 'day', 'messages': 0}
+        return docs[day]
+
+    for day, entry in (stats.get('daily') or {}).items():
+        doc = _doc(day)
+        doc['messages'] = int(entry.get('messages', 0) or 0)
+        doc['member_count'] = int(entry.get('member_count', 0) or 0)
+
+    logs_by_day = defaultdict(list)
+    for log in stats.get('logs') or []:
+        day = str(log.get('timestamp', ''))[:10]
+        if len(day) == 10:
+            logs_by_day[day].append(log)
+    for day, logs in logs_by_day.items():
+        _doc(day)['logs'] = logs
+
+    members = stats.get('members') or {}
+    if members and docs:
+        latest = _doc(max(docs))
+        latest['members'] = {uid: int(m.get('messages', 0) or 0) for uid, m in members.items()}
+        latest['names'] = {uid: m['name'] for uid, m in members.items() if m.get('name')}
+
+    return {day_doc_id(guild_id, day): doc for day, doc in docs.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='쓰지 않고 건수만 출력')
+    args = parser.parse_args()
+
+    fs = firestore.Client(project=GCP_PROJECT_ID)
+    guilds = fs.collection('guilds')
+    stats_col = fs.collection(STATS_COLLECTION)
+
+    migrated = written = 0
+    for snap in guilds.stream():
+        stats = (snap.to_dict() or {}).get('stats')
+        if stats is None:
+            continue
+        docs = convert(snap.id, stats if isinstance(stats, dict) else {})
+        print(f"  {snap.id}: 일별 문서 {len(docs)}개, 로그 {len(stats.get('logs') or [])}개", flush=True)
+        migrated += 1
+        written += len(docs)
+        if args.dry_run:
+            continue
+        batch = fs.batch()
+        for i, (doc_id, doc) in enumerate(docs.items(), 1):
+            batch.set(stats_col.document(doc_id), doc, merge=True)
+            if i % 400 == 0:
+                batch.commit()
+                batch = fs.batch()
+        # 통계를 다 옮긴 뒤에만 설정 문서에서 제거
+        batch.update(guilds.document(snap.id), {'stats': firestore.DELETE_FIELD})
+        batch.commit()
+
+    mode = '미리보기' if args.dry_run else '완료'
+    print(f"[{mode}] 서버 {migrated}개 → {STATS_COLLECTION} 문서 {written}개", flush=True)
+
+
+if __name__ == '__main__':
+    main()
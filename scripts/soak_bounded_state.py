@@ -0,0 +1,192 @@
+"""채널 / 유저 / 서버별 상태 테이블 메모리 soak — 몇 주치 채널 churn 후에도 RSS 가 평평한지.
+
+사용법:
+    python3 scripts/soak_bounded_state.py [--weeks 4] [--channels-per-tick 300] [--tick-minutes 10]
+
+가짜 시계로 시간을 건너뛰며 실제 객체의 테이블을 채운다. 틱마다 새 채널 / 유저 / 서버가
+channels-per-tick 개씩 나타나 한 번 쓰이고 다시 오지 않는다 (오래된 것 일부는 다시 활동).
+    ChimeInDecider._state                 → on_user_message / on_bot_message
+    StickyEngine._last_sent / _last_ids  → _resend (가짜 채널)
+    VoiceManager.locks                    → _get_lock (가끔 잡힌 채로 둠 — 버리면 안 됨)
+    AudioPlayer.tts_queues                → 입장 시 빈 큐 생성 (가끔 재생 대기 중)
+    VoiceListenCog.listen_mode / ListenSink.detectors·_user_map → 모듈을 불러올 수 있을 때만
+
+확인:
+  - 모든 테이블 크기 ≤ maxsize (+ 버리면 안 되는 항목 수)
+  - 잡힌 락 / 비어 있지 않은 큐는 한 번도 버려지지 않음
+  - 첫 주 끝 RSS 대비 마지막 RSS 증가가 --max-growth-mb 이내
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import os
+import random
+import sys
+import types
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run.services.chat.chime_decider import ChimeInDecider  # noqa: E402
+from run.services.sticky_engine import StickyEngine  # noqa: E402
+from run.services.tts.audio_player import AudioPlayer  # noqa: E402
+from run.services.voice_manager import VoiceManager  # noqa: E402
+
+try:
+    from run.cogs import voice_listen  # noqa: E402
+except ImportError as e:  # discord.ext.voice_recv / davey 없는 환경
+    voice_listen = None
+    VOICE_LISTEN_ERROR = e
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # 최대치 (Linux 외)
+
+
+class FakeChannel:
+    _ids = itertools.count(1)
+
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+    async def send(self, content, silent=False):
+        return types.SimpleNamespace(id=next(self._ids))
+
+    def get_partial_message(self, message_id):
+        async def delete():
+            return None
+        return types.SimpleNamespace(delete=delete)
+
+
+class HeldLock:
+    """잡힌 채로 남아 있는 asyncio.Lock 흉내 (soak 는 이벤트 루프 밖에서 돈다)."""
+
+    def locked(self):
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--tick-minutes", type=float, default=10)
+    parser.add_argument("--channels-per-tick", type=int, default=300)
+    parser.add_argument("--max-growth-mb", type=float, default=8.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    clock = FakeClock()
+    decider = ChimeInDecider("debi", anthropic_client=None)
+    engine = StickyEngine(features_getter=lambda cid: None, persist=None)
+    voice = VoiceManager()
+    player = AudioPlayer()
+    tables = {
+        "chime._state": decider._state,
+        "sticky._last_sent": engine._last_sent,
+        "sticky._last_ids": engine._last_ids,
+        "voice.locks": voice.locks,
+        "tts_queues": player.tts_queues,
+    }
+    cog = sink = None
+    if voice_listen is not None:
+        cog = voice_listen.VoiceListenCog(bot=None)
+        sink = voice_listen.ListenSink(cog, "1", text_channel=None)
+        tables.update({"listen_mode": cog.listen_mode, "sink.detectors": sink.detectors,
+                       "sink._user_map": sink._user_map})
+    else:
+        print(f"[soak] voice_listen 건너뜀 ({VOICE_LISTEN_ERROR})", flush=True)
+    for table in tables.values():
+        table.clock = clock
+
+    # 버리면 안 되는 항목 — 끝까지 남아 있어야 함
+    held_locks, busy_queues = {}, {}
+
+    async def sticky_burst(channel_ids):
+        for cid in channel_ids:
+            sticky = {"channelId": str(cid), "enabled": True, "content": "공지"}
+            engine._features = lambda _cid, s=sticky: types.SimpleNamespace(stickies=((0, s),))
+            state = types.SimpleNamespace(channel=FakeChannel(cid), guild_id="1")
+            await engine._resend(cid, state)
+            engine._last_sent[cid] = clock.now
+
+    async def no_persist(*_):
+        return None
+    engine._persist = no_persist
+
+    ids = itertools.count(10_000_000)
+    seen = []  # 다시 활동할 수 있는 예전 ID 일부
+    ticks_per_week = int(7 * 24 * 60 / args.tick_minutes)
+    baseline = None
+    print(f"{'week':>4} {'RSS MB':>8}  " + "  ".join(f"{name}" for name in tables), flush=True)
+    loop = asyncio.new_event_loop()
+    for week in range(1, args.weeks + 1):
+        for _ in range(ticks_per_week):
+            clock.now += args.tick_minutes * 60
+            fresh = [next(ids) for _ in range(args.channels_per_tick)]
+            active = fresh + rng.sample(seen, min(len(seen), args.channels_per_tick // 10))
+            seen.extend(rng.sample(fresh, max(1, len(fresh) // 50)))
+            del seen[:-2000]
+            for cid in active:
+                decider.on_user_message(cid // 7, cid)
+                decider.on_bot_message(cid // 7, cid)
+                gid = str(cid // 3)
+                voice._get_lock(gid)
+                player.tts_queues.setdefault(gid, deque())
+                if cog is not None:
+                    cog._enter_listen_mode(cid)
+                    sink._user_map[cid] = object()
+                    sink.detectors.get_or_create(cid, lambda: types.SimpleNamespace(is_speaking=False))
+            loop.run_until_complete(sticky_burst(active[: max(1, len(active) // 20)]))
+            if rng.random() < 0.01:
+                gid = f"held-{len(held_locks)}"
+                held_locks[gid] = voice.locks[gid] = HeldLock()
+                busy_queues[gid] = player.tts_queues[gid] = deque(["pending.mp3"])
+        gc.collect()
+        rss = rss_mb()
+        if week == 1:
+            baseline = rss
+        sizes = "  ".join(f"{len(table):>{len(name)}}" for name, table in tables.items())
+        print(f"{week:>4} {rss:>8.1f}  {sizes}", flush=True)
+    loop.close()
+
+    problems = []
+    for name, table in tables.items():
+        extra = len(held_locks) if name in ("voice.locks", "tts_queues") else 0
+        if len(table) > table.maxsize + extra:
+            problems.append(f"{name} 크기 {len(table)} > maxsize {table.maxsize}")
+    for gid, lock in held_locks.items():
+        if voice.locks.get(gid) is not lock:
+            problems.append(f"잡힌 락이 버려짐: {gid}")
+    for gid, queue in busy_queues.items():
+        if player.tts_queues.get(gid) is not queue:
+            problems.append(f"대기 중인 TTS 큐가 버려짐: {gid}")
+    growth = rss - baseline
+    if growth > args.max_growth_mb:
+        problems.append(f"RSS 증가 {growth:.1f}MB > {args.max_growth_mb}MB (1주차 {baseline:.1f} → {rss:.1f})")
+
+    total = next(ids) - 10_000_000
+    print(f"\n채널 {total:,}개 churn, RSS 1주차 대비 {growth:+.1f}MB")
+    for problem in problems:
+        print(f"  - {problem}")
+    print("OK" if not problems else "FAIL")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()